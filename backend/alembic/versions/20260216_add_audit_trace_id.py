@@ -0,0 +1,28 @@
+"""Add trace_id to execution_audit_log
+
+Revision ID: 20260216_audit_trace_id
+Revises: ff623aa1e0db
+Create Date: 2026-02-16
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '20260216_audit_trace_id'
+down_revision: Union[str, None] = 'ff623aa1e0db'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('execution_audit_log', sa.Column('trace_id', sa.String(50), nullable=True))
+    op.create_index('ix_execution_audit_log_trace_id', 'execution_audit_log', ['trace_id'])
+
+
+def downgrade() -> None:
+    op.drop_index('ix_execution_audit_log_trace_id', table_name='execution_audit_log')
+    op.drop_column('execution_audit_log', 'trace_id')
@@ -0,0 +1,102 @@
+"""
+Broker Process for Trading System v2.0
+
+Owns everything that must exist once per deployment - the Kite ticker, the
+trading engine, the trailing-stop service, the shared API rate limiter and
+the reconciliation scheduler - and serves it to stateless API workers
+through the state hub (app/core/state_hub.py).
+
+Run with scripts/run_broker.py (PROCESS_ROLE=broker), then start any number
+of API workers with PROCESS_ROLE=api.
+"""
+
+import asyncio
+import os
+from typing import Optional
+
+from loguru import logger
+
+from ..core.state_hub import StateHub
+
+TICKER_METHODS = [
+    "start", "stop", "ensure_started", "subscribe", "start_recording", "stop_recording", "get_all_prices"
+]
+TRADING_METHODS = ["start", "stop", "status", "flatten", "risk_grid"]
+TRAILING_STOP_METHODS = [
+    "enable_trailing_stop", "disable_trailing_stop", "refresh_strategy", "get_state", "get_all_states", "stop"
+]
+TRACER_METHODS = ["get_stats", "recent_traces", "find_traces", "waterfall"]
+
+
+def expose_broker_state(hub: StateHub, loop: asyncio.AbstractEventLoop) -> None:
+    """
+    Register the broker process's singletons on the hub.
+
+    Args:
+        hub: Hub to register on
+        loop: Event loop running the engine; trading and trailing-stop
+            calls run on it so they never race the loop's own tasks
+    """
+    from .websocket import ticker_manager
+    from .trading_control import get_trading_controller
+    from ..core.rate_limiter import get_rate_limiter
+    from ..core.tracing import get_tracer
+    from ..services.execution import get_trailing_stop_service
+
+    # Ticks and order postbacks fan out to every worker's websocket clients
+    ticker_manager.add_callback(lambda ticks: hub.broadcast("ticks", ticks))
+    ticker_manager.add_order_callback(lambda data: hub.broadcast("orders", data))
+    hub.expose("ticker", ticker_manager, TICKER_METHODS)
+
+    hub.expose("trading", get_trading_controller(), TRADING_METHODS, loop)
+
+    trailing_stop = get_trailing_stop_service()
+    hub.expose("trailing_stop", trailing_stop, TRAILING_STOP_METHODS, loop)
+    # The monitor runs until stopped: schedule it rather than wait for it.
+    # Returns None - the loop's Handle could not be sent back to the worker.
+    def start_trailing_stop(poll_interval=5) -> None:
+        loop.call_soon_threadsafe(lambda: asyncio.ensure_future(trailing_stop.start(poll_interval)))
+
+    hub.register("trailing_stop.start", start_trailing_stop)
+
+    hub.register("rate_limit.reserve", get_rate_limiter().reserve)
+    hub.expose("tracer", get_tracer(), TRACER_METHODS)
+
+
+async def run_broker(config, stop_event: Optional[asyncio.Event] = None) -> None:
+    """
+    Serve the hub and publish state until stop_event is set.
+
+    Args:
+        config: Settings
+        stop_event: Set to shut down (runs forever if None)
+    """
+    from .trading_control import get_trading_controller
+    from ..core.state_hub import get_state_hub
+    from ..services.scheduler import start_scheduler, stop_scheduler
+
+    stop_event = stop_event or asyncio.Event()
+    hub = get_state_hub()
+    expose_broker_state(hub, asyncio.get_running_loop())
+    hub.start()
+
+    await start_scheduler()
+    logger.info("Reconciliation scheduler started")
+
+    controller = get_trading_controller()
+    try:
+        while not stop_event.is_set():
+            try:
+                hub.publish("trading.status", controller.status())
+                hub.publish("broker.heartbeat", {"pid": os.getpid(), "hub": hub.get_stats()})
+            except Exception as e:
+                logger.error(f"Broker state publish failed: {e}")
+            try:
+                await asyncio.wait_for(stop_event.wait(), timeout=config.state_publish_interval)
+            except asyncio.TimeoutError:
+                pass
+    finally:
+        if controller.running:
+            controller.stop()
+        await stop_scheduler()
+        hub.stop()
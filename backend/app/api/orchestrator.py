@@ -12,15 +12,18 @@ from pathlib import Path
 from loguru import logger
 
 from ..config.settings import Settings
-from ..config.constants import NIFTY_TOKEN, MARKET_OPEN_HOUR, MARKET_CLOSE_HOUR
+from ..config.constants import MARKET_OPEN_HOUR, MARKET_CLOSE_HOUR
 from ..core.kite_client import KiteClient
 from ..core.kite_provider import get_kite_client
 from ..core.data_cache import DataCache
 from ..core.state_manager import StateManager
 from ..core.trading_engine import TradingEngine
+from ..core.tracing import get_tracer
 from ..services.agents import Sentinel, Monk
+from ..services.agents.regime_service import get_regime_service
 from ..services.strategies import Strategist
-from ..services.execution import Treasury, Executor
+from ..services.execution import Treasury, Executor, RiskGridEngine
+from ..services.utilities.correlation_service import get_correlation_service
 from ..database.repository import Repository
 from ..database.models import RegimeLog
 
@@ -36,6 +39,8 @@ class Orchestrator:
         self.mode = mode
         self.running = False
         self.last_regime = None  # Track last regime for status reporting
+        self.last_regimes = {}  # symbol -> last regime, per underlying
+        self.underlying_tokens = list(config.underlying_tokens)
         
         # Get KiteClient from provider (uses DB credentials, cached for the day)
         self.kite = get_kite_client(paper_mode=(mode == "paper"))
@@ -56,10 +61,24 @@ class Orchestrator:
         # Initialize agents - share state_manager for consistent margin tracking
         self.sentinel = Sentinel(self.kite, config, self.data_cache)
         self.strategist = Strategist(self.kite, config)
-        self.treasury = Treasury(self.kite, config, self.state_manager, paper_mode=(mode == "paper"))
         self.executor = Executor(self.kite, config, self.state_manager)
+        self.risk_grid = RiskGridEngine(self.executor.greeks_aggregator)
+        self.treasury = Treasury(
+            self.kite, config, self.state_manager,
+            paper_mode=(mode == "paper"), risk_grid=self.risk_grid
+        )
         self.monk = Monk(self.kite, config, config.models_dir)
         
+        # Revise today's correlation bars from live ticks (no per-iteration refetch)
+        if not getattr(self.kite, "mock_mode", False):
+            get_correlation_service().start()
+        
+        get_tracer().configure(
+            sample_rate=config.trace_sample_rate,
+            capacity=config.trace_buffer_size,
+            max_spans=config.trace_max_spans
+        )
+        
         # Initialize TradingEngine with all agents
         # This is the SAME engine used by backtest runner
         self.trading_engine = TradingEngine(
@@ -68,11 +87,20 @@ class Orchestrator:
             treasury=self.treasury,
             executor=self.executor,
             state_manager=self.state_manager,
-            kite=self.kite
+            kite=self.kite,
+            pipeline_factory=self._create_pipeline,
+            max_workers=config.pipeline_workers
         )
         
         logger.info(f"Orchestrator initialized in {mode.upper()} mode")
     
+    def _create_pipeline(self, instrument_token: int):
+        """Create an isolated Sentinel/Strategist pair for an extra underlying."""
+        return (
+            Sentinel(self.kite, self.config, self.data_cache),
+            Strategist(self.kite, self.config)
+        )
+    
     async def run(self, interval_seconds: int = 30):
         """Main trading loop."""
         self.running = True
@@ -108,29 +136,42 @@ class Orchestrator:
         logger.info(f"Trading loop stopped after {iteration_count} iterations")
     
     async def _run_iteration(self):
-        """Run one iteration of the trading loop."""
-        logger.info(f"=== Iteration at {datetime.now().strftime('%H:%M:%S')} ===")
-        
+        """Run one iteration of the trading loop (one trace, see GET /traces)."""
+        with get_tracer().trace("orchestrator.iteration", underlyings=len(self.underlying_tokens)) as trace_id:
+            logger.info(f"=== Iteration at {datetime.now().strftime('%H:%M:%S')} (trace {trace_id}) ===")
+            await self._run_traced_iteration()
+    
+    async def _run_traced_iteration(self):
         # Use shared TradingEngine for the core trading logic
         # This is the SAME code path used by backtest runner
-        result = self.trading_engine.run_iteration(NIFTY_TOKEN)
-        
-        # Log regime to database (Orchestrator-specific)
-        if result.regime:
-            self.last_regime = result.regime  # Track for status reporting
-            logger.info(f"Regime: {result.regime.regime.value} (safe={result.regime.is_safe})")
-            self._log_regime(result.regime)
-        
-        # Log results
-        for exit_info in result.exits:
-            logger.info(f"Exit: {exit_info['reason']} P&L: {exit_info.get('pnl', 0):.2f}")
+        # Runs off the event loop; underlyings are evaluated concurrently
+        cycle = await asyncio.to_thread(self.trading_engine.run_cycle, self.underlying_tokens)
         
-        for entry_info in result.entries:
-            logger.info(f"Entry: {entry_info['structure']} on {entry_info['instrument']}")
-            logger.info(f"Execution ({self.mode.upper()}): SUCCESS")
+        for token, result in cycle.results.items():
+            # Log regime to database (Orchestrator-specific)
+            if result.regime:
+                if token == self.underlying_tokens[0]:
+                    self.last_regime = result.regime  # Track for status reporting
+                self.last_regimes[result.regime.symbol] = result.regime
+                get_regime_service().publish(result.regime)  # Serves GET /regime/current
+                logger.info(
+                    f"Regime {result.regime.symbol}: {result.regime.regime.value} "
+                    f"(safe={result.regime.is_safe}, {cycle.pipeline_ms.get(token, 0):.0f}ms)"
+                )
+                self._log_regime(result.regime)
+            
+            # Log results
+            for exit_info in result.exits:
+                logger.info(f"Exit: {exit_info['reason']} P&L: {exit_info.get('pnl', 0):.2f}")
+            
+            for entry_info in result.entries:
+                logger.info(f"Entry: {entry_info['structure']} on {entry_info['instrument']}")
+                logger.info(f"Execution ({self.mode.upper()}): SUCCESS")
+            
+            if result.skipped_reason:
+                logger.info(f"{result.regime.symbol if result.regime else token}: {result.skipped_reason}")
         
-        if result.skipped_reason:
-            logger.info(result.skipped_reason)
+        logger.info(f"Cycle over {len(self.underlying_tokens)} underlyings took {cycle.elapsed_ms:.0f}ms")
     
     def _is_market_hours(self) -> bool:
         """Check if current time is within market hours."""
@@ -167,6 +208,7 @@ class Orchestrator:
     def stop(self):
         """Stop the trading loop."""
         self.running = False
+        self.trading_engine.shutdown()
         logger.info("Stop signal sent")
     
     def flatten_all(self, reason: str = "MANUAL"):
@@ -45,6 +45,83 @@ async def health_check():
     )
 
 
+@router.get("/broker/read-cache")
+async def get_broker_read_cache_stats():
+    """Hit/coalesce counters and TTLs of the broker read-through cache."""
+    from ..core.broker_cache import get_broker_cache
+    return get_broker_cache().get_stats()
+
+
+@router.get("/metrics")
+async def get_latency_metrics():
+    """Latency histograms in Prometheus text format (engine stages, broker calls, DB, websocket)."""
+    from fastapi.responses import PlainTextResponse
+    from ..core.metrics import get_metrics
+    return PlainTextResponse(get_metrics().render(), media_type="text/plain; version=0.0.4")
+
+
+@router.get("/metrics/summary")
+async def get_latency_summary():
+    """Latency count/mean and recent p50/p95/p99 in milliseconds, per label set."""
+    from ..core.metrics import get_metrics
+    return get_metrics().get_stats()
+
+
+async def _service_call(service, method: str, *args, **kwargs):
+    """
+    Call a method of a broker-owned service. In an API worker the service is
+    a HubProxy: the round trip runs off the event loop, and an unreachable or
+    unresponsive broker process is a 503.
+    """
+    from ..core.state_hub import HubError, HubProxy
+    import asyncio
+    
+    if not isinstance(service, HubProxy):
+        return getattr(service, method)(*args, **kwargs)
+    try:
+        return await asyncio.to_thread(getattr(service, method), *args, **kwargs)
+    except HubError as e:
+        raise HTTPException(status_code=503, detail=str(e))
+
+
+def _tracer():
+    """Tracer of the process running the engine (the broker process, for API workers)."""
+    from ..core.state_hub import get_hub_client, is_api_worker
+    if is_api_worker():
+        return get_hub_client().proxy("tracer")
+    from ..core.tracing import get_tracer
+    return get_tracer()
+
+
+@router.get("/traces")
+async def get_recent_traces(limit: int = 50):
+    """Newest traces in the ring buffer plus sampling/overhead stats."""
+    tracer = _tracer()
+    return {
+        "stats": await _service_call(tracer, "get_stats"),
+        "traces": await _service_call(tracer, "recent_traces", limit)
+    }
+
+
+@router.get("/traces/trade/{trade_id}")
+async def get_trade_traces(trade_id: str):
+    """Waterfalls of every buffered trace touching a trade (via its audit events)."""
+    tracer = _tracer()
+    trace_ids = await _service_call(tracer, "find_traces", trade_id=trade_id)
+    if not trace_ids:
+        raise HTTPException(status_code=404, detail=f"No traces for trade {trade_id}")
+    return {"trade_id": trade_id, "traces": [await _service_call(tracer, "waterfall", t) for t in trace_ids]}
+
+
+@router.get("/traces/{trace_id}")
+async def get_trace_waterfall(trace_id: str):
+    """Span waterfall for one iteration (trace id = audit entry trace_id)."""
+    waterfall = await _service_call(_tracer(), "waterfall", trace_id)
+    if not waterfall:
+        raise HTTPException(status_code=404, detail=f"Trace {trace_id} not found")
+    return waterfall
+
+
 # ============== Data ==============
 
 @router.post("/data/download")
@@ -221,103 +298,99 @@ async def download_historical_data(request: HistoricalDownloadRequest):
 
 # ============== Trading ==============
 
-# Global orchestrator instance and task reference
-_orchestrator = None
-_orchestrator_task = None
+async def _trading_call(method: str, **kwargs):
+    """
+    Run a TradingController method where the engine lives: in this process,
+    or in the broker process when this is a stateless API worker.
+    """
+    from ..core.state_hub import HubUnavailable, get_hub_client, is_api_worker
+    from .trading_control import get_trading_controller
+    import asyncio
+    
+    try:
+        if is_api_worker():
+            return await asyncio.to_thread(get_hub_client().call, f"trading.{method}", **kwargs)
+        result = getattr(get_trading_controller(), method)(**kwargs)
+        return await result if asyncio.iscoroutine(result) else result
+    except HubUnavailable as e:
+        raise HTTPException(status_code=503, detail=str(e))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
 
 
 @router.post("/trading/start")
 async def start_trading(mode: str = "paper", interval_seconds: int = 30):
     """Start the trading system."""
-    global _orchestrator, _orchestrator_task
-    
-    # Check if task is actually running (not just orchestrator exists)
-    if _orchestrator_task is not None and not _orchestrator_task.done():
-        raise HTTPException(status_code=400, detail="Trading already running")
-    
-    from ..config.settings import Settings
-    from .orchestrator import Orchestrator
-    import asyncio
-    
-    logger.info(f"Creating orchestrator in {mode} mode...")
-    config = Settings()
-    _orchestrator = Orchestrator(config, mode)
-    logger.info("Orchestrator created, starting task...")
-    
-    # Store task reference to prevent garbage collection and track status
-    _orchestrator_task = asyncio.create_task(_orchestrator.run(interval_seconds))
-    logger.info(f"Task created: {_orchestrator_task}")
-    
-    # Add callback to log any errors
-    def on_task_done(task):
-        try:
-            exc = task.exception()
-            if exc:
-                logger.error(f"Trading loop failed with error: {exc}")
-        except asyncio.CancelledError:
-            logger.info("Trading loop task was cancelled")
-    
-    _orchestrator_task.add_done_callback(on_task_done)
-    
-    return {"message": f"Trading started in {mode.upper()} mode with {interval_seconds}s interval"}
+    return await _trading_call("start", mode=mode, interval_seconds=interval_seconds)
 
 
 @router.post("/trading/stop")
 async def stop_trading():
     """Stop the trading system."""
-    global _orchestrator, _orchestrator_task
-    
-    if _orchestrator_task is None or _orchestrator_task.done():
-        raise HTTPException(status_code=400, detail="Trading not running")
-    
-    _orchestrator.stop()
-    # Cancel the task if still running
-    if not _orchestrator_task.done():
-        _orchestrator_task.cancel()
-    return {"message": "Trading stopped"}
+    return await _trading_call("stop")
 
 
 @router.get("/trading/status", response_model=TradingStatusResponse)
 async def get_trading_status():
     """Get current trading status."""
-    global _orchestrator, _orchestrator_task
-    
-    # Check actual task status, not just orchestrator existence
-    is_running = _orchestrator_task is not None and not _orchestrator_task.done()
-    
-    if not _orchestrator or not is_running:
-        return TradingStatusResponse(
-            mode="stopped",
-            running=False,
-            positions=0,
-            daily_pnl=0,
-            regime=None
-        )
+    from ..core.state_hub import HubError, get_hub_client, is_api_worker
     
-    # Get last regime from orchestrator
-    regime_str = None
-    if _orchestrator.last_regime:
-        regime_str = f"{_orchestrator.last_regime.regime.value} (safe={_orchestrator.last_regime.is_safe})"
-    
-    return TradingStatusResponse(
-        mode=_orchestrator.mode,
-        running=is_running,
-        positions=len(_orchestrator.executor.get_open_positions()) if is_running else 0,
-        daily_pnl=_orchestrator.state_manager.get("daily_pnl", 0.0) if is_running else 0,
-        regime=regime_str
-    )
+    if is_api_worker():
+        # Published by the broker process every state_publish_interval
+        import asyncio
+        try:
+            status = await asyncio.to_thread(get_hub_client().get, "trading.status")
+        except HubError as e:
+            raise HTTPException(status_code=503, detail=str(e))
+        if status is None:
+            raise HTTPException(status_code=503, detail="Broker process has not published trading status")
+        return TradingStatusResponse(**status)
+    
+    from .trading_control import get_trading_controller
+    return TradingStatusResponse(**get_trading_controller().status())
 
 
 @router.post("/trading/flatten")
 async def flatten_all(reason: str = "MANUAL"):
     """Emergency flatten all positions."""
-    global _orchestrator
+    return await _trading_call("flatten", reason=reason)
+
+
+# ============== Risk ==============
+
+@router.get("/risk/grid")
+async def get_risk_grid(
+    spot_range: float = 0.10,
+    spot_points: int = 50,
+    vol_down: float = 0.05,
+    vol_up: float = 0.14,
+    vol_points: int = 20,
+    days: str = "0,1,2,5,10"
+):
+    """
+    Spot x vol x time P&L surfaces for the open book.
     
-    if not _orchestrator:
-        raise HTTPException(status_code=400, detail="Trading not running")
+    Surfaces are indexed [spot_shock][vol_shock][days_forward] for the
+    portfolio, each strategy and each underlying.
+    """
+    from ..services.execution.risk_grid import RiskGridConfig
     
-    results = _orchestrator.flatten_all(reason)
-    return {"message": "Flatten executed", "results": len(results)}
+    if spot_points < 1 or vol_points < 1:
+        raise HTTPException(status_code=400, detail="spot_points and vol_points must be at least 1")
+    try:
+        day_list = [int(d) for d in days.split(",") if d.strip()]
+    except ValueError:
+        raise HTTPException(status_code=400, detail="days must be a comma-separated list of integers")
+    
+    config = RiskGridConfig.build(
+        spot_range=spot_range,
+        spot_points=min(spot_points, 200),
+        vol_down=vol_down,
+        vol_up=vol_up,
+        vol_points=min(vol_points, 50),
+        days=day_list
+    )
+    return await _trading_call("risk_grid", config=config)
 
 
 # ============== Positions & Orders ==============
@@ -353,10 +426,11 @@ async def get_positions(request: Request):
         net_positions = positions_data.get("net", [])
         
         # Also get paper positions from orchestrator if running
-        global _orchestrator
         paper_positions = []
-        if _orchestrator and _orchestrator.running:
-            paper_positions = [p.tradingsymbol for p in _orchestrator.executor.get_open_positions()]
+        try:
+            paper_positions = (await _trading_call("status"))["open_symbols"]
+        except HTTPException:
+            pass  # Broker process unreachable: real positions only
         
         # F&O exchanges only - filter out equity (NSE/BSE CNC positions)
         FO_EXCHANGES = {"NFO", "MCX", "BFO", "CDS"}
@@ -487,7 +561,7 @@ async def get_indices_quotes(request: Request, body: IndicesQuotesRequest):
     from ..config.settings import Settings
     from .auth import get_access_token
     from datetime import datetime, timedelta
-    import pytz
+    from zoneinfo import ZoneInfo
     
     config = Settings()
     access_token = get_access_token(request) or config.kite_access_token
@@ -507,7 +581,7 @@ async def get_indices_quotes(request: Request, body: IndicesQuotesRequest):
         logger.debug(f"Got quotes: {quotes}")
         
         result = []
-        ist = pytz.timezone('Asia/Kolkata')
+        ist = ZoneInfo('Asia/Kolkata')
         now = datetime.now(ist)
         
         for symbol in body.symbols:
@@ -536,7 +610,7 @@ async def get_indices_quotes(request: Request, body: IndicesQuotesRequest):
                     
                     if ltt:
                         if ltt.tzinfo is None:
-                            ltt = ist.localize(ltt)
+                            ltt = ltt.replace(tzinfo=ist)
                         market_open = (now - ltt) < timedelta(minutes=5)
                 
                 # Fallback: check if within NSE market hours (9:15 AM - 3:30 PM IST, Mon-Fri)
@@ -1598,26 +1672,34 @@ async def sync_positions(request: Request):
 
 @router.get("/regime/current")
 async def get_current_regime(request: Request):
-    """Get current market regime."""
-    from ..core.kite_client import KiteClient
-    from ..config.settings import Settings
+    """Get current market regime (cached; recomputed at most once per TTL)."""
     from ..config.constants import NIFTY_TOKEN
-    from ..services.agents import Sentinel
-    from ..core.data_cache import DataCache
-    from .auth import get_access_token
-    
-    config = Settings()
-    
-    # Get KiteClient from provider (paper mode for regime detection)
-    kite = get_kite_client(paper_mode=True, skip_api_check=True)
-    if not kite:
-        raise HTTPException(status_code=500, detail="No valid KiteClient available")
+    from ..services.agents.regime_service import get_regime_service
     
-    cache = DataCache(Path("data/cache"))
+    try:
+        entry = await get_regime_service().get_async(NIFTY_TOKEN)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Regime unavailable: {e}")
     
-    sentinel = Sentinel(kite, config, cache)
-    regime = sentinel.process(NIFTY_TOKEN)
+    # Response is built once per regime version and shared by all pollers
+    cached = _regime_responses.get(NIFTY_TOKEN)
+    if cached is None or cached[0] != entry.version:
+        cached = (entry.version, _build_regime_response(entry.packet))
+        _regime_responses[NIFTY_TOKEN] = cached
     
+    return {
+        **cached[1],
+        "source": entry.source,
+        "age_seconds": round(entry.age, 3)
+    }
+
+
+# token -> (regime version, response body)
+_regime_responses: dict = {}
+
+
+def _build_regime_response(regime) -> dict:
+    """Build the /regime/current body for a RegimePacket."""
     # Build detailed explanation of regime classification
     explanation = _build_regime_explanation(regime)
     
@@ -1768,8 +1850,9 @@ async def enable_trailing_stop(strategy_id: str, config: TrailingStopConfigReque
     if config is None:
         config = TrailingStopConfigRequest()
     
-    service = get_trailing_stop_service()
-    success = service.enable_trailing_stop(
+    success = await _service_call(
+        get_trailing_stop_service(),
+        "enable_trailing_stop",
         strategy_id=strategy_id,
         activation_pct=config.activation_pct,
         step_pct=config.step_pct,
@@ -1799,8 +1882,9 @@ async def disable_trailing_stop(strategy_id: str, cancel_orders: bool = True):
     """
     from ..services.execution import get_trailing_stop_service
     
-    service = get_trailing_stop_service()
-    success = service.disable_trailing_stop(strategy_id, cancel_orders=cancel_orders)
+    success = await _service_call(
+        get_trailing_stop_service(), "disable_trailing_stop", strategy_id, cancel_orders=cancel_orders
+    )
     
     if not success:
         raise HTTPException(status_code=404, detail="Strategy not found or failed to disable")
@@ -1830,6 +1914,10 @@ async def update_trailing_stop_config(strategy_id: str, config: TrailingStopConf
         
         session.commit()
         
+        # Pick up new thresholds in the tick-driven monitor
+        from ..services.execution import get_trailing_stop_service
+        await _service_call(get_trailing_stop_service(), "refresh_strategy", strategy_id)
+        
         return {
             "message": "Trailing stop config updated",
             "strategy_id": strategy_id,
@@ -1860,8 +1948,7 @@ async def get_trailing_stop_status(strategy_id: str):
         if not strategy:
             raise HTTPException(status_code=404, detail="Strategy not found")
         
-        service = get_trailing_stop_service()
-        state = service.get_state(strategy_id)
+        state = await _service_call(get_trailing_stop_service(), "get_state", strategy_id)
         
         return {
             "strategy_id": strategy_id,
@@ -1899,11 +1986,11 @@ async def get_all_trailing_stop_statuses():
             Strategy.trailing_stop_enabled == True
         ).all()
         
-        service = get_trailing_stop_service()
+        states = await _service_call(get_trailing_stop_service(), "get_all_states")
         
         result = []
         for strategy in strategies:
-            state = service.get_state(strategy.id)
+            state = states.get(strategy.id)
             result.append({
                 "strategy_id": strategy.id,
                 "strategy_name": strategy.name,
@@ -1926,18 +2013,23 @@ async def start_trailing_stop_monitor(poll_interval: int = 5, background_tasks:
     
     This runs in the background and monitors all strategies with trailing stop enabled.
     """
+    from ..core.state_hub import HubProxy
     from ..services.execution import get_trailing_stop_service
     import asyncio
     
     service = get_trailing_stop_service()
     
-    if background_tasks:
+    if isinstance(service, HubProxy):
+        # The broker process schedules the monitor on its own loop
+        await _service_call(service, "start", poll_interval)
+        return {"message": f"Trailing stop monitor started (tick-driven, P&L flushed every {poll_interval}s)"}
+    elif background_tasks:
         background_tasks.add_task(service.start, poll_interval)
-        return {"message": f"Trailing stop monitor started with {poll_interval}s interval"}
+        return {"message": f"Trailing stop monitor started (tick-driven, P&L flushed every {poll_interval}s)"}
     else:
         # Start in a new task
         asyncio.create_task(service.start(poll_interval))
-        return {"message": f"Trailing stop monitor started with {poll_interval}s interval"}
+        return {"message": f"Trailing stop monitor started (tick-driven, P&L flushed every {poll_interval}s)"}
 
 
 @router.post("/trailing-stop/stop")
@@ -1945,8 +2037,7 @@ async def stop_trailing_stop_monitor():
     """Stop the trailing stop monitoring service."""
     from ..services.execution import get_trailing_stop_service
     
-    service = get_trailing_stop_service()
-    service.stop()
+    await _service_call(get_trailing_stop_service(), "stop")
     
     return {"message": "Trailing stop monitor stopped"}
 
@@ -1987,30 +2078,31 @@ async def reconcile_positions(request: Request, dry_run: bool = False):
 @router.get("/debug/strategist")
 async def debug_strategist():
     """Debug endpoint to test strategist proposal generation and execution."""
-    global _orchestrator
     from datetime import date
+    from .trading_control import get_trading_controller
     
-    if not _orchestrator:
+    orchestrator = get_trading_controller().orchestrator
+    if not orchestrator:
         raise HTTPException(status_code=400, detail="Trading not running")
     
     # Get current regime
     from ..config.constants import NIFTY_TOKEN
-    regime = _orchestrator.sentinel.process(NIFTY_TOKEN)
+    regime = orchestrator.sentinel.process(NIFTY_TOKEN)
     
     # Try to generate proposals
-    proposals = _orchestrator.strategist.process(regime)
+    proposals = orchestrator.strategist.process(regime)
     
     # Get expiry info
-    kite = _orchestrator.kite
+    kite = orchestrator.kite
     df = kite.get_instruments("NFO")
     nifty_opts = df[(df['name'] == 'NIFTY') & (df['instrument_type'].isin(['CE', 'PE']))]
     expiries = sorted(nifty_opts['expiry'].unique())[:5]
     
     # Test Treasury validation for each proposal
-    account = _orchestrator.treasury.get_account_state()
+    account = orchestrator.treasury.get_account_state()
     treasury_results = []
     for p in proposals:
-        approved, signal, reason = _orchestrator.treasury.process(p, account)
+        approved, signal, reason = orchestrator.treasury.process(p, account)
         treasury_results.append({
             "structure": p.structure.value,
             "approved": approved,
@@ -2046,13 +2138,14 @@ async def debug_strategist():
 @router.get("/debug/option-chain/{symbol}/{expiry}")
 async def debug_option_chain(symbol: str, expiry: str):
     """Debug endpoint to check option chain prices."""
-    global _orchestrator
     from datetime import date, datetime
+    from .trading_control import get_trading_controller
     
-    if not _orchestrator:
+    orchestrator = get_trading_controller().orchestrator
+    if not orchestrator:
         raise HTTPException(status_code=400, detail="Trading not running")
     
-    kite = _orchestrator.kite
+    kite = orchestrator.kite
     expiry_date = datetime.strptime(expiry, "%Y-%m-%d").date()
     
     df = kite.get_option_chain(symbol.upper(), expiry_date)
@@ -2098,12 +2191,13 @@ async def debug_option_chain(symbol: str, expiry: str):
 @router.get("/debug/expiries/{symbol}")
 async def get_symbol_expiries(symbol: str):
     """Debug endpoint to check available expiries for a symbol."""
-    global _orchestrator
     from datetime import date
+    from .trading_control import get_trading_controller
     
     # Use orchestrator's kite client if available
-    if _orchestrator and _orchestrator.kite:
-        kite = _orchestrator.kite
+    orchestrator = get_trading_controller().orchestrator
+    if orchestrator and orchestrator.kite:
+        kite = orchestrator.kite
     else:
         from ..core.kite_provider import get_kite_client
         kite = get_kite_client(paper_mode=True)
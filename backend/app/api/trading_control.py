@@ -0,0 +1,126 @@
+"""
+Trading engine control for Trading System v2.0
+
+Owns the Orchestrator and its asyncio task in the process that runs the
+engine (the single process, or the broker process of a multi-worker
+deployment). The /trading endpoints call it directly in-process or through
+the state hub from API workers, so every method returns plain data.
+"""
+
+import asyncio
+from typing import Dict, Optional
+
+from loguru import logger
+
+
+class TradingController:
+    """Starts, stops and reports on the trading loop."""
+
+    def __init__(self):
+        self.orchestrator = None
+        self._task: Optional[asyncio.Task] = None
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    async def start(self, mode: str = "paper", interval_seconds: int = 30) -> Dict:
+        """
+        Create an Orchestrator and run its loop as a task on the current event loop.
+
+        Raises:
+            ValueError: If trading is already running
+        """
+        if self.running:
+            raise ValueError("Trading already running")
+
+        from ..config.settings import Settings
+        from .orchestrator import Orchestrator
+
+        logger.info(f"Creating orchestrator in {mode} mode...")
+        self.orchestrator = Orchestrator(Settings(), mode)
+        logger.info("Orchestrator created, starting task...")
+
+        # Keep the task reference to prevent garbage collection and track status
+        self._task = asyncio.create_task(self.orchestrator.run(interval_seconds))
+        logger.info(f"Task created: {self._task}")
+
+        def on_task_done(task):
+            try:
+                exc = task.exception()
+                if exc:
+                    logger.error(f"Trading loop failed with error: {exc}")
+            except asyncio.CancelledError:
+                logger.info("Trading loop task was cancelled")
+
+        self._task.add_done_callback(on_task_done)
+        return {"message": f"Trading started in {mode.upper()} mode with {interval_seconds}s interval"}
+
+    def stop(self) -> Dict:
+        """
+        Stop the trading loop.
+
+        Raises:
+            ValueError: If trading is not running
+        """
+        if not self.running:
+            raise ValueError("Trading not running")
+        self.orchestrator.stop()
+        if not self._task.done():
+            self._task.cancel()
+        return {"message": "Trading stopped"}
+
+    def status(self) -> Dict:
+        """Mode, open position count, daily P&L and last regime of the loop."""
+        if not self.orchestrator or not self.running:
+            return {"mode": "stopped", "running": False, "positions": 0, "daily_pnl": 0.0,
+                    "regime": None, "open_symbols": []}
+
+        regime = self.orchestrator.last_regime
+        open_positions = self.orchestrator.executor.get_open_positions()
+        return {
+            "mode": self.orchestrator.mode,
+            "running": True,
+            "positions": len(open_positions),
+            "daily_pnl": self.orchestrator.state_manager.get("daily_pnl", 0.0),
+            "regime": f"{regime.regime.value} (safe={regime.is_safe})" if regime else None,
+            "open_symbols": [p.tradingsymbol for p in open_positions],
+        }
+
+    def flatten(self, reason: str = "MANUAL") -> Dict:
+        """
+        Emergency flatten all positions.
+
+        Raises:
+            ValueError: If no orchestrator has been started
+        """
+        if not self.orchestrator:
+            raise ValueError("Trading not running")
+        results = self.orchestrator.flatten_all(reason)
+        return {"message": "Flatten executed", "results": len(results)}
+
+    def risk_grid(self, config) -> Dict:
+        """
+        Risk grid surfaces of the open book.
+
+        Args:
+            config: RiskGridConfig
+
+        Raises:
+            ValueError: If no orchestrator has been started
+        """
+        if not self.orchestrator:
+            raise ValueError("Trading not running")
+        return self.orchestrator.risk_grid.compute(config).to_dict()
+
+
+# Global controller
+_controller: Optional[TradingController] = None
+
+
+def get_trading_controller() -> TradingController:
+    """Get or create the trading controller."""
+    global _controller
+    if _controller is None:
+        _controller = TradingController()
+    return _controller
@@ -22,6 +22,10 @@ from ..database.models import (
 )
 
 from ..core.kite_client import KiteClient
+from ..core.broker_cache import get_broker_cache
+from ..core.metrics import WEBSOCKET_UPDATE_SECONDS
+from ..core.state_hub import RemoteTicker, get_hub_client, is_api_worker
+from ..core.tick_log import TickRecorder, TickReplay
 from ..config.settings import Settings
 from .auth import get_any_valid_access_token
 from ..services.utilities import InstrumentCache, PnLCalculator
@@ -51,14 +55,18 @@ class KiteTickerManager:
         self._initialized = True
         self._kws = None
         self._running = False
-        self._subscribed_tokens: Set[int] = set()
+        self._connected = False
+        self._subscribed_tokens: Set[int] = set()  # Wanted tokens, (re)sent on every connect
         self._price_cache: Dict[int, Dict] = {}  # token -> tick data
         self._position_data: Dict[int, Dict] = {}  # token -> position info
         self._callbacks: List[callable] = []
+        self._order_callbacks: List[callable] = []
         self._thread = None
         self._access_token = None
         self._api_key = None
         self._instrument_cache = InstrumentCache()
+        self._recorder: Optional[TickRecorder] = None
+        self._replay: Optional[TickReplay] = None
         logger.info("KiteTickerManager initialized")
     
     def add_callback(self, callback: callable):
@@ -71,6 +79,16 @@ class KiteTickerManager:
         if callback in self._callbacks:
             self._callbacks.remove(callback)
     
+    def add_order_callback(self, callback: callable):
+        """Add callback to be called with order update postbacks."""
+        if callback not in self._order_callbacks:
+            self._order_callbacks.append(callback)
+    
+    def remove_order_callback(self, callback: callable):
+        """Remove order update callback."""
+        if callback in self._order_callbacks:
+            self._order_callbacks.remove(callback)
+    
     def start(self, api_key: str, access_token: str):
         """Start the Kite WebSocket ticker."""
         if self._running:
@@ -94,6 +112,7 @@ class KiteTickerManager:
             self._kws.on_close = self._on_close
             self._kws.on_error = self._on_error
             self._kws.on_reconnect = self._on_reconnect
+            self._kws.on_order_update = self._on_order_update
             
             # Start in background thread
             self._thread = threading.Thread(target=self._run_ticker, daemon=True)
@@ -104,6 +123,30 @@ class KiteTickerManager:
         except Exception as e:
             logger.error(f"Failed to start Kite ticker: {e}")
     
+    def ensure_started(self) -> bool:
+        """
+        Start the ticker with the best available credentials if it is not running.
+        
+        Services that need ticks (trailing stops, live Greeks) call this so
+        they do not depend on a dashboard websocket having started it.
+        
+        Returns:
+            True if the ticker is running (or replaying)
+        """
+        if self._running:
+            return True
+        config = Settings()
+        access_token = get_any_valid_access_token() or config.kite_access_token
+        if not (config.kite_api_key and access_token):
+            logger.warning("No Kite credentials, ticker not started")
+            return False
+        self.start(config.kite_api_key, access_token)
+        return self._running
+    
+    @property
+    def is_connected(self) -> bool:
+        return self._connected
+    
     def _run_ticker(self):
         """Run ticker in background thread."""
         try:
@@ -120,24 +163,63 @@ class KiteTickerManager:
             except:
                 pass
         self._running = False
+        self._connected = False
         self._kws = None
         logger.info("Kite WebSocket ticker stopped")
     
     def subscribe(self, tokens: List[int]):
-        """Subscribe to instrument tokens."""
+        """
+        Subscribe to instrument tokens.
+        
+        Tokens are remembered even while the ticker is stopped or
+        connecting, and subscribed on the next connect.
+        """
         if not tokens:
             return
         
         new_tokens = set(tokens) - self._subscribed_tokens
-        if new_tokens and self._kws and self._running:
+        self._subscribed_tokens.update(new_tokens)
+        if new_tokens and self._kws and self._connected:
             try:
                 self._kws.subscribe(list(new_tokens))
                 self._kws.set_mode(self._kws.MODE_FULL, list(new_tokens))
-                self._subscribed_tokens.update(new_tokens)
                 logger.info(f"Subscribed to {len(new_tokens)} new tokens")
             except Exception as e:
                 logger.error(f"Failed to subscribe: {e}")
     
+    def start_recording(self, directory, prefix: str = "ticks"):
+        """Append every received tick batch to a daily binary log."""
+        if self._recorder is None:
+            self._recorder = TickRecorder(directory, prefix=prefix)
+    
+    def stop_recording(self):
+        """Stop recording ticks and close the log."""
+        if self._recorder:
+            self._recorder.close()
+            self._recorder = None
+    
+    def start_replay(self, files, speed: Optional[float] = 1.0) -> TickReplay:
+        """
+        Feed recorded tick files through this manager instead of Kite.
+        
+        Ticks reach the price cache and callbacks exactly as live ticks do,
+        from a background thread. speed=None replays as fast as possible.
+        """
+        self.stop()
+        self.stop_replay()
+        self._replay = TickReplay(files, speed=speed)
+        self._replay.start(self._on_ticks)
+        self._running = True
+        logger.info(f"Replaying {len(self._replay.files)} tick file(s) at speed {speed or 'max'}")
+        return self._replay
+    
+    def stop_replay(self):
+        """Stop a running replay."""
+        if self._replay:
+            self._replay.stop()
+            self._replay = None
+            self._running = False
+    
     def set_position_data(self, token: int, data: Dict):
         """Store position data for a token."""
         self._position_data[token] = data
@@ -153,6 +235,12 @@ class KiteTickerManager:
     
     def _on_ticks(self, ws, ticks):
         """Handle incoming ticks from Kite."""
+        if self._recorder and self._replay is None:
+            try:
+                self._recorder.record(ticks)
+            except Exception as e:
+                logger.error(f"Tick recording error: {e}")
+        
         for tick in ticks:
             token = tick.get("instrument_token")
             if token:
@@ -165,9 +253,20 @@ class KiteTickerManager:
             except Exception as e:
                 logger.error(f"Tick callback error: {e}")
     
+    def _on_order_update(self, ws, data):
+        """Handle order update postbacks pushed over the ticker connection."""
+        # Fills/cancels change orders, positions and margins - drop cached reads first
+        get_broker_cache().on_order_update(data)
+        for callback in self._order_callbacks:
+            try:
+                callback(data)
+            except Exception as e:
+                logger.error(f"Order update callback error: {e}")
+    
     def _on_connect(self, ws, response):
         """Handle connection."""
         logger.info("Kite ticker connected")
+        self._connected = True
         # Resubscribe to tokens
         if self._subscribed_tokens:
             try:
@@ -180,6 +279,7 @@ class KiteTickerManager:
         """Handle close - attempt reconnection."""
         logger.warning(f"Kite ticker closed: {code} - {reason}")
         self._running = False
+        self._connected = False
         
         # Attempt to reconnect after a short delay
         if self._api_key and self._access_token:
@@ -195,14 +295,18 @@ class KiteTickerManager:
         """Handle error - mark as not running so reconnect can happen."""
         logger.error(f"Kite ticker error: {code} - {reason}")
         self._running = False
+        self._connected = False
     
     def _on_reconnect(self, ws, attempts_count):
         """Handle reconnect."""
         logger.info(f"Kite ticker reconnecting, attempt {attempts_count}")
 
 
-# Global ticker manager
-ticker_manager = KiteTickerManager()
+# Global ticker manager (API workers mirror the broker process's ticker)
+if is_api_worker():
+    ticker_manager = RemoteTicker(get_hub_client())
+else:
+    ticker_manager = KiteTickerManager()
 
 
 class ConnectionManager:
@@ -254,12 +358,13 @@ class ConnectionManager:
             return
         
         disconnected = set()
-        for connection in self.active_connections:
-            try:
-                await connection.send_json(message)
-            except Exception as e:
-                logger.warning(f"Failed to send to client: {e}")
-                disconnected.add(connection)
+        with WEBSOCKET_UPDATE_SECONDS.time(stage="broadcast"):
+            for connection in self.active_connections:
+                try:
+                    await connection.send_json(message)
+                except Exception as e:
+                    logger.warning(f"Failed to send to client: {e}")
+                    disconnected.add(connection)
         
         # Clean up disconnected clients
         self.active_connections -= disconnected
@@ -511,22 +616,24 @@ async def websocket_endpoint(websocket: WebSocket):
                 # Wait for tick with timeout
                 ticks = await asyncio.wait_for(tick_queue.get(), timeout=5.0)
                 if connected and ticks:
-                    updated_positions = update_positions_with_ticks(positions, ticks)
-                    
-                    # Fetch strategies and portfolios with updated position data
-                    strategies, portfolios = await asyncio.get_event_loop().run_in_executor(
-                        None, fetch_strategies_and_portfolios, updated_positions
-                    )
+                    with WEBSOCKET_UPDATE_SECONDS.time(stage="enrich"):
+                        updated_positions = update_positions_with_ticks(positions, ticks)
+                        
+                        # Fetch strategies and portfolios with updated position data
+                        strategies, portfolios = await asyncio.get_event_loop().run_in_executor(
+                            None, fetch_strategies_and_portfolios, updated_positions
+                        )
                     
-                    await websocket.send_json({
-                        "type": "price_update",
-                        "data": {
-                            "positions": updated_positions,
-                            "strategies": strategies,
-                            "portfolios": portfolios,
-                            "timestamp": datetime.now().isoformat()
-                        }
-                    })
+                    with WEBSOCKET_UPDATE_SECONDS.time(stage="send"):
+                        await websocket.send_json({
+                            "type": "price_update",
+                            "data": {
+                                "positions": updated_positions,
+                                "strategies": strategies,
+                                "portfolios": portfolios,
+                                "timestamp": datetime.now().isoformat()
+                            }
+                        })
                     positions = updated_positions
             except asyncio.TimeoutError:
                 continue
@@ -569,6 +676,8 @@ async def websocket_endpoint(websocket: WebSocket):
             if access_token:
                 logger.info(f"Starting ticker for {len(positions)} positions")
                 ticker_manager.start(config.kite_api_key, access_token)
+                if config.record_ticks:
+                    ticker_manager.start_recording(config.tick_log_dir)
                 ticker_manager.add_callback(on_tick)
                 
                 # Subscribe to all position tokens
@@ -934,13 +1043,15 @@ def update_positions_with_ticks(positions: list, ticks: list) -> list:
     
     Backend is the source of truth for P&L calculations.
     Uses PnLCalculator for correct calculations across all instrument types.
+    
+    Position dicts are updated in place (each connection holds its own list
+    from fetch_positions_once), so a tick allocates no per-position copies.
     """
     from ..services.utilities import PnLCalculator
     
     # Create lookup by token
     tick_map = {t.get("instrument_token"): t for t in ticks}
     
-    updated = []
     for pos in positions:
         token = pos.get("instrument_token")
         tick = tick_map.get(token)
@@ -962,18 +1073,13 @@ def update_positions_with_ticks(positions: list, ticks: list) -> list:
             ltp_change = last_price - close_price if close_price else 0
             ltp_change_pct = (ltp_change / close_price * 100) if close_price else 0
             
-            updated.append({
-                **pos,
-                "last_price": last_price,
-                "ltp_change": round(ltp_change, 2),
-                "ltp_change_pct": round(ltp_change_pct, 2),
-                "pnl": pnl_data["pnl"],
-                "pnl_pct": pnl_data["pnl_pct"],
-            })
-        else:
-            updated.append(pos)
+            pos["last_price"] = last_price
+            pos["ltp_change"] = round(ltp_change, 2)
+            pos["ltp_change_pct"] = round(ltp_change_pct, 2)
+            pos["pnl"] = pnl_data["pnl"]
+            pos["pnl_pct"] = pnl_data["pnl_pct"]
     
-    return updated
+    return positions
 
 
 def fetch_positions_sync() -> list:
@@ -5,6 +5,12 @@ NIFTY_TOKEN = 256265
 BANKNIFTY_TOKEN = 260105
 INDIA_VIX_TOKEN = 264969
 
+# Underlying name -> index token (spot for options on that underlying)
+UNDERLYING_TOKENS = {
+    "NIFTY": NIFTY_TOKEN,
+    "BANKNIFTY": BANKNIFTY_TOKEN,
+}
+
 # MCX Commodity Tokens (as of 2026-02-06)
 GOLDM_TOKEN = 142316039     # GOLDM26AUGFUT
 SILVERM_TOKEN = 126774791   # SILVER26DECFUT
@@ -2,7 +2,7 @@
 
 from pydantic_settings import BaseSettings
 from pydantic import Field
-from typing import Optional
+from typing import List, Optional
 from pathlib import Path
 
 
@@ -26,6 +26,10 @@ class Settings(BaseSettings):
     banknifty_token: int = Field(260105, description="Bank NIFTY instrument token")
     india_vix_token: int = Field(264969, description="India VIX instrument token")
     
+    # Underlyings traded each iteration (first is primary)
+    underlying_tokens: List[int] = Field([256265], description="Underlying tokens to trade")
+    pipeline_workers: int = Field(4, description="Worker threads for per-underlying pipelines")
+    
     # Regime Thresholds
     adx_range_bound: int = Field(12, description="ADX threshold for range-bound")
     adx_trend: int = Field(22, description="ADX threshold for trend")
@@ -51,6 +55,22 @@ class Settings(BaseSettings):
     state_dir: Path = Field(Path("state"), description="State directory")
     models_dir: Path = Field(Path("data/models"), description="ML models directory")
     
+    # Tick recording (replay with scripts/replay_ticks.py)
+    record_ticks: bool = Field(False, description="Record live ticks to a binary log")
+    tick_log_dir: Path = Field(Path("data/ticks"), description="Tick log directory")
+    
+    # Span tracing (GET /api/v1/traces)
+    trace_sample_rate: float = Field(1.0, description="Fraction of iterations traced (0 disables)")
+    trace_buffer_size: int = Field(20000, description="Spans kept in the trace ring buffer")
+    trace_max_spans: int = Field(2000, description="Span cap per trace")
+    
+    # Multi-worker deployment (app/core/state_hub.py)
+    process_role: str = Field("all", description="Process role: all, broker or api")
+    state_hub_address: str = Field("state/state_hub.sock", description="State hub Unix socket")
+    state_hub_authkey: str = Field("", description="State hub auth key (derived from the Kite secret if empty)")
+    state_hub_timeout: float = Field(10.0, description="Seconds an API worker waits for the broker")
+    state_publish_interval: float = Field(1.0, description="Seconds between broker state publishes")
+    
     # Database
     db_path: Path = Field(Path("data/trading.db"), description="SQLite database path")
     
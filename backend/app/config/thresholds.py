@@ -63,6 +63,9 @@ MAX_DELTA = 30                 # Portfolio delta limit
 MAX_GAMMA = 0.3                # Portfolio gamma limit
 MAX_VEGA = 400                 # Portfolio vega limit
 
+# Scenario Risk Grid (spot x vol x time revaluation of book + proposal)
+MAX_SCENARIO_LOSS_PCT = 0.10   # Worst grid loss must stay under 10% of equity
+
 # Drawdown Response
 DRAWDOWN_LEVEL_1 = 0.05        # 5% drawdown = 50% size
 DRAWDOWN_LEVEL_2 = 0.10        # 10% drawdown = 25% size
@@ -1,6 +1,11 @@
-from .kite_client import KiteClient
-from .data_cache import DataCache
-from .logger import setup_logger, get_logger
-from .state_manager import StateManager
+from .lazy import lazy_exports
+
+# Submodules are imported on first use of one of their names (see core/lazy.py)
+__getattr__, __dir__ = lazy_exports(__name__, {
+    ".kite_client": ["KiteClient"],
+    ".data_cache": ["DataCache"],
+    ".logger": ["setup_logger", "get_logger"],
+    ".state_manager": ["StateManager"],
+})
 
 __all__ = ["KiteClient", "DataCache", "setup_logger", "get_logger", "StateManager"]
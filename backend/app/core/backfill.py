@@ -0,0 +1,368 @@
+"""Resumable historical backfill engine for Trading System v2.0
+
+Splits (instrument, interval, date range) requests into calendar-aligned
+chunks, tracks each chunk in a persistent manifest, and fetches pending
+chunks concurrently through the shared API rate limiter. Completed chunks
+are written straight into a partitioned parquet store, so an interrupted
+backfill resumes where it stopped instead of starting over.
+"""
+
+import json
+import os
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from dataclasses import dataclass, field
+from datetime import date, datetime, timedelta
+from enum import Enum
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+import pandas as pd
+from loguru import logger
+
+from .rate_limiter import APIEndpoint, APIRateLimiter, get_rate_limiter
+
+
+# Chunk boundaries are multiples of chunk_days counted from this date, so the
+# same request produces the same chunk keys on every run.
+CHUNK_EPOCH = date(2000, 1, 1)
+
+
+class ChunkStatus(str, Enum):
+    """Backfill chunk lifecycle."""
+    PENDING = "pending"
+    DONE = "done"
+    FAILED = "failed"
+
+
+@dataclass
+class BackfillChunk:
+    """One (instrument, interval, date-chunk) unit of work."""
+    instrument: str
+    interval: str
+    start: datetime
+    end: datetime
+    params: Dict[str, Any] = field(default_factory=dict)  # Passed through to the fetch function
+    status: ChunkStatus = ChunkStatus.PENDING
+    attempts: int = 0
+    rows: int = 0
+    error: Optional[str] = None
+
+    @property
+    def key(self) -> str:
+        return f"{self.instrument}|{self.interval}|{self.start:%Y%m%d%H%M}|{self.end:%Y%m%d%H%M}"
+
+    @property
+    def is_open(self) -> bool:
+        """A chunk reaching into the future is never final and is always refetched."""
+        return self.end > datetime.now()
+
+
+def make_chunks(
+    instrument: str,
+    interval: str,
+    start: datetime,
+    end: datetime,
+    chunk_days: int,
+    params: Optional[Dict[str, Any]] = None,
+    align: bool = True
+) -> List[BackfillChunk]:
+    """
+    Split a date range into chunks.
+
+    Args:
+        instrument: Instrument identifier (symbol, token or option key)
+        interval: Candle interval
+        start: Range start
+        end: Range end
+        chunk_days: Days per chunk (the API's max range for the interval)
+        params: Extra arguments for the fetch function
+        align: Snap chunk boundaries to the CHUNK_EPOCH grid so keys are
+            stable across runs (the first chunk may start before `start`).
+            Use False for one-off windows such as intraday gap-fills.
+
+    Returns:
+        List of chunks covering [start, end]
+    """
+    if align:
+        epoch = datetime.combine(CHUNK_EPOCH, datetime.min.time())
+        chunk_start = epoch + timedelta(days=((start - epoch).days // chunk_days) * chunk_days)
+    else:
+        chunk_start = start
+
+    chunks = []
+    while chunk_start < end:
+        chunk_end = chunk_start + timedelta(days=chunk_days)
+        if not align:
+            chunk_end = min(chunk_end, end)
+        chunks.append(BackfillChunk(
+            instrument=instrument,
+            interval=interval,
+            start=chunk_start,
+            end=chunk_end,
+            params=dict(params or {}),
+        ))
+        chunk_start = chunk_end
+    return chunks
+
+
+class BackfillManifest:
+    """
+    Persistent chunk status table.
+
+    Stored as an append-only JSON-lines journal: every status change is one
+    line, and loading replays the journal (last entry per key wins). Writes
+    are O(1) per update regardless of manifest size. With path=None the
+    manifest is in-memory only.
+    """
+
+    def __init__(self, path: Optional[Path] = None):
+        self.path = Path(path) if path else None
+        self._entries: Dict[str, Dict[str, Any]] = {}
+        self._lock = threading.Lock()
+
+        if self.path is not None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            self._load()
+
+    def _load(self) -> None:
+        if not self.path.exists():
+            return
+        try:
+            with open(self.path, "r") as f:
+                for line in f:
+                    line = line.strip()
+                    if not line:
+                        continue
+                    try:
+                        entry = json.loads(line)
+                    except json.JSONDecodeError:
+                        continue  # Torn last line from a hard kill
+                    self._entries[entry["key"]] = entry
+            logger.info(f"Loaded backfill manifest: {len(self._entries)} chunks from {self.path}")
+        except Exception as e:
+            logger.error(f"Failed to load backfill manifest: {e}")
+
+    def status(self, key: str) -> Optional[ChunkStatus]:
+        entry = self._entries.get(key)
+        return ChunkStatus(entry["status"]) if entry else None
+
+    def record(self, chunk: BackfillChunk) -> None:
+        """Persist the current status of a chunk."""
+        entry = {
+            "key": chunk.key,
+            "status": chunk.status.value,
+            "attempts": chunk.attempts,
+            "rows": chunk.rows,
+            "error": chunk.error,
+            "updated_at": datetime.now().isoformat(),
+        }
+        with self._lock:
+            self._entries[chunk.key] = entry
+            if self.path is not None:
+                with open(self.path, "a") as f:
+                    f.write(json.dumps(entry) + "\n")
+
+    def compact(self) -> None:
+        """Rewrite the journal with one line per chunk."""
+        if self.path is None:
+            return
+        with self._lock:
+            tmp = self.path.with_suffix(".tmp")
+            with open(tmp, "w") as f:
+                for entry in self._entries.values():
+                    f.write(json.dumps(entry) + "\n")
+            os.replace(tmp, self.path)
+
+    def summary(self) -> Dict[str, int]:
+        counts = {s.value: 0 for s in ChunkStatus}
+        for entry in self._entries.values():
+            counts[entry["status"]] = counts.get(entry["status"], 0) + 1
+        return counts
+
+
+class PartitionedStore:
+    """
+    Parquet store partitioned by interval and instrument.
+
+    Layout: {root}/{interval}/{instrument}/{chunk_start:%Y%m%d%H%M}.parquet
+    Each chunk is written atomically, so a chunk marked done in the manifest
+    always has a complete file.
+    """
+
+    def __init__(self, root: Path):
+        self.root = Path(root)
+        self.root.mkdir(parents=True, exist_ok=True)
+
+    def _partition(self, instrument: str, interval: str) -> Path:
+        return self.root / interval / str(instrument)
+
+    def write(self, chunk: BackfillChunk, df: pd.DataFrame) -> Path:
+        """Write one chunk's data, replacing any previous version."""
+        partition = self._partition(chunk.instrument, chunk.interval)
+        partition.mkdir(parents=True, exist_ok=True)
+        path = partition / f"{chunk.start:%Y%m%d%H%M}.parquet"
+        tmp = path.with_suffix(".parquet.tmp")
+        df.to_parquet(tmp)
+        os.replace(tmp, path)
+        return path
+
+    def read(self, instrument: str, interval: str) -> pd.DataFrame:
+        """Read all chunks for an instrument/interval, sorted and de-duplicated."""
+        files = sorted(self._partition(instrument, interval).glob("*.parquet"))
+        if not files:
+            return pd.DataFrame()
+
+        df = pd.concat([pd.read_parquet(f) for f in files])
+        if "date" in df.columns:
+            return df.drop_duplicates(subset=["date"], keep="last").sort_values("date").reset_index(drop=True)
+        return df[~df.index.duplicated(keep="last")].sort_index()
+
+
+class BackfillEngine:
+    """
+    Concurrent, resumable chunk fetcher.
+
+    Usage:
+        engine = BackfillEngine(
+            fetch_fn=lambda c: kite.fetch_historical_data(
+                c.params["token"], c.interval, c.start, c.end, raise_errors=True, retry=False),
+            manifest=BackfillManifest(state_dir / "backfill_manifest.jsonl"),
+            store=PartitionedStore(data_dir / "store"),
+        )
+        engine.run(make_chunks("NIFTY", "5minute", start, end, 30, {"token": 256265}))
+    """
+
+    def __init__(
+        self,
+        fetch_fn: Callable[[BackfillChunk], pd.DataFrame],
+        manifest: Optional[BackfillManifest] = None,
+        store: Optional[PartitionedStore] = None,
+        on_chunk: Optional[Callable[[BackfillChunk, pd.DataFrame], None]] = None,
+        limiter: Optional[APIRateLimiter] = None,
+        endpoint: APIEndpoint = APIEndpoint.HISTORICAL,
+        max_workers: int = 3,
+        max_retries: int = 4,
+        backoff_base: float = 1.0,
+        backoff_max: float = 30.0
+    ):
+        """
+        Args:
+            fetch_fn: Fetches one chunk with a single API request (the engine
+                takes one limiter slot per attempt and does the retrying);
+                must raise on failure (empty frame = no data)
+            manifest: Chunk status table (in-memory if None)
+            store: Destination for completed chunks
+            on_chunk: Optional callback for each completed chunk (called from workers)
+            limiter: Rate limiter shared with other API users (global one if None)
+            endpoint: Rate limit bucket for fetch calls
+            max_workers: Concurrent fetches in flight
+            max_retries: Attempts per chunk per run before marking it failed
+            backoff_base: First retry delay in seconds (doubles per attempt)
+            backoff_max: Retry delay cap in seconds
+        """
+        self.fetch_fn = fetch_fn
+        self.manifest = manifest or BackfillManifest()
+        self.store = store
+        self.on_chunk = on_chunk
+        self.limiter = limiter or get_rate_limiter()
+        self.endpoint = endpoint
+        self.max_workers = max_workers
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+
+        self._stop = threading.Event()
+        self._stats_lock = threading.Lock()
+        self.stats = {"fetched": 0, "skipped": 0, "failed": 0, "retries": 0, "rows": 0}
+
+    def stop(self) -> None:
+        """Stop picking up new chunks; in-flight fetches finish normally."""
+        self._stop.set()
+
+    def pending(self, chunks: List[BackfillChunk]) -> List[BackfillChunk]:
+        """Chunks that still need fetching (not done, or open-ended)."""
+        return [
+            c for c in chunks
+            if c.is_open or self.manifest.status(c.key) != ChunkStatus.DONE
+        ]
+
+    def run(self, chunks: List[BackfillChunk]) -> Dict[str, int]:
+        """
+        Fetch all pending chunks concurrently.
+
+        Returns:
+            Run statistics
+        """
+        todo = self.pending(chunks)
+        self.stats["skipped"] += len(chunks) - len(todo)
+        if not todo:
+            logger.info(f"Backfill: all {len(chunks)} chunks already complete")
+            return dict(self.stats)
+
+        logger.info(
+            f"Backfill: {len(todo)} of {len(chunks)} chunks pending "
+            f"({self.max_workers} workers, {self.endpoint.value} limits)"
+        )
+        started = time.time()
+
+        with ThreadPoolExecutor(max_workers=self.max_workers) as pool:
+            futures = [pool.submit(self._process, chunk) for chunk in todo]
+            for done, future in enumerate(as_completed(futures), 1):
+                try:
+                    future.result()
+                except Exception as e:
+                    logger.error(f"Backfill worker error: {e}")
+                if done % 50 == 0:
+                    logger.info(f"Backfill progress: {done}/{len(todo)} chunks")
+
+        self.manifest.compact()
+        logger.info(
+            f"Backfill finished in {time.time() - started:.1f}s: "
+            f"{self.stats['fetched']} fetched, {self.stats['failed']} failed, "
+            f"{self.stats['rows']} rows"
+        )
+        return dict(self.stats)
+
+    def _process(self, chunk: BackfillChunk) -> None:
+        for attempt in range(self.max_retries):
+            if self._stop.is_set():
+                return
+
+            self.limiter.acquire_slot(self.endpoint)
+            chunk.attempts += 1
+            try:
+                df = self.fetch_fn(chunk)
+                if df is None:
+                    df = pd.DataFrame()
+                if self.store is not None and not df.empty:
+                    self.store.write(chunk, df)
+                if self.on_chunk is not None:
+                    self.on_chunk(chunk, df)
+
+                chunk.status = ChunkStatus.DONE
+                chunk.rows = len(df)
+                chunk.error = None
+                self.manifest.record(chunk)
+                with self._stats_lock:
+                    self.stats["fetched"] += 1
+                    self.stats["rows"] += len(df)
+                return
+
+            except Exception as e:
+                chunk.error = str(e)
+                if attempt < self.max_retries - 1:
+                    delay = min(self.backoff_max, self.backoff_base * (2 ** attempt))
+                    delay *= 0.5 + random.random()  # Jitter so workers don't retry in lockstep
+                    logger.warning(f"Chunk {chunk.key} failed ({e}), retrying in {delay:.1f}s")
+                    with self._stats_lock:
+                        self.stats["retries"] += 1
+                    self._stop.wait(delay)
+
+        chunk.status = ChunkStatus.FAILED
+        self.manifest.record(chunk)
+        with self._stats_lock:
+            self.stats["failed"] += 1
+        logger.error(f"Chunk {chunk.key} failed after {chunk.attempts} attempts: {chunk.error}")
@@ -0,0 +1,174 @@
+"""Read-through cache for broker account reads for Trading System v2.0
+
+Positions, margins, orders and holdings are read by many routes and
+services at once. This layer gives each endpoint a short TTL (the maximum
+age of data served) and single-flights concurrent identical reads so they
+share one broker call. Writes invalidate the affected endpoints; a read
+already in flight when an invalidation lands is returned to its callers
+but never cached.
+"""
+
+import copy
+import threading
+import time
+from concurrent.futures import Future
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Hashable, Optional, Tuple
+
+from loguru import logger
+
+
+# Endpoint -> max age in seconds of data served from cache
+DEFAULT_TTLS: Dict[str, float] = {
+    "positions": 2.0,
+    "margins": 5.0,
+    "orders": 1.0,
+    "holdings": 30.0,
+}
+
+# Endpoints whose data can change when an order is placed/modified/cancelled/filled
+ORDER_AFFECTED = ("orders", "positions", "margins")
+
+
+@dataclass
+class EndpointStats:
+    hits: int = 0
+    misses: int = 0  # Broker calls made
+    coalesced: int = 0  # Callers that joined an in-flight call
+    invalidations: int = 0
+    errors: int = 0
+
+
+class BrokerReadCache:
+    """
+    TTL + single-flight read-through cache keyed by (scope, endpoint).
+
+    scope separates accounts/sessions (e.g. the access token) so clients
+    for different users never share entries.
+    """
+
+    def __init__(self, ttls: Optional[Dict[str, float]] = None):
+        self.ttls = {**DEFAULT_TTLS, **(ttls or {})}
+        self._entries: Dict[Tuple[Hashable, str], Tuple[float, Any]] = {}
+        self._inflight: Dict[Tuple[Hashable, str], Future] = {}
+        self._generation: Dict[Tuple[Hashable, str], int] = {}
+        self._stats: Dict[str, EndpointStats] = {}
+        self._lock = threading.Lock()
+
+    def configure(self, ttls: Dict[str, float]) -> None:
+        """Override per-endpoint TTLs (0 disables caching but keeps coalescing)."""
+        with self._lock:
+            self.ttls.update(ttls)
+            self._entries.clear()
+
+    def get(self, endpoint: str, fetch: Callable[[], Any], scope: Hashable = None) -> Any:
+        """
+        Read an endpoint through the cache.
+
+        Args:
+            endpoint: Endpoint name (positions, margins, orders, holdings, ...)
+            fetch: Zero-arg callable making the broker request
+            scope: Account/session key
+
+        Returns:
+            A private copy of the (possibly shared) response
+
+        Raises:
+            Whatever fetch raises (errors are never cached)
+        """
+        key = (scope, endpoint)
+        now = time.monotonic()
+        with self._lock:
+            stats = self._stats.setdefault(endpoint, EndpointStats())
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] > now:
+                stats.hits += 1
+                return copy.deepcopy(entry[1])
+
+            future = self._inflight.get(key)
+            leader = future is None
+            if leader:
+                future = Future()
+                self._inflight[key] = future
+                generation = self._generation.get(key, 0)
+                stats.misses += 1
+            else:
+                stats.coalesced += 1
+
+        if not leader:
+            return copy.deepcopy(future.result())
+
+        try:
+            value = fetch()
+        except BaseException as e:
+            with self._lock:
+                stats.errors += 1
+                if self._inflight.get(key) is future:
+                    del self._inflight[key]
+            future.set_exception(e)
+            raise
+
+        with self._lock:
+            ttl = self.ttls.get(endpoint, 0.0)
+            if ttl > 0 and self._generation.get(key, 0) == generation:
+                self._entries[key] = (time.monotonic() + ttl, value)
+            if self._inflight.get(key) is future:
+                del self._inflight[key]
+        future.set_result(value)
+        return copy.deepcopy(value)
+
+    def invalidate(self, *endpoints: str, scope: Hashable = None) -> None:
+        """
+        Drop cached entries (all endpoints if none given).
+
+        In-flight reads for those endpoints finish for their callers but are
+        not cached, and new readers start a fresh call.
+        """
+        with self._lock:
+            for key in list(self._entries) + list(self._inflight) + list(self._generation):
+                key_scope, endpoint = key
+                if endpoints and endpoint not in endpoints:
+                    continue
+                if scope is not None and key_scope != scope:
+                    continue
+                self._generation[key] = self._generation.get(key, 0) + 1
+                self._inflight.pop(key, None)
+                if self._entries.pop(key, None) is not None:
+                    self._stats.setdefault(endpoint, EndpointStats()).invalidations += 1
+
+    def on_order_update(self, order: Dict) -> None:
+        """Order postback/listener hook: any order state change invalidates account reads."""
+        self.invalidate(*ORDER_AFFECTED)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._inflight.clear()
+
+    def get_stats(self) -> Dict[str, Dict]:
+        with self._lock:
+            result = {}
+            for endpoint, stats in self._stats.items():
+                calls = stats.hits + stats.misses + stats.coalesced
+                result[endpoint] = {
+                    **stats.__dict__,
+                    "ttl": self.ttls.get(endpoint, 0.0),
+                    "saved_rate": (stats.hits + stats.coalesced) / calls if calls else 0.0,
+                }
+            return result
+
+
+# Singleton instance
+_broker_cache: Optional[BrokerReadCache] = None
+_broker_cache_lock = threading.Lock()
+
+
+def get_broker_cache() -> BrokerReadCache:
+    """Get or create the process-wide broker read cache."""
+    global _broker_cache
+    if _broker_cache is None:
+        with _broker_cache_lock:
+            if _broker_cache is None:
+                _broker_cache = BrokerReadCache()
+                logger.debug(f"Broker read cache initialized with TTLs {_broker_cache.ttls}")
+    return _broker_cache
@@ -1,6 +1,7 @@
 """Data caching layer for Trading System v2.0"""
 
 import pickle
+import threading
 from pathlib import Path
 from datetime import datetime, date, timedelta
 from typing import Optional, Dict, Any
@@ -12,6 +13,9 @@ class DataCache:
     """
     Caches historical data to reduce API calls and improve performance.
     Supports both CSV and pickle formats.
+    
+    Thread-safe: the per-underlying pipelines share one instance, and
+    put() is a read-modify-write of the instrument's parquet file.
     """
     
     def __init__(self, cache_dir: Path = Path("data/cache")):
@@ -19,6 +23,13 @@ class DataCache:
         self.cache_dir.mkdir(parents=True, exist_ok=True)
         self._memory_cache: Dict[str, pd.DataFrame] = {}
         self._cache_metadata: Dict[str, Dict[str, Any]] = {}
+        self._lock = threading.Lock()  # Guards _memory_cache and _file_locks
+        self._file_locks: Dict[Path, threading.Lock] = {}
+    
+    def _file_lock(self, file_path: Path) -> threading.Lock:
+        """Lock serializing reads and rewrites of one cache file."""
+        with self._lock:
+            return self._file_locks.setdefault(file_path, threading.Lock())
     
     def _get_cache_key(
         self,
@@ -56,15 +67,18 @@ class DataCache:
         cache_key = self._get_cache_key(instrument_token, interval, from_date, to_date)
         
         # Check memory cache first
-        if cache_key in self._memory_cache:
+        with self._lock:
+            cached = self._memory_cache.get(cache_key)
+        if cached is not None:
             logger.debug(f"Memory cache hit: {cache_key}")
-            return self._memory_cache[cache_key]
+            return cached
         
         # Check file cache
         file_path = self._get_file_path(instrument_token, interval)
         if file_path.exists():
             try:
-                df = pd.read_parquet(file_path)
+                with self._file_lock(file_path):
+                    df = pd.read_parquet(file_path)
                 
                 # Filter to requested date range
                 if 'date' in df.columns:
@@ -74,7 +88,8 @@ class DataCache:
                     df = df[(df.index.date >= from_date) & (df.index.date <= to_date)]
                 
                 if not df.empty:
-                    self._memory_cache[cache_key] = df
+                    with self._lock:
+                        self._memory_cache[cache_key] = df
                     logger.debug(f"File cache hit: {file_path}")
                     return df
                     
@@ -116,22 +131,24 @@ class DataCache:
         cache_key = self._get_cache_key(instrument_token, interval, from_date, to_date)
         
         # Store in memory cache
-        self._memory_cache[cache_key] = data
+        with self._lock:
+            self._memory_cache[cache_key] = data
         
         # Append to file cache
         file_path = self._get_file_path(instrument_token, interval)
         try:
-            if file_path.exists():
-                existing = pd.read_parquet(file_path)
-                # Merge and deduplicate
-                combined = pd.concat([existing, data])
-                if 'date' in combined.columns:
-                    combined = combined.drop_duplicates(subset=['date'])
+            with self._file_lock(file_path):
+                if file_path.exists():
+                    existing = pd.read_parquet(file_path)
+                    # Merge and deduplicate
+                    combined = pd.concat([existing, data])
+                    if 'date' in combined.columns:
+                        combined = combined.drop_duplicates(subset=['date'])
+                    else:
+                        combined = combined[~combined.index.duplicated(keep='last')]
+                    combined.to_parquet(file_path)
                 else:
-                    combined = combined[~combined.index.duplicated(keep='last')]
-                combined.to_parquet(file_path)
-            else:
-                data.to_parquet(file_path)
+                    data.to_parquet(file_path)
             
             logger.debug(f"Cached data to {file_path}")
             
@@ -152,19 +169,21 @@ class DataCache:
         """
         # Clear memory cache
         if instrument_token is None and interval is None:
-            self._memory_cache.clear()
+            with self._lock:
+                self._memory_cache.clear()
             logger.info("Cleared all memory cache")
         else:
-            keys_to_remove = []
-            for key in self._memory_cache:
-                if instrument_token and str(instrument_token) not in key:
-                    continue
-                if interval and interval not in key:
-                    continue
-                keys_to_remove.append(key)
-            
-            for key in keys_to_remove:
-                del self._memory_cache[key]
+            with self._lock:
+                keys_to_remove = []
+                for key in self._memory_cache:
+                    if instrument_token and str(instrument_token) not in key:
+                        continue
+                    if interval and interval not in key:
+                        continue
+                    keys_to_remove.append(key)
+                
+                for key in keys_to_remove:
+                    del self._memory_cache[key]
             logger.info(f"Cleared {len(keys_to_remove)} memory cache entries")
         
         # Clear file cache
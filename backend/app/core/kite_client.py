@@ -2,10 +2,17 @@
 
 import time
 from datetime import datetime, date, timedelta
-from typing import Dict, List, Optional, Any
-import pandas as pd
+from typing import TYPE_CHECKING, Callable, Dict, List, Optional, Any
 from loguru import logger
 
+from .ttl_cache import TTLCache
+from .broker_cache import ORDER_AFFECTED, get_broker_cache
+from .metrics import BROKER_CALL_SECONDS, broker_category
+from .tracing import span
+
+if TYPE_CHECKING:
+    import pandas as pd  # Imported on first use (API cold start)
+
 try:
     from kiteconnect import KiteConnect, KiteTicker
     from kiteconnect.exceptions import TokenException, DataException
@@ -54,11 +61,13 @@ class KiteClient:
         self._cache_timestamp: Optional[datetime] = None
         self._cache_ttl = 5  # seconds
         # Basket margins cache
-        self._basket_margin_cache: Dict[str, Dict] = {}
         self._basket_cache_ttl = 300  # seconds
+        self._basket_margin_cache = TTLCache(maxsize=256, ttl=self._basket_cache_ttl)
+        # Account reads (positions/margins/orders/holdings) shared across all callers
+        self._reads = get_broker_cache()
         
         # Instruments cache (refresh once per day)
-        self._instruments_cache: Dict[str, pd.DataFrame] = {}
+        self._instruments_cache: Dict[str, "pd.DataFrame"] = {}
         self._instruments_cache_timestamp: Optional[datetime] = None
         self._instruments_cache_ttl = 3600  # 1 hour
         
@@ -66,6 +75,10 @@ class KiteClient:
         self._paper_orders: Dict[str, Dict] = {}
         self._paper_positions: Dict[str, Dict] = {}
         
+        # Order update listeners (paper orders push their state changes here,
+        # mirroring the broker's order postbacks in live mode)
+        self._order_listeners: List[Callable[[Dict], None]] = []
+        
         if not self.mock_mode and KITE_AVAILABLE:
             self._init_kite()
             mode_str = "PAPER" if self.paper_mode else "LIVE"
@@ -142,17 +155,31 @@ class KiteClient:
             logger.error(f"Failed to refresh session: {e}")
             return False
 
-    def _retry_request(self, func, *args, **kwargs) -> Any:
-        """Execute a request with retry logic."""
+    def _retry_request(self, func, *args, attempts: Optional[int] = None, **kwargs) -> Any:
+        """
+        Execute a request with retry logic (latency recorded in broker_call_seconds and traced).
+        
+        Args:
+            attempts: Tries for non-token errors (max_retries if None)
+        """
+        method = getattr(func, "__name__", "unknown")
+        category = broker_category(method)
+        with BROKER_CALL_SECONDS.time(category=category, method=method), span(f"kite.{method}", kind="broker", category=category):
+            return self._retry_request_inner(func, *args, attempts=attempts, **kwargs)
+    
+    def _retry_request_inner(self, func, *args, attempts: Optional[int] = None, **kwargs) -> Any:
+        attempts = attempts or self.max_retries
         last_error = None
-        for attempt in range(self.max_retries):
+        for attempt in range(attempts):
             try:
                 return func(*args, **kwargs)
             except TokenException as e:
                 # Token expired - try to refresh from DB
                 logger.warning(f"Token expired: {e}. Attempting refresh from DB...")
                 if self.refresh_session():
-                    continue  # Retry with new token
+                    if attempt < attempts - 1:
+                        continue  # Retry with new token
+                    return func(*args, **kwargs)
                 
                 logger.error(f"Token refresh failed or token invalid: {e}")
                 raise TokenExpiredException(str(e))
@@ -163,17 +190,19 @@ class KiteClient:
                 if "api_key" in error_str or "access_token" in error_str or "token" in error_str:
                     logger.warning(f"Token error detected: {e}. Attempting refresh from DB...")
                     if self.refresh_session():
-                        continue
+                        if attempt < attempts - 1:
+                            continue
+                        return func(*args, **kwargs)
                         
                     logger.error(f"Token refresh failed: {e}")
                     raise TokenExpiredException(str(e))
                 
                 last_error = e
-                logger.warning(f"Request failed (attempt {attempt + 1}/{self.max_retries}): {e}")
-                if attempt < self.max_retries - 1:
+                logger.warning(f"Request failed (attempt {attempt + 1}/{attempts}): {e}")
+                if attempt < attempts - 1:
                     time.sleep(self.retry_delay * (attempt + 1))
         
-        logger.error(f"Request failed after {self.max_retries} attempts: {last_error}")
+        logger.error(f"Request failed after {attempts} attempts: {last_error}")
         raise last_error
     
     def fetch_historical_data(
@@ -182,8 +211,10 @@ class KiteClient:
         interval: str,
         from_date: datetime,
         to_date: datetime,
-        continuous: bool = False
-    ) -> pd.DataFrame:
+        continuous: bool = False,
+        raise_errors: bool = False,
+        retry: bool = True
+    ) -> "pd.DataFrame":
         """
         Fetch historical OHLCV data.
         
@@ -193,10 +224,16 @@ class KiteClient:
             from_date: Start date
             to_date: End date
             continuous: Whether to fetch continuous data for F&O
+            raise_errors: Re-raise API errors instead of returning an empty
+                frame (lets callers tell "no data" from "request failed")
+            retry: Retry failed requests internally; pass False when the
+                caller retries and rate-limits each raw request (BackfillEngine)
             
         Returns:
             DataFrame with columns: date, open, high, low, close, volume
         """
+        import pandas as pd
+        
         if self.mock_mode:
             return self._mock_historical_data(from_date, to_date, interval)
         
@@ -207,7 +244,8 @@ class KiteClient:
                 from_date,
                 to_date,
                 interval,
-                continuous=continuous
+                continuous=continuous,
+                attempts=None if retry else 1
             )
             
             df = pd.DataFrame(data)
@@ -220,6 +258,8 @@ class KiteClient:
             
         except Exception as e:
             logger.error(f"Failed to fetch historical data: {e}")
+            if raise_errors:
+                raise
             return pd.DataFrame()
     
     def get_quote(self, instruments: list) -> Dict:
@@ -314,7 +354,7 @@ class KiteClient:
         underlying: str,
         expiry: date,
         strike_range: Optional[tuple] = None
-    ) -> pd.DataFrame:
+    ) -> "pd.DataFrame":
         """
         Get option chain for an underlying.
         
@@ -326,6 +366,8 @@ class KiteClient:
         Returns:
             DataFrame with option chain data
         """
+        import pandas as pd
+        
         if self.mock_mode:
             return self._mock_option_chain(underlying, expiry)
         
@@ -517,6 +559,7 @@ class KiteClient:
             mode = "MOCK" if self.mock_mode else "PAPER"
             status_str = f"@ {fill_price}" if status == "COMPLETE" else f"PENDING @ {price}"
             logger.info(f"[{mode}] ORDER placed: {order_id} - {transaction_type} {quantity} {tradingsymbol} {status_str}")
+            self._emit_order_update(self._paper_orders[order_id])
             return order_id
         
         # Live mode - real order
@@ -539,6 +582,7 @@ class KiteClient:
                 order_params["tag"] = tag
             
             order_id = self._retry_request(self._kite.place_order, **order_params)
+            self._reads.invalidate(*ORDER_AFFECTED, scope=self.access_token)
             logger.info(f"[LIVE] ORDER placed: {order_id} - {transaction_type} {quantity} {tradingsymbol}")
             return order_id
             
@@ -591,7 +635,9 @@ class KiteClient:
             if order_type:
                 params["order_type"] = order_type
             
-            return self._retry_request(self._kite.modify_order, **params)
+            order_id = self._retry_request(self._kite.modify_order, **params)
+            self._reads.invalidate(*ORDER_AFFECTED, scope=self.access_token)
+            return order_id
         except Exception as e:
             logger.error(f"Failed to modify order: {e}")
             raise
@@ -601,12 +647,15 @@ class KiteClient:
         if self.mock_mode or self.paper_mode:
             if order_id in self._paper_orders:
                 self._paper_orders[order_id]["status"] = "CANCELLED"
+                self._emit_order_update(self._paper_orders[order_id])
             mode = "MOCK" if self.mock_mode else "PAPER"
             logger.info(f"[{mode}] ORDER cancelled: {order_id}")
             return order_id
         
         try:
-            return self._retry_request(self._kite.cancel_order, variety="regular", order_id=order_id)
+            order_id = self._retry_request(self._kite.cancel_order, variety="regular", order_id=order_id)
+            self._reads.invalidate(*ORDER_AFFECTED, scope=self.access_token)
+            return order_id
         except Exception as e:
             logger.error(f"Failed to cancel order: {e}")
             raise
@@ -617,11 +666,31 @@ class KiteClient:
             return list(self._paper_orders.values())
         
         try:
-            return self._retry_request(self._kite.orders)
+            return self._reads.get(
+                "orders", lambda: self._retry_request(self._kite.orders), scope=self.access_token
+            )
         except Exception as e:
             logger.error(f"Failed to get orders: {e}")
             return []
     
+    def add_order_listener(self, callback: Callable[[Dict], None]) -> None:
+        """Register a callback for paper/mock order state changes."""
+        if callback not in self._order_listeners:
+            self._order_listeners.append(callback)
+    
+    def remove_order_listener(self, callback: Callable[[Dict], None]) -> None:
+        if callback in self._order_listeners:
+            self._order_listeners.remove(callback)
+    
+    def _emit_order_update(self, order: Dict) -> None:
+        """Push a paper order's current state to listeners (same shape as a postback)."""
+        update = dict(order)
+        for callback in self._order_listeners:
+            try:
+                callback(update)
+            except Exception as e:
+                logger.error(f"Order listener error: {e}")
+    
     def get_order_history(self, order_id: str) -> List[Dict]:
         """Get order history for a specific order."""
         if self.mock_mode or self.paper_mode:
@@ -696,6 +765,7 @@ class KiteClient:
             order["filled_quantity"] = order["quantity"]
             order["pending_quantity"] = 0
             logger.info(f"[PAPER] ORDER filled: {order_id} - {transaction_type} {order['quantity']} {tradingsymbol} @ {fill_price}")
+            self._emit_order_update(order)
         
         try:
             return self._retry_request(self._kite.order_history, order_id)
@@ -742,7 +812,9 @@ class KiteClient:
             return {"day": positions, "net": positions}
         
         try:
-            return self._retry_request(self._kite.positions)
+            return self._reads.get(
+                "positions", lambda: self._retry_request(self._kite.positions), scope=self.access_token
+            )
         except Exception as e:
             logger.error(f"Failed to get positions: {e}")
             return {"day": [], "net": []}
@@ -753,7 +825,9 @@ class KiteClient:
             return []  # Paper trading doesn't have holdings
         
         try:
-            return self._retry_request(self._kite.holdings)
+            return self._reads.get(
+                "holdings", lambda: self._retry_request(self._kite.holdings), scope=self.access_token
+            )
         except Exception as e:
             logger.error(f"Failed to get holdings: {e}")
             return []
@@ -770,7 +844,9 @@ class KiteClient:
         # Paper mode still fetches real margins for realistic simulation
         
         try:
-            return self._retry_request(self._kite.margins)
+            return self._reads.get(
+                "margins", lambda: self._retry_request(self._kite.margins), scope=self.access_token
+            )
         except Exception as e:
             logger.error(f"Failed to get margins: {e}")
             return {}
@@ -823,15 +899,13 @@ class KiteClient:
 
         # Check cache
         cached = self._basket_margin_cache.get(key)
-        if cached:
-            ts = cached.get("_ts")
-            if ts and (datetime.now() - ts).seconds < self._basket_cache_ttl:
-                return cached.get("value", {})
+        if cached is not None:
+            return cached
 
         if self.mock_mode:
             # Return a conservative mock margin for testing
             resp = {"required_margin": 100000, "details": []}
-            self._basket_margin_cache[key] = {"_ts": datetime.now(), "value": resp}
+            self._basket_margin_cache.set(key, resp)
             return resp
 
         # Prefer `basket_order_margins` if available on Kite SDK
@@ -859,7 +933,7 @@ class KiteClient:
                     resp = {}
 
             # Cache and return
-            self._basket_margin_cache[key] = {"_ts": datetime.now(), "value": resp}
+            self._basket_margin_cache.set(key, resp)
             return resp
 
         except TokenException as e:
@@ -869,7 +943,7 @@ class KiteClient:
                 if self.refresh_session():
                     if hasattr(self._kite, "basket_order_margins"):
                         resp = self._retry_request(self._kite.basket_order_margins, basket)
-                        self._basket_margin_cache[key] = {"_ts": datetime.now(), "value": resp}
+                        self._basket_margin_cache.set(key, resp)
                         return resp
             except Exception:
                 pass
@@ -880,8 +954,10 @@ class KiteClient:
         # Final fallback: return empty dict
         return {}
     
-    def get_instruments(self, exchange: str = "NFO") -> pd.DataFrame:
+    def get_instruments(self, exchange: str = "NFO") -> "pd.DataFrame":
         """Get all instruments for an exchange (cached to avoid rate limits)."""
+        import pandas as pd
+        
         if self.mock_mode:
             return pd.DataFrame()
         
@@ -957,9 +1033,10 @@ class KiteClient:
         from_date: datetime,
         to_date: datetime,
         interval: str
-    ) -> pd.DataFrame:
+    ) -> "pd.DataFrame":
         """Generate mock historical data for testing."""
         import numpy as np
+        import pandas as pd
         
         # Determine frequency
         freq_map = {
@@ -1021,9 +1098,10 @@ class KiteClient:
         
         return result
     
-    def _mock_option_chain(self, underlying: str, expiry: date) -> pd.DataFrame:
+    def _mock_option_chain(self, underlying: str, expiry: date) -> "pd.DataFrame":
         """Generate mock option chain for testing."""
         import numpy as np
+        import pandas as pd
         
         # Generate strikes around ATM
         atm = 22000 if underlying == "NIFTY" else 48000
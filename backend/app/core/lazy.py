@@ -0,0 +1,48 @@
+"""
+Lazy Package Exports for Trading System v2.0
+
+Package __init__ modules re-export their public names through lazy_exports()
+so importing a package - or any one of its submodules - does not import every
+sibling, and with them pandas, scipy, scikit-learn and hmmlearn, at API
+startup. Each name is imported from its submodule on first access and then
+cached on the package, so `from app.services.agents import Sentinel` keeps
+working unchanged.
+
+Usage (in a package __init__.py):
+    __getattr__, __dir__ = lazy_exports(__name__, {
+        ".sentinel": ["Sentinel"],
+        ".monk": ["Monk"],
+    })
+"""
+
+import importlib
+import sys
+from typing import Callable, Dict, List, Sequence, Tuple
+
+
+def lazy_exports(package: str, submodules: Dict[str, Sequence[str]]) -> Tuple[Callable, Callable]:
+    """
+    Module-level __getattr__/__dir__ pair for a package (PEP 562).
+
+    Args:
+        package: The package's __name__
+        submodules: Relative submodule -> public names it provides
+
+    Returns:
+        Tuple of (__getattr__, __dir__)
+    """
+    module = sys.modules[package]
+    origins = {name: submodule for submodule, names in submodules.items() for name in names}
+
+    def __getattr__(name: str):
+        submodule = origins.get(name)
+        if submodule is None:
+            raise AttributeError(f"module {package!r} has no attribute {name!r}")
+        value = getattr(importlib.import_module(submodule, package), name)
+        setattr(module, name, value)
+        return value
+
+    def __dir__() -> List[str]:
+        return sorted(set(vars(module)) | set(origins))
+
+    return __getattr__, __dir__
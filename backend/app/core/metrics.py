@@ -0,0 +1,289 @@
+"""
+Latency Metrics for Trading System v2.0
+
+Fixed-bucket latency histograms exported in Prometheus text format
+(GET /api/v1/metrics). Each histogram also keeps its most recent samples
+per label set, exported as a summary with p50/p95/p99 - so a scrape shows
+both the all-time distribution and what latency looks like right now.
+
+Instrumented:
+- trading_engine_stage_seconds{stage}: the 7 TradingEngine steps
+- trading_engine_cycle_seconds: whole run_cycle
+- broker_call_seconds{category,method}: KiteClient API calls
+- db_session_seconds: database session open-to-close
+- websocket_update_seconds{stage}: websocket enrichment and sends
+"""
+
+import math
+import threading
+import time
+from bisect import bisect_left
+from collections import deque
+from contextlib import contextmanager
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
+
+
+# Seconds - broker round trips (~50ms-2s) through sub-millisecond stages
+DEFAULT_BUCKETS: Tuple[float, ...] = (
+    0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0
+)
+QUANTILES: Tuple[float, ...] = (0.5, 0.95, 0.99)
+RECENT_WINDOW = 1024  # Samples per label set used for the quantiles
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels(names: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    pairs = [f'{n}="{_escape(v)}"' for n, v in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _format(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value))
+
+
+class _Series:
+    """Bucket counts, sum and recent samples for one label set."""
+
+    __slots__ = ("counts", "total", "count", "recent")
+
+    def __init__(self, buckets: int, window: int):
+        self.counts = [0] * (buckets + 1)  # Last slot is +Inf
+        self.total = 0.0
+        self.count = 0
+        self.recent: deque = deque(maxlen=window)
+
+
+class Histogram:
+    """
+    Latency histogram with optional labels.
+
+    Usage:
+        STAGE = Histogram("stage_seconds", "Stage latency", ["stage"])
+        STAGE.observe(0.012, stage="sentinel")
+        with STAGE.time(stage="strategist"):
+            ...
+    """
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_BUCKETS,
+        window: int = RECENT_WINDOW
+    ):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(sorted(buckets))
+        self.window = window
+        self._series: Dict[Tuple[str, ...], _Series] = {}
+        self._lock = threading.Lock()
+
+    def _key(self, labels: Dict[str, str]) -> Tuple[str, ...]:
+        if set(labels) != set(self.labelnames):
+            raise ValueError(f"{self.name} expects labels {self.labelnames}, got {tuple(labels)}")
+        return tuple(str(labels[n]) for n in self.labelnames)
+
+    def observe(self, seconds: float, **labels) -> None:
+        """Record one duration in seconds."""
+        key = self._key(labels)
+        idx = bisect_left(self.buckets, seconds)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = _Series(len(self.buckets), self.window)
+            series.counts[idx] += 1
+            series.total += seconds
+            series.count += 1
+            series.recent.append(seconds)
+
+    @contextmanager
+    def time(self, **labels) -> Iterator[None]:
+        """Observe the duration of the with-block (also when it raises)."""
+        self._key(labels)
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, **labels)
+
+    def snapshot(self) -> List[Dict]:
+        """
+        Per label set: count, sum, mean and recent p50/p95/p99 (seconds).
+
+        Returns:
+            List of dicts with the label values plus the statistics
+        """
+        with self._lock:
+            items = [(key, s.count, s.total, sorted(s.recent)) for key, s in self._series.items()]
+
+        out = []
+        for key, count, total, recent in sorted(items):
+            row = dict(zip(self.labelnames, key))
+            row.update({
+                "count": count,
+                "sum": total,
+                "mean": total / count if count else 0.0,
+            })
+            for q in QUANTILES:
+                row[f"p{int(q * 100)}"] = _quantile(recent, q)
+            out.append(row)
+        return out
+
+    def render(self) -> List[str]:
+        """Prometheus text exposition: a histogram plus a <name>_recent summary."""
+        with self._lock:
+            items = sorted(
+                (key, list(s.counts), s.total, s.count, sorted(s.recent))
+                for key, s in self._series.items()
+            )
+
+        lines = [
+            f"# HELP {self.name} {self.documentation}",
+            f"# TYPE {self.name} histogram",
+        ]
+        for key, counts, total, count, _ in items:
+            cumulative = 0
+            for bound, n in zip(self.buckets + (float("inf"),), counts):
+                cumulative += n
+                le = 'le="' + _format(bound) + '"'
+                lines.append(f"{self.name}_bucket{_labels(self.labelnames, key, le)} {cumulative}")
+            lines.append(f"{self.name}_sum{_labels(self.labelnames, key)} {_format(total)}")
+            lines.append(f"{self.name}_count{_labels(self.labelnames, key)} {count}")
+
+        recent_name = f"{self.name}_recent"
+        lines += [
+            f"# HELP {recent_name} {self.documentation} (last {self.window} samples)",
+            f"# TYPE {recent_name} summary",
+        ]
+        for key, _, _, _, recent in items:
+            for q in QUANTILES:
+                quantile = f'quantile="{q}"'
+                lines.append(f"{recent_name}{_labels(self.labelnames, key, quantile)} {_format(_quantile(recent, q))}")
+            lines.append(f"{recent_name}_sum{_labels(self.labelnames, key)} {_format(sum(recent))}")
+            lines.append(f"{recent_name}_count{_labels(self.labelnames, key)} {len(recent)}")
+        return lines
+
+    def reset(self) -> None:
+        with self._lock:
+            self._series.clear()
+
+
+def _quantile(ordered: List[float], q: float) -> float:
+    """Nearest-rank quantile of sorted samples (0.0 when empty)."""
+    if not ordered:
+        return 0.0
+    rank = min(max(math.ceil(q * len(ordered)), 1), len(ordered))
+    return ordered[rank - 1]
+
+
+class MetricsRegistry:
+    """Named histograms, rendered together for a scrape."""
+
+    def __init__(self):
+        self._metrics: Dict[str, Histogram] = {}
+        self._lock = threading.Lock()
+
+    def histogram(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_BUCKETS
+    ) -> Histogram:
+        """Get or create a histogram (same name returns the same instance)."""
+        with self._lock:
+            metric = self._metrics.get(name)
+            if metric is None:
+                metric = self._metrics[name] = Histogram(name, documentation, labelnames, buckets)
+            elif metric.labelnames != tuple(labelnames):
+                raise ValueError(f"{name} already registered with labels {metric.labelnames}")
+            return metric
+
+    def get(self, name: str) -> Optional[Histogram]:
+        return self._metrics.get(name)
+
+    def render(self) -> str:
+        """All metrics in Prometheus text format (version 0.0.4)."""
+        lines = []
+        for name in sorted(self._metrics):
+            lines += self._metrics[name].render()
+        return "\n".join(lines) + "\n"
+
+    def get_stats(self) -> Dict[str, List[Dict]]:
+        """Snapshot of every histogram, in milliseconds, for JSON APIs."""
+        stats = {}
+        for name in sorted(self._metrics):
+            rows = []
+            for row in self._metrics[name].snapshot():
+                for field in ("sum", "mean") + tuple(f"p{int(q * 100)}" for q in QUANTILES):
+                    row[f"{field}_ms"] = round(row.pop(field) * 1000, 3)
+                rows.append(row)
+            stats[name] = rows
+        return stats
+
+    def reset(self) -> None:
+        for metric in self._metrics.values():
+            metric.reset()
+
+
+# Global registry instance
+_registry: Optional[MetricsRegistry] = None
+
+
+def get_metrics() -> MetricsRegistry:
+    """Get or create global metrics registry."""
+    global _registry
+    if _registry is None:
+        _registry = MetricsRegistry()
+    return _registry
+
+
+ENGINE_STAGE_SECONDS = get_metrics().histogram(
+    "trading_engine_stage_seconds", "TradingEngine step latency in seconds", ["stage"]
+)
+ENGINE_CYCLE_SECONDS = get_metrics().histogram(
+    "trading_engine_cycle_seconds", "TradingEngine run_cycle latency in seconds"
+)
+BROKER_CALL_SECONDS = get_metrics().histogram(
+    "broker_call_seconds", "Broker API call latency in seconds, including retries", ["category", "method"]
+)
+DB_SESSION_SECONDS = get_metrics().histogram(
+    "db_session_seconds", "Database session open-to-close time in seconds"
+)
+WEBSOCKET_UPDATE_SECONDS = get_metrics().histogram(
+    "websocket_update_seconds", "Websocket update latency in seconds", ["stage"]
+)
+
+# Kite API method -> broker_call_seconds category
+BROKER_CATEGORIES = {
+    "quote": "quote",
+    "ltp": "quote",
+    "ohlc": "quote",
+    "historical_data": "historical",
+    "place_order": "orders",
+    "modify_order": "orders",
+    "cancel_order": "orders",
+    "orders": "orders",
+    "order_history": "orders",
+    "trades": "orders",
+    "margins": "margins",
+    "order_margins": "margins",
+    "basket_order_margins": "margins",
+    "positions": "portfolio",
+    "holdings": "portfolio",
+    "instruments": "instruments",
+}
+
+
+def broker_category(method: str) -> str:
+    """Category label for a Kite API method name."""
+    return BROKER_CATEGORIES.get(method, "other")
@@ -0,0 +1,173 @@
+"""Append-only Parquet writers for Trading System v2.0"""
+
+import threading
+from datetime import date
+from pathlib import Path
+from typing import Dict, List, Optional
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+from loguru import logger
+
+
+# Schema for option chain snapshots written by the options collector.
+# Prices are float32 (paise precision is preserved well beyond index levels),
+# low-cardinality string/date columns are dictionary-encoded on disk.
+OPTIONS_CHAIN_SCHEMA = pa.schema([
+    ("timestamp", pa.timestamp("us")),
+    ("symbol", pa.string()),
+    ("trading_symbol", pa.string()),
+    ("expiry", pa.date32()),
+    ("strike", pa.int32()),
+    ("option_type", pa.string()),
+    ("underlying", pa.float32()),
+    ("ltp", pa.float32()),
+    ("bid", pa.float32()),
+    ("bid_qty", pa.int64()),
+    ("ask", pa.float32()),
+    ("ask_qty", pa.int64()),
+    ("volume", pa.int64()),
+    ("oi", pa.int64()),
+    ("oi_day_high", pa.int64()),
+    ("oi_day_low", pa.int64()),
+    ("open", pa.float32()),
+    ("high", pa.float32()),
+    ("low", pa.float32()),
+    ("close", pa.float32()),
+    ("last_trade_time", pa.timestamp("us")),
+])
+
+OPTIONS_CHAIN_DICTIONARY_COLUMNS = ["symbol", "trading_symbol", "expiry", "option_type"]
+
+
+class DailyParquetWriter:
+    """
+    Streams records into one Parquet file per day.
+
+    The day file stays open and every write appends a row group, so the cost
+    of a flush depends only on the rows being flushed, not on how much has
+    already been written. The footer is written on close() or on day
+    rotation; until then the file is not readable by Parquet readers.
+
+    File naming: {prefix}_{YYYYMMDD}.parquet
+    """
+
+    def __init__(
+        self,
+        directory: Path,
+        prefix: str,
+        schema: pa.Schema,
+        dictionary_columns: Optional[List[str]] = None,
+        compression: str = "zstd"
+    ):
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.prefix = prefix
+        self.schema = schema
+        self.dictionary_columns = dictionary_columns or []
+        self.compression = compression
+
+        self._writer: Optional[pq.ParquetWriter] = None
+        self._day: Optional[date] = None
+        self._lock = threading.Lock()
+        self.rows_written = 0
+        self.row_groups_written = 0
+
+    def path_for(self, day: date) -> Path:
+        """Get the file path for a given day."""
+        return self.directory / f"{self.prefix}_{day.strftime('%Y%m%d')}.parquet"
+
+    @property
+    def is_open(self) -> bool:
+        return self._writer is not None
+
+    def write(self, records: List[Dict], day: Optional[date] = None) -> int:
+        """
+        Append records as a single row group to the file for `day`.
+
+        Args:
+            records: List of dicts keyed by schema field names
+            day: File date (defaults to today)
+
+        Returns:
+            Number of rows written
+        """
+        if not records:
+            return 0
+
+        day = day or date.today()
+        table = self._to_table(records)
+
+        with self._lock:
+            if self._day != day:
+                self._close_locked()
+                self._open_locked(day)
+
+            self._writer.write_table(table)
+            self.rows_written += table.num_rows
+            self.row_groups_written += 1
+
+        return table.num_rows
+
+    def close(self) -> None:
+        """Write the footer and close the current file."""
+        with self._lock:
+            self._close_locked()
+
+    def _to_table(self, records: List[Dict]) -> pa.Table:
+        """Convert records to an Arrow table matching the schema."""
+        df = pd.DataFrame.from_records(records, columns=self.schema.names)
+        return pa.Table.from_pandas(df, schema=self.schema, preserve_index=False)
+
+    def _open_locked(self, day: date) -> None:
+        path = self.path_for(day)
+        carried_over = None
+
+        # A previous run today already wrote (and closed) this file. Move it
+        # aside and stream its row groups into the new writer so we keep a
+        # single file per day.
+        if path.exists():
+            carried_over = path.with_suffix(".parquet.prev")
+            path.replace(carried_over)
+
+        self._writer = pq.ParquetWriter(
+            path,
+            self.schema,
+            compression=self.compression,
+            use_dictionary=self.dictionary_columns or True
+        )
+        self._day = day
+
+        if carried_over is not None:
+            self._carry_over(carried_over)
+
+        logger.debug(f"Opened streaming parquet writer: {path}")
+
+    def _carry_over(self, previous: Path) -> None:
+        """Copy row groups from a previous file into the open writer."""
+        try:
+            pf = pq.ParquetFile(previous)
+            for i in range(pf.num_row_groups):
+                table = pf.read_row_group(i).select(self.schema.names).cast(self.schema)
+                self._writer.write_table(table)
+            previous.unlink()
+            logger.info(f"Resumed {pf.metadata.num_rows} existing rows from {previous.name}")
+        except Exception as e:
+            # An unreadable file (e.g. from a hard kill before close) is kept
+            # for manual recovery rather than silently dropped.
+            corrupt = previous.with_suffix(".corrupt")
+            previous.replace(corrupt)
+            logger.warning(f"Could not resume {previous.name} ({e}); kept as {corrupt.name}")
+
+    def _close_locked(self) -> None:
+        if self._writer is None:
+            return
+        try:
+            self._writer.close()
+            logger.debug(f"Closed parquet writer: {self.path_for(self._day)}")
+        except Exception as e:
+            logger.error(f"Failed to close parquet writer: {e}")
+        finally:
+            self._writer = None
+            self._day = None
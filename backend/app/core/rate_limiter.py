@@ -11,7 +11,7 @@ KiteConnect Limits (as of 2026):
 """
 
 from datetime import datetime, timedelta
-from typing import Dict, Optional, List, Callable
+from typing import Dict, Optional, List, Callable, Tuple
 from collections import deque
 from dataclasses import dataclass, field
 from enum import Enum
@@ -190,27 +190,31 @@ class APIRateLimiter:
         config = self.limits.get(endpoint, self.limits[APIEndpoint.OTHER])
         
         with self._lock:
-            # Check per-second limit
-            calls_last_second = self._get_calls_in_window(endpoint, 1.0)
-            if calls_last_second >= config.requests_per_second:
-                wait = 1.0 - (datetime.now() - self._call_windows[endpoint][-1]).total_seconds()
-                return False, max(0.1, wait)
-            
-            # Check per-minute limit
-            calls_last_minute = self._get_calls_in_window(endpoint, 60.0)
-            if calls_last_minute >= config.requests_per_minute:
-                oldest_in_minute = min(
-                    (ts for ts in self._call_windows[endpoint] 
-                     if ts > datetime.now() - timedelta(seconds=60)),
-                    default=datetime.now()
-                )
-                wait = 60.0 - (datetime.now() - oldest_in_minute).total_seconds()
-                return False, max(0.1, wait)
-            
-            # Check daily budget
-            total_daily = sum(self._daily_calls.values())
-            if total_daily >= self.daily_budget:
-                return False, 3600.0  # Wait an hour
+            return self._check_locked(endpoint, config)
+    
+    def _check_locked(self, endpoint: APIEndpoint, config: RateLimitConfig) -> tuple[bool, float]:
+        """Limit check; caller must hold self._lock."""
+        # Check per-second limit
+        calls_last_second = self._get_calls_in_window(endpoint, 1.0)
+        if calls_last_second >= config.requests_per_second:
+            wait = 1.0 - (datetime.now() - self._call_windows[endpoint][-1]).total_seconds()
+            return False, max(0.1, wait)
+        
+        # Check per-minute limit
+        calls_last_minute = self._get_calls_in_window(endpoint, 60.0)
+        if calls_last_minute >= config.requests_per_minute:
+            oldest_in_minute = min(
+                (ts for ts in self._call_windows[endpoint] 
+                 if ts > datetime.now() - timedelta(seconds=60)),
+                default=datetime.now()
+            )
+            wait = 60.0 - (datetime.now() - oldest_in_minute).total_seconds()
+            return False, max(0.1, wait)
+        
+        # Check daily budget
+        total_daily = sum(self._daily_calls.values())
+        if total_daily >= self.daily_budget:
+            return False, 3600.0  # Wait an hour
         
         return True, 0.0
     
@@ -308,6 +312,50 @@ class APIRateLimiter:
         else:
             raise RateLimitExceeded(endpoint, wait_seconds)
     
+    def reserve(self, endpoint: APIEndpoint) -> Tuple[bool, float]:
+        """
+        Record a call if one is allowed now; check and reservation happen under one lock.
+        
+        Args:
+            endpoint: The API endpoint to call
+            
+        Returns:
+            Tuple of (reserved, seconds to wait before retrying)
+        """
+        self._reset_daily_if_needed()
+        config = self.limits.get(endpoint, self.limits[APIEndpoint.OTHER])
+        
+        with self._lock:
+            allowed, wait_seconds = self._check_locked(endpoint, config)
+            if allowed:
+                self._call_windows[endpoint].append(datetime.now())
+                self._daily_calls[endpoint] += 1
+        return allowed, wait_seconds
+    
+    def acquire_slot(self, endpoint: APIEndpoint) -> float:
+        """
+        Block until a call is allowed and record it atomically.
+        
+        Unlike acquire() + record_call(), the check and the reservation
+        happen under one lock, so concurrent workers sharing this limiter
+        cannot all pass the check before any of them is recorded.
+        
+        Args:
+            endpoint: The API endpoint to call
+            
+        Returns:
+            Total seconds waited
+        """
+        waited = 0.0
+        
+        while True:
+            allowed, wait_seconds = self.reserve(endpoint)
+            if allowed:
+                return waited
+            
+            time.sleep(wait_seconds)
+            waited += wait_seconds
+    
     def get_stats(self, endpoint: Optional[APIEndpoint] = None) -> Dict[str, RateLimitStats]:
         """
         Get rate limit statistics.
@@ -394,15 +442,40 @@ class APIRateLimiter:
         }
 
 
+class RemoteRateLimiter(APIRateLimiter):
+    """
+    Limiter for API workers: reservations are made against the broker
+    process's limiter through the state hub, so every worker draws on one
+    KiteConnect budget. Falls back to this worker's own windows while the
+    broker process is unreachable.
+    """
+    
+    def __init__(self, client, **kwargs):
+        super().__init__(**kwargs)
+        self._client = client
+    
+    def reserve(self, endpoint: APIEndpoint) -> Tuple[bool, float]:
+        from .state_hub import HubError
+        try:
+            return self._client.call("rate_limit.reserve", endpoint)
+        except HubError as e:
+            logger.warning(f"Shared rate limiter unavailable ({e}), using local limits")
+            return super().reserve(endpoint)
+
+
 # Global rate limiter instance
 _rate_limiter: Optional[APIRateLimiter] = None
 
 
 def get_rate_limiter() -> APIRateLimiter:
-    """Get or create global rate limiter instance."""
+    """Get or create global rate limiter instance (shared through the state hub in API workers)."""
     global _rate_limiter
     if _rate_limiter is None:
-        _rate_limiter = APIRateLimiter()
+        from .state_hub import get_hub_client, is_api_worker
+        if is_api_worker():
+            _rate_limiter = RemoteRateLimiter(get_hub_client())
+        else:
+            _rate_limiter = APIRateLimiter()
     return _rate_limiter
 
 
@@ -0,0 +1,585 @@
+"""
+Broker-process State Hub for Trading System v2.0
+
+The Kite ticker, the Orchestrator, the rate limiter and the trailing-stop
+service are per-process singletons. Several uvicorn workers would each open
+a ticker, split the rate budget and lose track of the running engine. So the
+deployment can be split by PROCESS_ROLE:
+
+- all    (default) one process does everything, as before
+- broker owns the broker connections and the engine (app/api/broker.py) and
+         serves them through a StateHub
+- api    stateless HTTP/websocket worker (uvicorn --workers N); reads state
+         and ticks from the hub and forwards control calls to the broker
+
+The hub is stdlib local IPC (multiprocessing.connection over a Unix socket
+with an auth key):
+
+- publish(key, value) stores the latest value of a piece of state, read by
+  workers with get(key)
+- broadcast(topic, payload) pushes to every subscribed worker (ticks, order
+  updates) through a bounded per-worker queue, so a slow worker drops old
+  messages instead of stalling the ticker thread
+- expose(name, obj, methods) makes obj.method callable as call("name.method");
+  handlers bound to an event loop run on that loop
+"""
+
+import asyncio
+import hashlib
+import os
+import queue
+import socket
+import threading
+import time
+from functools import lru_cache
+from multiprocessing.connection import Client, Listener
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+from loguru import logger
+
+ROLE_ALL = "all"
+ROLE_BROKER = "broker"
+ROLE_API = "api"
+
+
+class HubError(Exception):
+    """A hub request failed in the broker process or timed out."""
+
+
+class HubUnavailable(HubError):
+    """The broker process's hub could not be reached."""
+
+
+@lru_cache(maxsize=None)
+def process_role() -> str:
+    """PROCESS_ROLE of this process (all, broker or api)."""
+    from ..config.settings import Settings
+    return Settings().process_role.lower()
+
+
+def is_api_worker() -> bool:
+    """True in a stateless API worker, which must not own broker state."""
+    return process_role() == ROLE_API
+
+
+def hub_authkey(config) -> bytes:
+    """Auth key shared by broker and workers (derived from the Kite secret by default)."""
+    secret = config.state_hub_authkey or f"trading-v2:{config.kite_api_secret}"
+    return hashlib.sha256(secret.encode()).digest()
+
+
+class _Subscriber:
+    """One worker's push connection for a topic."""
+
+    __slots__ = ("conn", "topic", "queue")
+
+    def __init__(self, conn, topic: str, queue_size: int):
+        self.conn = conn
+        self.topic = topic
+        self.queue: queue.Queue = queue.Queue(maxsize=queue_size)
+
+
+class StateHub:
+    """
+    Latest-value store, topic fan-out and RPC for API workers.
+
+    Usage (broker process):
+        hub = StateHub(address, authkey)
+        hub.expose("ticker", ticker_manager, ["subscribe", "get_all_prices"])
+        ticker_manager.add_callback(lambda ticks: hub.broadcast("ticks", ticks))
+        hub.start()
+        hub.publish("trading.status", {...})
+    """
+
+    def __init__(self, address: str, authkey: bytes, queue_size: int = 1000, call_timeout: float = 30.0):
+        """
+        Args:
+            address: Unix socket path
+            authkey: Shared auth key
+            queue_size: Pending broadcasts kept per subscriber (oldest dropped)
+            call_timeout: Seconds a loop-bound handler may take
+        """
+        self.address = address
+        self.authkey = authkey
+        self.queue_size = queue_size
+        self.call_timeout = call_timeout
+
+        self._lock = threading.Lock()
+        self._state: Dict[str, Any] = {}
+        self._handlers: Dict[str, Callable] = {}
+        self._subscribers: Dict[str, List[_Subscriber]] = {}
+        self._connections: set = set()
+        self._listener: Optional[Listener] = None
+        self._running = False
+        self.stats = {"connections": 0, "requests": 0, "errors": 0, "broadcasts": 0, "dropped": 0}
+
+    # =========================================================================
+    # Broker-side API
+    # =========================================================================
+
+    def register(self, name: str, handler: Callable, loop: Optional[asyncio.AbstractEventLoop] = None) -> None:
+        """
+        Make handler callable by workers as call(name, ...).
+
+        Args:
+            name: Command name
+            handler: Function or coroutine function
+            loop: Run the handler on this event loop instead of the hub thread
+        """
+        if loop is not None:
+            handler = self._on_loop(handler, loop)
+        self._handlers[name] = handler
+
+    def expose(
+        self,
+        name: str,
+        obj: Any,
+        methods: Iterable[str],
+        loop: Optional[asyncio.AbstractEventLoop] = None
+    ) -> None:
+        """Register obj.method as "name.method" for each method."""
+        for method in methods:
+            self.register(f"{name}.{method}", getattr(obj, method), loop)
+
+    def publish(self, key: str, value: Any) -> None:
+        """Store the latest value for key."""
+        with self._lock:
+            self._state[key] = value
+
+    def broadcast(self, topic: str, payload: Any) -> None:
+        """Queue payload for every subscriber of topic (never blocks)."""
+        with self._lock:
+            subscribers = list(self._subscribers.get(topic, ()))
+            self.stats["broadcasts"] += 1
+        for sub in subscribers:
+            try:
+                sub.queue.put_nowait(payload)
+            except queue.Full:
+                try:
+                    sub.queue.get_nowait()
+                except queue.Empty:
+                    pass
+                sub.queue.put_nowait(payload)
+                self.stats["dropped"] += 1
+
+    def start(self) -> None:
+        """Listen on the socket and serve workers from background threads."""
+        if self._running:
+            return
+        if os.path.exists(self.address):
+            os.unlink(self.address)  # Stale socket from a previous run
+        os.makedirs(os.path.dirname(os.path.abspath(self.address)), exist_ok=True)
+        self._listener = Listener(self.address, authkey=self.authkey)
+        os.chmod(self.address, 0o600)
+        self._running = True
+        threading.Thread(target=self._accept_loop, name="state-hub", daemon=True).start()
+        logger.info(f"State hub listening on {self.address}")
+
+    def stop(self) -> None:
+        """Close the socket and every worker connection."""
+        if not self._running:
+            return
+        self._running = False
+        try:
+            Client(self.address, authkey=self.authkey).close()  # Wake the accept loop
+        except Exception:
+            pass
+        try:
+            self._listener.close()
+        except Exception:
+            pass
+        with self._lock:
+            connections = list(self._connections)
+            self._subscribers.clear()
+        for conn in connections:
+            _shutdown(conn)  # Workers see EOF and reconnect to the next broker
+        logger.info("State hub stopped")
+
+    def get_stats(self) -> Dict:
+        with self._lock:
+            return {
+                **self.stats,
+                "address": self.address,
+                "running": self._running,
+                "keys": sorted(self._state),
+                "commands": len(self._handlers),
+                "subscribers": {t: len(s) for t, s in self._subscribers.items()},
+            }
+
+    # =========================================================================
+    # Serving
+    # =========================================================================
+
+    def _on_loop(self, handler: Callable, loop: asyncio.AbstractEventLoop) -> Callable:
+        async def run(*args, **kwargs):
+            result = handler(*args, **kwargs)
+            return await result if asyncio.iscoroutine(result) else result
+
+        def call(*args, **kwargs):
+            return asyncio.run_coroutine_threadsafe(run(*args, **kwargs), loop).result(self.call_timeout)
+        return call
+
+    def _accept_loop(self) -> None:
+        while self._running:
+            try:
+                conn = self._listener.accept()
+            except Exception as e:
+                if self._running:
+                    logger.warning(f"State hub rejected a connection: {e}")
+                    continue
+                break
+            if not self._running:
+                _close(conn)
+                break
+            self.stats["connections"] += 1
+            threading.Thread(target=self._serve, args=(conn,), name="state-hub-conn", daemon=True).start()
+
+    def _serve(self, conn) -> None:
+        with self._lock:
+            self._connections.add(conn)
+        try:
+            while self._running:
+                message = conn.recv()
+                op = message[0]
+                if op == "subscribe":
+                    self._stream(conn, message[1])
+                    return
+                conn.send(self._handle(op, message))
+        except (EOFError, OSError):
+            pass  # Worker went away
+        finally:
+            with self._lock:
+                self._connections.discard(conn)
+            _close(conn)
+
+    def _handle(self, op: str, message: tuple) -> tuple:
+        self.stats["requests"] += 1
+        if op == "get":
+            with self._lock:
+                return ("ok", self._state.get(message[1]))
+        if op == "call":
+            _, name, args, kwargs = message
+            handler = self._handlers.get(name)
+            if handler is None:
+                return ("error", HubError(f"Unknown hub command: {name}"))
+            try:
+                return ("ok", handler(*args, **kwargs))
+            except Exception as e:
+                self.stats["errors"] += 1
+                return ("error", _portable(e))
+        return ("error", HubError(f"Unknown hub operation: {op}"))
+
+    def _stream(self, conn, topic: str) -> None:
+        """Push broadcasts of topic to one worker until it disconnects."""
+        sub = _Subscriber(conn, topic, self.queue_size)
+        with self._lock:
+            self._subscribers.setdefault(topic, []).append(sub)
+        try:
+            conn.send(("subscribed", topic))
+            while self._running:
+                try:
+                    payload = sub.queue.get(timeout=1.0)
+                except queue.Empty:
+                    continue
+                if payload is None:
+                    break
+                conn.send((topic, payload))
+        finally:
+            with self._lock:
+                subs = self._subscribers.get(topic, [])
+                if sub in subs:
+                    subs.remove(sub)
+
+
+class StateHubClient:
+    """
+    Worker-side connection to the broker process's hub.
+
+    Requests share one connection (serialized by a lock); each subscription
+    gets its own connection and thread and reconnects after broker restarts.
+    """
+
+    def __init__(self, address: str, authkey: bytes, timeout: float = 10.0, retry_interval: float = 2.0):
+        self.address = address
+        self.authkey = authkey
+        self.timeout = timeout
+        self.retry_interval = retry_interval
+        self._lock = threading.Lock()
+        self._conn = None
+        self._closed = False
+        self._streams: List[Any] = []
+
+    def get(self, key: str, default: Any = None) -> Any:
+        """Latest published value of key."""
+        value = self._request(("get", key))
+        return default if value is None else value
+
+    def call(self, name: str, *args, **kwargs) -> Any:
+        """Run a registered command in the broker process and return its result."""
+        return self._request(("call", name, args, kwargs))
+
+    def proxy(self, name: str) -> "HubProxy":
+        """Object whose method calls run as call("name.method", ...)."""
+        return HubProxy(self, name)
+
+    def subscribe(self, topic: str, callback: Callable[[Any], None], on_connect: Optional[Callable] = None) -> None:
+        """
+        Receive broadcasts of topic on a background thread.
+
+        Args:
+            topic: Broadcast topic
+            callback: Called with each payload
+            on_connect: Called after each (re)connect, e.g. to reseed caches
+        """
+        threading.Thread(
+            target=self._stream, args=(topic, callback, on_connect), name=f"state-hub-{topic}", daemon=True
+        ).start()
+
+    def close(self) -> None:
+        self._closed = True
+        with self._lock:
+            _close(self._conn)
+            self._conn = None
+        for conn in list(self._streams):
+            _close(conn)
+
+    def _request(self, message: tuple) -> Any:
+        with self._lock:
+            for attempt in range(2):
+                fresh = self._conn is None
+                try:
+                    if fresh:
+                        self._conn = Client(self.address, authkey=self.authkey)
+                    self._conn.send(message)
+                except (OSError, EOFError) as e:
+                    _close(self._conn)
+                    self._conn = None
+                    if fresh or attempt:
+                        raise HubUnavailable(f"State hub unavailable at {self.address}: {e}") from e
+                    continue  # Stale connection from before a broker restart: reconnect once
+
+                # Sent: never resend, the command may have run
+                try:
+                    if not self._conn.poll(self.timeout):
+                        raise HubError(f"State hub did not answer {message[0]} {message[1]} in {self.timeout}s")
+                    status, value = self._conn.recv()
+                except (OSError, EOFError, HubError) as e:
+                    _close(self._conn)
+                    self._conn = None
+                    if isinstance(e, HubError):
+                        raise
+                    raise HubUnavailable(f"State hub connection lost: {e}") from e
+                break
+
+        if status == "error":
+            raise value
+        return value
+
+    def _stream(self, topic: str, callback: Callable, on_connect: Optional[Callable]) -> None:
+        while not self._closed:
+            conn = None
+            try:
+                conn = Client(self.address, authkey=self.authkey)
+                self._streams.append(conn)
+                conn.send(("subscribe", topic))
+                conn.recv()  # ("subscribed", topic)
+                if on_connect:
+                    on_connect()
+                while not self._closed:
+                    _, payload = conn.recv()
+                    try:
+                        callback(payload)
+                    except Exception as e:
+                        logger.error(f"State hub {topic} callback error: {e}")
+            except (OSError, EOFError, HubError) as e:
+                if not self._closed:
+                    logger.warning(f"State hub {topic} stream lost ({e}), retrying in {self.retry_interval}s")
+                    time.sleep(self.retry_interval)
+            finally:
+                if conn is not None:
+                    _close(conn)
+                    if conn in self._streams:
+                        self._streams.remove(conn)
+
+
+class HubProxy:
+    """Forwards method calls to an object exposed by the broker process."""
+
+    def __init__(self, client: StateHubClient, name: str):
+        self._client = client
+        self._name = name
+
+    def __getattr__(self, method: str) -> Callable:
+        if method.startswith("_"):
+            raise AttributeError(method)
+
+        def call(*args, **kwargs):
+            return self._client.call(f"{self._name}.{method}", *args, **kwargs)
+        return call
+
+
+class RemoteTicker:
+    """
+    KiteTickerManager stand-in for API workers.
+
+    Ticks and order updates arrive from the broker process's ticker over the
+    hub and feed a local price cache and the registered callbacks; start,
+    subscribe and recording calls are forwarded to the broker's ticker.
+    """
+
+    def __init__(self, client: StateHubClient):
+        self._client = client
+        self._lock = threading.Lock()
+        self._callbacks: List[Callable] = []
+        self._order_callbacks: List[Callable] = []
+        self._price_cache: Dict[int, Dict] = {}
+        self._position_data: Dict[int, Dict] = {}
+        self._streams: set = set()
+
+    def add_callback(self, callback: Callable):
+        """Add callback to be called on tick updates."""
+        if callback not in self._callbacks:
+            self._callbacks.append(callback)
+        self._ensure_stream("ticks", self._on_ticks, self._seed_prices)
+
+    def remove_callback(self, callback: Callable):
+        if callback in self._callbacks:
+            self._callbacks.remove(callback)
+
+    def add_order_callback(self, callback: Callable):
+        """Add callback to be called with order update postbacks."""
+        if callback not in self._order_callbacks:
+            self._order_callbacks.append(callback)
+        self._ensure_stream("orders", self._on_order_update)
+
+    def remove_order_callback(self, callback: Callable):
+        if callback in self._order_callbacks:
+            self._order_callbacks.remove(callback)
+
+    def start(self, api_key: str, access_token: str):
+        """Start (or re-key) the broker process's ticker."""
+        self._forward("start", api_key, access_token)
+
+    def stop(self):
+        self._forward("stop")
+
+    def ensure_started(self) -> bool:
+        """Start the broker process's ticker if it is not running."""
+        return bool(self._forward("ensure_started"))
+
+    def subscribe(self, tokens: List[int]):
+        if tokens:
+            self._forward("subscribe", list(tokens))
+
+    def start_recording(self, directory, prefix: str = "ticks"):
+        self._forward("start_recording", directory, prefix=prefix)
+
+    def stop_recording(self):
+        self._forward("stop_recording")
+
+    def set_position_data(self, token: int, data: Dict):
+        self._position_data[token] = data
+
+    def get_price(self, token: int) -> Optional[float]:
+        tick = self._price_cache.get(token)
+        return tick.get("last_price") if tick else None
+
+    def get_all_prices(self) -> Dict[int, float]:
+        return {t: d.get("last_price", 0) for t, d in self._price_cache.items()}
+
+    def _forward(self, method: str, *args, **kwargs):
+        try:
+            return self._client.call(f"ticker.{method}", *args, **kwargs)
+        except HubError as e:
+            logger.error(f"Ticker {method} via broker process failed: {e}")
+
+    def _ensure_stream(self, topic: str, callback: Callable, on_connect: Optional[Callable] = None):
+        with self._lock:
+            if topic in self._streams:
+                return
+            self._streams.add(topic)
+        self._client.subscribe(topic, callback, on_connect)
+
+    def _seed_prices(self):
+        try:
+            prices = self._client.call("ticker.get_all_prices")
+        except HubError:
+            return
+        for token, price in prices.items():
+            self._price_cache.setdefault(token, {"instrument_token": token, "last_price": price})
+
+    def _on_ticks(self, ticks):
+        for tick in ticks:
+            token = tick.get("instrument_token")
+            if token:
+                self._price_cache[token] = tick
+        for callback in list(self._callbacks):
+            try:
+                callback(ticks)
+            except Exception as e:
+                logger.error(f"Tick callback error: {e}")
+
+    def _on_order_update(self, data):
+        for callback in list(self._order_callbacks):
+            try:
+                callback(data)
+            except Exception as e:
+                logger.error(f"Order update callback error: {e}")
+
+
+def _close(conn) -> None:
+    if conn is None:
+        return
+    try:
+        conn.close()
+    except Exception:
+        pass
+
+
+def _shutdown(conn) -> None:
+    """Shut a connection's socket down, waking any thread blocked on it."""
+    try:
+        sock = socket.socket(fileno=os.dup(conn.fileno()))
+    except OSError:
+        return
+    try:
+        sock.shutdown(socket.SHUT_RDWR)
+    except OSError:
+        pass
+    finally:
+        sock.close()
+
+
+def _portable(error: Exception) -> Exception:
+    """The exception itself if it survives pickling, else a HubError carrying its text."""
+    import pickle
+    try:
+        pickle.loads(pickle.dumps(error))
+        return error
+    except Exception:
+        return HubError(f"{type(error).__name__}: {error}")
+
+
+# Global hub (broker process) and client (API workers)
+_hub: Optional[StateHub] = None
+_client: Optional[StateHubClient] = None
+
+
+def get_state_hub() -> StateHub:
+    """Get or create the broker process's hub."""
+    global _hub
+    if _hub is None:
+        from ..config.settings import Settings
+        config = Settings()
+        _hub = StateHub(config.state_hub_address, hub_authkey(config))
+    return _hub
+
+
+def get_hub_client() -> StateHubClient:
+    """Get or create this worker's hub client."""
+    global _client
+    if _client is None:
+        from ..config.settings import Settings
+        config = Settings()
+        _client = StateHubClient(config.state_hub_address, hub_authkey(config), timeout=config.state_hub_timeout)
+    return _client
@@ -0,0 +1,429 @@
+"""Binary tick log: recording and replay of ticker sessions for Trading System v2.0
+
+Every tick batch received from the Kite ticker is appended to a daily file
+of fixed-width records ({prefix}_{YYYYMMDD}.ticks). A record holds the
+receive time, the batch it arrived in and every field of a full-mode tick;
+a presence mask remembers which keys the tick actually had, so LTP, quote
+and full-mode ticks decode back to the same dicts the callbacks saw.
+
+TickReplay feeds recorded batches back through a tick handler (normally
+KiteTickerManager._on_ticks) with the original spacing, N times faster, or
+as fast as possible.
+"""
+
+import json
+import threading
+import time
+from datetime import date, datetime
+from pathlib import Path
+from typing import Callable, Dict, Iterator, List, Optional, Sequence, Tuple, Union
+
+import numpy as np
+from loguru import logger
+
+
+MAGIC = b"TICKLOG1"
+DEPTH_LEVELS = 5
+
+MODES = ("ltp", "quote", "full")
+
+TICK_DTYPE = np.dtype([
+    ("received_ns", "<i8"),     # time.time_ns() when the batch arrived
+    ("batch", "<u4"),           # Batch sequence number within the file
+    ("instrument_token", "<u4"),
+    ("last_price", "<f8"),
+    ("last_traded_quantity", "<i8"),
+    ("average_traded_price", "<f8"),
+    ("volume_traded", "<i8"),
+    ("total_buy_quantity", "<i8"),
+    ("total_sell_quantity", "<i8"),
+    ("ohlc", "<f8", (4,)),
+    ("change", "<f8"),
+    ("last_trade_time", "<i8"),     # Epoch seconds, 0 = None
+    ("oi", "<i8"),
+    ("oi_day_high", "<i8"),
+    ("oi_day_low", "<i8"),
+    ("exchange_timestamp", "<i8"),  # Epoch seconds, 0 = None
+    ("buy_price", "<f8", (DEPTH_LEVELS,)),
+    ("buy_quantity", "<i8", (DEPTH_LEVELS,)),
+    ("buy_orders", "<i4", (DEPTH_LEVELS,)),
+    ("sell_price", "<f8", (DEPTH_LEVELS,)),
+    ("sell_quantity", "<i8", (DEPTH_LEVELS,)),
+    ("sell_orders", "<i4", (DEPTH_LEVELS,)),
+    ("mode", "u1"),
+    ("tradable", "u1"),
+    ("present", "<u2"),         # Bit per optional key (see OPTIONAL_FIELDS)
+    ("reserved", "<u4"),        # Keeps records 8-byte aligned
+])
+
+# Optional tick keys in presence-mask bit order
+OPTIONAL_FIELDS = (
+    "last_traded_quantity",
+    "average_traded_price",
+    "volume_traded",
+    "total_buy_quantity",
+    "total_sell_quantity",
+    "ohlc",
+    "change",
+    "last_trade_time",
+    "oi",
+    "oi_day_high",
+    "oi_day_low",
+    "exchange_timestamp",
+    "depth",
+)
+_BITS = {name: 1 << i for i, name in enumerate(OPTIONAL_FIELDS)}
+_SCALARS = (
+    "last_traded_quantity", "average_traded_price", "volume_traded",
+    "total_buy_quantity", "total_sell_quantity", "change", "oi", "oi_day_high", "oi_day_low",
+)
+_OHLC = ("open", "high", "low", "close")
+
+
+def _epoch(value) -> int:
+    return int(value.timestamp()) if isinstance(value, datetime) else int(value or 0)
+
+
+def encode_ticks(ticks: Sequence[Dict], batch: int, received_ns: int) -> np.ndarray:
+    """
+    Encode one tick batch as fixed-width records.
+
+    Columns are gathered as Python lists and assigned once per field, which
+    keeps the cost on the ticker thread to a few microseconds per tick.
+    Keys outside the Kite tick layout are not recorded.
+    """
+    n = len(ticks)
+    records = np.zeros(n, dtype=TICK_DTYPE)
+    records["received_ns"] = received_ns
+    records["batch"] = batch
+    records["instrument_token"] = [tick.get("instrument_token", 0) for tick in ticks]
+    records["mode"] = [MODES.index(tick["mode"]) if tick.get("mode") in MODES else 0 for tick in ticks]
+    records["tradable"] = [bool(tick.get("tradable", True)) for tick in ticks]
+    records["last_price"] = [tick.get("last_price") or 0.0 for tick in ticks]
+
+    present = [0] * n
+    for name in _SCALARS:
+        if any(name in tick for tick in ticks):
+            records[name] = [tick.get(name) or 0 for tick in ticks]
+            bit = _BITS[name]
+            for i, tick in enumerate(ticks):
+                if name in tick:
+                    present[i] |= bit
+
+    zeros = [0] * DEPTH_LEVELS
+    nested = {name: [] for name in ("ohlc", "last_trade_time", "exchange_timestamp",
+                                    "buy_price", "buy_quantity", "buy_orders",
+                                    "sell_price", "sell_quantity", "sell_orders")}
+    for i, tick in enumerate(ticks):
+        ohlc = tick.get("ohlc")
+        if ohlc is not None:
+            present[i] |= _BITS["ohlc"]
+            nested["ohlc"].append([ohlc.get(k, 0) for k in _OHLC])
+        else:
+            nested["ohlc"].append(zeros[:4])
+        for name in ("last_trade_time", "exchange_timestamp"):
+            if name in tick:
+                present[i] |= _BITS[name]
+            nested[name].append(_epoch(tick.get(name)))
+        depth = tick.get("depth")
+        if depth is not None:
+            present[i] |= _BITS["depth"]
+        for side in ("buy", "sell"):
+            levels = (depth or {}).get(side, [])[:DEPTH_LEVELS]
+            pad = zeros[len(levels):]
+            nested[f"{side}_price"].append([level.get("price", 0) for level in levels] + pad)
+            nested[f"{side}_quantity"].append([level.get("quantity", 0) for level in levels] + pad)
+            nested[f"{side}_orders"].append([level.get("orders", 0) for level in levels] + pad)
+    for name, values in nested.items():
+        records[name] = values
+
+    records["present"] = present
+    return records
+
+
+def decode_ticks(records: np.ndarray) -> List[Dict]:
+    """Decode records to the tick dicts KiteTicker delivered."""
+    columns = {name: records[name].tolist() for name in TICK_DTYPE.names}
+    ticks = []
+    for i, present in enumerate(columns["present"]):
+        tick = {
+            "tradable": bool(columns["tradable"][i]),
+            "mode": MODES[columns["mode"][i]],
+            "instrument_token": columns["instrument_token"][i],
+            "last_price": columns["last_price"][i],
+        }
+        if present:
+            for name in _SCALARS:
+                if present & _BITS[name]:
+                    tick[name] = columns[name][i]
+            if present & _BITS["ohlc"]:
+                tick["ohlc"] = dict(zip(_OHLC, columns["ohlc"][i]))
+            for name in ("last_trade_time", "exchange_timestamp"):
+                if present & _BITS[name]:
+                    seconds = columns[name][i]
+                    tick[name] = datetime.fromtimestamp(seconds) if seconds else None
+            if present & _BITS["depth"]:
+                tick["depth"] = {
+                    side: [
+                        {"quantity": q, "price": p, "orders": o}
+                        for p, q, o in zip(
+                            columns[f"{side}_price"][i],
+                            columns[f"{side}_quantity"][i],
+                            columns[f"{side}_orders"][i],
+                        )
+                    ]
+                    for side in ("buy", "sell")
+                }
+        ticks.append(tick)
+    return ticks
+
+
+def _header() -> bytes:
+    header = json.dumps({"version": 1, "dtype": TICK_DTYPE.descr}).encode()
+    # Pad so records start on an 8-byte boundary
+    header += b" " * (-(len(MAGIC) + 4 + len(header)) % 8)
+    return MAGIC + len(header).to_bytes(4, "little") + header
+
+
+class TickRecorder:
+    """
+    Appends tick batches to one binary file per day.
+
+    File naming: {prefix}_{YYYYMMDD}.ticks. Restarting on the same day
+    appends to the existing file; batch numbers continue from its last
+    record.
+    """
+
+    def __init__(self, directory: Path, prefix: str = "ticks", flush_every: int = 100):
+        """
+        Args:
+            directory: Output directory
+            prefix: File name prefix
+            flush_every: Flush the file after this many batches
+        """
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.prefix = prefix
+        self.flush_every = flush_every
+
+        self._file = None
+        self._day: Optional[date] = None
+        self._batch = 0
+        self._unflushed = 0
+        self._lock = threading.Lock()
+        self.ticks_written = 0
+        self.batches_written = 0
+
+    def path_for(self, day: date) -> Path:
+        """Get the file path for a given day."""
+        return self.directory / f"{self.prefix}_{day.strftime('%Y%m%d')}.ticks"
+
+    def record(self, ticks: Sequence[Dict], received_ns: Optional[int] = None) -> int:
+        """
+        Append one tick batch.
+
+        Args:
+            ticks: Ticks as delivered to on_ticks
+            received_ns: Receive time (defaults to now)
+
+        Returns:
+            Number of ticks written
+        """
+        if not ticks:
+            return 0
+
+        received_ns = received_ns or time.time_ns()
+        day = datetime.fromtimestamp(received_ns / 1e9).date()
+
+        with self._lock:
+            if self._day != day:
+                self._close_locked()
+                self._open_locked(day)
+
+            self._file.write(encode_ticks(ticks, self._batch, received_ns).tobytes())
+            self._batch += 1
+            self._unflushed += 1
+            if self._unflushed >= self.flush_every:
+                self._file.flush()
+                self._unflushed = 0
+
+            self.ticks_written += len(ticks)
+            self.batches_written += 1
+
+        return len(ticks)
+
+    def flush(self) -> None:
+        with self._lock:
+            if self._file:
+                self._file.flush()
+                self._unflushed = 0
+
+    def close(self) -> None:
+        """Flush and close the current file."""
+        with self._lock:
+            self._close_locked()
+
+    def _open_locked(self, day: date) -> None:
+        path = self.path_for(day)
+        self._batch = 0
+        if path.exists() and path.stat().st_size > 0:
+            offset = TickLog.data_offset(path)
+            count = (path.stat().st_size - offset) // TICK_DTYPE.itemsize
+            # Drop a partial trailing record left by a crash
+            with open(path, "r+b") as f:
+                f.truncate(offset + count * TICK_DTYPE.itemsize)
+            if count:
+                last = np.fromfile(path, dtype=TICK_DTYPE, count=1, offset=offset + (count - 1) * TICK_DTYPE.itemsize)
+                self._batch = int(last["batch"][0]) + 1
+            self._file = open(path, "ab")
+        else:
+            self._file = open(path, "wb")
+            self._file.write(_header())
+        self._day = day
+        logger.info(f"Recording ticks to {path}")
+
+    def _close_locked(self) -> None:
+        if self._file:
+            self._file.close()
+            self._file = None
+            self._day = None
+
+    def get_stats(self) -> Dict:
+        return {
+            "directory": str(self.directory),
+            "day": self._day.isoformat() if self._day else None,
+            "ticks_written": self.ticks_written,
+            "batches_written": self.batches_written,
+        }
+
+
+class TickLog:
+    """Read-only, memory-mapped view of one recorded tick file."""
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        offset = self.data_offset(self.path)
+        count = (self.path.stat().st_size - offset) // TICK_DTYPE.itemsize
+        if count > 0:
+            self.records = np.memmap(self.path, dtype=TICK_DTYPE, mode="r", offset=offset, shape=(count,))
+        else:
+            self.records = np.zeros(0, dtype=TICK_DTYPE)
+
+    @staticmethod
+    def data_offset(path: Path) -> int:
+        with open(path, "rb") as f:
+            if f.read(len(MAGIC)) != MAGIC:
+                raise ValueError(f"Not a tick log: {path}")
+            header_len = int.from_bytes(f.read(4), "little")
+        return len(MAGIC) + 4 + header_len
+
+    def __len__(self) -> int:
+        return len(self.records)
+
+    def batches(self) -> Iterator[Tuple[int, List[Dict]]]:
+        """Yield (received_ns, ticks) per recorded batch, in order."""
+        if not len(self.records):
+            return
+        batch_ids = np.asarray(self.records["batch"])
+        bounds = np.flatnonzero(np.diff(batch_ids)) + 1
+        starts = np.r_[0, bounds]
+        ends = np.r_[bounds, len(batch_ids)]
+        for start, end in zip(starts, ends):
+            chunk = self.records[start:end]
+            yield int(chunk["received_ns"][0]), decode_ticks(chunk)
+
+
+def session_files(directory: Path, prefix: str = "ticks", start: Optional[date] = None,
+                  end: Optional[date] = None) -> List[Path]:
+    """Recorded day files in a directory, optionally limited to a date range."""
+    files = []
+    for path in sorted(Path(directory).glob(f"{prefix}_*.ticks")):
+        day = datetime.strptime(path.stem.rsplit("_", 1)[1], "%Y%m%d").date()
+        if (start is None or day >= start) and (end is None or day <= end):
+            files.append(path)
+    return files
+
+
+class TickReplay:
+    """
+    Feeds recorded tick batches to a handler with the recorded timing.
+
+    speed=1 reproduces the live spacing between batches, speed=N compresses
+    it N times and speed=None replays as fast as the handler allows. The
+    handler is called as handler(None, ticks), matching on_ticks(ws, ticks).
+    """
+
+    def __init__(self, files: Union[Path, Sequence[Path]], speed: Optional[float] = 1.0):
+        self.files = [Path(files)] if isinstance(files, (str, Path)) else [Path(f) for f in files]
+        self.speed = speed
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self.batches = 0
+        self.ticks = 0
+        self.max_lag_ms = 0.0
+        self.elapsed_s = 0.0
+
+    def run(self, handler: Callable) -> Dict:
+        """
+        Replay all files in the calling thread.
+
+        Returns:
+            Stats: batches, ticks, elapsed_s, ticks_per_s, max_lag_ms (how far
+            delivery fell behind the scheduled time)
+        """
+        self._stop.clear()
+        start = time.perf_counter()
+        first_ns = None
+
+        for path in self.files:
+            for received_ns, ticks in TickLog(path).batches():
+                if self._stop.is_set():
+                    break
+                if first_ns is None:
+                    first_ns = received_ns
+
+                if self.speed:
+                    due = start + (received_ns - first_ns) / 1e9 / self.speed
+                    wait = due - time.perf_counter()
+                    if wait > 0:
+                        self._stop.wait(wait)
+                    else:
+                        self.max_lag_ms = max(self.max_lag_ms, -wait * 1000)
+
+                handler(None, ticks)
+                self.batches += 1
+                self.ticks += len(ticks)
+
+        self.elapsed_s = time.perf_counter() - start
+        return self.get_stats()
+
+    def start(self, handler: Callable) -> None:
+        """Replay in a background thread (like the live ticker)."""
+        self._thread = threading.Thread(target=self.run, args=(handler,), daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread and self._thread is not threading.current_thread():
+            self._thread.join(timeout=5)
+
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        """Wait for a background replay to finish; True if it did."""
+        if self._thread:
+            self._thread.join(timeout)
+        return not self.is_running
+
+    @property
+    def is_running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def get_stats(self) -> Dict:
+        return {
+            "files": len(self.files),
+            "speed": self.speed,
+            "batches": self.batches,
+            "ticks": self.ticks,
+            "elapsed_s": round(self.elapsed_s, 3),
+            "ticks_per_s": round(self.ticks / self.elapsed_s, 1) if self.elapsed_s > 0 else 0.0,
+            "max_lag_ms": round(self.max_lag_ms, 3),
+        }
@@ -0,0 +1,383 @@
+"""
+Span Tracing for Trading System v2.0
+
+Lightweight per-iteration traces: Orchestrator iterations, TradingEngine
+steps, agent runs, KiteClient calls, SQL queries and ExecutionAuditLogger
+events are recorded as spans in a bounded in-memory ring buffer and served
+as a waterfall (GET /api/v1/traces/{trace_id}).
+
+The active trace lives in a contextvar, so spans nest across asyncio.to_thread
+and the TradingEngine pipeline pool. An iteration is sampled with
+probability sample_rate; unsampled iterations still carry a trace id (stored on
+their audit entries) but record nothing. Each trace is capped at
+max_spans spans, and the tracer measures its own bookkeeping time so the
+overhead can be checked against the traced time (get_stats()["overhead_pct"]).
+"""
+
+import itertools
+import random
+import threading
+import time
+import uuid
+from collections import OrderedDict, deque
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+
+@dataclass
+class Span:
+    """One timed operation within a trace."""
+    trace_id: str
+    span_id: str
+    parent_id: Optional[str]
+    name: str
+    kind: str  # iteration, engine, agent, broker, db, audit
+    start: float  # Epoch seconds
+    duration_ms: float = 0.0
+    attributes: Dict[str, Any] = field(default_factory=dict)
+    error: Optional[str] = None
+
+    # perf_counter start and tracer bookkeeping time (not exported)
+    _perf_start: float = field(default=0.0, repr=False, compare=False)
+    _overhead_s: float = field(default=0.0, repr=False, compare=False)
+
+    def to_dict(self) -> Dict:
+        return {
+            "trace_id": self.trace_id,
+            "span_id": self.span_id,
+            "parent_id": self.parent_id,
+            "name": self.name,
+            "kind": self.kind,
+            "start": datetime.fromtimestamp(self.start).isoformat(),
+            "duration_ms": round(self.duration_ms, 3),
+            "attributes": self.attributes,
+            "error": self.error,
+        }
+
+
+class _TraceState:
+    """Shared by every span of one active trace."""
+
+    __slots__ = ("trace_id", "sampled", "span_count")
+
+    def __init__(self, trace_id: str, sampled: bool):
+        self.trace_id = trace_id
+        self.sampled = sampled
+        self.span_count = 0
+
+
+# (active trace, current span id) for the running task/thread
+_active: ContextVar[Optional[Tuple[_TraceState, Optional[str]]]] = ContextVar("trace", default=None)
+_span_ids = itertools.count(1)
+
+
+def new_trace_id() -> str:
+    """Trace ids follow the audit correlation id format with their own prefix."""
+    return f"trace_{uuid.uuid4().hex[:12]}"
+
+
+def current_trace_id() -> Optional[str]:
+    """Trace id of the active trace (sampled or not), if any."""
+    active = _active.get()
+    return active[0].trace_id if active else None
+
+
+class Tracer:
+    """
+    Ring buffer of finished spans with sampling.
+
+    Usage:
+        tracer = get_tracer()
+        with tracer.trace("orchestrator.iteration") as trace_id:
+            with tracer.span("engine.sentinel", kind="engine"):
+                ...
+        tracer.waterfall(trace_id)
+    """
+
+    def __init__(self, capacity: int = 20000, sample_rate: float = 1.0, max_spans: int = 2000):
+        self.capacity = capacity
+        self.sample_rate = sample_rate
+        self.max_spans = max_spans
+        self._spans: deque = deque(maxlen=capacity)
+        self._lock = threading.Lock()
+        self._rng = random.Random()
+
+        self._traces_started = 0
+        self._traces_sampled = 0
+        self._spans_dropped = 0
+        self._traced_s = 0.0
+        self._overhead_s = 0.0
+
+    def configure(
+        self,
+        sample_rate: Optional[float] = None,
+        capacity: Optional[int] = None,
+        max_spans: Optional[int] = None
+    ) -> None:
+        """Update sampling controls (capacity change keeps the newest spans)."""
+        if sample_rate is not None:
+            self.sample_rate = min(max(sample_rate, 0.0), 1.0)
+        if max_spans is not None:
+            self.max_spans = max_spans
+        if capacity is not None and capacity != self.capacity:
+            with self._lock:
+                self.capacity = capacity
+                self._spans = deque(self._spans, maxlen=capacity)
+
+    # ------------------------------------------------------------------
+    # Recording
+    # ------------------------------------------------------------------
+
+    @contextmanager
+    def trace(self, name: str, trace_id: Optional[str] = None, kind: str = "iteration", **attributes) -> Iterator[str]:
+        """
+        Start a trace (or a child span if one is already active).
+
+        Args:
+            name: Root span name
+            trace_id: Id to use (default: a new correlation-style id)
+            kind: Root span kind
+            **attributes: Root span attributes
+
+        Yields:
+            The trace id
+        """
+        if _active.get() is not None:
+            with self.span(name, kind, **attributes):
+                yield current_trace_id()
+            return
+
+        state = _TraceState(trace_id or new_trace_id(), self._rng.random() < self.sample_rate)
+        token = _active.set((state, None))
+        with self._lock:
+            self._traces_started += 1
+            self._traces_sampled += state.sampled
+        root = None
+        try:
+            if state.sampled:
+                with self.span(name, kind, **attributes) as root:
+                    yield state.trace_id
+            else:
+                yield state.trace_id
+        finally:
+            _active.reset(token)
+            if root is not None:
+                with self._lock:
+                    self._traced_s += root.duration_ms / 1000
+
+    def start_span(self, name: str, kind: str = "internal", **attributes) -> Optional[Span]:
+        """
+        Start a span under the active span without making it the parent of
+        later spans (for callback-style hooks). Finish with end_span().
+
+        Returns:
+            Span, or None when no sampled trace is active or the cap is hit
+        """
+        active = _active.get()
+        if active is None or not active[0].sampled:
+            return None
+
+        t0 = time.perf_counter()
+        state, parent_id = active
+        if state.span_count >= self.max_spans:
+            self._spans_dropped += 1
+            return None
+        state.span_count += 1
+
+        span = Span(
+            trace_id=state.trace_id,
+            span_id=f"{next(_span_ids):x}",
+            parent_id=parent_id,
+            name=name,
+            kind=kind,
+            start=time.time(),
+            attributes=attributes,
+        )
+        span._perf_start = time.perf_counter()
+        span._overhead_s = span._perf_start - t0
+        return span
+
+    def end_span(self, span: Optional[Span], error: Optional[str] = None) -> None:
+        """Finish a span from start_span() and store it."""
+        if span is None:
+            return
+        end = time.perf_counter()
+        span.duration_ms = (end - span._perf_start) * 1000
+        if error:
+            span.error = error
+        with self._lock:
+            self._spans.append(span)
+            self._overhead_s += span._overhead_s + (time.perf_counter() - end)
+
+    @contextmanager
+    def span(self, name: str, kind: str = "internal", **attributes) -> Iterator[Optional[Span]]:
+        """Time the with-block as a child of the active span (no-op when not sampled)."""
+        span = self.start_span(name, kind, **attributes)
+        if span is None:
+            yield None
+            return
+
+        token = _active.set((_active.get()[0], span.span_id))
+        error = None
+        try:
+            yield span
+        except BaseException as e:
+            error = f"{type(e).__name__}: {e}"
+            raise
+        finally:
+            _active.reset(token)
+            self.end_span(span, error)
+
+    def event(self, name: str, trace_id: Optional[str] = None, kind: str = "audit", **attributes) -> None:
+        """
+        Record a zero-length span, regardless of sampling.
+
+        Args:
+            name: Event name
+            trace_id: Trace to attach to (default: the active trace)
+            kind: Span kind
+            **attributes: Event attributes
+        """
+        active = _active.get()
+        trace_id = trace_id or (active[0].trace_id if active else None)
+        if not trace_id:
+            return
+        parent_id = active[1] if active and active[0].trace_id == trace_id else None
+        span = Span(
+            trace_id=trace_id,
+            span_id=f"{next(_span_ids):x}",
+            parent_id=parent_id,
+            name=name,
+            kind=kind,
+            start=time.time(),
+            attributes=attributes,
+        )
+        with self._lock:
+            self._spans.append(span)
+
+    # ------------------------------------------------------------------
+    # Queries
+    # ------------------------------------------------------------------
+
+    def get_spans(self, trace_id: str) -> List[Span]:
+        with self._lock:
+            return [s for s in self._spans if s.trace_id == trace_id]
+
+    def find_traces(self, **attributes) -> List[str]:
+        """Trace ids (oldest first) with a span matching all the attributes."""
+        with self._lock:
+            spans = list(self._spans)
+        found = OrderedDict()
+        for s in spans:
+            if all(s.attributes.get(k) == v for k, v in attributes.items()):
+                found[s.trace_id] = True
+        return list(found)
+
+    def waterfall(self, trace_id: str) -> Dict:
+        """
+        Spans of one trace ordered by start, with offset from the trace start
+        and nesting depth.
+
+        Returns:
+            Dict with trace summary and spans, or empty dict if unknown
+        """
+        spans = sorted(self.get_spans(trace_id), key=lambda s: s.start)
+        if not spans:
+            return {}
+
+        parents = {s.span_id: s.parent_id for s in spans}
+        depths: Dict[str, int] = {}
+
+        def depth(span_id: str) -> int:
+            if span_id not in depths:
+                parent = parents.get(span_id)
+                depths[span_id] = depth(parent) + 1 if parent in parents else 0
+            return depths[span_id]
+
+        origin = spans[0].start
+        end = max(s.start + s.duration_ms / 1000 for s in spans)
+        rows = []
+        for s in spans:
+            row = s.to_dict()
+            row["offset_ms"] = round((s.start - origin) * 1000, 3)
+            row["depth"] = depth(s.span_id)
+            rows.append(row)
+
+        root = next((s for s in spans if s.parent_id is None and s.kind != "audit"), spans[0])
+        return {
+            "trace_id": trace_id,
+            "name": root.name,
+            "start": datetime.fromtimestamp(origin).isoformat(),
+            "duration_ms": round((end - origin) * 1000, 3),
+            "span_count": len(spans),
+            "spans": rows,
+        }
+
+    def recent_traces(self, limit: int = 50) -> List[Dict]:
+        """Newest traces first: id, root name, start, duration and span count."""
+        with self._lock:
+            spans = list(self._spans)
+
+        traces: Dict[str, Dict] = OrderedDict()
+        for s in spans:
+            t = traces.get(s.trace_id)
+            if t is None:
+                t = traces[s.trace_id] = {
+                    "trace_id": s.trace_id, "name": s.name, "start": s.start, "end": s.start, "span_count": 0
+                }
+            t["span_count"] += 1
+            t["start"] = min(t["start"], s.start)
+            t["end"] = max(t["end"], s.start + s.duration_ms / 1000)
+            if s.parent_id is None and s.kind != "audit":
+                t["name"] = s.name
+
+        out = []
+        for t in list(traces.values())[::-1][:limit]:
+            out.append({
+                "trace_id": t["trace_id"],
+                "name": t["name"],
+                "start": datetime.fromtimestamp(t["start"]).isoformat(),
+                "duration_ms": round((t["end"] - t["start"]) * 1000, 3),
+                "span_count": t["span_count"],
+            })
+        return out
+
+    def get_stats(self) -> Dict:
+        """Sampling counters and measured tracer overhead."""
+        with self._lock:
+            return {
+                "sample_rate": self.sample_rate,
+                "capacity": self.capacity,
+                "max_spans": self.max_spans,
+                "spans_buffered": len(self._spans),
+                "spans_dropped": self._spans_dropped,
+                "traces_started": self._traces_started,
+                "traces_sampled": self._traces_sampled,
+                "overhead_pct": round(self._overhead_s / self._traced_s * 100, 4) if self._traced_s else 0.0,
+            }
+
+    def clear(self) -> None:
+        with self._lock:
+            self._spans.clear()
+            self._traces_started = self._traces_sampled = self._spans_dropped = 0
+            self._traced_s = self._overhead_s = 0.0
+
+
+# Global tracer instance
+_tracer: Optional[Tracer] = None
+
+
+def get_tracer() -> Tracer:
+    """Get or create global tracer."""
+    global _tracer
+    if _tracer is None:
+        _tracer = Tracer()
+    return _tracer
+
+
+def span(name: str, kind: str = "internal", **attributes):
+    """Child span on the global tracer (see Tracer.span)."""
+    return get_tracer().span(name, kind, **attributes)
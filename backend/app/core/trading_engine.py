@@ -11,14 +11,24 @@ The trading loop is the SAME for all modes. Only the data source differs:
 - Backtest: HistoricalDataClient with historical data
 
 This ensures backtest results match live trading behavior.
+
+With several underlyings, each runs its own Sentinel -> Strategist pipeline
+concurrently on a worker pool; Treasury/Executor stay a single serialized
+stage so risk checks and orders never interleave.
 """
 
+import contextvars
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
 from datetime import datetime
-from typing import Dict, List, Optional, Tuple, Any, Callable
+from typing import Dict, Iterator, List, Optional, Tuple, Any, Callable
 from dataclasses import dataclass, field
 from loguru import logger
 
 from ..config.constants import NIFTY_TOKEN
+from .metrics import ENGINE_CYCLE_SECONDS, ENGINE_STAGE_SECONDS
+from .tracing import span
 from ..models.regime import RegimePacket, RegimeType
 
 
@@ -31,6 +41,21 @@ class IterationResult:
     skipped_reason: Optional[str] = None
 
 
+@dataclass
+class CycleResult:
+    """Result from one trading cycle across all underlyings."""
+    results: Dict[int, IterationResult] = field(default_factory=dict)  # token -> result
+    pipeline_ms: Dict[int, float] = field(default_factory=dict)  # token -> Sentinel+Strategist time
+    elapsed_ms: float = 0.0
+
+
+@contextmanager
+def _stage(stage: str) -> Iterator[None]:
+    """Record one engine step in trading_engine_stage_seconds and as a trace span."""
+    with ENGINE_STAGE_SECONDS.time(stage=stage), span(f"engine.{stage}", kind="engine"):
+        yield
+
+
 class TradingEngine:
     """
     Core trading engine with the shared trading loop.
@@ -44,7 +69,16 @@ class TradingEngine:
     6. Treasury: Validate signals
     7. Executor: Execute approved signals
     
+    Steps 1 and 5 run per underlying (concurrently when a pipeline_factory
+    is given); the rest run once, serialized, over all underlyings.
+    
     Both Orchestrator and backtest use this same engine.
+    
+    Each step's latency is recorded in trading_engine_stage_seconds
+    (stages: sentinel, treasury_state, exit_monitoring, safety, strategist,
+    treasury_validation, execution) and whole cycles in
+    trading_engine_cycle_seconds; when a trace is active (see core.tracing)
+    each step is also an engine.<stage> span.
     """
     
     def __init__(
@@ -57,7 +91,9 @@ class TradingEngine:
         kite,
         on_regime: Optional[Callable[[RegimePacket], None]] = None,
         on_entry: Optional[Callable[[Dict], None]] = None,
-        on_exit: Optional[Callable[[Dict], None]] = None
+        on_exit: Optional[Callable[[Dict], None]] = None,
+        pipeline_factory: Optional[Callable[[int], Tuple[Any, Any]]] = None,
+        max_workers: int = 4
     ):
         """
         Initialize trading engine with agents.
@@ -72,6 +108,10 @@ class TradingEngine:
             on_regime: Optional callback when regime is detected
             on_entry: Optional callback when entry is executed
             on_exit: Optional callback when exit is executed
+            pipeline_factory: Optional callable token -> (sentinel, strategist)
+                giving each extra underlying its own agents. Without it, all
+                underlyings share the primary agents and run sequentially.
+            max_workers: Worker pool size for concurrent pipelines
         """
         self.sentinel = sentinel
         self.strategist = strategist
@@ -84,6 +124,77 @@ class TradingEngine:
         self._on_regime = on_regime
         self._on_entry = on_entry
         self._on_exit = on_exit
+        
+        # Per-underlying Sentinel/Strategist pairs (DC/HMM/alarm state is per instance)
+        self._pipeline_factory = pipeline_factory
+        self._pipelines: Dict[int, Tuple[Any, Any]] = {}
+        self._max_workers = max_workers
+        self._pool: Optional[ThreadPoolExecutor] = None
+    
+    def _get_pipeline(self, instrument_token: int) -> Tuple[Any, Any]:
+        """Get (sentinel, strategist) for an underlying, creating it on first use."""
+        pipeline = self._pipelines.get(instrument_token)
+        if pipeline is None:
+            if not self._pipelines or not self._pipeline_factory:
+                pipeline = (self.sentinel, self.strategist)
+            else:
+                pipeline = self._pipeline_factory(instrument_token)
+            self._pipelines[instrument_token] = pipeline
+        return pipeline
+    
+    def _run_pipeline(self, instrument_token: int) -> Tuple[RegimePacket, List, float]:
+        """
+        Steps 1 and 5 for one underlying: detect regime, then generate proposals.
+        
+        Returns:
+            Tuple of (regime, proposals, elapsed_ms)
+        """
+        start = time.perf_counter()
+        sentinel, strategist = self._get_pipeline(instrument_token)
+        
+        with span("engine.pipeline", kind="engine", instrument_token=instrument_token):
+            with _stage("sentinel"):
+                regime = sentinel.process(instrument_token)
+            proposals = []
+            if regime.is_safe and not self.state_manager.is_circuit_breaker_active():
+                with _stage("strategist"):
+                    proposals = strategist.process(regime) or []
+        
+        return regime, proposals, (time.perf_counter() - start) * 1000
+    
+    def _run_pipelines(self, instrument_tokens: List[int]) -> Dict[int, Tuple[RegimePacket, List, float]]:
+        """Run all underlying pipelines, concurrently when each has its own agents."""
+        # Create pipelines up front on this thread so the factory is never raced
+        for token in instrument_tokens:
+            self._get_pipeline(token)
+        
+        if len(instrument_tokens) == 1 or not self._pipeline_factory:
+            return {token: self._run_pipeline(token) for token in instrument_tokens}
+        
+        if self._pool is None:
+            self._pool = ThreadPoolExecutor(
+                max_workers=self._max_workers, thread_name_prefix="pipeline"
+            )
+        # Each worker runs in a copy of this context so its spans join the active trace
+        futures = {
+            token: self._pool.submit(contextvars.copy_context().run, self._run_pipeline, token)
+            for token in instrument_tokens
+        }
+        
+        outputs = {}
+        for token, future in futures.items():
+            try:
+                outputs[token] = future.result()
+            except Exception as e:
+                logger.error(f"Pipeline failed for token {token}: {e}")
+        return outputs
+    
+    def shutdown(self) -> None:
+        """Stop the pipeline worker pool and detach the executor from the ticker."""
+        if self._pool:
+            self._pool.shutdown(wait=False)
+            self._pool = None
+        self.executor.shutdown()
     
     def run_iteration(self, instrument_token: int = NIFTY_TOKEN) -> IterationResult:
         """
@@ -98,100 +209,127 @@ class TradingEngine:
         Returns:
             IterationResult with regime, entries, exits, and any skip reason
         """
-        result = IterationResult()
+        return self.run_cycle([instrument_token]).results.get(instrument_token, IterationResult())
+    
+    def run_cycle(self, instrument_tokens: List[int]) -> CycleResult:
+        """
+        Run one iteration of the trading loop over several underlyings.
+        
+        Sentinel and Strategist run per underlying (in parallel), so cycle time
+        tracks the slowest underlying. Exits, validation and execution then run
+        once, in instrument_tokens order.
+        
+        Args:
+            instrument_tokens: Underlying tokens to evaluate (first is primary)
+            
+        Returns:
+            CycleResult with one IterationResult per underlying
+        """
+        with span("engine.cycle", kind="engine", underlyings=len(instrument_tokens)):
+            return self._run_cycle(instrument_tokens)
+    
+    def _run_cycle(self, instrument_tokens: List[int]) -> CycleResult:
+        cycle = CycleResult()
+        start = time.perf_counter()
         
         # =====================================================================
-        # STEP 1: Sentinel - Detect regime
+        # STEP 1 & 5: Sentinel + Strategist per underlying (concurrent)
         # =====================================================================
-        regime = self.sentinel.process(instrument_token)
-        result.regime = regime
+        outputs = self._run_pipelines(instrument_tokens)
+        
+        proposals_by_token: Dict[int, List] = {}
+        regimes: Dict[str, RegimeType] = {}
+        for token in instrument_tokens:
+            if token not in outputs:
+                continue
+            regime, proposals, pipeline_ms = outputs[token]
+            cycle.results[token] = IterationResult(regime=regime)
+            cycle.pipeline_ms[token] = pipeline_ms
+            proposals_by_token[token] = proposals
+            regimes[regime.symbol] = regime.regime
+            
+            logger.debug(f"Regime {regime.symbol}: {regime.regime.value} (safe={regime.is_safe})")
+            
+            if self._on_regime:
+                self._on_regime(regime)
         
-        logger.debug(f"Regime: {regime.regime.value} (safe={regime.is_safe})")
+        if not cycle.results:
+            cycle.elapsed_ms = (time.perf_counter() - start) * 1000
+            ENGINE_CYCLE_SECONDS.observe(cycle.elapsed_ms / 1000)
+            return cycle
         
-        if self._on_regime:
-            self._on_regime(regime)
+        primary = cycle.results[next(t for t in instrument_tokens if t in cycle.results)]
         
         # =====================================================================
         # STEP 2: Treasury - Get account state
         # =====================================================================
-        account = self.treasury.get_account_state()
+        with _stage("treasury_state"):
+            account = self.treasury.get_account_state()
         
         # =====================================================================
         # STEP 3: Executor - Monitor existing positions for exits
         # =====================================================================
-        positions = self.executor.get_open_positions()
-        if positions:
-            tokens = set()
-            for pos in positions:
-                for leg in pos.legs:
-                    tokens.add(leg.instrument_token)
+        with _stage("exit_monitoring"):
+            positions = self.executor.get_open_positions()
+            if positions:
+                tokens = set()
+                for pos in positions:
+                    for leg in pos.legs:
+                        tokens.add(leg.instrument_token)
             
-            prices = self.kite.get_ltp(list(tokens))
-            exit_orders = self.executor.monitor_positions(prices, regime.regime)
+                prices = self.kite.get_ltp(list(tokens))
+                # Each position exits on its own underlying's regime
+                exit_orders = self.executor.monitor_positions(
+                    prices, primary.regime.regime, regimes_by_instrument=regimes
+                )
             
-            for exit_order in exit_orders:
-                logger.debug(f"Executing exit: {exit_order.exit_reason}")
-                exec_result = self.executor.execute_exit(exit_order)
+                for exit_order in exit_orders:
+                    logger.debug(f"Executing exit: {exit_order.exit_reason}")
+                    exec_result = self.executor.execute_exit(exit_order)
                 
-                if exec_result.success:
-                    self.state_manager.update_pnl(exit_order.realized_pnl)
+                    if exec_result.success:
+                        self.state_manager.update_pnl(exit_order.realized_pnl)
                     
-                    exit_info = {
-                        'reason': exit_order.exit_reason,
-                        'pnl': exit_order.realized_pnl,
-                        'position_id': getattr(exit_order, 'position_id', None)
-                    }
-                    result.exits.append(exit_info)
+                        exit_info = {
+                            'reason': exit_order.exit_reason,
+                            'pnl': exit_order.realized_pnl,
+                            'position_id': getattr(exit_order, 'position_id', None)
+                        }
+                        primary.exits.append(exit_info)
                     
-                    if self._on_exit:
-                        self._on_exit(exit_info)
+                        if self._on_exit:
+                            self._on_exit(exit_info)
                     
-                    # Check loss limits after exit
-                    limit_hit, reason, flat_days = self.treasury.check_loss_limits(account)
-                    if limit_hit:
-                        self.treasury.activate_circuit_breaker(reason, flat_days)
+                        # Check loss limits after exit
+                        limit_hit, reason, flat_days = self.treasury.check_loss_limits(account)
+                        if limit_hit:
+                            self.treasury.activate_circuit_breaker(reason, flat_days)
         
         # =====================================================================
-        # STEP 4: Check if we should generate new signals
+        # STEP 4-8: Per underlying, serialized - safety, filter, validate, execute
         # =====================================================================
-        if not regime.is_safe:
-            result.skipped_reason = f"Regime not safe: {regime.regime.value}"
-            logger.debug(result.skipped_reason)
-            return result
+        seen_structures = set()  # (instrument, structure) in this cycle, to avoid duplicates
+        for token, result in cycle.results.items():
+            self._execute_proposals(result, proposals_by_token[token], account, seen_structures)
         
-        if self.state_manager.is_circuit_breaker_active():
-            result.skipped_reason = "Circuit breaker active"
-            logger.debug(result.skipped_reason)
-            return result
-        
-        # =====================================================================
-        # STEP 5: Strategist - Generate signals
-        # =====================================================================
-        proposals = self.strategist.process(regime)
-        
-        if not proposals:
-            result.skipped_reason = "No proposals generated"
-            return result
-        
-        # =====================================================================
-        # STEP 6: Filter out proposals for structures we already have positions for
-        # =====================================================================
-        filtered_proposals = []
-        seen_structures = set()  # Track structures in this batch to avoid duplicates
-        for proposal in proposals:
-            structure_key = proposal.structure.value
-            # Check both in-memory and database positions
-            if self.executor.has_open_position_for_structure(structure_key):
-                logger.info(f"Skipping {structure_key} - already have open position")
-            elif structure_key in seen_structures:
-                logger.info(f"Skipping {structure_key} - duplicate in current batch")
-            else:
-                filtered_proposals.append(proposal)
-                seen_structures.add(structure_key)
+        cycle.elapsed_ms = (time.perf_counter() - start) * 1000
+        ENGINE_CYCLE_SECONDS.observe(cycle.elapsed_ms / 1000)
+        return cycle
+    
+    def _execute_proposals(
+        self,
+        result: IterationResult,
+        proposals: List,
+        account,
+        seen_structures: set
+    ) -> None:
+        """Steps 4-8 for one underlying's proposals."""
+        regime = result.regime
         
+        with _stage("safety"):
+            filtered_proposals = self._filter_proposals(result, proposals, seen_structures)
         if not filtered_proposals:
-            result.skipped_reason = "All proposals filtered (existing positions)"
-            return result
+            return
         
         # =====================================================================
         # STEP 7 & 8: Treasury validate + Executor execute
@@ -200,13 +338,15 @@ class TradingEngine:
             logger.debug(f"Proposal: {proposal.structure.value} on {proposal.instrument}")
             
             # Treasury: Validate
-            approved, signal, reason = self.treasury.process(proposal, account)
+            with _stage("treasury_validation"):
+                approved, signal, reason = self.treasury.process(proposal, account)
             
             if approved and signal:
                 logger.debug(f"Approved: {reason}")
                 
                 # Executor: Place order
-                exec_result = self.executor.process(signal)
+                with _stage("execution"):
+                    exec_result = self.executor.process(signal)
                 
                 if exec_result.success:
                     entry_info = {
@@ -221,5 +361,49 @@ class TradingEngine:
                         self._on_entry(entry_info)
             else:
                 logger.debug(f"Rejected: {reason}")
+    
+    def _filter_proposals(
+        self,
+        result: IterationResult,
+        proposals: List,
+        seen_structures: set
+    ) -> List:
+        """Steps 4 and 6: safety gates and duplicate-structure filter."""
+        regime = result.regime
+        
+        # =====================================================================
+        # STEP 4: Check if we should act on new signals
+        # =====================================================================
+        if not regime.is_safe:
+            result.skipped_reason = f"Regime not safe: {regime.regime.value}"
+            logger.debug(result.skipped_reason)
+            return []
+        
+        if self.state_manager.is_circuit_breaker_active():
+            result.skipped_reason = "Circuit breaker active"
+            logger.debug(result.skipped_reason)
+            return []
+        
+        if not proposals:
+            result.skipped_reason = "No proposals generated"
+            return []
+        
+        # =====================================================================
+        # STEP 6: Filter out proposals for structures we already have positions for
+        # =====================================================================
+        # One structure per underlying, both across the book and within a batch
+        filtered_proposals = []
+        for proposal in proposals:
+            structure_key = proposal.structure.value
+            # Check both in-memory and database positions
+            if self.executor.has_open_position_for_structure(structure_key, instrument=proposal.instrument):
+                logger.info(f"Skipping {structure_key} on {proposal.instrument} - already have open position")
+            elif (proposal.instrument, structure_key) in seen_structures:
+                logger.info(f"Skipping {structure_key} on {proposal.instrument} - duplicate in current batch")
+            else:
+                filtered_proposals.append(proposal)
+                seen_structures.add((proposal.instrument, structure_key))
         
-        return result
+        if not filtered_proposals:
+            result.skipped_reason = "All proposals filtered (existing positions)"
+        return filtered_proposals
@@ -4,13 +4,17 @@ from datetime import datetime, date
 from typing import Optional
 from sqlalchemy import (
     Column, Integer, String, Float, DateTime, Date, 
-    Boolean, Text, ForeignKey, JSON, create_engine, Numeric, UniqueConstraint
+    Boolean, Text, ForeignKey, JSON, create_engine, event, Numeric, UniqueConstraint
 )
 from sqlalchemy.dialects.postgresql import UUID
-from sqlalchemy.orm import declarative_base, relationship, sessionmaker
+from sqlalchemy.orm import Session, declarative_base, relationship, sessionmaker
+import time
 import uuid
 import os
 
+from ..core.metrics import DB_SESSION_SECONDS
+from ..core.tracing import get_tracer
+
 Base = declarative_base()
 
 # Database URL - MUST be set via environment variable in production
@@ -599,6 +603,7 @@ class ExecutionAuditLog(Base):
     
     # Correlation
     correlation_id = Column(String(50), nullable=False, index=True)
+    trace_id = Column(String(50), index=True)
     agent = Column(String(50), nullable=False)
     
     # Trade context
@@ -630,11 +635,50 @@ class ExecutionAuditLog(Base):
     error_message = Column(Text)
 
 
+class TimedSession(Session):
+    """Session that records its open-to-close time in db_session_seconds."""
+    
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._opened_at = time.perf_counter()
+    
+    def close(self) -> None:
+        super().close()
+        if self._opened_at is not None:
+            DB_SESSION_SECONDS.observe(time.perf_counter() - self._opened_at)
+            self._opened_at = None
+
+
+def trace_queries(engine) -> None:
+    """Record each SQL statement as a db.query span on the active trace."""
+    tracer = get_tracer()
+    
+    @event.listens_for(engine, "before_cursor_execute")
+    def _start(conn, cursor, statement, parameters, context, executemany):
+        query_span = tracer.start_span("db.query", kind="db")
+        if query_span is not None:
+            query_span.attributes["statement"] = " ".join(statement.split())[:200]
+        conn.info.setdefault("trace_spans", []).append(query_span)
+    
+    @event.listens_for(engine, "after_cursor_execute")
+    def _end(conn, *args):
+        spans = conn.info.get("trace_spans")
+        if spans:
+            tracer.end_span(spans.pop())
+    
+    @event.listens_for(engine, "handle_error")
+    def _error(context):
+        spans = context.connection.info.get("trace_spans") if context.connection else None
+        if spans:
+            tracer.end_span(spans.pop(), error=str(context.original_exception))
+
+
 def get_engine():
     """Get or create database engine."""
     global _engine
     if _engine is None:
         _engine = create_engine(DATABASE_URL)
+        trace_queries(_engine)
     return _engine
 
 
@@ -642,7 +686,7 @@ def get_session():
     """Get a new database session."""
     global _SessionLocal
     if _SessionLocal is None:
-        _SessionLocal = sessionmaker(bind=get_engine())
+        _SessionLocal = sessionmaker(bind=get_engine(), class_=TimedSession)
     return _SessionLocal()
 
 
@@ -10,7 +10,7 @@ from loguru import logger
 from .models import (
     Base, TradeRecord, PositionRecord, RegimeLog, EventRecord, DailyStats,
     Strategy, StrategyLeg, StrategyPerformance, StrategyTrade, Portfolio, 
-    BrokerPosition, StrategyPosition, DATABASE_URL
+    BrokerPosition, StrategyPosition, TimedSession, DATABASE_URL, trace_queries
 )
 
 
@@ -30,9 +30,10 @@ class Repository:
         self.db_url = db_url or DATABASE_URL
         
         self.engine = create_engine(self.db_url)
+        trace_queries(self.engine)
         Base.metadata.create_all(self.engine)
         
-        self.Session = sessionmaker(bind=self.engine)
+        self.Session = sessionmaker(bind=self.engine, class_=TimedSession)
     
     def _get_session(self) -> Session:
         """Get a new database session."""
@@ -1,4 +1,13 @@
-"""FastAPI application for Trading System v2.0"""
+"""FastAPI application for Trading System v2.0
+
+Routers import their heavy dependencies (pandas, scipy, scikit-learn,
+hmmlearn, the agents) on first use, so the process starts serving quickly
+after a restart - see scripts/profile_startup.py and the startup benchmarks.
+"""
+
+import time
+
+_import_started = time.perf_counter()
 
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
@@ -10,7 +19,6 @@ import os
 # Set default timezone to IST (Indian Standard Time)
 os.environ['TZ'] = 'Asia/Kolkata'
 try:
-    import time
     time.tzset()
 except AttributeError:
     pass  # Windows doesn't have tzset
@@ -21,23 +29,31 @@ from .api.websocket import router as ws_router
 from .api.portfolio_routes import router as portfolio_router
 from .api.data_routes import router as data_router
 from .core.logger import setup_logger
+from .core.state_hub import is_api_worker
 from .services.scheduler import start_scheduler, stop_scheduler
 
+_imported = time.perf_counter()
+
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     """Application lifespan handler."""
     # Startup
-    logger.info("Trading System v2.0 API starting...")
+    logger.info(f"Trading System v2.0 API starting (app imported in {(_imported - _import_started) * 1000:.0f}ms)...")
     
-    # Start the reconciliation scheduler
-    await start_scheduler()
-    logger.info("Reconciliation scheduler started")
+    # Start the reconciliation scheduler (the broker process runs it for API workers)
+    scheduler = not is_api_worker()
+    if scheduler:
+        await start_scheduler()
+        logger.info("Reconciliation scheduler started")
+    else:
+        logger.info(f"API worker {os.getpid()}: engine, ticker and scheduler live in the broker process")
     
     yield
     
     # Shutdown
-    await stop_scheduler()
+    if scheduler:
+        await stop_scheduler()
     logger.info("Trading System v2.0 API shutting down...")
 
 
@@ -34,6 +34,9 @@ class LegType(str, Enum):
     SHORT_FUTURE = "SHORT_FUTURE"
 
 
+LONG_LEG_TYPES = frozenset({LegType.LONG_CALL, LegType.LONG_PUT, LegType.LONG_FUTURE})
+
+
 class TradeLeg(BaseModel):
     """Individual leg of a multi-leg trade."""
     leg_id: str = Field(default_factory=lambda: str(uuid.uuid4())[:8])
@@ -58,7 +61,7 @@ class TradeLeg(BaseModel):
     
     @property
     def is_long(self) -> bool:
-        return self.leg_type in [LegType.LONG_CALL, LegType.LONG_PUT, LegType.LONG_FUTURE]
+        return self.leg_type in LONG_LEG_TYPES
     
     @property
     def is_short(self) -> bool:
@@ -163,11 +166,13 @@ class TradeSignal(BaseModel):
     # Approved details
     structure: StructureType
     instrument: str
+    instrument_token: Optional[int] = Field(None, description="Underlying token")
     legs: List[TradeLeg]
     
     # Adjusted sizing (may differ from proposal after Treasury review)
     approved_margin: float
     approved_size_pct: float
+    available_margin: Optional[float] = Field(None, description="Free margin Treasury saw at approval")
     drawdown_multiplier: float = Field(1.0, description="Size multiplier based on drawdown")
     
     # Execution parameters
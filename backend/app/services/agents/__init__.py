@@ -1,17 +1,31 @@
 """Trading agents - Core system agents for market analysis and trading"""
 
-from .base_agent import BaseAgent
-from .sentinel import Sentinel
-from .monk import Monk
-from .trainer import ModelTrainer
-# from .engine import TradingEngine
-from .data_loader import DataLoader
-from .metrics import calculate_sharpe, calculate_sortino, calculate_var, calculate_cvar, calculate_metrics
+from ...core.lazy import lazy_exports
+
+# Submodules are imported on first use of one of their names (see core/lazy.py)
+__getattr__, __dir__ = lazy_exports(__name__, {
+    ".base_agent": ["BaseAgent"],
+    ".sentinel": ["Sentinel"],
+    ".regime_service": ["RegimeService", "RegimeEntry", "get_regime_service"],
+    ".regime_features": ["FeatureStore", "get_feature_store", "compute_regime_features", "label_regimes"],
+    ".monk": ["Monk"],
+    ".trainer": ["ModelTrainer"],
+    # ".engine": ["TradingEngine"],
+    ".data_loader": ["DataLoader"],
+    ".metrics": ["calculate_sharpe", "calculate_sortino", "calculate_var", "calculate_cvar", "calculate_metrics"],
+})
 
 
 __all__ = [
     "BaseAgent",
     "Sentinel",
+    "RegimeService",
+    "RegimeEntry",
+    "get_regime_service",
+    "FeatureStore",
+    "get_feature_store",
+    "compute_regime_features",
+    "label_regimes",
     "Monk",
     "ModelTrainer",
     # "TradingEngine",
@@ -1,11 +1,12 @@
 """Base agent class for Trading System v2.0"""
 
 from abc import ABC, abstractmethod
-from typing import Any, Optional
+from typing import Any, Callable, Optional
 from datetime import datetime
 from loguru import logger
 
 from ...core.kite_client import KiteClient
+from ...core.tracing import span
 from ...config.settings import Settings
 
 
@@ -28,6 +29,9 @@ class BaseAgent(ABC):
         self._last_run: Optional[datetime] = None
         self._run_count: int = 0
         self._error_count: int = 0
+        
+        # Time source for trading-time decisions (backtests install the simulation clock)
+        self.clock: Callable[[], datetime] = datetime.now
     
     @abstractmethod
     def process(self, *args, **kwargs) -> Any:
@@ -65,26 +69,27 @@ class BaseAgent(ABC):
     def run(self, *args, **kwargs) -> Any:
         """
         Execute the agent with pre/post processing hooks.
-        Handles errors and metrics.
+        Handles errors and metrics; traced as an agent span.
         """
         self._run_count += 1
         self._last_run = datetime.now()
         
-        try:
-            if not self.pre_process():
-                self.logger.debug("Pre-process returned False, skipping")
-                return None
-            
-            result = self.process(*args, **kwargs)
-            result = self.post_process(result)
-            
-            self.logger.debug(f"Run #{self._run_count} completed successfully")
-            return result
-            
-        except Exception as e:
-            self._error_count += 1
-            self.logger.error(f"Error in run #{self._run_count}: {e}")
-            raise
+        with span(f"{self.name}.run", kind="agent"):
+            try:
+                if not self.pre_process():
+                    self.logger.debug("Pre-process returned False, skipping")
+                    return None
+                
+                result = self.process(*args, **kwargs)
+                result = self.post_process(result)
+                
+                self.logger.debug(f"Run #{self._run_count} completed successfully")
+                return result
+                
+            except Exception as e:
+                self._error_count += 1
+                self.logger.error(f"Error in run #{self._run_count}: {e}")
+                raise
     
     def get_stats(self) -> dict:
         """Get agent statistics."""
@@ -1,12 +1,58 @@
 """ML Regime Classifier for Trading System v2.0"""
 
 from pathlib import Path
-from typing import Optional, Tuple, List
+from typing import Optional, Tuple, List, Sequence
 import pickle
 import numpy as np
+import pandas as pd
 from loguru import logger
 
 
+# Features Sentinel builds from RegimeMetrics for single-row inference
+LIVE_FEATURE_NAMES = ['iv_percentile', 'adx', 'rsi', 'realized_vol', 'rv_atr_ratio']
+
+
+def predict_batch(model, features: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Score a whole feature matrix with one predict_proba call.
+    
+    Works with RegimeClassifier and the pickled wrappers from
+    train_regime_classifier.py / Monk (anything with predict_proba). Labels
+    come from the argmax of the probabilities, so the model is evaluated
+    once instead of once for predict() and again for predict_proba().
+    
+    Args:
+        model: Classifier exposing predict_proba
+        features: Array of shape (n_samples, n_features)
+        
+    Returns:
+        Tuple of (labels, max probability) arrays of length n_samples
+    """
+    features = np.asarray(features, dtype=float)
+    if len(features) == 0:
+        return np.empty(0, dtype=int), np.empty(0)
+    
+    probabilities = model.predict_proba(features)
+    best = probabilities.argmax(axis=1)
+    classes = _model_classes(model)
+    labels = classes[best] if classes is not None else best
+    return labels, probabilities[np.arange(len(best)), best]
+
+
+def _model_classes(model) -> Optional[np.ndarray]:
+    """Class labels of the underlying sklearn estimator (wrappers nest it)."""
+    for attr in ('classes_', 'model', 'classifier'):
+        inner = getattr(model, attr, None)
+        if inner is None:
+            continue
+        if attr == 'classes_':
+            return np.asarray(inner)
+        classes = getattr(inner, 'classes_', None)
+        if classes is not None:
+            return np.asarray(classes)
+    return None
+
+
 class RegimeClassifier:
     """
     Machine learning classifier for market regime detection.
@@ -111,6 +157,21 @@ class RegimeClassifier:
         
         return regime_name, float(confidence)
     
+    def predict_batch(self, features: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Predict regimes for many rows in one pass.
+        
+        Args:
+            features: Array of shape (n_samples, n_features)
+            
+        Returns:
+            Tuple of (regime predictions, probability of each prediction)
+        """
+        if not self._is_fitted:
+            raise ValueError("Model not fitted")
+        
+        return predict_batch(self, features)
+    
     def get_feature_importance(self) -> Optional[dict]:
         """Get feature importance if available."""
         if not self._is_fitted:
@@ -121,3 +182,72 @@ class RegimeClassifier:
             return dict(zip(self.FEATURE_NAMES, importances))
         
         return None
+
+
+class PrecomputedRegimes:
+    """
+    ML regime predictions for a whole history, looked up by timestamp.
+    
+    Backtests and replays score every bar in one predict_batch() call up
+    front; each simulated step then costs a binary search instead of a
+    single-row sklearn call.
+    """
+    
+    def __init__(self, timestamps: np.ndarray, labels: np.ndarray, probabilities: np.ndarray):
+        self._times = timestamps.astype('datetime64[ns]').astype(np.int64)
+        self.labels = labels
+        self.probabilities = probabilities
+        self.lookups = 0
+        self.misses = 0
+    
+    @classmethod
+    def build(
+        cls,
+        model,
+        features: pd.DataFrame,
+        feature_names: Optional[Sequence[str]] = None,
+        time_column: str = 'date'
+    ) -> "PrecomputedRegimes":
+        """
+        Score a feature frame (e.g. FeatureStore output) in one batch.
+        
+        Args:
+            model: Classifier exposing predict_proba
+            features: Frame with a time column and the model's feature columns
+            feature_names: Columns in model order (default: model.feature_names,
+                else LIVE_FEATURE_NAMES)
+            time_column: Column holding bar timestamps
+            
+        Returns:
+            PrecomputedRegimes covering every row with complete features
+        """
+        names = list(feature_names or getattr(model, 'feature_names', None) or LIVE_FEATURE_NAMES)
+        frame = features.dropna(subset=names).sort_values(time_column)
+        
+        timestamps = pd.to_datetime(frame[time_column])
+        if timestamps.dt.tz is not None:
+            timestamps = timestamps.dt.tz_localize(None)
+        
+        labels, probabilities = predict_batch(model, frame[names].to_numpy(dtype=float))
+        logger.info(f"Precomputed ML regimes for {len(frame)} bars ({len(features) - len(frame)} skipped)")
+        return cls(timestamps.to_numpy(), labels, probabilities)
+    
+    def __len__(self) -> int:
+        return len(self._times)
+    
+    def lookup(self, timestamp) -> Optional[Tuple[int, float]]:
+        """
+        Prediction for the latest bar at or before timestamp.
+        
+        Returns:
+            (regime label, probability), or None if timestamp precedes all bars
+        """
+        self.lookups += 1
+        ts = pd.Timestamp(timestamp)
+        if ts.tzinfo is not None:
+            ts = ts.tz_localize(None)
+        idx = np.searchsorted(self._times, ts.value, side='right') - 1
+        if idx < 0:
+            self.misses += 1
+            return None
+        return int(self.labels[idx]), float(self.probabilities[idx])
@@ -0,0 +1,329 @@
+"""Regime feature pipeline and feature store for Trading System v2.0
+
+Computes the regime classifier's features and rule-based training labels
+from daily OHLCV with whole-column NumPy/pandas operations, and persists
+them as versioned Parquet files keyed by a hash of the source bars.
+Training and backtests read features from the store; they are only
+recomputed when the source data or FEATURE_VERSION changes.
+"""
+
+import hashlib
+import os
+import threading
+from pathlib import Path
+from typing import Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+from loguru import logger
+from numpy.lib.stride_tricks import sliding_window_view
+
+from ..indicators.technical import calculate_adx, calculate_rsi, calculate_atr
+from ..indicators.volatility import calculate_realized_vol
+
+
+# Bump whenever a feature or label definition changes - invalidates every stored file
+FEATURE_VERSION = 1
+
+# Source columns that feed the pipeline (and the source hash)
+SOURCE_COLUMNS = ["date", "open", "high", "low", "close", "volume", "oi", "skew"]
+
+FEATURE_COLUMNS = [
+    "adx",
+    "rsi",
+    "atr",
+    "atr_pct",
+    "realized_vol",
+    "rv_atr_ratio",
+    "gap_pct",
+    "day_range_pct",
+    "parkinson_vol",
+    "iv_percentile",
+    "skew",
+    "oi_change_pct",
+]
+
+IV_PERCENTILE_LOOKBACK = 252
+
+# Label codes (match RegimeClassifier.REGIME_MAP, -1 = not enough history)
+LABEL_UNKNOWN = -1
+LABEL_RANGE_BOUND = 0
+LABEL_MEAN_REVERSION = 1
+LABEL_TREND = 2
+LABEL_CHAOS = 3
+
+
+def rolling_percentile_rank(values: np.ndarray, window: int) -> np.ndarray:
+    """
+    Percent of each trailing window strictly below its last value.
+
+    Same result as ``rolling(window).apply(lambda x: (x < x[-1]).sum() / len(x) * 100)``
+    (NaN until the window is full or while it contains a NaN), computed on
+    a strided view instead of one Python call per row.
+
+    Args:
+        values: 1-D float array
+        window: Window length
+
+    Returns:
+        Array of percentiles (0-100) aligned with values
+    """
+    values = np.asarray(values, dtype=float)
+    out = np.full(len(values), np.nan)
+    if len(values) < window:
+        return out
+
+    windows = sliding_window_view(values, window)
+    ranks = (windows < windows[:, -1:]).sum(axis=1) * (100.0 / window)
+    ranks[sliding_window_view(np.isnan(values), window).any(axis=1)] = np.nan
+    out[window - 1:] = ranks
+    return out
+
+
+def compute_regime_features(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Compute regime features for daily OHLCV bars.
+
+    skew and oi_change_pct need option-chain/OI data: skew is passed through
+    when the source has a 'skew' column and oi_change_pct is derived from an
+    'oi' column; otherwise both are NaN.
+
+    Args:
+        df: DataFrame with open, high, low, close (and optionally oi, skew)
+
+    Returns:
+        DataFrame of FEATURE_COLUMNS aligned with df's index
+    """
+    high, low, close, open_ = df["high"], df["low"], df["close"], df["open"]
+    prev_close = close.shift(1)
+
+    atr = calculate_atr(high, low, close, period=14)
+    atr_pct = atr / close
+    realized_vol = calculate_realized_vol(close, period=20, annualize=True)
+
+    log_hl = np.log(high / low).to_numpy(dtype=float)
+    parkinson_vol = np.sqrt(1 / (4 * np.log(2)) * (log_hl ** 2))
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        rv_atr_ratio = (realized_vol / atr_pct).replace([np.inf, -np.inf], np.nan)
+
+    features = pd.DataFrame({
+        "adx": calculate_adx(high, low, close, period=14),
+        "rsi": calculate_rsi(close, period=14),
+        "atr": atr,
+        "atr_pct": atr_pct,
+        "realized_vol": realized_vol,
+        "rv_atr_ratio": rv_atr_ratio,
+        "gap_pct": (open_ - prev_close) / prev_close,
+        "day_range_pct": (high - low) / close,
+        "parkinson_vol": parkinson_vol,
+        "iv_percentile": rolling_percentile_rank(parkinson_vol, IV_PERCENTILE_LOOKBACK),
+    }, index=df.index)
+
+    features["skew"] = df["skew"].astype(float) if "skew" in df.columns else np.nan
+    if "oi" in df.columns:
+        oi = df["oi"].astype(float).replace(0, np.nan)
+        features["oi_change_pct"] = oi.pct_change(fill_method=None) * 100
+    else:
+        features["oi_change_pct"] = np.nan
+
+    return features[FEATURE_COLUMNS]
+
+
+def label_regimes(features: pd.DataFrame) -> np.ndarray:
+    """
+    Rule-based regime labels for training.
+
+    Rules are evaluated in order (first match wins):
+    -1 = UNKNOWN (ADX or RSI not available yet)
+    3 = CHAOS (IV percentile > 75, |gap| > 2% or day range > 2.5%)
+    0 = RANGE_BOUND (ADX < 12 and 40 <= RSI <= 60)
+    1 = MEAN_REVERSION (12 <= ADX <= 25 and RSI < 30 or > 70)
+    2 = TREND (ADX > 25)
+    1 = MEAN_REVERSION otherwise
+
+    Args:
+        features: DataFrame with adx, rsi, iv_percentile, gap_pct, day_range_pct
+
+    Returns:
+        int8 label array
+    """
+    adx = features["adx"].to_numpy(dtype=float)
+    rsi = features["rsi"].to_numpy(dtype=float)
+    iv_pct = features["iv_percentile"].to_numpy(dtype=float)
+    gap = np.abs(features["gap_pct"].to_numpy(dtype=float))
+    day_range = features["day_range_pct"].to_numpy(dtype=float)
+
+    # NaN comparisons are False, so missing vol inputs never trigger CHAOS
+    with np.errstate(invalid="ignore"):
+        conditions = [
+            np.isnan(adx) | np.isnan(rsi),
+            (iv_pct > 75) | (gap > 0.02) | (day_range > 0.025),
+            (adx < 12) & (rsi >= 40) & (rsi <= 60),
+            (adx >= 12) & (adx <= 25) & ((rsi < 30) | (rsi > 70)),
+            adx > 25,
+        ]
+    choices = [LABEL_UNKNOWN, LABEL_CHAOS, LABEL_RANGE_BOUND, LABEL_MEAN_REVERSION, LABEL_TREND]
+    return np.select(conditions, choices, default=LABEL_MEAN_REVERSION).astype(np.int8)
+
+
+def build_feature_frame(df: pd.DataFrame) -> pd.DataFrame:
+    """Features plus regime_label for each source row (date column kept if present)."""
+    features = compute_regime_features(df)
+    features["regime_label"] = label_regimes(features)
+    if "date" in df.columns:
+        features.insert(0, "date", df["date"].to_numpy())
+    return features.reset_index(drop=True)
+
+
+def source_hash(df: pd.DataFrame) -> str:
+    """
+    Stable hash of the source bars that feed the pipeline.
+
+    Only SOURCE_COLUMNS with data are hashed, so frames that already carry
+    feature columns (e.g. the historical CSVs, where skew may be an empty
+    column) hash the same as the raw bars. Values are rounded to 6 decimals
+    so CSV round trips (which may differ in the last ulp) hash the same.
+    """
+    columns = [c for c in SOURCE_COLUMNS if c in df.columns and df[c].notna().any()]
+    source = df[columns].copy()
+    if "date" in source.columns:
+        source["date"] = pd.to_datetime(source["date"], utc=True)
+    for column in columns:
+        if column != "date":
+            source[column] = source[column].astype(float).round(6)
+
+    digest = hashlib.sha256()
+    digest.update(",".join(columns).encode())
+    digest.update(pd.util.hash_pandas_object(source, index=False).to_numpy().tobytes())
+    return digest.hexdigest()[:16]
+
+
+class FeatureStore:
+    """
+    Versioned columnar store of regime features.
+
+    One Parquet file per (symbol, FEATURE_VERSION, source hash):
+    {root}/{SYMBOL}/v{FEATURE_VERSION}_{hash}.parquet. A lookup with the same
+    source bars and version is a file read; anything else rebuilds. The
+    `keep` most recently used files per symbol are kept, so training and
+    backtest runs over different bars do not evict each other; files of
+    other feature versions are removed.
+    """
+
+    def __init__(self, root: Path = Path("data/features"), version: int = FEATURE_VERSION, keep: int = 4):
+        self.root = Path(root)
+        self.version = version
+        self.keep = keep
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.builds = 0
+
+    def path_for(self, symbol: str, digest: str) -> Path:
+        return self.root / symbol.upper() / f"v{self.version}_{digest}.parquet"
+
+    def load_or_build(self, symbol: str, df: pd.DataFrame) -> pd.DataFrame:
+        """
+        Get features for a symbol's daily bars, computing them only on a miss.
+
+        Args:
+            symbol: Instrument symbol (e.g. NIFTY)
+            df: Daily OHLCV bars (date, open, high, low, close, ...)
+
+        Returns:
+            DataFrame of date (if present), FEATURE_COLUMNS and regime_label,
+            one row per source row in source order
+        """
+        digest = source_hash(df)
+        path = self.path_for(symbol, digest)
+
+        if path.exists():
+            try:
+                features = pq.read_table(path).to_pandas()
+                os.utime(path)  # Most recently used survives retention
+                self.hits += 1
+                return features
+            except Exception as e:
+                logger.warning(f"Unreadable feature file {path}, rebuilding: {e}")
+
+        features = build_feature_frame(df)
+        self._write(symbol, path, features, digest)
+        self.builds += 1
+        logger.info(f"Built {len(features)} feature rows for {symbol} (v{self.version}, {digest})")
+        return features
+
+    def _write(self, symbol: str, path: Path, features: pd.DataFrame, digest: str) -> None:
+        with self._lock:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            table = pa.Table.from_pandas(features, preserve_index=False)
+            table = table.replace_schema_metadata({
+                **(table.schema.metadata or {}),
+                b"feature_version": str(self.version).encode(),
+                b"source_hash": digest.encode(),
+                b"symbol": symbol.upper().encode(),
+            })
+            tmp = path.with_suffix(".parquet.tmp")
+            pq.write_table(table, tmp)
+            os.replace(tmp, path)
+
+            current = []
+            for existing in path.parent.glob("v*.parquet"):
+                if existing.name.startswith(f"v{self.version}_"):
+                    current.append(existing)
+                else:
+                    existing.unlink(missing_ok=True)
+            current.sort(key=lambda p: p.stat().st_mtime_ns, reverse=True)
+            for old in current[self.keep:]:
+                if old != path:
+                    old.unlink(missing_ok=True)
+
+    def load(self, symbol: str) -> pd.DataFrame:
+        """Latest stored features for a symbol at the current version (empty if none)."""
+        files = sorted(
+            (self.root / symbol.upper()).glob(f"v{self.version}_*.parquet"),
+            key=lambda p: p.stat().st_mtime
+        )
+        if not files:
+            return pd.DataFrame()
+        return pq.read_table(files[-1]).to_pandas()
+
+    def training_frame(self, sources: Dict[str, pd.DataFrame]) -> pd.DataFrame:
+        """
+        Features for several symbols stacked for training.
+
+        Args:
+            sources: symbol -> daily OHLCV bars
+
+        Returns:
+            Combined DataFrame with a 'symbol' column
+        """
+        frames: List[pd.DataFrame] = []
+        for symbol, df in sources.items():
+            features = self.load_or_build(symbol, df)
+            features.insert(0, "symbol", symbol)
+            frames.append(features)
+        if not frames:
+            return pd.DataFrame()
+        return pd.concat(frames, ignore_index=True)
+
+    def get_stats(self) -> Dict:
+        return {
+            "root": str(self.root),
+            "version": self.version,
+            "hits": self.hits,
+            "builds": self.builds,
+        }
+
+
+# Singleton instance
+_feature_store: Optional[FeatureStore] = None
+
+
+def get_feature_store() -> FeatureStore:
+    """Get or create the feature store singleton."""
+    global _feature_store
+    if _feature_store is None:
+        _feature_store = FeatureStore()
+    return _feature_store
@@ -0,0 +1,200 @@
+"""Cached regime service for Trading System v2.0
+
+Serves the latest RegimePacket per underlying to API readers. Packets are
+published by the running orchestrator; otherwise a long-lived Sentinel
+recomputes them. Fresh entries are returned directly, stale ones are
+returned while one background refresh runs (stale-while-revalidate), and
+concurrent recomputations for the same token are single-flighted.
+"""
+
+import asyncio
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Callable, Dict, Optional
+
+from loguru import logger
+
+from ...config.constants import NIFTY_TOKEN
+from ...models.regime import RegimePacket
+
+
+@dataclass
+class RegimeEntry:
+    """Latest regime for one underlying."""
+    packet: RegimePacket
+    updated_at: float  # time.monotonic()
+    source: str  # "orchestrator" or "refresh"
+    version: int = 0
+
+    @property
+    def age(self) -> float:
+        return time.monotonic() - self.updated_at
+
+
+@dataclass
+class RegimeServiceStats:
+    hits: int = 0
+    stale_hits: int = 0
+    misses: int = 0
+    refreshes: int = 0
+    coalesced: int = 0
+    publishes: int = 0
+    errors: int = 0
+
+
+class RegimeService:
+    """
+    Latest-regime cache with TTL, stale-while-revalidate and single-flight.
+
+    get()/get_async() never run more than one Sentinel.process() per token at
+    a time, regardless of how many clients are polling.
+    """
+
+    def __init__(
+        self,
+        ttl: float = 60.0,
+        stale_ttl: float = 900.0,
+        sentinel_factory: Optional[Callable[[int], object]] = None
+    ):
+        """
+        Initialize regime service.
+
+        Args:
+            ttl: Seconds an entry is served without refreshing
+            stale_ttl: Seconds a stale entry may still be served while refreshing
+            sentinel_factory: Optional token -> Sentinel (default: live Sentinel)
+        """
+        self.ttl = ttl
+        self.stale_ttl = stale_ttl
+        self._sentinel_factory = sentinel_factory or self._create_sentinel
+        self._sentinels: Dict[int, object] = {}
+        self._entries: Dict[int, RegimeEntry] = {}
+        self._inflight: Dict[int, Future] = {}
+        self._lock = threading.Lock()
+        self._pool = ThreadPoolExecutor(max_workers=2, thread_name_prefix="regime")
+        self._version = 0
+        self.stats = RegimeServiceStats()
+
+    def publish(self, packet: RegimePacket, source: str = "orchestrator") -> RegimeEntry:
+        """Store a freshly computed packet (e.g. from the trading loop)."""
+        with self._lock:
+            self._version += 1
+            entry = RegimeEntry(packet, time.monotonic(), source, self._version)
+            self._entries[packet.instrument_token] = entry
+            if source == "orchestrator":
+                self.stats.publishes += 1
+            return entry
+
+    def peek(self, instrument_token: int = NIFTY_TOKEN) -> Optional[RegimeEntry]:
+        """Latest entry without triggering a refresh."""
+        return self._entries.get(instrument_token)
+
+    def get(self, instrument_token: int = NIFTY_TOKEN) -> RegimeEntry:
+        """
+        Get the latest regime, refreshing as needed (blocking).
+
+        Returns:
+            Fresh or stale-but-usable RegimeEntry
+
+        Raises:
+            Exception from Sentinel if there is nothing usable to serve
+        """
+        entry = self._lookup(instrument_token)
+        if entry is not None:
+            return entry
+        return self._refresh(instrument_token).result()
+
+    async def get_async(self, instrument_token: int = NIFTY_TOKEN) -> RegimeEntry:
+        """Async variant of get() - waits on the shared refresh without blocking the loop."""
+        entry = self._lookup(instrument_token)
+        if entry is not None:
+            return entry
+        return await asyncio.wrap_future(self._refresh(instrument_token))
+
+    def _lookup(self, instrument_token: int) -> Optional[RegimeEntry]:
+        """Return a servable entry (kicking off revalidation if stale), else None."""
+        entry = self._entries.get(instrument_token)
+        if entry is None:
+            self.stats.misses += 1
+            return None
+
+        age = entry.age
+        if age < self.ttl:
+            self.stats.hits += 1
+            return entry
+        if age < self.stale_ttl:
+            self.stats.stale_hits += 1
+            self._refresh(instrument_token)
+            return entry
+
+        self.stats.misses += 1
+        return None
+
+    def _refresh(self, instrument_token: int) -> Future:
+        """Start (or join) the single in-flight recomputation for a token."""
+        with self._lock:
+            future = self._inflight.get(instrument_token)
+            if future is not None:
+                self.stats.coalesced += 1
+                return future
+            future = self._pool.submit(self._compute, instrument_token)
+            self._inflight[instrument_token] = future
+            self.stats.refreshes += 1
+
+        future.add_done_callback(lambda _: self._finish(instrument_token, future))
+        return future
+
+    def _finish(self, instrument_token: int, future: Future) -> None:
+        with self._lock:
+            if self._inflight.get(instrument_token) is future:
+                del self._inflight[instrument_token]
+
+    def _compute(self, instrument_token: int) -> RegimeEntry:
+        try:
+            sentinel = self._sentinels.get(instrument_token)
+            if sentinel is None:
+                sentinel = self._sentinel_factory(instrument_token)
+                self._sentinels[instrument_token] = sentinel
+            packet = sentinel.process(instrument_token)
+        except Exception as e:
+            self.stats.errors += 1
+            logger.error(f"Regime refresh failed for token {instrument_token}: {e}")
+            raise
+        return self.publish(packet, source="refresh")
+
+    @staticmethod
+    def _create_sentinel(instrument_token: int):
+        """Long-lived Sentinel with the shared disk cache (built once per token)."""
+        from ...config.settings import Settings
+        from ...core.data_cache import DataCache
+        from ...core.kite_provider import get_kite_client
+        from .sentinel import Sentinel
+
+        kite = get_kite_client(paper_mode=True, skip_api_check=True)
+        if not kite:
+            raise RuntimeError("No valid KiteClient available")
+        return Sentinel(kite, Settings(), DataCache(Path("data/cache")))
+
+    def get_stats(self) -> Dict:
+        return {
+            **self.stats.__dict__,
+            "entries": {
+                token: {"age": round(e.age, 3), "source": e.source}
+                for token, e in self._entries.items()
+            },
+        }
+
+
+# Singleton instance
+_regime_service: Optional[RegimeService] = None
+
+
+def get_regime_service() -> RegimeService:
+    """Get or create the regime service singleton."""
+    global _regime_service
+    if _regime_service is None:
+        _regime_service = RegimeService()
+    return _regime_service
@@ -1,5 +1,6 @@
 """Sentinel Agent - Market Regime Detection for Trading System v2.0"""
 
+import time
 from datetime import datetime, timedelta, date
 from typing import Dict, List, Optional, Tuple
 import pandas as pd
@@ -11,6 +12,7 @@ from ...core.kite_client import KiteClient
 from ...core.data_cache import DataCache
 from ...config.settings import Settings
 from ..utilities.event_calendar import EventCalendar, get_event_calendar
+from ..utilities.correlation_service import RollingCorrelationService, get_correlation_service
 from ...config.constants import (
     NIFTY_TOKEN, BANKNIFTY_TOKEN, INDIA_VIX_TOKEN,
     INTERVAL_5MIN, INTERVAL_DAY, REGIME_LOOKBACK_DAYS
@@ -40,6 +42,7 @@ from ..indicators.volatility import (
     calculate_correlation, detect_correlation_spike,
     calculate_rv_iv_ratio, detect_correlation_spike_dynamic
 )
+from .regime_classifier import PrecomputedRegimes, predict_batch
 from ..indicators.dc import DirectionalChange
 from ..indicators.smei import SMEICalculator
 from ..indicators.hmm_helper import HMMRegimeClassifier, DCAlarmTracker
@@ -68,6 +71,11 @@ class Sentinel(BaseAgent):
     DC_ALARM_P = 0.7  # Threshold for p_abnormal
     DC_ALARM_N = 3  # Consecutive events for alarm
     
+    # Correlation service refresh (only for assets without live ticks)
+    CORRELATION_BACKFILL_DAYS = 120
+    CORRELATION_REFRESH_DAYS = 5
+    CORRELATION_REFRESH_SECONDS = 300
+    
     # Hybrid voting weights
     DC_WEIGHT = 0.5
     SIMPLE_WEIGHT = 0.2
@@ -86,15 +94,22 @@ class Sentinel(BaseAgent):
         # This forces fetching from kite (HistoricalDataClient) instead of disk
         self.data_cache = data_cache
         self.ml_classifier = ml_classifier
+        self._ml_precomputed: Optional[PrecomputedRegimes] = None
+        self._precomputed_indicators = None  # Bar-mode backtests (see use_precomputed_indicators)
+        self._intraday_bars = False  # Stepping intraday bars: the last daily bar is partial
         
         # Event calendar - now uses EventCalendar service
         self._event_calendar = get_event_calendar()
         
-        # Correlation tracking
+        # Correlation tracking - live Sentinels share one rolling matrix;
+        # backtests (no data_cache) get a private one so dates never mix
         self._correlation_assets = {
             "NIFTY": NIFTY_TOKEN,
             "BANKNIFTY": BANKNIFTY_TOKEN,
         }
+        self._correlation_service = (
+            get_correlation_service() if data_cache is not None else RollingCorrelationService()
+        )
         
         # v2.3: DC, HMM, SMEI components
         self._dc = DirectionalChange(theta=self.DC_THETA, min_bar_window=self.DC_MIN_BAR_WINDOW)
@@ -143,7 +158,7 @@ class Sentinel(BaseAgent):
         event_flag, event_name, event_days = self._check_events()
         
         # 5. Calculate correlations
-        correlations = self._calculate_correlations(instrument_token)
+        correlations = self._calculate_correlations(instrument_token, ohlcv_daily)
         correlation_alert = any(abs(v) > CORRELATION_THRESHOLD for v in correlations.values())
         
         # 6. v2.3: DC event detection
@@ -156,7 +171,10 @@ class Sentinel(BaseAgent):
         regime, confidence, confluence = self._classify_regime(metrics, event_flag, correlations)
         
         # 9. ML override (if available) - require higher prob for CHAOS
-        ml_regime, ml_probability = self._ml_classify(metrics) if self.ml_classifier else (None, 0.0)
+        ml_regime, ml_probability = (
+            self._ml_classify(metrics, self._ml_as_of(ohlcv_daily))
+            if self.ml_classifier or self._ml_precomputed is not None else (None, 0.0)
+        )
         if ml_regime and ml_probability > ML_OVERRIDE_PROBABILITY:
             if ml_regime == RegimeType.CHAOS and ml_probability < ML_CHAOS_PROBABILITY:
                 self.logger.info(f"ML CHAOS below threshold: {ml_probability:.2f} < {ML_CHAOS_PROBABILITY}")
@@ -272,27 +290,10 @@ class Sentinel(BaseAgent):
         ohlcv_daily: pd.DataFrame
     ) -> RegimeMetrics:
         """Calculate all technical metrics including new BBW and RV/IV."""
-        # ADX on 5-min data
-        adx = calculate_adx(
-            ohlcv_5min['high'],
-            ohlcv_5min['low'],
-            ohlcv_5min['close'],
-            period=14
-        )
-        current_adx = adx.iloc[-1] if not adx.empty else 15.0
-        
-        # RSI on 5-min data
-        rsi = calculate_rsi(ohlcv_5min['close'], period=14)
-        current_rsi = rsi.iloc[-1] if not rsi.empty else 50.0
-        
-        # ATR on 5-min data
-        atr = calculate_atr(
-            ohlcv_5min['high'],
-            ohlcv_5min['low'],
-            ohlcv_5min['close'],
-            period=14
-        )
-        current_atr = atr.iloc[-1] if not atr.empty else 0.0
+        intraday = self._intraday_indicators(ohlcv_5min)
+        current_adx = intraday['adx']
+        current_rsi = intraday['rsi']
+        current_atr = intraday['atr']
         
         # Realized volatility on daily data
         rv = calculate_realized_vol(ohlcv_daily['close'], period=20, annualize=True)
@@ -305,20 +306,15 @@ class Sentinel(BaseAgent):
         rv_atr_ratio = current_rv / (current_atr / ohlcv_5min['close'].iloc[-1]) if current_atr > 0 else 1.0
         
         # NEW: Bollinger Band Width ratio
-        bbw = calculate_bollinger_band_width(ohlcv_5min['close'], period=20)
-        current_bbw = bbw.iloc[-1] if not bbw.empty else 0.02
-        bbw_ratio = calculate_bbw_ratio(ohlcv_5min['close'], period=20, avg_period=20)
-        current_bbw_ratio = bbw_ratio.iloc[-1] if not bbw_ratio.empty else 1.0
+        current_bbw = intraday['bbw']
+        current_bbw_ratio = intraday['bbw_ratio']
         
         # NEW: RV/IV ratio (vol overpriced if < 0.8)
         iv_decimal = iv_percentile / 100 * 0.3  # Convert percentile to approx IV
         rv_iv_ratio = current_rv / iv_decimal if iv_decimal > 0 else 1.0
         
         # NEW: Volume ratio
-        volume_ratio = 1.0
-        if 'volume' in ohlcv_5min.columns:
-            vol_ratio = calculate_volume_ratio(ohlcv_5min['volume'], period=20)
-            volume_ratio = vol_ratio.iloc[-1] if not vol_ratio.empty else 1.0
+        volume_ratio = intraday['volume_ratio']
         
         return RegimeMetrics(
             adx=float(current_adx) if not np.isnan(current_adx) else 15.0,
@@ -336,6 +332,56 @@ class Sentinel(BaseAgent):
             volume_ratio=float(volume_ratio) if not np.isnan(volume_ratio) else 1.0
         )
     
+    def _intraday_indicators(self, ohlcv_5min: pd.DataFrame) -> Dict[str, float]:
+        """
+        Latest 5-minute indicator values (ADX, RSI, ATR, BBW, BBW ratio, volume ratio).
+        
+        Read from precomputed arrays at the current bar when available
+        (bar-mode backtests), otherwise computed over the fetched window.
+        """
+        if self._precomputed_indicators is not None:
+            values = self._precomputed_indicators.at(
+                self._last_bar_time(ohlcv_5min), ohlcv_5min['close'].iloc[-1], len(ohlcv_5min)
+            )
+            if values is not None:
+                return values
+        
+        # ADX on 5-min data
+        adx = calculate_adx(
+            ohlcv_5min['high'],
+            ohlcv_5min['low'],
+            ohlcv_5min['close'],
+            period=14
+        )
+        
+        # RSI on 5-min data
+        rsi = calculate_rsi(ohlcv_5min['close'], period=14)
+        
+        # ATR on 5-min data
+        atr = calculate_atr(
+            ohlcv_5min['high'],
+            ohlcv_5min['low'],
+            ohlcv_5min['close'],
+            period=14
+        )
+        
+        bbw = calculate_bollinger_band_width(ohlcv_5min['close'], period=20)
+        bbw_ratio = calculate_bbw_ratio(ohlcv_5min['close'], period=20, avg_period=20)
+        
+        volume_ratio = 1.0
+        if 'volume' in ohlcv_5min.columns:
+            vol_ratio = calculate_volume_ratio(ohlcv_5min['volume'], period=20)
+            volume_ratio = vol_ratio.iloc[-1] if not vol_ratio.empty else 1.0
+        
+        return {
+            'adx': adx.iloc[-1] if not adx.empty else 15.0,
+            'rsi': rsi.iloc[-1] if not rsi.empty else 50.0,
+            'atr': atr.iloc[-1] if not atr.empty else 0.0,
+            'bbw': bbw.iloc[-1] if not bbw.empty else 0.02,
+            'bbw_ratio': bbw_ratio.iloc[-1] if not bbw_ratio.empty else 1.0,
+            'volume_ratio': volume_ratio,
+        }
+    
     def _calculate_iv_percentile(self, ohlcv_daily: pd.DataFrame) -> Tuple[float, Optional[float]]:
         """
         Calculate IV percentile/rank using actual India VIX data.
@@ -624,13 +670,74 @@ class Sentinel(BaseAgent):
         # Default: MEAN_REVERSION with moderate confidence
         return RegimeType.MEAN_REVERSION, 0.55, confluence
     
-    def _ml_classify(self, metrics: RegimeMetrics) -> Tuple[Optional[RegimeType], float]:
+    def use_precomputed_indicators(self, indicators) -> None:
+        """
+        Read 5-minute indicators from precomputed arrays (bar-mode backtests).
+        
+        indicators.at(bar_time, close, window) returns the values for the last
+        bar of the fetched window, or None (e.g. a partial bar) to compute them.
+        """
+        self._precomputed_indicators = indicators
+        self._intraday_bars = indicators is not None and bool(getattr(self.kite, "is_intraday", False))
+    
+    def use_precomputed_ml(self, precomputed: Optional[PrecomputedRegimes]) -> None:
+        """
+        Serve ML predictions from a precomputed table (backtests/replays).
+        
+        Bars the table doesn't cover fall back to ml_classifier, if set.
+        """
+        self._ml_precomputed = precomputed
+    
+    @staticmethod
+    def _last_bar_time(ohlcv: pd.DataFrame) -> Optional[datetime]:
+        """Timestamp of the last bar (date column or DatetimeIndex)."""
+        if ohlcv.empty:
+            return None
+        if 'date' in ohlcv.columns:
+            return ohlcv['date'].iloc[-1]
+        if isinstance(ohlcv.index, pd.DatetimeIndex):
+            return ohlcv.index[-1]
+        return None
+    
+    def _ml_as_of(self, ohlcv_daily: pd.DataFrame) -> Optional[datetime]:
+        """
+        Timestamp to look precomputed ML predictions up at.
+        
+        In intraday bar mode the last daily bar is the session in progress,
+        stamped D 00:00, while the precomputed row for D is scored on the
+        day's final close - so the lookup must stop at the last completed day.
+        """
+        as_of = self._last_bar_time(ohlcv_daily)
+        if as_of is not None and self._intraday_bars:
+            return pd.Timestamp(as_of) - pd.Timedelta(1, "ns")
+        return as_of
+    
+    def _ml_classify(
+        self,
+        metrics: RegimeMetrics,
+        as_of: Optional[datetime] = None
+    ) -> Tuple[Optional[RegimeType], float]:
         """
         Classify regime using ML model.
         
+        With precomputed predictions (backtests/replays) this is a lookup by
+        bar timestamp; otherwise the model scores one feature row.
+        
         Returns:
             Tuple of (predicted regime, probability)
         """
+        regime_map = {
+            0: RegimeType.RANGE_BOUND,
+            1: RegimeType.MEAN_REVERSION,
+            2: RegimeType.TREND,
+            3: RegimeType.CHAOS
+        }
+        
+        if self._ml_precomputed is not None and as_of is not None:
+            hit = self._ml_precomputed.lookup(as_of)
+            if hit is not None:
+                return regime_map.get(hit[0], RegimeType.UNKNOWN), hit[1]
+        
         if not self.ml_classifier:
             return None, 0.0
         
@@ -644,16 +751,9 @@ class Sentinel(BaseAgent):
                 metrics.rv_atr_ratio
             ]])
             
-            # Predict
-            prediction = self.ml_classifier.predict(features)[0]
-            probability = max(self.ml_classifier.predict_proba(features)[0])
-            
-            regime_map = {
-                0: RegimeType.RANGE_BOUND,
-                1: RegimeType.MEAN_REVERSION,
-                2: RegimeType.TREND,
-                3: RegimeType.CHAOS
-            }
+            # Predict (single predict_proba pass)
+            labels, probabilities = predict_batch(self.ml_classifier, features)
+            prediction, probability = labels[0], float(probabilities[0])
             
             return regime_map.get(prediction, RegimeType.UNKNOWN), probability
             
@@ -908,37 +1008,62 @@ class Sentinel(BaseAgent):
         
         return self._chaos_trigger_days
     
-    def _calculate_correlations(self, primary_token: int) -> Dict[str, float]:
-        """Calculate correlations with other assets."""
-        correlations = {}
+    def _calculate_correlations(
+        self,
+        primary_token: int,
+        primary_daily: Optional[pd.DataFrame] = None
+    ) -> Dict[str, float]:
+        """
+        Calculate correlations with other assets from the rolling correlation service.
         
-        # Get primary asset data
-        primary_data = self._fetch_ohlcv(primary_token, INTERVAL_DAY, 30)
-        if primary_data.empty:
-            return correlations
+        The primary's daily bars (already fetched by process()) are fed in for
+        free; other assets are backfilled once, then refreshed only when they
+        have no live ticks and their bars are behind.
+        """
+        service = self._correlation_service
+        primary = self._get_symbol(primary_token)
+        assets = dict(self._correlation_assets)
+        assets.setdefault(primary, primary_token)
         
-        primary_returns = primary_data['close'].pct_change().dropna()
+        for name, token in assets.items():
+            service.add_asset(name, token)
         
-        for name, token in self._correlation_assets.items():
-            if token == primary_token:
-                continue
-            
-            asset_data = self._fetch_ohlcv(token, INTERVAL_DAY, 30)
-            if asset_data.empty:
-                continue
-            
-            asset_returns = asset_data['close'].pct_change().dropna()
-            
-            # Align data
-            common_idx = primary_returns.index.intersection(asset_returns.index)
-            if len(common_idx) < 10:
-                continue
-            
-            corr = primary_returns.loc[common_idx].corr(asset_returns.loc[common_idx])
-            if not np.isnan(corr):
-                correlations[name] = float(corr)
+        if primary_daily is not None and not primary_daily.empty:
+            if service.last_bar_date(primary) is None:
+                service.backfill({primary: primary_daily['close']})
+            else:
+                for ts, close in primary_daily['close'].tail(2).items():
+                    service.update_bar(ts, {primary: close})
+        else:
+            self._refresh_correlation_asset(primary, primary_token, None)
+        
+        as_of = service.last_bar_date(primary)
+        for name, token in assets.items():
+            if name != primary and not service.is_streaming(name):
+                self._refresh_correlation_asset(name, token, as_of)
         
-        return correlations
+        return service.get_correlations(primary, [name for name in assets if name != primary])
+    
+    def _refresh_correlation_asset(self, name: str, token: int, as_of: Optional[date]) -> None:
+        """Backfill an asset once, then fetch only the last few bars when it falls behind."""
+        service = self._correlation_service
+        last = service.last_bar_date(name)
+        if last is not None:
+            behind = as_of is not None and last < as_of
+            stale = time.time() - service.last_update(name) > self.CORRELATION_REFRESH_SECONDS
+            if not behind and not stale:
+                return
+        
+        days = self.CORRELATION_BACKFILL_DAYS if last is None else self.CORRELATION_REFRESH_DAYS
+        data = self._fetch_ohlcv(token, INTERVAL_DAY, days)
+        if data.empty:
+            return
+        
+        if last is None:
+            service.backfill({name: data['close']})
+        else:
+            for ts, close in data['close'].items():
+                service.update_bar(ts, {name: close})
     
     def _get_approved_universe(
         self,
@@ -6,13 +6,19 @@ injecting historical data instead of live data.
 Components:
 - HistoricalDataClient: KiteClient replacement for historical data
 - OptionsSimulator: Black-Scholes pricing for synthetic options
+- PrecomputedIndicators: 5-minute indicator arrays for bar-mode backtests
+- RecordedOptionChains: memory-mapped index of recorded option chains
 """
 
 from .options_simulator import OptionsSimulator
 from .historical_data_client import HistoricalDataClient, load_ohlcv_data
+from .bar_indicators import PrecomputedIndicators
+from .recorded_chains import RecordedOptionChains
 
 __all__ = [
     "OptionsSimulator",
     "HistoricalDataClient",
     "load_ohlcv_data",
+    "PrecomputedIndicators",
+    "RecordedOptionChains",
 ]
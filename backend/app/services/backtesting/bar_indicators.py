@@ -0,0 +1,100 @@
+"""
+Precomputed indicator arrays for bar-mode backtests
+
+Sentinel's 5-minute indicators (ADX, RSI, ATR, BBW, BBW ratio, volume ratio)
+are rolling-window calculations, so their value at a bar only depends on the
+bars just before it. Computing them once over the whole history and reading
+them at the current bar gives the same numbers as recomputing them over a
+fetched window on every step, at a fraction of the cost.
+"""
+
+from typing import Dict, Optional
+
+import numpy as np
+import pandas as pd
+from loguru import logger
+
+from ..indicators.technical import (
+    calculate_adx, calculate_rsi, calculate_atr,
+    calculate_bollinger_band_width, calculate_bbw_ratio, calculate_volume_ratio
+)
+
+
+class PrecomputedIndicators:
+    """
+    Sentinel's 5-minute indicators over a full bar series.
+
+    at() only answers for a bar that is complete in the precomputed series
+    (same timestamp and close) when the caller's window is at least MEMORY
+    bars long; otherwise the windowed calculation would still be warming up
+    and Sentinel computes it itself.
+    """
+
+    COLUMNS = ('adx', 'rsi', 'atr', 'bbw', 'bbw_ratio', 'volume_ratio')
+
+    # Bars an indicator looks back over, including its own warm-up: a window
+    # at least this long yields the full-history value (ADX: 1 + 14 + 14,
+    # BBW ratio: 20 + 20)
+    MEMORY = 40
+
+    def __init__(self, bars: pd.DataFrame):
+        """
+        Args:
+            bars: 5-minute OHLCV bars with a date column, sorted by date
+        """
+        high, low, close = bars['high'], bars['low'], bars['close']
+
+        if 'volume' in bars.columns:
+            volume_ratio = calculate_volume_ratio(bars['volume'], period=20)
+        else:
+            volume_ratio = pd.Series(1.0, index=bars.index)
+
+        self._values: Dict[str, np.ndarray] = {
+            'adx': calculate_adx(high, low, close, period=14).to_numpy(dtype=float),
+            'rsi': calculate_rsi(close, period=14).to_numpy(dtype=float),
+            'atr': calculate_atr(high, low, close, period=14).to_numpy(dtype=float),
+            'bbw': calculate_bollinger_band_width(close, period=20).to_numpy(dtype=float),
+            'bbw_ratio': calculate_bbw_ratio(close, period=20, avg_period=20).to_numpy(dtype=float),
+            'volume_ratio': volume_ratio.to_numpy(dtype=float),
+        }
+        self._times = pd.DatetimeIndex(bars['date'])
+        self._close = close.to_numpy(dtype=float)
+        self.hits = 0
+        self.misses = 0
+
+        logger.info(f"Precomputed 5-minute indicators for {len(bars)} bars")
+
+    @classmethod
+    def from_client(cls, client, instrument_token: int) -> "PrecomputedIndicators":
+        """Build from a HistoricalDataClient's cached 5-minute resample."""
+        bars, _ = client._resampled_bars(instrument_token, '5minute')
+        return cls(bars)
+
+    def __len__(self) -> int:
+        return len(self._times)
+
+    def at(self, bar_time, close: float, window: int) -> Optional[Dict[str, float]]:
+        """
+        Indicator values at a bar.
+
+        Args:
+            bar_time: Timestamp of the bar (start of the 5-minute bucket)
+            close: The bar's close as seen by the caller
+            window: Number of bars in the caller's window
+
+        Returns:
+            Dict of indicator values, or None if the bar isn't in the series,
+            is still forming (its close differs from the completed bar's) or
+            the window is shorter than MEMORY
+        """
+        if bar_time is None or window < self.MEMORY:
+            self.misses += 1
+            return None
+
+        idx = self._times.searchsorted(pd.Timestamp(bar_time))
+        if idx >= len(self._times) or self._times[idx] != bar_time or self._close[idx] != close:
+            self.misses += 1
+            return None
+
+        self.hits += 1
+        return {name: values[idx] for name, values in self._values.items()}
@@ -9,14 +9,18 @@ Key Principle: NO trading logic here. We only provide data - the actual
 trading decisions use the SAME code as paper/live trading.
 """
 
+import threading
 from datetime import datetime, date, time, timedelta
-from typing import Dict, List, Optional, Any, Iterator
+from typing import Callable, Dict, List, Optional, Any, Iterator
 import pandas as pd
 import numpy as np
 from loguru import logger
 from pathlib import Path
 
-from ...config.constants import NIFTY_TOKEN, BANKNIFTY_TOKEN, INDIA_VIX_TOKEN
+from ...config.constants import (
+    NIFTY_TOKEN, BANKNIFTY_TOKEN, INDIA_VIX_TOKEN, MARKET_CLOSE_HOUR, MARKET_CLOSE_MINUTE
+)
+from .recorded_chains import RecordedOptionChains, RECORDED_TOKEN_BASE
 
 
 class HistoricalDataClient:
@@ -62,6 +66,7 @@ class HistoricalDataClient:
         self._data = self._prepare_data(ohlcv_data)
         self._current_idx = 0
         self._current_date: Optional[date] = None
+        self._current_time: Optional[pd.Timestamp] = None  # Set in bar mode
         
         # Simulate KiteClient attributes
         self.paper_mode = True
@@ -74,6 +79,8 @@ class HistoricalDataClient:
         self._paper_positions: Dict[str, Dict] = {}
         self._paper_balance = initial_capital
         self._order_counter = 0
+        self._order_lock = threading.Lock()  # Legs are placed from the executor's pool
+        self._order_listeners: List[Callable[[Dict], None]] = []
         
         # Additional instrument data (e.g., VIX)
         self._instrument_data: Dict[int, pd.DataFrame] = {
@@ -83,6 +90,16 @@ class HistoricalDataClient:
             instrument_token: symbol
         }
         
+        # Daily regime features per token (see get_features)
+        self._features: Dict[int, pd.DataFrame] = {}
+        
+        # Bar mode: resampled series per (token, interval), bar times per token
+        self._resampled: Dict[tuple, tuple] = {}
+        self._times: Dict[int, pd.DatetimeIndex] = {}
+        
+        # Recorded option chains (see use_recorded_chains); None = simulate all options
+        self._recorded_chains: Optional[RecordedOptionChains] = None
+        
         logger.info(f"HistoricalDataClient initialized with {len(self._data)} bars")
         logger.info(f"Date range: {self._data['date'].min()} to {self._data['date'].max()}")
     
@@ -91,6 +108,9 @@ class HistoricalDataClient:
         prepared = self._prepare_data(data)
         self._instrument_data[token] = prepared
         self._instrument_symbols[token] = symbol
+        self._features.pop(token, None)
+        self._times.pop(token, None)
+        self._resampled = {k: v for k, v in self._resampled.items() if k[0] != token}
         logger.info(f"Added {symbol} data: {len(prepared)} bars")
     
     def _prepare_data(self, df: pd.DataFrame) -> pd.DataFrame:
@@ -133,6 +153,7 @@ class HistoricalDataClient:
     def set_current_date(self, current_date: date) -> None:
         """Set the current simulation date."""
         self._current_date = current_date
+        self._current_time = None
         
         # Find index for this date
         mask = self._data['date'].dt.date <= current_date
@@ -168,6 +189,149 @@ class HistoricalDataClient:
             self.set_current_date(d)
             yield d
     
+    @property
+    def is_intraday(self) -> bool:
+        """True if the primary series has more than one bar per day."""
+        dates = self._data['date'].dt.normalize()
+        return dates.duplicated().any()
+    
+    def set_current_time(self, current_time) -> None:
+        """
+        Set the simulation clock to a bar timestamp (bar mode).
+        
+        Data requests then only see bars up to and including current_time;
+        the current day/5-minute bar is built from the bars seen so far.
+        """
+        self._current_time = pd.Timestamp(current_time)
+        self._current_date = self._current_time.date()
+        times = self._bar_times(self.instrument_token)
+        self._current_idx = max(times.searchsorted(self._current_time, side='right') - 1, 0)
+    
+    def iterate_bars(self, interval: Optional[str] = None) -> Iterator[pd.Timestamp]:
+        """
+        Step the simulation clock bar by bar (bar mode).
+        
+        Args:
+            interval: Step size - '5minute' or 'day' steps on the last source
+                bar of each bucket; None steps on every source bar
+        """
+        times = self._bar_times(self.instrument_token)
+        if interval is not None:
+            buckets = self._bucket_starts(times, interval)
+            times = times[np.append(buckets[1:] != buckets[:-1], True)]
+        for ts in times:
+            self.set_current_time(ts)
+            yield ts
+    
+    def now(self) -> datetime:
+        """Simulated wall clock: timestamp of the current bar (naive local time)."""
+        ts = self._data['date'].iloc[min(self._current_idx, len(self._data) - 1)]
+        if ts.tzinfo is not None:
+            ts = ts.tz_localize(None)
+        return ts.to_pydatetime()
+    
+    def use_recorded_chains(self, chains: Optional[RecordedOptionChains]) -> None:
+        """
+        Serve options from recorded chains instead of Black-Scholes.
+        
+        Option chains, quotes, LTPs and fills for recorded strikes use the
+        recorded quotes at the simulation time; strikes that weren't
+        recorded (or whose quote is stale) are still simulated.
+        """
+        self._recorded_chains = chains
+        if chains is not None:
+            logger.info(f"Using recorded option chains: {chains.get_stats()}")
+    
+    def _quote_time(self) -> datetime:
+        """Simulation time for option quotes (a daily bar is taken at the close)."""
+        ts = self.now()
+        if ts.time() == time():
+            ts = datetime.combine(ts.date(), time(MARKET_CLOSE_HOUR, MARKET_CLOSE_MINUTE))
+        return ts
+    
+    def _recorded_quote(self, token: int) -> Optional[Dict]:
+        if self._recorded_chains is None or token < RECORDED_TOKEN_BASE:
+            return None
+        return self._recorded_chains.quote_token(token, self._quote_time())
+    
+    def _bar_times(self, token: int) -> pd.DatetimeIndex:
+        times = self._times.get(token)
+        if times is None:
+            data = self._instrument_data.get(token, self._data)
+            times = pd.DatetimeIndex(data['date'])
+            self._times[token] = times
+        return times
+    
+    @staticmethod
+    def _bucket_starts(times: pd.DatetimeIndex, interval: str) -> pd.DatetimeIndex:
+        if interval == 'day':
+            return times.normalize()
+        if interval == '5minute':
+            return times.floor('5min')
+        raise ValueError(f"Unsupported bar interval: {interval}")
+    
+    def _resampled_bars(self, token: int, interval: str) -> tuple:
+        """Full-history resample of a token, computed once: (bars, bar start times)."""
+        key = (token, interval)
+        cached = self._resampled.get(key)
+        if cached is None:
+            data = self._instrument_data.get(token, self._data)
+            rule = 'D' if interval == 'day' else '5min'
+            bars = data.set_index('date').resample(rule).agg({
+                'open': 'first',
+                'high': 'max',
+                'low': 'min',
+                'close': 'last',
+                'volume': 'sum'
+            }).dropna().reset_index()
+            cached = (bars, pd.DatetimeIndex(bars['date']))
+            self._resampled[key] = cached
+        return cached
+    
+    def _bar_window(self, token: int, interval: str, sim_from_date: date) -> pd.DataFrame:
+        """
+        Bars from sim_from_date up to the simulation clock, without lookahead.
+        
+        Completed buckets are sliced from the cached resample; the bucket the
+        clock is in is aggregated from the source bars seen so far.
+        """
+        data = self._instrument_data.get(token, self._data)
+        times = self._bar_times(token)
+        cutoff = self._current_time
+        if times.tz is not None and cutoff.tzinfo is None:
+            cutoff = cutoff.tz_localize(times.tz)
+        start = pd.Timestamp(sim_from_date)
+        if times.tz is not None:
+            start = start.tz_localize(times.tz)
+        
+        if interval not in ('day', '5minute'):
+            lo, hi = times.searchsorted(start), times.searchsorted(cutoff, side='right')
+            return data.iloc[lo:hi].copy()
+        
+        bars, bar_times = self._resampled_bars(token, interval)
+        bucket = self._bucket_starts(pd.DatetimeIndex([cutoff]), interval)[0]
+        lo, hi = bar_times.searchsorted(start), bar_times.searchsorted(bucket)
+        window = bars.iloc[lo:hi]
+        
+        # Current (possibly incomplete) bucket from the source bars so far
+        a, b = times.searchsorted(bucket), times.searchsorted(cutoff, side='right')
+        if b <= a:
+            return window.copy()
+        complete = b == len(times) or self._bucket_starts(times[b:b + 1], interval)[0] != bucket
+        if complete and hi < len(bar_times) and bar_times[hi] == bucket:
+            # Bucket already complete - the cached bar is exact
+            return bars.iloc[lo:hi + 1].copy()
+        rows = data.iloc[a:b]
+        partial = pd.DataFrame({
+            'date': [bucket],
+            'open': [rows['open'].iloc[0]],
+            'high': [rows['high'].max()],
+            'low': [rows['low'].min()],
+            'close': [rows['close'].iloc[-1]],
+            'volume': [rows['volume'].sum()],
+        })
+        return pd.concat([window, partial], ignore_index=True)
+    
     def get_date_range(self) -> tuple:
         """Get the date range of available data."""
         return (
@@ -175,6 +339,35 @@ class HistoricalDataClient:
             self._data['date'].max().date()
         )
     
+    def get_features(self, instrument_token: int = None) -> pd.DataFrame:
+        """
+        Regime features and labels for an instrument's daily bars, up to the
+        current simulation date.
+        
+        Features are computed once for the whole series (every feature only
+        looks backwards) and read from the feature store on later runs, so
+        each simulated day is a slice instead of a recomputation.
+        """
+        token = instrument_token or self.instrument_token
+        if token not in self._features:
+            from ..agents.regime_features import get_feature_store
+            
+            data = self._instrument_data.get(token, self._data)
+            daily = data.set_index('date').resample('D').agg({
+                'open': 'first',
+                'high': 'max',
+                'low': 'min',
+                'close': 'last',
+                'volume': 'sum'
+            }).dropna().reset_index()
+            symbol = self._instrument_symbols.get(token, str(token))
+            self._features[token] = get_feature_store().load_or_build(symbol, daily)
+        
+        features = self._features[token]
+        if not self._current_date:
+            return features
+        return features[features['date'].dt.date <= self._current_date]
+    
     # =========================================================================
     # KiteClient Interface Methods
     # =========================================================================
@@ -208,6 +401,11 @@ class HistoricalDataClient:
         sim_to_date = self._current_date
         sim_from_date = sim_to_date - timedelta(days=lookback_days)
         
+        if self._current_time is not None:
+            if instrument_token not in self._instrument_data:
+                instrument_token = self.instrument_token
+            return self._bar_window(instrument_token, interval, sim_from_date)
+        
         # Filter data for the simulation date range
         mask = (data['date'].dt.date >= sim_from_date) & \
                (data['date'].dt.date <= sim_to_date)
@@ -236,18 +434,47 @@ class HistoricalDataClient:
         return result
     
     def get_ltp(self, tokens: List[int]) -> Dict[int, float]:
-        """Get last traded prices for tokens."""
+        """Get last traded prices for tokens (recorded options use their recorded LTP)."""
         ltp = self.get_current_bar()['close'] if self.get_current_bar() else 0.0
-        return {token: ltp for token in tokens}
+        result = {}
+        unquoted = {}
+        for token in tokens:
+            quote = self._recorded_quote(token)
+            if quote is None and self._recorded_chains is not None:
+                # Recorded contract without a current quote - price it below
+                contract = self._recorded_chains.instrument(token)
+                if contract:
+                    unquoted[token] = contract
+                    continue
+            result[token] = quote['ltp'] if quote else ltp
+        if unquoted:
+            prices = self._simulated_quotes(list(unquoted.values())).mid
+            result.update(zip(unquoted, prices.tolist()))
+            result = {token: result[token] for token in tokens}
+        return result
     
     def get_quote(self, tokens: List[int]) -> Dict[int, Dict]:
-        """Get quotes for tokens."""
+        """Get quotes for tokens (recorded options include their order book top)."""
         bar = self.get_current_bar()
         if not bar:
             return {}
         
         result = {}
         for token in tokens:
+            quote = self._recorded_quote(token)
+            if quote is not None:
+                result[token] = {
+                    'instrument_token': token,
+                    'last_price': quote['ltp'],
+                    'volume': quote['volume'],
+                    'oi': quote['oi'],
+                    'depth': {
+                        'buy': [{'price': quote['bid'], 'quantity': quote['bid_qty']}],
+                        'sell': [{'price': quote['ask'], 'quantity': quote['ask_qty']}]
+                    },
+                    'timestamp': quote['timestamp']
+                }
+                continue
             result[token] = {
                 'instrument_token': token,
                 'last_price': bar['close'],
@@ -306,60 +533,82 @@ class HistoricalDataClient:
         
         Returns order_id.
         """
-        self._order_counter += 1
-        order_id = f"BT{self._order_counter:06d}"
-        
-        # Get fill price with slippage
-        ltp = self.get_current_bar()['close'] if self.get_current_bar() else 0
-        if transaction_type == "BUY":
-            fill_price = ltp * (1 + self.slippage_pct)
-        else:
-            fill_price = ltp * (1 - self.slippage_pct)
-        
-        # Record order
-        self._paper_orders[order_id] = {
-            'order_id': order_id,
-            'tradingsymbol': tradingsymbol,
-            'exchange': exchange,
-            'transaction_type': transaction_type,
-            'quantity': quantity,
-            'order_type': order_type,
-            'product': product,
-            'price': fill_price,
-            'status': 'COMPLETE',
-            'filled_quantity': quantity,
-            'average_price': fill_price,
-            'order_timestamp': datetime.now()
-        }
-        
-        # Update position
-        pos_key = f"{exchange}:{tradingsymbol}"
-        if pos_key in self._paper_positions:
-            pos = self._paper_positions[pos_key]
+        # Recorded options fill at the touch (ask to buy, bid to sell)
+        fill_price = self._recorded_fill_price(tradingsymbol, transaction_type)
+        if fill_price is None:
+            # Get fill price with slippage
+            ltp = self.get_current_bar()['close'] if self.get_current_bar() else 0
             if transaction_type == "BUY":
-                new_qty = pos['quantity'] + quantity
+                fill_price = ltp * (1 + self.slippage_pct)
             else:
-                new_qty = pos['quantity'] - quantity
+                fill_price = ltp * (1 - self.slippage_pct)
+        
+        with self._order_lock:
+            self._order_counter += 1
+            order_id = f"BT{self._order_counter:06d}"
             
-            if new_qty == 0:
-                del self._paper_positions[pos_key]
-            else:
-                pos['quantity'] = new_qty
-        else:
-            qty = quantity if transaction_type == "BUY" else -quantity
-            self._paper_positions[pos_key] = {
+            # Record order
+            self._paper_orders[order_id] = {
+                'order_id': order_id,
                 'tradingsymbol': tradingsymbol,
                 'exchange': exchange,
-                'quantity': qty,
+                'transaction_type': transaction_type,
+                'quantity': quantity,
+                'order_type': order_type,
+                'product': product,
+                'price': fill_price,
+                'status': 'COMPLETE',
+                'filled_quantity': quantity,
                 'average_price': fill_price,
-                'last_price': fill_price,
-                'pnl': 0,
-                'instrument_token': self.instrument_token
+                'order_timestamp': datetime.now()
             }
+            
+            # Update position
+            pos_key = f"{exchange}:{tradingsymbol}"
+            if pos_key in self._paper_positions:
+                pos = self._paper_positions[pos_key]
+                if transaction_type == "BUY":
+                    new_qty = pos['quantity'] + quantity
+                else:
+                    new_qty = pos['quantity'] - quantity
+                
+                if new_qty == 0:
+                    del self._paper_positions[pos_key]
+                else:
+                    pos['quantity'] = new_qty
+            else:
+                qty = quantity if transaction_type == "BUY" else -quantity
+                self._paper_positions[pos_key] = {
+                    'tradingsymbol': tradingsymbol,
+                    'exchange': exchange,
+                    'quantity': qty,
+                    'average_price': fill_price,
+                    'last_price': fill_price,
+                    'pnl': 0,
+                    'instrument_token': self.instrument_token
+                }
         
         logger.debug(f"Order: {order_id} {transaction_type} {quantity} {tradingsymbol} @ {fill_price:.2f}")
+        self._emit_order_update(self._paper_orders[order_id])
         return order_id
     
+    def _recorded_fill_price(self, tradingsymbol: str, transaction_type: str) -> Optional[float]:
+        """Fill price from the recorded quote, or None if the option wasn't recorded."""
+        if self._recorded_chains is None:
+            return None
+        quote = self._recorded_chains.quote_symbol(tradingsymbol, self._quote_time())
+        if quote is None:
+            return None
+        
+        touch = quote['ask'] if transaction_type == "BUY" else quote['bid']
+        if touch > 0:
+            return float(touch)
+        if quote['ltp'] > 0:
+            # No book recorded (e.g. Breeze history) - last price with slippage
+            sign = 1 if transaction_type == "BUY" else -1
+            return float(quote['ltp']) * (1 + sign * self.slippage_pct)
+        return None
+    
     def modify_order(self, order_id: str, **kwargs) -> str:
         """Modify an order (no-op for backtest)."""
         return order_id
@@ -370,6 +619,28 @@ class HistoricalDataClient:
             self._paper_orders[order_id]['status'] = 'CANCELLED'
         return order_id
     
+    def add_order_listener(self, callback: Callable[[Dict], None]) -> None:
+        """Register a callback for order state changes (OrderTracker)."""
+        if callback not in self._order_listeners:
+            self._order_listeners.append(callback)
+    
+    def remove_order_listener(self, callback: Callable[[Dict], None]) -> None:
+        if callback in self._order_listeners:
+            self._order_listeners.remove(callback)
+    
+    def _emit_order_update(self, order: Dict) -> None:
+        """Push an order's state to listeners (same shape as a postback)."""
+        update = dict(order)
+        for callback in self._order_listeners:
+            try:
+                callback(update)
+            except Exception as e:
+                logger.error(f"Order listener error: {e}")
+    
+    def poll_paper_orders(self) -> int:
+        """Backtest orders fill at placement - nothing is ever left open."""
+        return 0
+    
     def get_orders(self) -> List[Dict]:
         """Get all orders."""
         return list(self._paper_orders.values())
@@ -425,17 +696,56 @@ class HistoricalDataClient:
                         'strike': strike
                     })
         
-        return pd.DataFrame(instruments)
+        instruments = pd.DataFrame(instruments)
+        if self._recorded_chains is None:
+            return instruments
+        
+        # Recorded options replace generated ones for the same contract
+        recorded = self._recorded_chains.instruments(self._quote_time())
+        if recorded.empty:
+            return instruments
+        recorded_keys = set(zip(recorded['expiry'], recorded['strike'], recorded['instrument_type']))
+        generated = instruments[[
+            (expiry, strike, opt_type) not in recorded_keys
+            for expiry, strike, opt_type in zip(
+                instruments['expiry'], instruments['strike'], instruments['instrument_type']
+            )
+        ]]
+        return pd.concat([generated, recorded], ignore_index=True)
     
     def get_option_chain(self, symbol: str, expiry: date) -> pd.DataFrame:
-        """Get option chain (simulated using OptionsSimulator)."""
-        from .options_simulator import OptionsSimulator
+        """
+        Get option chain.
+        
+        With recorded chains (see use_recorded_chains), recorded strikes carry
+        their recorded prices, book and OI, with model greeks; only strikes
+        missing from the recording are simulated.
+        """
+        iv = self._estimate_iv()
+        simulated = self._simulated_chain(symbol, expiry, iv)
+        if self._recorded_chains is None or symbol != self._recorded_chains.symbol:
+            return simulated
+        
+        recorded = self._recorded_chains.chain(expiry, self._quote_time())
+        if recorded.empty:
+            return simulated
         
-        simulator = OptionsSimulator()
         spot = self.get_current_bar()['close'] if self.get_current_bar() else 0
+        recorded = self._with_model_greeks(recorded, expiry, spot, iv)
+        
+        if simulated.empty:
+            return recorded
+        recorded_keys = set(zip(recorded['strike'].astype(int), recorded['instrument_type']))
+        missing = simulated[[
+            (int(strike), opt_type) not in recorded_keys
+            for strike, opt_type in zip(simulated['strike'], simulated['instrument_type'])
+        ]]
+        chain = pd.concat([recorded, missing], ignore_index=True)
+        return chain.sort_values(['strike', 'instrument_type']).reset_index(drop=True)
+    
+    def _estimate_iv(self) -> float:
+        """Estimate IV from the last 30 days of realized volatility."""
         current_date = self._current_date or date.today()
-        
-        # Estimate IV from recent volatility
         hist = self.fetch_historical_data(
             self.instrument_token,
             'day',
@@ -444,43 +754,77 @@ class HistoricalDataClient:
         )
         if len(hist) > 5:
             returns = hist['close'].pct_change().dropna()
-            iv = returns.std() * np.sqrt(252)
-        else:
-            iv = 0.15
-        
-        chain = simulator.get_options_chain(spot, expiry, current_date, iv)
-        
-        # Convert to DataFrame format expected by Strategist
-        rows = []
-        token_counter = 100000
-        for quote in chain.get('calls', []) + chain.get('puts', []):
-            opt_type = quote.option_type  # 'CE' or 'PE'
-            strike_int = int(quote.strike)
-            expiry_str = quote.expiry.strftime('%y%b').upper()  # e.g., '24MAR'
-            tradingsymbol = f"{symbol}{expiry_str}{strike_int}{opt_type}"
-            
-            rows.append({
-                'strike': quote.strike,
-                'expiry': quote.expiry,
-                'instrument_type': opt_type,
-                'tradingsymbol': tradingsymbol,
-                'instrument_token': token_counter,
-                'name': symbol,
-                'last_price': quote.mid,
-                'ltp': quote.mid,
-                'bid': quote.bid,
-                'ask': quote.ask,
-                'iv': quote.iv,
-                'delta': quote.delta,
-                'gamma': quote.gamma,
-                'theta': quote.theta,
-                'vega': quote.vega,
-                'oi': 10000,  # Simulated OI
-                'volume': 1000  # Simulated volume
-            })
-            token_counter += 1
-        
-        return pd.DataFrame(rows)
+            return returns.std() * np.sqrt(252)
+        return 0.15
+    
+    def _with_model_greeks(self, chain: pd.DataFrame, expiry: date, spot: float, iv: float) -> pd.DataFrame:
+        """Add Black-Scholes greeks at the estimated IV to recorded quotes."""
+        from .options_simulator import BlackScholes, OptionsSimulator
+        
+        bs = BlackScholes
+        r = OptionsSimulator().risk_free_rate
+        current_date = self._current_date or date.today()
+        T = max((expiry - current_date).days / 365, 1 / 365)
+        
+        # Spot as recorded with each quote where available
+        S = chain['underlying'].to_numpy(dtype=float)
+        S = np.where(S > 0, S, spot)
+        K = chain['strike'].to_numpy(dtype=float)
+        is_call = (chain['instrument_type'] == 'CE').to_numpy()
+        
+        chain = chain.copy()
+        chain['iv'] = iv
+        chain['delta'] = np.where(is_call, bs.call_delta(S, K, T, r, iv), bs.put_delta(S, K, T, r, iv))
+        chain['gamma'] = bs.gamma(S, K, T, r, iv)
+        chain['theta'] = np.where(is_call, bs.call_theta(S, K, T, r, iv), bs.put_theta(S, K, T, r, iv))
+        chain['vega'] = bs.vega(S, K, T, r, iv)
+        return chain
+    
+    def _simulated_quotes(self, contracts: List[tuple]):
+        """
+        Black-Scholes QuoteArrays for (expiry, strike, option_type) contracts
+        (recorded strikes with stale quotes), in one vectorized pass.
+        """
+        from .options_simulator import OptionsSimulator
+        
+        spot = self.get_current_bar()['close'] if self.get_current_bar() else 0
+        current_date = self._current_date or date.today()
+        expiries, strikes, option_types = zip(*contracts)
+        return OptionsSimulator().get_option_quotes(
+            spot, strikes, expiries, current_date, self._estimate_iv(), option_types
+        )
+    
+    def _simulated_chain(self, symbol: str, expiry: date, iv: float) -> pd.DataFrame:
+        """Option chain simulated with OptionsSimulator."""
+        from .options_simulator import OptionsSimulator
+        
+        spot = self.get_current_bar()['close'] if self.get_current_bar() else 0
+        current_date = self._current_date or date.today()
+        quotes = OptionsSimulator().get_options_chain_quotes(spot, expiry, current_date, iv)
+        
+        # DataFrame format expected by Strategist
+        strikes = quotes.strike.astype(int)
+        option_types = np.where(quotes.is_call, 'CE', 'PE')
+        expiry_str = expiry.strftime('%y%b').upper()  # e.g., '24MAR'
+        return pd.DataFrame({
+            'strike': strikes,
+            'expiry': [expiry] * len(quotes),
+            'instrument_type': option_types,
+            'tradingsymbol': [f"{symbol}{expiry_str}{k}{t}" for k, t in zip(strikes, option_types)],
+            'instrument_token': np.arange(100000, 100000 + len(quotes)),
+            'name': symbol,
+            'last_price': quotes.mid,
+            'ltp': quotes.mid,
+            'bid': quotes.bid,
+            'ask': quotes.ask,
+            'iv': quotes.iv,
+            'delta': quotes.delta,
+            'gamma': quotes.gamma,
+            'theta': quotes.theta,
+            'vega': quotes.vega,
+            'oi': 10000,  # Simulated OI
+            'volume': 1000  # Simulated volume
+        })
 
 
 def load_ohlcv_data(file_path: str) -> pd.DataFrame:
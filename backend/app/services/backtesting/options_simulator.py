@@ -25,7 +25,7 @@ from dataclasses import dataclass
 from loguru import logger
 
 
-@dataclass
+@dataclass(slots=True)
 class OptionQuote:
     """Simulated option quote."""
     strike: float
@@ -61,6 +61,58 @@ class OptionQuote:
         return not self.is_itm
 
 
+@dataclass(slots=True)
+class QuoteArrays:
+    """
+    Simulated quotes for many options as parallel arrays (one row per option),
+    from OptionsSimulator.get_option_quotes. quote(i) builds the OptionQuote
+    for one row.
+    """
+    strike: np.ndarray
+    expiry: np.ndarray  # datetime64[D]
+    is_call: np.ndarray
+    underlying_price: np.ndarray
+    
+    # Prices
+    theoretical_price: np.ndarray
+    bid: np.ndarray
+    ask: np.ndarray
+    mid: np.ndarray
+    
+    # Greeks
+    delta: np.ndarray
+    gamma: np.ndarray
+    theta: np.ndarray
+    vega: np.ndarray
+    iv: np.ndarray
+    
+    # Metadata
+    dte: np.ndarray
+    moneyness: np.ndarray
+    
+    def __len__(self) -> int:
+        return len(self.strike)
+    
+    def quote(self, i: int) -> OptionQuote:
+        return OptionQuote(
+            strike=float(self.strike[i]),
+            expiry=self.expiry[i].astype(date),
+            option_type="CE" if self.is_call[i] else "PE",
+            underlying_price=float(self.underlying_price[i]),
+            theoretical_price=float(self.theoretical_price[i]),
+            bid=float(self.bid[i]),
+            ask=float(self.ask[i]),
+            mid=float(self.mid[i]),
+            delta=float(self.delta[i]),
+            gamma=float(self.gamma[i]),
+            theta=float(self.theta[i]),
+            vega=float(self.vega[i]),
+            iv=float(self.iv[i]),
+            dte=int(self.dte[i]),
+            moneyness=float(self.moneyness[i])
+        )
+
+
 class BlackScholes:
     """Black-Scholes option pricing model."""
     
@@ -310,6 +362,114 @@ class OptionsSimulator:
             moneyness=moneyness
         )
     
+    def get_option_quotes(
+        self,
+        spot,
+        strikes,
+        expiries,
+        current_date,
+        iv,
+        option_types
+    ) -> QuoteArrays:
+        """
+        Simulated quotes for a whole book in one vectorized pass.
+        
+        Same prices, Greeks and spreads as get_option_quote, without an
+        OptionQuote per option.
+        
+        Args:
+            spot: Underlying price (scalar or one per option)
+            strikes: Strike prices
+            expiries: Expiry dates
+            current_date: Current date (scalar or one per option)
+            iv: Implied volatility, > 0 (scalar or one per option)
+            option_types: "CE"/"PE" per option
+        
+        Returns:
+            QuoteArrays with one row per option
+        """
+        strike = np.asarray(strikes, dtype=float)
+        expiry = np.asarray(expiries, dtype="datetime64[D]")
+        is_call = np.asarray(option_types) == "CE"
+        S = np.broadcast_to(np.asarray(spot, dtype=float), strike.shape)
+        sigma = np.broadcast_to(np.asarray(iv, dtype=float), strike.shape)
+        r = self.risk_free_rate
+        
+        dte = (expiry - np.asarray(current_date, dtype="datetime64[D]")).astype(np.int64)
+        T = np.maximum(dte / 365, 1/365)
+        sqrt_t = np.sqrt(T)
+        d1 = (np.log(S / strike) + (r + 0.5 * sigma ** 2) * T) / (sigma * sqrt_t)
+        d2 = d1 - sigma * sqrt_t
+        discounted = strike * np.exp(-r * T)
+        pdf_d1 = norm.pdf(d1)
+        cdf_d1 = norm.cdf(d1)
+        
+        price = np.where(
+            is_call,
+            S * cdf_d1 - discounted * norm.cdf(d2),
+            discounted * norm.cdf(-d2) - S * norm.cdf(-d1)
+        )
+        delta = np.where(is_call, cdf_d1, cdf_d1 - 1)
+        decay = -S * pdf_d1 * sigma / (2 * sqrt_t)
+        theta = np.where(
+            is_call,
+            decay - r * discounted * norm.cdf(d2),
+            decay + r * discounted * norm.cdf(-d2)
+        ) / 365
+        
+        # Spread as in get_option_quote
+        moneyness = strike / S
+        spread = np.maximum(price * self.bid_ask_spread_pct * (1 + np.abs(1 - moneyness) * 2), 0.5)
+        bid = np.maximum(0.05, price - spread / 2)
+        ask = price + spread / 2
+        
+        return QuoteArrays(
+            strike=strike,
+            expiry=expiry,
+            is_call=is_call,
+            underlying_price=np.array(S),
+            theoretical_price=price,
+            bid=bid,
+            ask=ask,
+            mid=(bid + ask) / 2,
+            delta=delta,
+            gamma=pdf_d1 / (S * sigma * sqrt_t),
+            theta=theta,
+            vega=S * pdf_d1 * sqrt_t / 100,
+            iv=np.array(sigma),
+            dte=dte,
+            moneyness=moneyness
+        )
+    
+    def _chain_strikes(
+        self,
+        spot: float,
+        expiry: date,
+        current_date: date,
+        iv: float,
+        delta_range: List[float]
+    ) -> Tuple[List[float], List[str]]:
+        """Strikes and option types at each delta level: calls, then puts."""
+        calls = [self.find_strike_by_delta(spot, d, expiry, current_date, iv, "CE") for d in delta_range]
+        puts = [self.find_strike_by_delta(spot, d, expiry, current_date, iv, "PE") for d in delta_range]
+        return calls + puts, ["CE"] * len(calls) + ["PE"] * len(puts)
+    
+    def get_options_chain_quotes(
+        self,
+        spot: float,
+        expiry: date,
+        current_date: date,
+        iv: float,
+        delta_range: List[float] = [0.10, 0.15, 0.20, 0.25, 0.30, 0.40, 0.50]
+    ) -> QuoteArrays:
+        """
+        Options chain at various delta levels as QuoteArrays.
+        
+        Rows are the calls in delta_range order, then the puts.
+        """
+        strikes, option_types = self._chain_strikes(spot, expiry, current_date, iv, delta_range)
+        return self.get_option_quotes(spot, strikes, [expiry] * len(strikes), current_date, iv, option_types)
+    
     def get_options_chain(
         self,
         spot: float,
@@ -331,27 +491,12 @@ class OptionsSimulator:
         Returns:
             Dict with 'calls' and 'puts' lists of OptionQuote
         """
-        calls = []
-        puts = []
-        
-        for target_delta in delta_range:
-            # Call at this delta
-            call_strike = self.find_strike_by_delta(
-                spot, target_delta, expiry, current_date, iv, "CE"
-            )
-            calls.append(self.get_option_quote(
-                spot, call_strike, expiry, current_date, iv, "CE"
-            ))
-            
-            # Put at this delta
-            put_strike = self.find_strike_by_delta(
-                spot, target_delta, expiry, current_date, iv, "PE"
-            )
-            puts.append(self.get_option_quote(
-                spot, put_strike, expiry, current_date, iv, "PE"
-            ))
-        
-        return {"calls": calls, "puts": puts}
+        quotes = self.get_options_chain_quotes(spot, expiry, current_date, iv, delta_range)
+        n = len(delta_range)
+        return {
+            "calls": [quotes.quote(i) for i in range(n)],
+            "puts": [quotes.quote(i) for i in range(n, 2 * n)]
+        }
     
     def simulate_options_data(
         self,
@@ -404,7 +549,8 @@ class OptionsSimulator:
         else:
             iv_series = iv_data['iv'] if 'iv' in iv_data.columns else iv_data.iloc[:, 0]
         
-        records = []
+        # Strikes for every bar, then one vectorized pass over all the quotes
+        bars, spots, strikes, expiries, dates, ivs, option_types = [], [], [], [], [], [], []
         
         for idx in range(len(underlying_data)):
             row = underlying_data.iloc[idx]
@@ -426,51 +572,37 @@ class OptionsSimulator:
             iv = iv_series.iloc[idx] if idx < len(iv_series) else 0.15
             iv = max(0.05, min(1.0, iv))  # Clamp between 5% and 100%
             
-            # Generate options chain
-            chain = self.get_options_chain(
-                spot, expiry, current_date, iv, delta_levels
-            )
-            
-            # Record each option
-            timestamp = underlying_data.index[idx]
-            
-            for call in chain['calls']:
-                records.append({
-                    'timestamp': timestamp,
-                    'underlying': spot,
-                    'strike': call.strike,
-                    'expiry': call.expiry,
-                    'option_type': 'CE',
-                    'price': call.mid,
-                    'bid': call.bid,
-                    'ask': call.ask,
-                    'delta': call.delta,
-                    'gamma': call.gamma,
-                    'theta': call.theta,
-                    'vega': call.vega,
-                    'iv': call.iv,
-                    'dte': call.dte
-                })
-            
-            for put in chain['puts']:
-                records.append({
-                    'timestamp': timestamp,
-                    'underlying': spot,
-                    'strike': put.strike,
-                    'expiry': put.expiry,
-                    'option_type': 'PE',
-                    'price': put.mid,
-                    'bid': put.bid,
-                    'ask': put.ask,
-                    'delta': put.delta,
-                    'gamma': put.gamma,
-                    'theta': put.theta,
-                    'vega': put.vega,
-                    'iv': put.iv,
-                    'dte': put.dte
-                })
-        
-        return pd.DataFrame(records)
+            bar_strikes, bar_types = self._chain_strikes(spot, expiry, current_date, iv, delta_levels)
+            n = len(bar_strikes)
+            bars += [idx] * n
+            spots += [spot] * n
+            strikes += bar_strikes
+            expiries += [expiry] * n
+            dates += [current_date] * n
+            ivs += [iv] * n
+            option_types += bar_types
+        
+        if not bars:
+            return pd.DataFrame()
+        
+        quotes = self.get_option_quotes(spots, strikes, expiries, dates, ivs, option_types)
+        
+        return pd.DataFrame({
+            'timestamp': underlying_data.index[bars],
+            'underlying': quotes.underlying_price,
+            'strike': strikes,
+            'expiry': expiries,
+            'option_type': option_types,
+            'price': quotes.mid,
+            'bid': quotes.bid,
+            'ask': quotes.ask,
+            'delta': quotes.delta,
+            'gamma': quotes.gamma,
+            'theta': quotes.theta,
+            'vega': quotes.vega,
+            'iv': quotes.iv,
+            'dte': quotes.dte
+        })
 
 
 def get_weekly_expiry(current_date: date, weeks_ahead: int = 0) -> date:
@@ -0,0 +1,526 @@
+"""
+Recorded option chains for backtesting
+
+Serves real option quotes from the chains written by collect_options_data.py
+(one Parquet file per symbol and day) and download_breeze_data.py (one
+Parquet file per option series) instead of Black-Scholes prices.
+
+The files are compiled once into an index on disk:
+- instruments: one id per (expiry, strike, option type)
+- buckets: the recorded minutes, plus a minute -> latest bucket table
+- slots: a buckets x instruments matrix of quote rows, forward-filled
+  within the trading day
+- quote columns: ltp, bid, ask, quantities, underlying, oi, volume
+
+Everything except the instrument table is opened with np.load(mmap_mode='r'),
+so a lookup is a few array reads and resident memory is bounded by the pages
+a backtest touches, not by how many months of chains are recorded. The index
+is rebuilt only when the source files change.
+"""
+
+import hashlib
+import json
+import os
+from datetime import date, datetime
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+import pyarrow.parquet as pq
+from loguru import logger
+
+
+# Bump whenever the index layout changes - forces a rebuild
+INDEX_VERSION = 1
+
+# Recorded instruments get tokens in their own range (simulated chains use 100000+)
+RECORDED_TOKEN_BASE = 9_000_000
+
+QUOTE_COLUMNS = {
+    'minute': np.int64,
+    'ltp': np.float32,
+    'bid': np.float32,
+    'ask': np.float32,
+    'bid_qty': np.int64,
+    'ask_qty': np.int64,
+    'underlying': np.float32,
+    'oi': np.int64,
+    'volume': np.int64,
+}
+
+InstrumentKey = Tuple[date, int, str]
+
+
+def _local_minutes(timestamps) -> np.ndarray:
+    """Minutes since epoch in exchange-local time (tz-aware input is converted to IST)."""
+    ts = pd.DatetimeIndex(pd.to_datetime(timestamps))
+    if ts.tz is not None:
+        ts = ts.tz_convert('Asia/Kolkata').tz_localize(None)
+    return ts.values.astype('datetime64[m]').astype(np.int64)
+
+
+def _minute_of(at) -> int:
+    """Minutes since epoch for a lookup time (naive times are exchange-local)."""
+    ts = pd.Timestamp(at)
+    if ts.tz is not None:
+        ts = ts.tz_convert('Asia/Kolkata').tz_localize(None)
+    return int(ts.value // 60_000_000_000)
+
+
+def option_symbol(symbol: str, expiry: date, strike: int, option_type: str) -> str:
+    """Trading symbol in the collector's format (NIFTY26FEB25500CE)."""
+    return f"{symbol}{expiry.strftime('%y%b').upper()}{int(strike)}{option_type}"
+
+
+def collected_files(symbol: str, options_dir: Path) -> List[Path]:
+    """Option chain files written by collect_options_data.py for a symbol."""
+    return sorted(Path(options_dir).glob(f"{symbol.upper()}_options_*.parquet"))
+
+
+def breeze_files(symbol: str, breeze_dir: Path) -> List[Path]:
+    """Per-series option files written by download_breeze_data.py for a symbol."""
+    root = Path(breeze_dir) / symbol.upper()
+    return sorted(root.glob(f"*/{symbol.upper()}_*_*_*.parquet"))
+
+
+def _read_collected(path: Path) -> pd.DataFrame:
+    """Normalise a collector day file to instrument key + quote columns."""
+    df = pq.read_table(path, columns=[
+        'timestamp', 'expiry', 'strike', 'option_type', 'trading_symbol',
+        'ltp', 'bid', 'ask', 'bid_qty', 'ask_qty', 'underlying', 'oi', 'volume'
+    ]).to_pandas()
+    df['minute'] = _local_minutes(df.pop('timestamp'))
+    return df
+
+
+def _read_breeze(path: Path) -> pd.DataFrame:
+    """
+    Normalise a Breeze series file ({SYMBOL}_{YYYYMMDD}_{strike}_{CALL|PUT}).
+
+    Breeze history has no order book, so bid/ask are NaN and fills use the
+    last price.
+    """
+    _, expiry, strike, right = path.stem.rsplit('_', 3)
+    raw = pd.read_parquet(path)
+    close = pd.to_numeric(raw['close'], errors='coerce')
+    return pd.DataFrame({
+        'minute': _local_minutes(raw['date']),
+        'expiry': datetime.strptime(expiry, '%Y%m%d').date(),
+        'strike': int(float(strike)),
+        'option_type': 'CE' if right.upper() == 'CALL' else 'PE',
+        'trading_symbol': None,
+        'ltp': close,
+        'bid': np.nan,
+        'ask': np.nan,
+        'bid_qty': 0,
+        'ask_qty': 0,
+        'underlying': np.nan,
+        'oi': pd.to_numeric(raw.get('open_interest', 0), errors='coerce'),
+        'volume': pd.to_numeric(raw.get('volume', 0), errors='coerce'),
+    })
+
+
+def _read_source(path: Path) -> pd.DataFrame:
+    if path.name.split('_')[1] == 'options':
+        df = _read_collected(path)
+    else:
+        df = _read_breeze(path)
+    df['expiry'] = pd.to_datetime(df['expiry']).dt.date
+    df['strike'] = df['strike'].astype(np.int64)
+    return df
+
+
+def _fingerprint(files: Iterable[Path]) -> str:
+    digest = hashlib.sha256(f"v{INDEX_VERSION}".encode())
+    for path in files:
+        stat = path.stat()
+        digest.update(f"{path.name}:{stat.st_size}:{stat.st_mtime_ns}".encode())
+    return digest.hexdigest()[:16]
+
+
+class RecordedOptionChains:
+    """
+    Minute-indexed recorded option chains for one underlying.
+
+    Usage:
+        chains = RecordedOptionChains.load("NIFTY", Path("data/options"))
+        chain = chains.chain(expiry, at=datetime(2026, 2, 6, 10, 30))
+        quote = chains.quote(expiry, 25500, "CE", at)
+    """
+
+    def __init__(self, index_dir: Path, max_stale_minutes: int = 5):
+        """
+        Open a built index (see build()).
+
+        Args:
+            index_dir: Directory written by build()
+            max_stale_minutes: Oldest quote (in minutes before the lookup
+                time) that still counts as current; older is a miss
+        """
+        self.index_dir = Path(index_dir)
+        self.max_stale_minutes = max_stale_minutes
+
+        manifest = json.loads((self.index_dir / 'manifest.json').read_text())
+        self.symbol: str = manifest['symbol']
+        self.fingerprint: str = manifest['fingerprint']
+        self._first_minute: int = manifest['first_minute']
+
+        self._bucket_of_minute = np.load(self.index_dir / 'bucket_of_minute.npy', mmap_mode='r')
+        self._slots = np.load(self.index_dir / 'slots.npy', mmap_mode='r')
+        self._columns = {
+            name: np.load(self.index_dir / f'{name}.npy', mmap_mode='r')
+            for name in QUOTE_COLUMNS
+        }
+
+        # Instrument table is small and lives in memory
+        self._instruments: List[Tuple[date, int, str, str, int]] = [
+            (date.fromisoformat(expiry), strike, option_type, tradingsymbol, first_minute)
+            for expiry, strike, option_type, tradingsymbol, first_minute in manifest['instruments']
+        ]
+        self._ids: Dict[InstrumentKey, int] = {
+            (expiry, strike, option_type): i
+            for i, (expiry, strike, option_type, _, _) in enumerate(self._instruments)
+        }
+        self._by_expiry: Dict[date, np.ndarray] = {}
+        self._by_symbol: Dict[str, List[int]] = {}
+        for i, (expiry, _, _, tradingsymbol, _) in enumerate(self._instruments):
+            self._by_expiry.setdefault(expiry, []).append(i)
+            self._by_symbol.setdefault(tradingsymbol, []).append(i)
+        self._by_expiry = {k: np.array(v, dtype=np.int64) for k, v in self._by_expiry.items()}
+
+        self.hits = 0
+        self.misses = 0
+
+    # =========================================================================
+    # Building
+    # =========================================================================
+
+    @classmethod
+    def load(
+        cls,
+        symbol: str,
+        options_dir: Path = Path("data/options"),
+        breeze_dir: Optional[Path] = None,
+        index_root: Optional[Path] = None,
+        max_stale_minutes: int = 5
+    ) -> Optional["RecordedOptionChains"]:
+        """
+        Open the index for a symbol, building it first if the files changed.
+
+        Args:
+            symbol: Underlying symbol (NIFTY, BANKNIFTY)
+            options_dir: Directory of collector day files
+            breeze_dir: Optional Breeze options directory (data/breeze/options)
+            index_root: Where indexes live (default: {options_dir}/index)
+            max_stale_minutes: See __init__
+
+        Returns:
+            RecordedOptionChains, or None if no recorded chains exist
+        """
+        files = collected_files(symbol, options_dir)
+        if breeze_dir is not None:
+            files += breeze_files(symbol, breeze_dir)
+        if not files:
+            logger.warning(f"No recorded option chains for {symbol} in {options_dir}")
+            return None
+
+        index_dir = Path(index_root or Path(options_dir) / "index") / symbol.upper()
+        manifest = index_dir / 'manifest.json'
+        fingerprint = _fingerprint(files)
+
+        current = None
+        if manifest.exists():
+            try:
+                current = json.loads(manifest.read_text()).get('fingerprint')
+            except Exception as e:
+                logger.warning(f"Unreadable chain index manifest {manifest}, rebuilding: {e}")
+
+        if current != fingerprint:
+            cls.build(symbol, files, index_dir)
+
+        return cls(index_dir, max_stale_minutes=max_stale_minutes)
+
+    @staticmethod
+    def build(symbol: str, files: List[Path], index_dir: Path) -> Path:
+        """
+        Compile recorded chain files into an index directory.
+
+        Two passes over the files, one file at a time: the first collects
+        the instrument universe and recorded minutes, the second writes
+        quote rows straight into memory-mapped output arrays. Memory use
+        is bounded by the largest single file plus the slot matrix pages
+        being written.
+
+        Args:
+            symbol: Underlying symbol
+            files: Collector and/or Breeze option files
+            index_dir: Output directory (replaced)
+
+        Returns:
+            index_dir
+        """
+        index_dir = Path(index_dir)
+        index_dir.mkdir(parents=True, exist_ok=True)
+
+        # Pass 1: instruments, minutes, row count
+        instruments: Dict[InstrumentKey, List] = {}
+        minutes = set()
+        readable = []
+        total_rows = 0
+        for path in files:
+            try:
+                df = _read_source(path)
+            except Exception as e:
+                # The collector's current-day file has no footer until it is closed
+                logger.warning(f"Skipping unreadable option file {path.name}: {e}")
+                continue
+            readable.append(path)
+            total_rows += len(df)
+            minutes.update(np.unique(df['minute']).tolist())
+
+            keys = df.groupby(['expiry', 'strike', 'option_type'], sort=False).agg(
+                first_minute=('minute', 'min'), tradingsymbol=('trading_symbol', 'last')
+            )
+            for (expiry, strike, option_type), row in keys.iterrows():
+                key = (expiry, int(strike), option_type)
+                tradingsymbol = row['tradingsymbol']
+                if pd.isna(tradingsymbol):
+                    tradingsymbol = option_symbol(symbol, expiry, strike, option_type)
+                if key in instruments:
+                    instruments[key][1] = min(instruments[key][1], int(row['first_minute']))
+                else:
+                    instruments[key] = [tradingsymbol, int(row['first_minute'])]
+
+        keys = sorted(instruments)
+        ids = {key: i for i, key in enumerate(keys)}
+        bucket_minutes = np.array(sorted(minutes), dtype=np.int64)
+        first_minute = int(bucket_minutes[0]) if len(bucket_minutes) else 0
+
+        # minute -> latest recorded bucket at or before it
+        span = int(bucket_minutes[-1]) - first_minute + 1 if len(bucket_minutes) else 0
+        bucket_of_minute = np.searchsorted(
+            bucket_minutes, np.arange(first_minute, first_minute + span), side='right'
+        ).astype(np.int32) - 1
+        np.save(index_dir / 'bucket_of_minute.npy', bucket_of_minute)
+
+        # Pass 2: quote rows and slots
+        open_memmap = np.lib.format.open_memmap
+        columns = {
+            name: open_memmap(index_dir / f'{name}.npy', mode='w+', dtype=dtype, shape=(total_rows,))
+            for name, dtype in QUOTE_COLUMNS.items()
+        }
+        slots = open_memmap(
+            index_dir / 'slots.npy', mode='w+', dtype=np.int32,
+            shape=(len(bucket_minutes), len(keys))
+        )
+        slots[:] = -1
+
+        offset = 0
+        for path in readable:
+            df = _read_source(path).sort_values('minute', kind='stable')
+            n = len(df)
+            rows = np.arange(offset, offset + n, dtype=np.int32)
+            for name, dtype in QUOTE_COLUMNS.items():
+                values = pd.to_numeric(df[name], errors='coerce')
+                if np.issubdtype(dtype, np.integer):
+                    values = values.fillna(0)
+                columns[name][offset:offset + n] = values.to_numpy(dtype=dtype)
+
+            buckets = np.searchsorted(bucket_minutes, df['minute'].to_numpy())
+            instrument_ids = np.fromiter(
+                (ids[(e, int(s), t)] for e, s, t in zip(df['expiry'], df['strike'], df['option_type'])),
+                dtype=np.int64, count=n
+            )
+            slots[buckets, instrument_ids] = rows  # Rows are in time order, so the last quote in a minute wins
+            offset += n
+
+        # Carry each instrument's last quote forward within the trading day;
+        # staleness is checked against the quote's own minute at lookup
+        days = bucket_minutes // 1440
+        day_starts = np.flatnonzero(np.r_[True, days[1:] != days[:-1]])
+        day_ends = np.r_[day_starts[1:], len(bucket_minutes)]
+        for start, end in zip(day_starts, day_ends):
+            block = np.asarray(slots[start:end])
+            positions = np.where(block >= 0, np.arange(end - start)[:, None], 0)
+            np.maximum.accumulate(positions, axis=0, out=positions)
+            slots[start:end] = np.take_along_axis(block, positions, axis=0)
+
+        for array in (*columns.values(), slots):
+            array.flush()
+        del columns, slots
+
+        manifest = {
+            'version': INDEX_VERSION,
+            'symbol': symbol.upper(),
+            'fingerprint': _fingerprint(files),
+            'files': [p.name for p in readable],
+            'rows': total_rows,
+            'first_minute': first_minute,
+            'instruments': [
+                [key[0].isoformat(), key[1], key[2], *instruments[key]] for key in keys
+            ],
+        }
+        tmp = index_dir / 'manifest.json.tmp'
+        tmp.write_text(json.dumps(manifest))
+        os.replace(tmp, index_dir / 'manifest.json')
+
+        logger.info(
+            f"Indexed {total_rows} recorded quotes for {symbol}: "
+            f"{len(keys)} instruments, {len(bucket_minutes)} minutes, {len(readable)} files"
+        )
+        return index_dir
+
+    # =========================================================================
+    # Lookups
+    # =========================================================================
+
+    def __len__(self) -> int:
+        return len(self._columns['minute'])
+
+    def _bucket(self, at) -> Tuple[int, int]:
+        """(bucket, minute) for a lookup time; bucket is -1 before the first recording."""
+        minute = _minute_of(at)
+        offset = minute - self._first_minute
+        if offset < 0 or len(self._bucket_of_minute) == 0:
+            return -1, minute
+        return int(self._bucket_of_minute[min(offset, len(self._bucket_of_minute) - 1)]), minute
+
+    def _row(self, instrument_id: int, at) -> int:
+        bucket, minute = self._bucket(at)
+        if bucket < 0:
+            return -1
+        row = int(self._slots[bucket, instrument_id])
+        if row < 0 or minute - int(self._columns['minute'][row]) > self.max_stale_minutes:
+            return -1
+        return row
+
+    def token_for(self, instrument_id: int) -> int:
+        return RECORDED_TOKEN_BASE + instrument_id
+
+    def instrument(self, token: int) -> Optional[InstrumentKey]:
+        """(expiry, strike, option_type) for a recorded instrument token."""
+        instrument_id = token - RECORDED_TOKEN_BASE
+        if 0 <= instrument_id < len(self._instruments):
+            expiry, strike, option_type, _, _ = self._instruments[instrument_id]
+            return expiry, strike, option_type
+        return None
+
+    def _quote_row(self, instrument_id: int, row: int) -> Dict:
+        expiry, strike, option_type, tradingsymbol, _ = self._instruments[instrument_id]
+        quote = {name: column[row].item() for name, column in self._columns.items()}
+        quote.update({
+            'instrument_token': self.token_for(instrument_id),
+            'tradingsymbol': tradingsymbol,
+            'expiry': expiry,
+            'strike': strike,
+            'instrument_type': option_type,
+            'timestamp': pd.Timestamp(int(quote.pop('minute')), unit='m').to_pydatetime(),
+        })
+        return quote
+
+    def quote(self, expiry: date, strike: int, option_type: str, at) -> Optional[Dict]:
+        """
+        Latest recorded quote for one option at a time.
+
+        Returns:
+            Dict of ltp, bid, ask, bid_qty, ask_qty, underlying, oi, volume,
+            timestamp and instrument fields, or None if the option was not
+            recorded within max_stale_minutes of `at`
+        """
+        instrument_id = self._ids.get((expiry, int(strike), option_type))
+        row = self._row(instrument_id, at) if instrument_id is not None else -1
+        if row < 0:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return self._quote_row(instrument_id, row)
+
+    def quote_token(self, token: int, at) -> Optional[Dict]:
+        """Latest recorded quote for a recorded instrument token."""
+        key = self.instrument(token)
+        return self.quote(*key, at) if key else None
+
+    def quote_symbol(self, tradingsymbol: str, at) -> Optional[Dict]:
+        """
+        Latest recorded quote for a trading symbol.
+
+        Collector symbols omit the expiry day, so weekly expiries in one
+        month share a symbol; the nearest expiry not yet past wins.
+        """
+        today = pd.Timestamp(at).date()
+        for instrument_id in sorted(self._by_symbol.get(tradingsymbol, []), key=lambda i: self._instruments[i][0]):
+            expiry, strike, option_type, _, _ = self._instruments[instrument_id]
+            if expiry >= today:
+                return self.quote(expiry, strike, option_type, at)
+        self.misses += 1
+        return None
+
+    def chain(self, expiry: date, at) -> pd.DataFrame:
+        """
+        Recorded chain for an expiry at a time (one vectorised read).
+
+        Returns:
+            DataFrame with strike, expiry, instrument_type, tradingsymbol,
+            instrument_token, ltp, last_price, bid, ask, bid_qty, ask_qty,
+            underlying, oi, volume, timestamp; empty if nothing is current
+        """
+        instrument_ids = self._by_expiry.get(expiry)
+        bucket, minute = self._bucket(at)
+        if instrument_ids is None or bucket < 0:
+            self.misses += 1
+            return pd.DataFrame()
+
+        rows = np.asarray(self._slots[bucket, instrument_ids]).astype(np.int64)
+        valid = rows >= 0
+        valid[valid] = minute - np.asarray(self._columns['minute'][rows[valid]]) <= self.max_stale_minutes
+        instrument_ids, rows = instrument_ids[valid], rows[valid]
+        if len(rows) == 0:
+            self.misses += 1
+            return pd.DataFrame()
+
+        self.hits += 1
+        instruments = [self._instruments[i] for i in instrument_ids]
+        data = {
+            'strike': [inst[1] for inst in instruments],
+            'expiry': [expiry] * len(rows),
+            'instrument_type': [inst[2] for inst in instruments],
+            'tradingsymbol': [inst[3] for inst in instruments],
+            'instrument_token': RECORDED_TOKEN_BASE + instrument_ids,
+            'name': [self.symbol] * len(rows),
+        }
+        for name, column in self._columns.items():
+            data[name] = np.asarray(column[rows])
+        data['timestamp'] = data.pop('minute').astype('datetime64[m]').astype('datetime64[ns]')
+        data['last_price'] = data['ltp']
+        return pd.DataFrame(data)
+
+    def instruments(self, at) -> pd.DataFrame:
+        """Recorded options already listed at `at` and not yet expired (instruments API shape)."""
+        minute = _minute_of(at)
+        today = pd.Timestamp(at).date()
+        rows = [
+            {
+                'instrument_token': self.token_for(i),
+                'tradingsymbol': tradingsymbol,
+                'name': self.symbol,
+                'exchange': 'NFO',
+                'segment': 'NFO-OPT',
+                'instrument_type': option_type,
+                'expiry': expiry,
+                'strike': strike,
+            }
+            for i, (expiry, strike, option_type, tradingsymbol, first_minute) in enumerate(self._instruments)
+            if expiry >= today and first_minute <= minute
+        ]
+        return pd.DataFrame(rows)
+
+    def get_stats(self) -> Dict:
+        return {
+            'symbol': self.symbol,
+            'rows': len(self),
+            'instruments': len(self._instruments),
+            'minutes': int(self._slots.shape[0]),
+            'hits': self.hits,
+            'misses': self.misses,
+        }
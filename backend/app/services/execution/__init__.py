@@ -1,28 +1,39 @@
 """Trade execution and risk management module"""
 
-from .executor import Executor
-from .treasury import Treasury
-from .circuit_breaker import CircuitBreaker
-from .greek_hedger import GreekHedger
-from .portfolio_service import PortfolioService
-from .audit_logger import (
-    ExecutionAuditLogger,
-    AuditEventType,
-    AuditEntry,
-    get_audit_logger
-)
-from .trailing_stop_service import (
-    TrailingStopService,
-    TrailingStopState,
-    get_trailing_stop_service
-)
+from ...core.lazy import lazy_exports
+
+# Submodules are imported on first use of one of their names (see core/lazy.py)
+__getattr__, __dir__ = lazy_exports(__name__, {
+    ".executor": ["Executor"],
+    ".order_tracker": ["OrderTracker"],
+    ".treasury": ["Treasury"],
+    ".circuit_breaker": ["CircuitBreaker"],
+    ".greek_hedger": ["GreekHedger"],
+    ".greeks_aggregator": ["LiveGreeksAggregator"],
+    ".leg_book": ["LegBook"],
+    ".risk_grid": ["RiskGridEngine", "RiskGridConfig", "RiskGrid"],
+    ".portfolio_service": ["PortfolioService"],
+    ".margin_service": ["MarginService", "MarginLeg", "MarginEstimate", "get_margin_service"],
+    ".audit_logger": ["ExecutionAuditLogger", "AuditEventType", "AuditEntry", "get_audit_logger"],
+    ".trailing_stop_service": ["TrailingStopService", "TrailingStopState", "get_trailing_stop_service"],
+})
 
 __all__ = [
     "Executor",
+    "OrderTracker",
     "Treasury",
     "CircuitBreaker",
     "GreekHedger",
+    "LiveGreeksAggregator",
+    "LegBook",
+    "RiskGridEngine",
+    "RiskGridConfig",
+    "RiskGrid",
     "PortfolioService",
+    "MarginService",
+    "MarginLeg",
+    "MarginEstimate",
+    "get_margin_service",
     "ExecutionAuditLogger",
     "AuditEventType",
     "AuditEntry",
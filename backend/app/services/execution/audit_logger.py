@@ -12,6 +12,8 @@ from loguru import logger
 import json
 import uuid
 
+from ...core.tracing import current_trace_id, get_tracer
+
 
 class AuditEventType(str, Enum):
     """Types of audit events."""
@@ -29,6 +31,7 @@ class AuditEventType(str, Enum):
     ORDER_PARTIAL_FILL = "order_partial_fill"
     ORDER_REJECTED = "order_rejected"
     ORDER_TIMEOUT = "order_timeout"
+    LEG_SKEW = "leg_skew"
     
     # Position events
     POSITION_OPENED = "position_opened"
@@ -71,6 +74,7 @@ class AuditEntry:
     # Context
     correlation_id: str  # Links related events (e.g., signal -> order -> fill)
     agent: str  # Which agent generated this event
+    trace_id: Optional[str] = None  # Iteration trace the trade was placed in
     
     # Trade context
     trade_id: Optional[str] = None
@@ -117,7 +121,8 @@ class ExecutionAuditLogger:
     Centralized audit logger for all execution events.
     
     Features:
-    - Correlation IDs to link related events
+    - Correlation IDs to link related events, one per trade
+    - Trace IDs so a trade's events join the iteration trace it was placed in
     - Structured logging for easy querying
     - In-memory buffer with periodic flush to database
     - Log file backup for compliance
@@ -135,6 +140,7 @@ class ExecutionAuditLogger:
         
         self._buffer: List[AuditEntry] = []
         self._correlation_map: Dict[str, str] = {}  # trade_id -> correlation_id
+        self._trace_map: Dict[str, str] = {}  # trade_id -> trace_id
         
         logger.info(f"ExecutionAuditLogger initialized: buffer_size={buffer_size}")
     
@@ -156,6 +162,16 @@ class ExecutionAuditLogger:
             self._correlation_map[trade_id] = corr_id
         return corr_id
     
+    def _trace_id_for(self, trade_id: Optional[str] = None) -> Optional[str]:
+        """Active trace id, else the trace the trade was first seen in."""
+        trace_id = current_trace_id()
+        if trade_id:
+            if trace_id:
+                self._trace_map.setdefault(trade_id, trace_id)
+            else:
+                trace_id = self._trace_map.get(trade_id)
+        return trace_id
+    
     def log(
         self,
         event_type: AuditEventType,
@@ -204,6 +220,7 @@ class ExecutionAuditLogger:
         # Get or create correlation ID
         if not correlation_id:
             correlation_id = self.get_or_create_correlation_id(trade_id)
+        trace_id = self._trace_id_for(trade_id)
         
         entry = AuditEntry(
             event_id=self._generate_event_id(),
@@ -211,6 +228,7 @@ class ExecutionAuditLogger:
             event_type=event_type,
             correlation_id=correlation_id,
             agent=agent,
+            trace_id=trace_id,
             trade_id=trade_id,
             position_id=position_id,
             order_id=order_id,
@@ -230,6 +248,20 @@ class ExecutionAuditLogger:
         # Add to buffer
         self._buffer.append(entry)
         
+        # Trace event under the trade's iteration trace (GET /traces/trade/{trade_id}),
+        # or its correlation id when it was never traced
+        get_tracer().event(
+            f"audit.{entry.event_type.value}",
+            trace_id=trace_id or correlation_id,
+            correlation_id=correlation_id,
+            agent=agent,
+            trade_id=trade_id,
+            position_id=position_id,
+            order_id=order_id,
+            instrument=instrument,
+            success=success
+        )
+        
         # Log to loguru
         log_msg = (
             f"[{entry.event_type.value}] {agent} | "
@@ -294,6 +326,7 @@ class ExecutionAuditLogger:
                         timestamp=entry.timestamp,
                         event_type=entry.event_type.value,
                         correlation_id=entry.correlation_id,
+                        trace_id=entry.trace_id,
                         agent=entry.agent,
                         trade_id=entry.trade_id,
                         position_id=entry.position_id,
@@ -526,6 +559,50 @@ class ExecutionAuditLogger:
             }
         )
     
+    def log_leg_skew(
+        self,
+        trade_id: str,
+        instrument: str,
+        structure: str,
+        legs: int,
+        submit_skew_ms: float,
+        fill_skew_ms: Optional[float] = None,
+        details: Optional[Dict] = None
+    ) -> AuditEntry:
+        """Log time between the first and last leg of a multi-leg structure."""
+        return self.log(
+            event_type=AuditEventType.LEG_SKEW,
+            agent="Executor",
+            trade_id=trade_id,
+            instrument=instrument,
+            details={
+                "structure": structure,
+                "legs": legs,
+                "submit_skew_ms": submit_skew_ms,
+                "fill_skew_ms": fill_skew_ms,
+                **(details or {})
+            }
+        )
+    
+    def log_rollback(
+        self,
+        trade_id: str,
+        instrument: str,
+        legs: List[str],
+        success: bool,
+        details: Optional[Dict] = None
+    ) -> AuditEntry:
+        """Log the unwinding of filled legs after a multi-leg entry failed."""
+        return self.log(
+            event_type=AuditEventType.ROLLBACK_INITIATED,
+            agent="Executor",
+            trade_id=trade_id,
+            instrument=instrument,
+            success=success,
+            error_message=None if success else "Filled legs not fully closed",
+            details={"legs": legs, **(details or {})}
+        )
+    
     def log_execution_error(
         self,
         trade_id: str,
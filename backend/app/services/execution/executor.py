@@ -1,5 +1,7 @@
 """Executor Agent - Order Execution for Trading System v2.0"""
 
+import contextvars
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, time
 from typing import Dict, List, Optional, Tuple
 from loguru import logger
@@ -8,14 +10,19 @@ import uuid
 from ..agents import BaseAgent
 from ...core.kite_client import KiteClient
 from ...core.state_manager import StateManager
+from ...core.rate_limiter import APIEndpoint, get_rate_limiter
 from ...config.settings import Settings
 from .greek_hedger import GreekHedger, GreekHedgeRecommendation, HedgeType
+from .order_tracker import OrderTracker
+from .greeks_aggregator import LiveGreeksAggregator
+from .leg_book import LegBook
+from .audit_logger import get_audit_logger
 from ...config.constants import (
     NFO, BUY, SELL, ORDER_TYPE_LIMIT, ORDER_TYPE_MARKET,
     PRODUCT_NRML, PRODUCT_MIS,
     INTRADAY_EXIT_HOUR, INTRADAY_EXIT_MINUTE,
     EXIT_PROFIT_TARGET, EXIT_STOP_LOSS, EXIT_TIME_BASED, EXIT_EOD,
-    EXIT_REGIME_CHANGE, EXIT_CIRCUIT_BREAKER
+    EXIT_REGIME_CHANGE, EXIT_CIRCUIT_BREAKER, UNDERLYING_TOKENS
 )
 from ...config.thresholds import SLIPPAGE_ALERT_THRESHOLD, SLIPPAGE_AUTO_CORRECT_THRESHOLD
 from ...models.trade import TradeSignal, TradeLeg
@@ -26,6 +33,12 @@ from ...database import Repository, BrokerPosition
 from ...database.models import Strategy, StrategyPosition, Portfolio
 
 
+# Concurrent order placement
+MAX_CONCURRENT_ORDERS = 8  # Legs in flight at once (broker limit is 10 orders/s)
+HEDGE_FIRST_MARGIN_HEADROOM = 3.0  # Hedges go first unless free margin covers this multiple of the hedged margin
+ROLLBACK_SETTLE_SECONDS = 5  # Wait for cancelled orders' final state (a fill may beat the cancel)
+
+
 class Executor(BaseAgent):
     """
     Order execution agent.
@@ -45,11 +58,14 @@ class Executor(BaseAgent):
         config: Settings,
         state_manager: Optional[StateManager] = None,
         greek_hedger: Optional[GreekHedger] = None,
-        treasury: Optional[object] = None  # Avoid circular import
+        treasury: Optional[object] = None,  # Avoid circular import
+        order_tracker: Optional[OrderTracker] = None,
+        greeks_aggregator: Optional[LiveGreeksAggregator] = None
     ):
         super().__init__(kite, config, name="Executor")
         self._pending_orders: Dict[str, OrderTicket] = {}
         self._positions: Dict[str, Position] = {}
+        self._leg_book = LegBook()  # Open legs as arrays for the monitoring pass
         self.repository = Repository()
         self.state_manager = state_manager or StateManager()
         
@@ -65,9 +81,26 @@ class Executor(BaseAgent):
         # Track existing structures to prevent duplicates
         self._existing_structures: set = set()
         
+        # Fill detection from pushed order updates (reconcile as fallback)
+        self.order_tracker = order_tracker or OrderTracker(kite)
+        self.order_tracker.start()
+        
+        # Leg dispatch (all legs of a structure are sent concurrently)
+        self._order_pool = ThreadPoolExecutor(
+            max_workers=MAX_CONCURRENT_ORDERS, thread_name_prefix="executor-order"
+        )
+        self._rate_limiter = get_rate_limiter()
+        self._audit = get_audit_logger()
+        
         # Always load existing paper positions from DB to prevent duplicates
         # This is needed regardless of paper_mode since we track all paper strategies
         self._load_positions()
+        
+        # Live Greeks: open legs repriced on ticks, totals fed to the hedger
+        self.greeks_aggregator = greeks_aggregator or LiveGreeksAggregator(hedger=self.greek_hedger, kite=kite)
+        self.greeks_aggregator.set_positions(self.get_open_positions())
+        if greeks_aggregator is None and not kite.mock_mode:
+            self.greeks_aggregator.start()
     
     def process(self, signal: TradeSignal) -> ExecutionResult:
         """
@@ -81,33 +114,26 @@ class Executor(BaseAgent):
         """
         self.logger.info(f"Executing signal: {signal.structure.value} on {signal.instrument}")
         
-        orders = []
-        failed_legs = []
+        orders = [self._create_order_ticket(signal, leg) for leg in signal.legs]
         
-        # Place orders for each leg
-        for leg in signal.legs:
-            order = self._create_order_ticket(signal, leg)
-            
-            try:
-                order_id = self._place_order(order)
-                order.broker_order_id = order_id
-                order.status = OrderStatus.OPEN
-                order.submitted_at = datetime.now()
-                orders.append(order)
+        # Place all legs concurrently (hedges first when margin needs it)
+        self._place_legs(signal, orders)
+        
+        failed_legs = []
+        for order in orders:
+            if order.status == OrderStatus.OPEN:
                 self._pending_orders[order.id] = order
-                
-            except Exception as e:
-                self.logger.error(f"Failed to place order for {leg.tradingsymbol}: {e}")
-                order.status = OrderStatus.REJECTED
-                failed_legs.append(leg.leg_id)
-                orders.append(order)
+            elif not order.is_complete:
+                failed_legs.append(order.leg_id)
         
         # Check if all legs executed
         success = len(failed_legs) == 0
+        position = None
         
         if success:
             # Wait for fills and create position
             self._wait_for_fills(orders)
+            self._log_leg_skew(signal.id, signal.instrument, signal.structure.value, orders)
             position = self._create_position(signal, orders)
             if position:
                 # Guard: Don't persist positions with zero entry price (API quotes unavailable)
@@ -120,6 +146,8 @@ class Executor(BaseAgent):
                         error="Zero entry price - API quotes unavailable"
                     )
                 self._positions[position.id] = position
+                self.greeks_aggregator.add_position(position)
+                self._leg_book.set_positions(self.get_open_positions())
                 # Persist position to database (both paper and live)
                 self._persist_position(position)
                 if self.kite.paper_mode:
@@ -127,10 +155,13 @@ class Executor(BaseAgent):
                     self._update_paper_margin(signal.approved_margin, add=True)
                     # Track this structure as having an open position
                     if hasattr(self, '_existing_structures'):
-                        self._existing_structures.add(position.strategy_type.value)
+                        self._existing_structures.add((position.instrument, position.strategy_type.value))
         else:
             # Rollback successful orders if partial failure
             self._rollback_orders([o for o in orders if o.status == OrderStatus.OPEN])
+            # Legs that already filled (e.g. hedges placed first) have no
+            # Position to exit through: close them now
+            self._unwind_filled_legs(signal, orders)
         
         # Calculate totals
         total_value = sum(
@@ -196,47 +227,207 @@ class Executor(BaseAgent):
             tag=order.tag
         )
     
+    def _dispatch_orders(self, orders: List[OrderTicket]) -> None:
+        """
+        Send orders to the broker concurrently, within the order rate limit.
+        
+        Orders that fail to place are marked REJECTED; placed orders are OPEN.
+        """
+        def send(order: OrderTicket) -> None:
+            self._rate_limiter.acquire_slot(APIEndpoint.ORDER)
+            try:
+                order.broker_order_id = self._place_order(order)
+                order.status = OrderStatus.OPEN
+                order.submitted_at = datetime.now()
+            except Exception as e:
+                self.logger.error(f"Failed to place order for {order.tradingsymbol}: {e}")
+                order.status = OrderStatus.REJECTED
+        
+        if len(orders) == 1:
+            send(orders[0])
+            return
+        # Each leg runs in a copy of this context so its spans and audit
+        # events stay in the caller's trace
+        futures = [self._order_pool.submit(contextvars.copy_context().run, send, o) for o in orders]
+        for future in futures:
+            future.result()
+    
+    def _place_legs(self, signal: TradeSignal, orders: List[OrderTicket]) -> None:
+        """
+        Place all legs of a structure.
+        
+        Normally every leg is dispatched at once. When free margin would not
+        cover the short legs without the hedge benefit, long (hedge) legs are
+        placed and filled first, then the short legs are sent together. If the
+        hedge wave fails, the short legs are not sent; if the short wave fails,
+        process() unwinds the filled hedges.
+        """
+        if not self._requires_hedge_first(signal, orders):
+            self._dispatch_orders(orders)
+            return
+        
+        hedges = [o for o in orders if o.transaction_type == TransactionType.BUY]
+        shorts = [o for o in orders if o.transaction_type == TransactionType.SELL]
+        self.logger.info(f"Hedge-first placement: {len(hedges)} hedges, then {len(shorts)} short legs")
+        
+        self._dispatch_orders(hedges)
+        if any(o.status == OrderStatus.REJECTED for o in hedges):
+            return
+        
+        self._wait_for_fills(hedges)
+        if not all(o.is_complete for o in hedges):
+            self.logger.warning("Hedge legs did not fill, not placing short legs")
+            return
+        
+        self._dispatch_orders(shorts)
+    
+    def _requires_hedge_first(self, signal: TradeSignal, orders: List[OrderTicket]) -> bool:
+        """Whether short legs need filled hedges for margin benefit."""
+        has_long = any(o.transaction_type == TransactionType.BUY for o in orders)
+        has_short = any(o.transaction_type == TransactionType.SELL for o in orders)
+        if not (has_long and has_short):
+            return False
+        
+        # Treasury's account snapshot saves a get_margins round trip per entry
+        available = signal.available_margin
+        if available is None:
+            available = self._available_margin()
+        if available is None:
+            return True  # Unknown margin: be safe
+        return available < signal.approved_margin * HEDGE_FIRST_MARGIN_HEADROOM
+    
+    def _available_margin(self) -> Optional[float]:
+        """Free equity margin from the broker, None if unavailable."""
+        try:
+            margins = self.kite.get_margins()
+            available = margins.get("equity", {}).get("available", {})
+            value = available.get("live_balance", available.get("cash"))
+            return float(value) if value is not None else None
+        except Exception as e:
+            self.logger.warning(f"Failed to get available margin: {e}")
+            return None
+    
+    def _log_leg_skew(
+        self,
+        trade_id: str,
+        instrument: str,
+        structure: str,
+        orders: List[OrderTicket]
+    ) -> None:
+        """Record time between first and last leg submission/fill."""
+        if len(orders) < 2:
+            return
+        
+        submitted = [o.submitted_at for o in orders if o.submitted_at]
+        filled = [o.filled_at for o in orders if o.filled_at]
+        submit_skew = (max(submitted) - min(submitted)).total_seconds() * 1000 if submitted else None
+        fill_skew = (max(filled) - min(filled)).total_seconds() * 1000 if len(filled) == len(orders) else None
+        
+        if submit_skew is None:
+            return
+        self._audit.log_leg_skew(
+            trade_id=trade_id,
+            instrument=instrument,
+            structure=structure,
+            legs=len(orders),
+            submit_skew_ms=round(submit_skew, 2),
+            fill_skew_ms=round(fill_skew, 2) if fill_skew is not None else None
+        )
+    
     def _wait_for_fills(self, orders: List[OrderTicket], timeout_seconds: int = 30) -> None:
-        """Wait for orders to fill and track slippage."""
-        import time as time_module
-        
-        start = datetime.now()
-        pending = [o for o in orders if o.status == OrderStatus.OPEN]
-        
-        while pending and (datetime.now() - start).seconds < timeout_seconds:
-            for order in pending:
-                if order.broker_order_id:
-                    history = self.kite.get_order_history(order.broker_order_id)
-                    if history:
-                        latest = history[-1]
-                        status = latest.get("status", "")
-                        
-                        if status == "COMPLETE":
-                            order.status = OrderStatus.COMPLETE
-                            order.filled_quantity = latest.get("filled_quantity", order.quantity)
-                            order.average_price = latest.get("average_price", order.price)
-                            order.filled_at = datetime.now()
-                            
-                            # Track slippage (Section 8)
-                            self._track_slippage(order)
-                            
-                        elif status in ["CANCELLED", "REJECTED"]:
-                            order.status = OrderStatus(status)
+        """Wait for all orders to fill concurrently and track slippage."""
+        pending = [o for o in orders if o.status == OrderStatus.OPEN and o.broker_order_id]
+        if not pending:
+            return
+        
+        updates = self.order_tracker.wait_all(
+            [o.broker_order_id for o in pending], timeout=timeout_seconds
+        )
+        
+        for order in pending:
+            latest = updates.get(order.broker_order_id)
+            if not latest:
+                continue
+            status = latest.get("status", "")
             
-            pending = [o for o in orders if o.status == OrderStatus.OPEN]
-            if pending:
-                time_module.sleep(1)
+            if status == "COMPLETE":
+                order.status = OrderStatus.COMPLETE
+                order.filled_quantity = latest.get("filled_quantity", order.quantity)
+                order.average_price = latest.get("average_price", order.price)
+                order.filled_at = datetime.now()
+                
+                # Track slippage (Section 8)
+                self._track_slippage(order)
+                
+            elif status in ["CANCELLED", "REJECTED"]:
+                order.status = OrderStatus(status)
     
     def _rollback_orders(self, orders: List[OrderTicket]) -> None:
-        """Cancel open orders on failure."""
-        for order in orders:
-            if order.broker_order_id and order.status == OrderStatus.OPEN:
-                try:
-                    self.kite.cancel_order(order.broker_order_id)
-                    order.status = OrderStatus.CANCELLED
-                    self.logger.info(f"Cancelled order: {order.broker_order_id}")
-                except Exception as e:
-                    self.logger.error(f"Failed to cancel order {order.broker_order_id}: {e}")
+        """
+        Cancel open orders on failure.
+        
+        A cancel can lose the race with a fill, so the broker's final state is
+        awaited; orders that filled anyway stay COMPLETE (and are unwound).
+        """
+        open_orders = [o for o in orders if o.broker_order_id and o.status == OrderStatus.OPEN]
+        cancelled = []
+        for order in open_orders:
+            try:
+                self.kite.cancel_order(order.broker_order_id)
+                cancelled.append(order)
+                self.logger.info(f"Cancelled order: {order.broker_order_id}")
+            except Exception as e:
+                self.logger.error(f"Failed to cancel order {order.broker_order_id}: {e}")
+        
+        self._wait_for_fills(open_orders, timeout_seconds=ROLLBACK_SETTLE_SECONDS)
+        for order in cancelled:
+            if order.status == OrderStatus.OPEN:
+                order.status = OrderStatus.CANCELLED
+    
+    def _unwind_filled_legs(self, signal: TradeSignal, orders: List[OrderTicket]) -> List[OrderTicket]:
+        """
+        Send market orders offsetting the legs of a failed entry that filled.
+        
+        Returns:
+            The offsetting orders (empty if no leg had filled)
+        """
+        filled = [o for o in orders if o.is_complete and o.filled_quantity]
+        if not filled:
+            return []
+        
+        unwind = [
+            OrderTicket(
+                signal_id=o.signal_id,
+                leg_id=o.leg_id,
+                tradingsymbol=o.tradingsymbol,
+                exchange=o.exchange,
+                transaction_type=(
+                    TransactionType.SELL if o.transaction_type == TransactionType.BUY else TransactionType.BUY
+                ),
+                quantity=o.filled_quantity,
+                order_type=OrderType.MARKET,
+                product=o.product,
+                tag="TV2_UNWIND"
+            )
+            for o in filled
+        ]
+        self.logger.warning(
+            f"Entry failed after {len(filled)} legs filled, unwinding: {[o.tradingsymbol for o in filled]}"
+        )
+        self._dispatch_orders(unwind)
+        self._wait_for_fills(unwind)
+        
+        open_legs = [o.tradingsymbol for o in unwind if not o.is_complete]
+        if open_legs:
+            self.logger.error(f"Unwind incomplete, close manually: {open_legs}")
+        self._audit.log_rollback(
+            trade_id=signal.id,
+            instrument=signal.instrument,
+            legs=[o.tradingsymbol for o in filled],
+            success=not open_legs,
+            details={"unfilled": open_legs}
+        )
+        return unwind
     
     def _create_position(self, signal: TradeSignal, orders: List[OrderTicket]) -> Optional[Position]:
         """Create position from executed orders."""
@@ -269,7 +460,11 @@ class Executor(BaseAgent):
             signal_id=signal.id,
             strategy_type=signal.structure,
             instrument=signal.instrument,
-            instrument_token=signal.legs[0].instrument_token,
+            instrument_token=(
+                signal.instrument_token
+                or UNDERLYING_TOKENS.get(signal.instrument)
+                or signal.legs[0].instrument_token
+            ),
             legs=legs,
             entry_price=entry_price,
             entry_margin=signal.approved_margin,
@@ -297,7 +492,8 @@ class Executor(BaseAgent):
         self,
         current_prices: Dict[int, float],
         current_regime: Optional[RegimeType] = None,
-        check_greeks: bool = True
+        check_greeks: bool = True,
+        regimes_by_instrument: Optional[Dict[str, RegimeType]] = None
     ) -> List[ExitOrder]:
         """
         Monitor positions and generate exit orders.
@@ -311,12 +507,18 @@ class Executor(BaseAgent):
             current_prices: Dict of token -> current price
             current_regime: Current market regime
             check_greeks: Whether to check portfolio Greeks
+            regimes_by_instrument: Optional per-underlying regimes; positions
+                on a listed instrument use it instead of current_regime
             
         Returns:
             List of exit orders to execute
         """
         exit_orders = []
-        now = datetime.now()
+        now = self.clock()
+        
+        # Revalue all open legs in one pass; models are synced per position below
+        self._leg_book.update(current_prices)
+        profit_hit, stop_hit = self._leg_book.exit_flags()
         
         # Update portfolio Greeks and check for hedging needs
         if check_greeks:
@@ -328,7 +530,13 @@ class Executor(BaseAgent):
                 continue
             
             # Update position P&L
-            position.update_pnl(current_prices)
+            if self._leg_book.sync(position, legs=False):
+                i = self._leg_book.index(pos_id)
+                hit_profit, hit_stop = profit_hit[i], stop_hit[i]
+            else:
+                # Not laid out in the book (added outside process())
+                position.update_pnl(current_prices)
+                hit_profit, hit_stop = position.should_exit_profit(), position.should_exit_stop()
             
             # Check EOD exit for intraday
             if position.is_intraday:
@@ -355,7 +563,7 @@ class Executor(BaseAgent):
                     continue
             
             # Check profit target (dynamic from Section 4)
-            if position.should_exit_profit():
+            if hit_profit:
                 exit_orders.append(ExitOrder(
                     position_id=pos_id,
                     exit_reason=EXIT_PROFIT_TARGET,
@@ -364,7 +572,7 @@ class Executor(BaseAgent):
                 continue
             
             # Check stop loss
-            if position.should_exit_stop():
+            if hit_stop:
                 exit_orders.append(ExitOrder(
                     position_id=pos_id,
                     exit_reason=EXIT_STOP_LOSS,
@@ -374,8 +582,7 @@ class Executor(BaseAgent):
                 continue
             
             # Check time-based exit (DTE)
-            from datetime import date
-            current_dte = (position.expiry - date.today()).days if position.expiry else 999
+            current_dte = (position.expiry - now.date()).days if position.expiry else 999
             if position.should_exit_time(current_dte):
                 exit_orders.append(ExitOrder(
                     position_id=pos_id,
@@ -385,7 +592,10 @@ class Executor(BaseAgent):
                 continue
             
             # Check regime change
-            if current_regime == RegimeType.CHAOS:
+            regime = current_regime
+            if regimes_by_instrument and position.instrument in regimes_by_instrument:
+                regime = regimes_by_instrument[position.instrument]
+            if regime == RegimeType.CHAOS:
                 exit_orders.append(ExitOrder(
                     position_id=pos_id,
                     exit_reason=EXIT_REGIME_CHANGE,
@@ -406,10 +616,20 @@ class Executor(BaseAgent):
             )
         
         self.logger.info(f"Executing exit for {position.id}: {exit_order.exit_reason}")
+        self._leg_book.sync(position)  # Exit limit prices come from the legs
+        
+        orders = self._create_exit_orders(position, exit_order)
+        self._dispatch_orders(orders)
         
+        # Wait for fills
+        self._wait_for_fills(orders)
+        
+        return self._complete_exit(position, exit_order, orders)
+    
+    def _create_exit_orders(self, position: Position, exit_order: ExitOrder) -> List[OrderTicket]:
+        """Create closing orders for each leg of a position."""
         orders = []
         
-        # Create closing orders for each leg
         for leg in position.legs:
             # Reverse the transaction type
             if leg.is_long:
@@ -417,31 +637,31 @@ class Executor(BaseAgent):
             else:
                 transaction_type = TransactionType.BUY
             
-            order = OrderTicket(
+            orders.append(OrderTicket(
                 signal_id=position.signal_id,
                 leg_id=leg.leg_id,
                 tradingsymbol=leg.tradingsymbol,
                 exchange=leg.exchange,
                 transaction_type=transaction_type,
                 quantity=leg.quantity,
-                order_type=OrderType.MARKET if exit_order.urgency == "HIGH" else OrderType.LIMIT,
+                order_type=OrderType.MARKET if exit_order.urgency in ("HIGH", "EMERGENCY") else OrderType.LIMIT,
                 product=ProductType.MIS if position.is_intraday else ProductType.NRML,
                 price=leg.current_price,
                 tag=f"TV2_EXIT"
-            )
-            
-            try:
-                order_id = self._place_order(order)
-                order.broker_order_id = order_id
-                order.status = OrderStatus.OPEN
-                orders.append(order)
-            except Exception as e:
-                self.logger.error(f"Failed to place exit order: {e}")
-                order.status = OrderStatus.REJECTED
-                orders.append(order)
+            ))
         
-        # Wait for fills
-        self._wait_for_fills(orders)
+        return orders
+    
+    def _complete_exit(
+        self,
+        position: Position,
+        exit_order: ExitOrder,
+        orders: List[OrderTicket]
+    ) -> ExecutionResult:
+        """Book a filled exit: close the position and record the result."""
+        self._log_leg_skew(
+            position.signal_id, position.instrument, position.strategy_type.value, orders
+        )
         
         # Calculate realized P&L
         exit_value = sum(
@@ -453,6 +673,8 @@ class Executor(BaseAgent):
         
         # Close position
         position.close(exit_value, exit_order.exit_reason)
+        self.greeks_aggregator.remove_position(position.id)
+        self._leg_book.set_positions(self.get_open_positions())
         
         if self.kite.paper_mode:
             self._persist_position(position)  # Update position status in DB
@@ -486,13 +708,19 @@ class Executor(BaseAgent):
         return result
     
     def flatten_all(self, reason: str = EXIT_CIRCUIT_BREAKER) -> List[ExecutionResult]:
-        """Emergency flatten all positions."""
-        self.logger.warning(f"FLATTEN ALL: {reason}")
+        """
+        Emergency flatten all positions.
         
-        results = []
+        Closing orders for every leg of every open position are sent in one
+        concurrent batch and their fills awaited together; positions are
+        then booked one by one.
+        """
+        self.logger.warning(f"FLATTEN ALL: {reason}")
         
-        for pos_id, position in self._positions.items():
+        exits = []
+        for pos_id, position in list(self._positions.items()):
             if position.status == PositionStatus.OPEN:
+                self._leg_book.sync(position)
                 exit_order = ExitOrder(
                     position_id=pos_id,
                     exit_reason=reason,
@@ -500,13 +728,35 @@ class Executor(BaseAgent):
                     order_type=OrderType.MARKET,
                     urgency="EMERGENCY"
                 )
-                result = self.execute_exit(exit_order)
-                results.append(result)
+                exits.append((position, exit_order, self._create_exit_orders(position, exit_order)))
+        
+        if not exits:
+            return []
+        
+        all_orders = [o for _, _, orders in exits for o in orders]
+        self._dispatch_orders(all_orders)
+        self._wait_for_fills(all_orders)
+        
+        return [
+            self._complete_exit(position, exit_order, orders)
+            for position, exit_order, orders in exits
+        ]
+    
+    def shutdown(self) -> None:
+        """
+        Detach from the ticker's order update and tick streams.
         
-        return results
+        Each Executor registers callbacks on the process-wide ticker; without
+        this a stopped engine keeps receiving every postback and tick. Fills
+        of later calls (e.g. a flatten after stop) are still detected by
+        reconcile.
+        """
+        self.order_tracker.stop()
+        self.greeks_aggregator.stop()
     
     def get_positions(self) -> List[Position]:
         """Get all tracked positions."""
+        self._leg_book.sync_all()
         return list(self._positions.values())
     
     def get_open_positions(self) -> List[Position]:
@@ -523,38 +773,10 @@ class Executor(BaseAgent):
         """
         Update GreekHedger with current portfolio Greeks from open positions.
         
-        Aggregates delta, vega, gamma, theta across all open positions.
+        Greeks are repriced at the current spot, vol and time by the live
+        aggregator (legs without a spot tick yet use their entry Greeks).
         """
-        total_delta = 0.0
-        total_vega = 0.0
-        total_gamma = 0.0
-        total_theta = 0.0
-        
-        for position in self._positions.values():
-            if position.status != PositionStatus.OPEN:
-                continue
-            
-            # Get Greeks from position legs
-            for leg in position.legs:
-                delta = getattr(leg, 'delta', 0) or 0
-                vega = getattr(leg, 'vega', 0) or 0
-                gamma = getattr(leg, 'gamma', 0) or 0
-                theta = getattr(leg, 'theta', 0) or 0
-                
-                # Adjust for quantity (negative for short positions)
-                qty_mult = leg.quantity if leg.is_long else -leg.quantity
-                total_delta += delta * qty_mult
-                total_vega += vega * qty_mult
-                total_gamma += gamma * qty_mult
-                total_theta += theta * qty_mult
-        
-        # Update the hedger
-        self.greek_hedger.update_portfolio_greeks(
-            delta=total_delta,
-            vega=total_vega,
-            gamma=total_gamma,
-            theta=total_theta
-        )
+        self.greeks_aggregator.refresh()
     
     def _check_greek_hedging(self) -> List[GreekHedgeRecommendation]:
         """
@@ -704,7 +926,7 @@ class Executor(BaseAgent):
                 self.logger.info(f"Persisted {source} position {position.id} with strategy {strategy.id}")
                 
                 # Update existing structures tracking
-                self._existing_structures.add(position.strategy_type.value)
+                self._existing_structures.add((position.instrument, position.strategy_type.value))
                 
         except Exception as e:
             self.logger.error(f"Failed to persist {source} position: {e}")
@@ -722,11 +944,11 @@ class Executor(BaseAgent):
                 Strategy.status == "OPEN"
             ).all()
             
-            # Track existing structures to prevent duplicates
+            # Track existing (instrument, structure) pairs to prevent duplicates
             self._existing_structures = set()
             for strategy in open_strategies:
                 if strategy.label:
-                    self._existing_structures.add(strategy.label)
+                    self._existing_structures.add((strategy.primary_instrument, strategy.label))
                     self.logger.info(f"Tracking existing structure: {strategy.label} (strategy_id={strategy.id})")
             
             self.logger.info(f"Loaded {len(open_strategies)} open paper strategies, structures: {self._existing_structures}")
@@ -739,23 +961,32 @@ class Executor(BaseAgent):
             self.logger.error(traceback.format_exc())
             self._existing_structures = set()
 
-    def has_open_position_for_structure(self, structure_value: str) -> bool:
-        """Check if there's already an open position for this structure type."""
+    def has_open_position_for_structure(self, structure_value: str, instrument: Optional[str] = None) -> bool:
+        """
+        Check if there's already an open position for this structure type.
+        
+        Args:
+            structure_value: StructureType value, e.g. "IRON_CONDOR"
+            instrument: Underlying to check; None matches any underlying
+        """
+        def matches(pos_instrument, pos_structure):
+            return pos_structure == structure_value and (instrument is None or pos_instrument == instrument)
+        
         # Always refresh from DB FIRST to ensure we have latest state
         self._load_positions()
         
         # Check loaded structures from DB (highest priority)
-        if hasattr(self, '_existing_structures') and structure_value in self._existing_structures:
-            self.logger.info(f"Found existing structure {structure_value} in DB")
+        if any(matches(*key) for key in getattr(self, '_existing_structures', ())):
+            self.logger.info(f"Found existing structure {structure_value} on {instrument or 'any underlying'} in DB")
             return True
         
         # Check in-memory positions as fallback
         for pos in self._positions.values():
-            if pos.strategy_type.value == structure_value:
-                self.logger.info(f"Found existing structure {structure_value} in memory")
+            if matches(pos.instrument, pos.strategy_type.value):
+                self.logger.info(f"Found existing structure {structure_value} on {pos.instrument} in memory")
                 return True
         
-        self.logger.debug(f"No existing position for structure {structure_value}")
+        self.logger.debug(f"No existing position for structure {structure_value} on {instrument or 'any underlying'}")
         return False
 
     def _update_paper_margin(self, margin_amount: float, add: bool = True) -> None:
@@ -0,0 +1,414 @@
+"""
+Live portfolio Greeks aggregation for Trading System v2.0
+
+Leg Greeks captured at entry go stale as spot, time and volatility move.
+LiveGreeksAggregator keeps every open leg in struct-of-arrays form and
+reprices the legs touched by ticks in one vectorized pass:
+
+- underlying ticks update spot for all legs on that underlying
+- option ticks update the leg price, from which implied vol is tracked
+  with a few Newton steps from the previous estimate
+- ticks are coalesced; a flush runs at most every coalesce_interval
+- per-strategy, per-underlying and portfolio totals are adjusted by the
+  change in each repriced leg's contribution (no full re-sum per tick)
+
+Totals are pushed to GreekHedger.update_portfolio_greeks at most every
+hedger_interval, and written back to Position.greeks so AccountState
+aggregation sees live values too. The aggregator starts the ticker itself;
+while no ticks arrive, refresh() seeds spot and option prices from get_ltp.
+"""
+
+import threading
+import time
+from datetime import datetime, time as dt_time
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+from loguru import logger
+
+from ...config.constants import UNDERLYING_TOKENS
+from ...models.position import Position, PositionStatus
+from ..utilities.option_pricing import BlackScholesCalculator
+
+GREEKS = ("delta", "gamma", "theta", "vega")
+YEAR_SECONDS = 365 * 24 * 3600
+EXPIRY_TIME = dt_time(15, 30)
+DEFAULT_VOL = 0.15
+TICK_STALE_SECONDS = 15.0  # No ticks for this long: refresh() polls quotes
+
+
+def _underlying_token(position: Position) -> Optional[int]:
+    """Spot token of a position's underlying (None if unknown)."""
+    token = UNDERLYING_TOKENS.get(position.instrument, position.instrument_token)
+    # Older positions stored their first leg's token here - never a spot
+    if any(leg.instrument_token == token for leg in position.legs):
+        return None
+    return token
+
+
+class LiveGreeksAggregator:
+    """
+    Vectorized, tick-driven Greeks for all open legs.
+
+    Legs of an underlying whose spot has not been seen yet keep the
+    Greeks captured at entry, so totals are never worse than the old
+    static sum.
+    """
+
+    def __init__(
+        self,
+        hedger=None,
+        ticker=None,
+        kite=None,
+        coalesce_interval: float = 0.25,
+        hedger_interval: float = 1.0,
+        risk_free_rate: float = BlackScholesCalculator.DEFAULT_RISK_FREE_RATE
+    ):
+        """
+        Args:
+            hedger: GreekHedger to feed portfolio totals
+            ticker: Tick source with add_callback/subscribe (KiteTickerManager)
+            kite: Quote source (get_ltp) used by refresh() while no ticks arrive
+            coalesce_interval: Minimum seconds between repricing passes
+            hedger_interval: Minimum seconds between hedger updates
+            risk_free_rate: Risk-free rate for pricing
+        """
+        self.hedger = hedger
+        self._ticker = ticker
+        self.kite = kite
+        self.coalesce_interval = coalesce_interval
+        self.hedger_interval = hedger_interval
+        self.risk_free_rate = risk_free_rate
+
+        self._lock = threading.RLock()
+        self._positions: Dict[str, Position] = {}
+        self._started = False
+        self._last_flush = 0.0
+        self._last_publish = 0.0
+        self._last_tick_at: Optional[float] = None
+        self.stats = {"ticks": 0, "flushes": 0, "legs_repriced": 0, "quote_seeds": 0}
+
+        self._reset_arrays(0, [], [])
+
+    # =========================================================================
+    # Position management
+    # =========================================================================
+
+    def set_positions(self, positions: List[Position]) -> None:
+        """Replace the tracked set with the given open positions."""
+        with self._lock:
+            self._positions = {p.id: p for p in positions if p.status == PositionStatus.OPEN}
+            self._rebuild()
+
+    def add_position(self, position: Position) -> None:
+        with self._lock:
+            self._positions[position.id] = position
+            self._rebuild()
+
+    def remove_position(self, position_id: str) -> None:
+        with self._lock:
+            if self._positions.pop(position_id, None) is not None:
+                self._rebuild()
+
+    def start(self) -> None:
+        """Start the ticker if needed, register for ticks and subscribe all leg and underlying tokens."""
+        ticker = self._get_ticker()
+        if ticker is None:
+            return
+        ticker.add_callback(self.on_ticks)
+        self._started = True
+        if not ticker.ensure_started():
+            logger.warning("Kite ticker not running, live Greeks fall back to quotes on refresh")
+        ticker.subscribe(self.tokens())  # Re-sent by the ticker on every (re)connect
+
+    def stop(self) -> None:
+        if self._started and self._ticker is not None:
+            self._ticker.remove_callback(self.on_ticks)
+        self._started = False
+
+    def tokens(self) -> List[int]:
+        with self._lock:
+            return sorted(set(self._leg_index) | set(self._und_index))
+
+    # =========================================================================
+    # Tick path
+    # =========================================================================
+
+    def on_ticks(self, ticks: List[Dict[str, Any]]) -> None:
+        """Ticker callback: record prices, reprice if the coalesce window has passed."""
+        with self._lock:
+            self._last_tick_at = time.monotonic()
+            self.stats["ticks"] += len(ticks)
+            self._apply_prices(ticks)
+            if time.monotonic() - self._last_flush >= self.coalesce_interval:
+                self.flush()
+
+    def _apply_prices(self, ticks: List[Dict[str, Any]]) -> None:
+        with self._lock:
+            for tick in ticks:
+                token = tick.get("instrument_token")
+                price = tick.get("last_price")
+                if not price:
+                    continue
+
+                u = self._und_index.get(token)
+                if u is not None and self._spot[u] != price:
+                    self._spot[u] = price
+                    self._dirty |= self._und == u
+
+                legs = self._leg_index.get(token)
+                if legs is not None:
+                    self._price[legs] = price
+                    self._iv_stale[legs] = True
+                    self._dirty[legs] = True
+
+    def flush(self, now: Optional[float] = None) -> None:
+        """Reprice dirty legs and adjust totals by their change in contribution."""
+        with self._lock:
+            self._last_flush = time.monotonic()
+            mask = self._dirty & ~np.isnan(self._spot[self._und])
+            self._dirty[:] = False
+            if mask.any():
+                self._reprice(mask, now or time.time())
+            self._maybe_publish()
+
+    def refresh(self) -> Dict[str, float]:
+        """Reprice every leg (time decay) and push totals to the hedger now."""
+        if self._started and self._ticks_stale():
+            self.seed_quotes()
+        with self._lock:
+            self._dirty[:] = True
+            self._last_publish = 0.0
+            self.flush()
+            return self.get_portfolio_greeks()
+
+    def seed_quotes(self) -> int:
+        """
+        Set spot and option prices from get_ltp (the ticker is down or not yet streaming).
+
+        Returns:
+            Number of prices applied
+        """
+        tokens = self.tokens()
+        if not tokens or self.kite is None:
+            return 0
+        try:
+            prices = self.kite.get_ltp(tokens)
+        except Exception as e:
+            logger.warning(f"Live Greeks quote seed failed: {e}")
+            return 0
+        ticks = [{"instrument_token": t, "last_price": p} for t, p in prices.items() if p]
+        self._apply_prices(ticks)
+        self.stats["quote_seeds"] += 1
+        return len(ticks)
+
+    def _ticks_stale(self) -> bool:
+        return self._last_tick_at is None or time.monotonic() - self._last_tick_at > TICK_STALE_SECONDS
+
+    def _reprice(self, mask: np.ndarray, now: float) -> None:
+        idx = np.flatnonzero(mask)
+        spot = self._spot[self._und[idx]]
+        ttm = np.maximum(self._expiry_ts[idx] - now, 0.0) / YEAR_SECONDS
+        is_call = self._is_call[idx]
+        strike = self._strike[idx]
+
+        # Track implied vol where the option price moved
+        iv_idx = self._iv_stale[idx] & ~self._is_fut[idx]
+        if iv_idx.any():
+            sel = idx[iv_idx]
+            self._vol[sel] = BlackScholesCalculator.implied_vol_array(
+                is_call[iv_idx], self._price[sel], spot[iv_idx], strike[iv_idx], ttm[iv_idx],
+                self._vol[sel], iterations=3 if self._iv_seeded[sel].all() else 8,
+                risk_free_rate=self.risk_free_rate,
+            )
+            self._iv_seeded[sel] = True
+            self._iv_stale[sel] = False
+
+        greeks = BlackScholesCalculator.greeks_array(
+            is_call, spot, strike, ttm, self._vol[idx], self.risk_free_rate
+        )
+        unit = np.column_stack([greeks[g] for g in GREEKS])
+        fut = self._is_fut[idx]
+        unit[fut] = (1.0, 0.0, 0.0, 0.0)
+
+        new = unit * self._qty[idx, None]
+        diff = new - self._contrib[idx]
+        self._contrib[idx] = new
+
+        np.add.at(self._strategy_totals, self._strat[idx], diff)
+        np.add.at(self._underlying_totals, self._und[idx], diff)
+        self._portfolio += diff.sum(axis=0)
+
+        self.stats["flushes"] += 1
+        self.stats["legs_repriced"] += len(idx)
+
+    def _maybe_publish(self) -> None:
+        if time.monotonic() - self._last_publish < self.hedger_interval:
+            return
+        self._last_publish = time.monotonic()
+
+        for i, pid in enumerate(self._strategy_ids):
+            position = self._positions.get(pid)
+            if position is not None:
+                position.greeks = dict(zip(GREEKS, self._strategy_totals[i].tolist()))
+
+        if self.hedger is not None:
+            try:
+                self.hedger.update_portfolio_greeks(**self.get_portfolio_greeks())
+            except Exception as e:
+                logger.error(f"Failed to update hedger Greeks: {e}")
+
+    # =========================================================================
+    # Read API
+    # =========================================================================
+
+    def get_portfolio_greeks(self) -> Dict[str, float]:
+        with self._lock:
+            return dict(zip(GREEKS, self._portfolio.tolist()))
+
+    def get_strategy_greeks(self) -> Dict[str, Dict[str, float]]:
+        with self._lock:
+            return {
+                pid: dict(zip(GREEKS, self._strategy_totals[i].tolist()))
+                for i, pid in enumerate(self._strategy_ids)
+            }
+
+    def get_underlying_greeks(self) -> Dict[str, Dict[str, float]]:
+        with self._lock:
+            return {
+                name: dict(zip(GREEKS, self._underlying_totals[i].tolist()))
+                for i, name in enumerate(self._underlyings)
+            }
+
+    def snapshot(self) -> Dict[str, Any]:
+        """
+        Copy of the leg arrays for full revaluation (e.g. the risk grid).
+
+        Spot is filled per leg; underlyings without a tick yet fall back to
+        the mean strike of their legs.
+        """
+        with self._lock:
+            spot = self._spot.copy()
+            for u in np.flatnonzero(np.isnan(spot)):
+                strikes = self._strike[(self._und == u) & ~self._is_fut]
+                spot[u] = strikes.mean() if len(strikes) else np.nan
+            return {
+                "strategy_ids": list(self._strategy_ids),
+                "underlyings": list(self._underlyings),
+                "strategy": self._strat.copy(),
+                "underlying": self._und.copy(),
+                "is_call": self._is_call.copy(),
+                "is_future": self._is_fut.copy(),
+                "strike": self._strike.copy(),
+                "expiry_ts": self._expiry_ts.copy(),
+                "quantity": self._qty.copy(),
+                "volatility": self._vol.copy(),
+                "spot": spot[self._und],
+            }
+
+    def get_status(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "legs": len(self._qty),
+                "strategies": len(self._strategy_ids),
+                "underlyings": {
+                    name: (None if np.isnan(self._spot[i]) else float(self._spot[i]))
+                    for i, name in enumerate(self._underlyings)
+                },
+                "portfolio": self.get_portfolio_greeks(),
+                **self.stats,
+            }
+
+    # =========================================================================
+    # Internals
+    # =========================================================================
+
+    def _get_ticker(self):
+        if self._ticker is None:
+            try:
+                from ...api.websocket import ticker_manager
+                self._ticker = ticker_manager
+            except Exception as e:
+                logger.warning(f"Ticker unavailable for live Greeks: {e}")
+        return self._ticker
+
+    def _reset_arrays(self, n: int, strategy_ids: List[str], underlyings: List[str]) -> None:
+        self._strategy_ids = strategy_ids
+        self._underlyings = underlyings
+        self._strat = np.zeros(n, dtype=np.int64)
+        self._und = np.zeros(n, dtype=np.int64)
+        self._is_call = np.zeros(n, dtype=bool)
+        self._is_fut = np.zeros(n, dtype=bool)
+        self._strike = np.zeros(n)
+        self._expiry_ts = np.zeros(n)
+        self._qty = np.zeros(n)
+        self._price = np.zeros(n)
+        self._vol = np.full(n, DEFAULT_VOL)
+        self._iv_stale = np.ones(n, dtype=bool)
+        self._iv_seeded = np.zeros(n, dtype=bool)
+        self._contrib = np.zeros((n, len(GREEKS)))
+        self._dirty = np.zeros(n, dtype=bool)
+        self._spot = np.full(len(underlyings), np.nan)
+        self._strategy_totals = np.zeros((len(strategy_ids), len(GREEKS)))
+        self._underlying_totals = np.zeros((len(underlyings), len(GREEKS)))
+        self._portfolio = np.zeros(len(GREEKS))
+        self._leg_index: Dict[int, np.ndarray] = {}
+        self._und_index: Dict[int, int] = {}
+
+    def _rebuild(self) -> None:
+        """Lay out all legs as arrays, carrying spot/vol over from the previous layout."""
+        old_spot = {name: self._spot[i] for i, name in enumerate(self._underlyings)}
+        old_vol = {}
+        for token, legs in self._leg_index.items():
+            i = legs[0]
+            old_vol[token] = (self._vol[i], self._iv_seeded[i], self._price[i])
+
+        legs = [(p, leg) for p in self._positions.values() for leg in p.legs]
+        strategy_ids = list(self._positions)
+        underlyings = sorted({p.instrument for p in self._positions.values()})
+        self._reset_arrays(len(legs), strategy_ids, underlyings)
+
+        strat_pos = {pid: i for i, pid in enumerate(strategy_ids)}
+        und_pos = {name: i for i, name in enumerate(underlyings)}
+        leg_index: Dict[int, List[int]] = {}
+
+        und_tokens = {pid: _underlying_token(p) for pid, p in self._positions.items()}
+        for i, (position, leg) in enumerate(legs):
+            expiry = leg.expiry or position.expiry
+            self._strat[i] = strat_pos[position.id]
+            self._und[i] = und_pos[position.instrument]
+            self._is_call[i] = leg.option_type == "CE"
+            self._is_fut[i] = leg.option_type not in ("CE", "PE")
+            self._strike[i] = leg.strike or 0.0
+            self._expiry_ts[i] = datetime.combine(expiry, EXPIRY_TIME).timestamp()
+            self._qty[i] = leg.quantity if leg.is_long else -leg.quantity
+            self._price[i] = leg.current_price or leg.entry_price
+
+            # Entry Greeks until the underlying's spot is known
+            entry = np.array([getattr(leg, g, 0) or 0 for g in GREEKS], dtype=float)
+            self._contrib[i] = entry * self._qty[i]
+
+            if leg.instrument_token in old_vol:
+                self._vol[i], self._iv_seeded[i], self._price[i] = old_vol[leg.instrument_token]
+                self._iv_stale[i] = not self._iv_seeded[i]
+            leg_index.setdefault(leg.instrument_token, []).append(i)
+
+            if und_tokens[position.id] is not None:
+                self._und_index[und_tokens[position.id]] = self._und[i]
+            if not np.isnan(old_spot.get(position.instrument, np.nan)):
+                self._spot[self._und[i]] = old_spot[position.instrument]
+
+        self._leg_index = {t: np.array(ix, dtype=np.int64) for t, ix in leg_index.items()}
+
+        # Totals from scratch (also clears accumulated float drift)
+        if len(legs):
+            np.add.at(self._strategy_totals, self._strat, self._contrib)
+            np.add.at(self._underlying_totals, self._und, self._contrib)
+            self._portfolio = self._contrib.sum(axis=0)
+
+        # Reprice right away on underlyings whose spot is already known
+        self._dirty[:] = True
+        self.flush()
+
+        if self._started and self._ticker is not None:
+            self._ticker.subscribe(self.tokens())
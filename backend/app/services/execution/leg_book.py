@@ -0,0 +1,206 @@
+"""
+Open-leg book for Trading System v2.0
+
+Position.update_pnl walks the TradeLeg models of a position and recomputes
+totals in Python on every monitoring pass. LegBook lays the open legs of all
+positions out once as arrays (token, signed quantity, entry and current
+price) and revalues every position in a few vectorized passes into
+preallocated buffers:
+
+- prices are written into the book in place, no leg models are touched
+- per-position price, P&L and P&L % and the profit-target / stop-loss
+  hits are computed with out= ufuncs, so a pass allocates nothing
+- the layout is rebuilt only when positions open or close
+
+Results are written back to the Position and TradeLeg models only at the
+boundaries that need them (the monitoring loop's per-position checks, exit
+orders, persistence and the API) via sync().
+"""
+
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from ...models.position import Position, PositionStatus
+from ...models.trade import TradeLeg
+
+# Floor for |entry value| in the P&L % division (positions at zero keep their last %)
+MIN_ENTRY = 1e-12
+
+
+class LegBook:
+    """
+    Struct-of-arrays view of the legs of open positions.
+
+    Usage:
+        book = LegBook()
+        book.set_positions(positions)
+        book.update(current_prices)
+        profit_hit, stop_hit = book.exit_flags()
+        book.sync(position)
+    """
+
+    def __init__(self):
+        self._reset_arrays(0, [])
+
+    def __len__(self) -> int:
+        return len(self._token)
+
+    @property
+    def position_ids(self) -> List[str]:
+        return list(self._position_ids)
+
+    def index(self, position_id: str) -> Optional[int]:
+        """Row of a position in the per-position arrays."""
+        return self._position_index.get(position_id)
+
+    # =========================================================================
+    # Layout
+    # =========================================================================
+
+    def set_positions(self, positions: List[Position]) -> None:
+        """Lay out the legs of the open positions, starting from their current leg prices."""
+        positions = [p for p in positions if p.status == PositionStatus.OPEN and p.legs]
+        legs = [leg for p in positions for leg in p.legs]
+        self._reset_arrays(len(legs), [p.id for p in positions])
+
+        leg_index: Dict[int, List[int]] = {}
+        row = 0
+        for i, position in enumerate(positions):
+            self._start[i] = row
+            self._target[i] = position.current_target
+            self._stop[i] = position.stop_loss
+            self._armed_profit[i] = position.entry_price != 0 and position.current_target != 0
+            self._armed_stop[i] = position.entry_price != 0 and position.stop_loss != 0
+            for leg in position.legs:
+                self._token[row] = leg.instrument_token
+                self._qty[row] = leg.quantity if leg.is_long else -leg.quantity
+                self._entry[row] = leg.entry_price
+                self._price[row] = leg.current_price or 0.0
+                leg_index.setdefault(leg.instrument_token, []).append(row)
+                row += 1
+
+        np.multiply(self._qty, self._entry, out=self._entry_value)
+        self._leg_index = {t: np.array(rows, dtype=np.int64) for t, rows in leg_index.items()}
+        self._positions = positions
+        self._legs = legs
+        if legs:
+            self._revalue()
+
+    def _reset_arrays(self, n: int, position_ids: List[str]) -> None:
+        m = len(position_ids)
+        self._positions: List[Position] = []
+        self._legs: List[TradeLeg] = []
+        self._position_ids = position_ids
+        self._position_index = {pid: i for i, pid in enumerate(position_ids)}
+        self._leg_index: Dict[int, np.ndarray] = {}
+
+        # Per leg
+        self._token = np.zeros(n, dtype=np.int64)
+        self._qty = np.zeros(n)
+        self._entry = np.zeros(n)
+        self._price = np.zeros(n)
+        self._entry_value = np.zeros(n)
+        self._value = np.zeros(n)
+        self._priced_entry = np.zeros(n)
+        self._priced = np.zeros(n, dtype=bool)
+
+        # Per position
+        self._start = np.zeros(m, dtype=np.int64)
+        self._target = np.zeros(m)
+        self._stop = np.zeros(m)
+        self._armed_profit = np.zeros(m, dtype=bool)
+        self._armed_stop = np.zeros(m, dtype=bool)
+        self._total_entry = np.zeros(m)
+        self._abs_entry = np.zeros(m)
+        self._has_entry = np.zeros(m, dtype=bool)
+        self._pct = np.zeros(m)
+        self._profit_hit = np.zeros(m, dtype=bool)
+        self._stop_hit = np.zeros(m, dtype=bool)
+        self.current_price = np.zeros(m)
+        self.current_pnl = np.zeros(m)
+        self.current_pnl_pct = np.zeros(m)
+
+    # =========================================================================
+    # Hot path
+    # =========================================================================
+
+    def update(self, current_prices: Dict[int, float]) -> None:
+        """Write the prices of book tokens in place and revalue every position."""
+        if not len(self._token):
+            return
+        for token, rows in self._leg_index.items():
+            price = current_prices.get(token)
+            if price is not None:
+                self._price[rows] = price
+        self._revalue()
+
+    def _revalue(self) -> None:
+        # Same rule as Position.update_pnl: legs without a price count on neither side
+        np.not_equal(self._price, 0.0, out=self._priced)
+        np.multiply(self._qty, self._price, out=self._value)
+        self._priced_entry.fill(0.0)
+        np.copyto(self._priced_entry, self._entry_value, where=self._priced)
+        np.add.reduceat(self._value, self._start, out=self.current_price)
+        np.add.reduceat(self._priced_entry, self._start, out=self._total_entry)
+        np.subtract(self.current_price, self._total_entry, out=self.current_pnl)
+        np.absolute(self._total_entry, out=self._abs_entry)
+        np.greater(self._abs_entry, 0.0, out=self._has_entry)
+        np.maximum(self._abs_entry, MIN_ENTRY, out=self._abs_entry)
+        np.divide(self.current_pnl, self._abs_entry, out=self._pct)
+        np.copyto(self.current_pnl_pct, self._pct, where=self._has_entry)  # Unpriced keep the last %
+
+    def exit_flags(self) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Profit-target and stop-loss hits per position (Position.should_exit_profit
+        and should_exit_stop on the book's P&L).
+
+        Returns:
+            Tuple of (profit_hit, stop_hit) boolean arrays, indexed like
+            position_ids and reused by the next call
+        """
+        np.greater_equal(self.current_pnl, self._target, out=self._profit_hit)
+        np.logical_and(self._profit_hit, self._armed_profit, out=self._profit_hit)
+        np.less_equal(self.current_pnl, self._stop, out=self._stop_hit)
+        np.logical_and(self._stop_hit, self._armed_stop, out=self._stop_hit)
+        return self._profit_hit, self._stop_hit
+
+    # =========================================================================
+    # Boundaries
+    # =========================================================================
+
+    def sync(self, position: Position, legs: bool = True) -> bool:
+        """
+        Write the book's values back to a position model.
+
+        Args:
+            position: Position in the book
+            legs: Also write leg current prices (exit orders, persistence, API)
+
+        Returns:
+            False if the position is not in the book
+        """
+        i = self._position_index.get(position.id)
+        if i is None or self._positions[i] is not position:
+            return False
+        position.current_price = float(self.current_price[i])
+        position.current_pnl = float(self.current_pnl[i])
+        if self._has_entry[i]:
+            position.current_pnl_pct = float(self.current_pnl_pct[i])
+        if legs:
+            stop = int(self._start[i + 1]) if i + 1 < len(self._start) else len(self._legs)
+            for row in range(int(self._start[i]), stop):
+                price = float(self._price[row])
+                leg = self._legs[row]
+                if price or leg.current_price is not None:
+                    leg.current_price = price
+        return True
+
+    def sync_all(self) -> None:
+        """Write back every position in the book."""
+        for position in self._positions:
+            self.sync(position)
+
+    def memory_bytes(self) -> int:
+        """Bytes held by the book's arrays."""
+        return sum(a.nbytes for a in vars(self).values() if isinstance(a, np.ndarray))
@@ -0,0 +1,573 @@
+"""
+Local margin estimation for Trading System v2.0
+
+Computes SPAN-like portfolio margin locally instead of calling Kite's
+margin APIs for every dashboard refresh and proposal:
+
+1. Legs are grouped by underlying and revalued across a vectorized
+   scenario array (price moves of 0, +-1/3, +-2/3, +-1 price scan range,
+   each with volatility up/down, plus two extreme moves at 35% weight)
+2. Scan risk (worst scenario loss) + exposure margin + long premium
+   gives the local estimate
+3. Per-underlying calibration factors are periodically refreshed from
+   broker basket-margin responses in a background thread, so local numbers
+   track Kite's without an estimate ever waiting on the broker
+4. Results sit behind a bounded TTL cache keyed by the basket normalized
+   to its lot multiple (with leg prices, volatilities and a spot bucket),
+   so 1 lot and 3 lots of the same structure share one entry
+"""
+
+import math
+import re
+import threading
+import time
+from dataclasses import dataclass, field
+from datetime import date, timedelta
+from functools import reduce
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+from loguru import logger
+
+from ...core.ttl_cache import TTLCache
+from ..utilities import PnLCalculator
+
+
+# Scenario array: (price move as fraction of scan range, vol direction, weight)
+SPAN_SCENARIOS = np.array([
+    (0.0, 1, 1.0), (0.0, -1, 1.0),
+    (1 / 3, 1, 1.0), (1 / 3, -1, 1.0), (-1 / 3, 1, 1.0), (-1 / 3, -1, 1.0),
+    (2 / 3, 1, 1.0), (2 / 3, -1, 1.0), (-2 / 3, 1, 1.0), (-2 / 3, -1, 1.0),
+    (1.0, 1, 1.0), (1.0, -1, 1.0), (-1.0, 1, 1.0), (-1.0, -1, 1.0),
+    (2.0, 0, 0.35), (-2.0, 0, 0.35),
+])
+
+INDEX_UNDERLYINGS = {"NIFTY", "BANKNIFTY", "FINNIFTY", "MIDCPNIFTY", "NIFTYNXT50", "SENSEX", "BANKEX"}
+
+# Price scan range (fraction of spot) and exposure margin (fraction of notional)
+INDEX_PRICE_SCAN = 0.09
+STOCK_PRICE_SCAN = 0.15
+INDEX_EXPOSURE = 0.02
+STOCK_EXPOSURE = 0.035
+VOL_SCAN = 0.04  # Absolute volatility shift
+DEFAULT_VOL = 0.15
+
+MONTHS = {m: i for i, m in enumerate(
+    ["JAN", "FEB", "MAR", "APR", "MAY", "JUN", "JUL", "AUG", "SEP", "OCT", "NOV", "DEC"], 1
+)}
+WEEKLY_MONTHS = {**{str(i): i for i in range(1, 10)}, "O": 10, "N": 11, "D": 12}
+
+MONTHLY_OPTION = re.compile(r'^([A-Z&]+)(\d{2})([A-Z]{3})(\d+(?:\.\d+)?)(CE|PE)$')
+WEEKLY_OPTION = re.compile(r'^([A-Z&]+)(\d{2})([1-9OND])(\d{2})(\d+(?:\.\d+)?)(CE|PE)$')
+FUTURE = re.compile(r'^([A-Z&]+)(\d{2})([A-Z]{3})FUT$')
+
+
+def _last_weekday(year: int, month: int, weekday: int) -> date:
+    """Last given weekday (Mon=0) of a month - monthly F&O expiry."""
+    next_month = date(year + month // 12, month % 12 + 1, 1)
+    last = next_month - timedelta(days=1)
+    return last - timedelta(days=(last.weekday() - weekday) % 7)
+
+
+@dataclass
+class MarginLeg:
+    """One position or order leg for margin purposes."""
+    tradingsymbol: str
+    quantity: int  # Signed: negative for short
+    price: float  # Option premium / futures price
+    exchange: str = "NFO"
+    underlying: Optional[str] = None
+    instrument_type: Optional[str] = None  # CE, PE, FUT
+    strike: Optional[float] = None
+    expiry: Optional[date] = None
+    volatility: Optional[float] = None
+    product: str = "NRML"
+
+    def __post_init__(self):
+        if self.instrument_type is None or self.underlying is None:
+            self._parse_symbol()
+
+    def _parse_symbol(self) -> None:
+        symbol = self.tradingsymbol
+        match = WEEKLY_OPTION.match(symbol)
+        if match:
+            name, yy, m, dd, strike, opt = match.groups()
+            self.underlying = self.underlying or name
+            self.instrument_type = self.instrument_type or opt
+            self.strike = self.strike or float(strike)
+            if self.expiry is None:
+                try:
+                    self.expiry = date(2000 + int(yy), WEEKLY_MONTHS[m], int(dd))
+                except ValueError:
+                    pass
+            return
+
+        match = MONTHLY_OPTION.match(symbol)
+        if match and match.group(3) in MONTHS:
+            name, yy, mon, strike, opt = match.groups()
+            self.underlying = self.underlying or name
+            self.instrument_type = self.instrument_type or opt
+            self.strike = self.strike or float(strike)
+            self.expiry = self.expiry or _last_weekday(2000 + int(yy), MONTHS[mon], 1)
+            return
+
+        match = FUTURE.match(symbol)
+        if match and match.group(3) in MONTHS:
+            name, yy, mon = match.groups()
+            self.underlying = self.underlying or name
+            self.instrument_type = self.instrument_type or "FUT"
+            self.expiry = self.expiry or _last_weekday(2000 + int(yy), MONTHS[mon], 1)
+            return
+
+        self.underlying = self.underlying or symbol
+        self.instrument_type = self.instrument_type or "EQ"
+
+    @property
+    def is_option(self) -> bool:
+        return self.instrument_type in ("CE", "PE")
+
+    @property
+    def is_span(self) -> bool:
+        """Whether the leg is margined by the scenario engine."""
+        return self.exchange in ("NFO", "BFO") and (
+            (self.is_option and self.strike) or self.instrument_type == "FUT"
+        )
+
+    @classmethod
+    def from_trade_leg(cls, leg) -> "MarginLeg":
+        """Build from a TradeLeg (quantity sign from the leg direction)."""
+        return cls(
+            tradingsymbol=leg.tradingsymbol,
+            quantity=-abs(leg.quantity) if leg.is_short else abs(leg.quantity),
+            price=float(leg.entry_price or 0),
+            exchange=leg.exchange or "NFO",
+            strike=leg.strike,
+            expiry=leg.expiry,
+            instrument_type=leg.option_type or ("FUT" if leg.leg_type.value.endswith("FUTURE") else None),
+        )
+
+    @classmethod
+    def from_order(cls, order: Dict[str, Any], price: float = 0.0) -> "MarginLeg":
+        """Build from a Kite order_margins-style order dict."""
+        qty = abs(int(order.get("quantity", 0)))
+        return cls(
+            tradingsymbol=order.get("tradingsymbol", ""),
+            quantity=-qty if order.get("transaction_type") == "SELL" else qty,
+            price=float(order.get("price") or price or 0),
+            exchange=order.get("exchange", "NFO"),
+            product=order.get("product", "NRML"),
+        )
+
+    def to_order(self) -> Dict[str, Any]:
+        """Kite order dict for broker margin calls."""
+        return {
+            "exchange": self.exchange,
+            "tradingsymbol": self.tradingsymbol,
+            "transaction_type": "SELL" if self.quantity < 0 else "BUY",
+            "variety": "regular",
+            "product": self.product,
+            "order_type": "MARKET",
+            "quantity": abs(self.quantity),
+            "price": 0,
+        }
+
+
+@dataclass
+class MarginEstimate:
+    """Margin breakdown for a basket."""
+    total: float
+    span: float = 0.0  # Calibrated scan risk
+    exposure: float = 0.0
+    premium: float = 0.0  # Long option premium paid
+    other: float = 0.0  # Non-scenario legs (MCX, equity) - flat percentages
+    by_underlying: Dict[str, float] = field(default_factory=dict)
+    calibration: Dict[str, float] = field(default_factory=dict)
+    cached: bool = False
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "total": self.total,
+            "span": self.span,
+            "exposure": self.exposure,
+            "premium": self.premium,
+            "other": self.other,
+            "by_underlying": self.by_underlying,
+            "calibration": self.calibration,
+            "cached": self.cached,
+        }
+
+
+@dataclass
+class _Calibration:
+    factor: float = 1.0
+    updated_at: float = 0.0  # monotonic seconds, 0 = never
+    samples: int = 0
+
+
+class MarginService:
+    """
+    SPAN-like local margin engine with broker calibration.
+
+    estimate() is served from the cache or computed locally; when an
+    underlying's calibration is older than calibration_interval a broker
+    basket-margin call is started in the background and the previous factor
+    is used until it lands.
+    """
+
+    def __init__(
+        self,
+        kite=None,
+        cache_size: int = 1024,
+        cache_ttl: float = 60.0,
+        calibration_interval: float = 1200.0,
+        spot_bucket_pct: float = 0.0025
+    ):
+        """
+        Args:
+            kite: KiteClient for calibration calls (None = local only)
+            cache_size: Maximum cached normalized baskets
+            cache_ttl: Seconds a cached estimate stays valid
+            calibration_interval: Seconds between broker calibrations per underlying
+            spot_bucket_pct: Spot moves smaller than this reuse cached results
+        """
+        self.kite = kite
+        self.calibration_interval = calibration_interval
+        self.spot_bucket_pct = spot_bucket_pct
+
+        self._cache = TTLCache(maxsize=cache_size, ttl=cache_ttl)
+        self._spots: Dict[str, float] = {}
+        self._vols: Dict[str, float] = {}
+        self._calibration: Dict[str, _Calibration] = {}
+        self._calibrating: set = set()  # Underlyings with a broker call in flight
+        self._calibration_thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+        self.stats = {"estimates": 0, "local": 0, "broker_calls": 0}
+
+    # =========================================================================
+    # Market inputs
+    # =========================================================================
+
+    def update_spot(self, underlying: str, spot: float) -> None:
+        if spot and spot > 0:
+            self._spots[underlying] = float(spot)
+
+    def update_vol(self, underlying: str, volatility: float) -> None:
+        """Set the volatility used to revalue options (annualized decimal)."""
+        if volatility and volatility > 0:
+            self._vols[underlying] = float(volatility)
+
+    # =========================================================================
+    # Public API
+    # =========================================================================
+
+    def estimate(
+        self,
+        legs: List[MarginLeg],
+        allow_calibration: bool = True
+    ) -> MarginEstimate:
+        """
+        Estimate margin for a basket of legs (hedge benefit included).
+
+        Args:
+            legs: Basket legs
+            allow_calibration: Start a background broker call if an
+                underlying's calibration is stale (at most one per interval)
+
+        Returns:
+            MarginEstimate
+        """
+        self.stats["estimates"] += 1
+        legs = [l for l in legs if l.quantity]
+        if not legs:
+            return MarginEstimate(total=0.0)
+
+        if allow_calibration:
+            self._maybe_calibrate(legs)
+
+        key, multiple = self._normalize(legs)
+        raw = self._cache.get(key)
+        cached = raw is not None
+        if raw is None:
+            raw = self._compute_raw(legs, 1.0 / multiple)
+            self._cache.set(key, raw)
+            self.stats["local"] += 1
+
+        return self._apply(raw, multiple, cached)
+
+    def estimate_total(self, legs: List[MarginLeg], allow_calibration: bool = True) -> float:
+        return self.estimate(legs, allow_calibration=allow_calibration).total
+
+    def estimate_each(self, legs: List[MarginLeg], allow_calibration: bool = True) -> Dict[str, float]:
+        """Standalone (unhedged) margin per leg, keyed by tradingsymbol."""
+        return {
+            leg.tradingsymbol: self.estimate([leg], allow_calibration=allow_calibration).total
+            for leg in legs
+        }
+
+    def calibrate(self, legs: List[MarginLeg]) -> Optional[float]:
+        """
+        Fetch the broker margin for a basket and update calibration factors.
+
+        Returns:
+            Broker total margin, or None if unavailable
+        """
+        if self.kite is None or getattr(self.kite, "mock_mode", False):
+            return None
+
+        span_legs = [l for l in legs if l.is_span and l.quantity]
+        if not span_legs:
+            return None
+
+        self.stats["broker_calls"] += 1
+        try:
+            response = self.kite.get_basket_margins({"orders": [l.to_order() for l in span_legs]})
+        except Exception as e:
+            logger.warning(f"Margin calibration call failed: {e}")
+            response = None
+
+        broker_total = 0.0
+        if isinstance(response, list):
+            # order_margins fallback has no hedge benefit - only usable for one leg
+            if len(span_legs) == 1:
+                broker_total = sum(m.get("total", 0) for m in response)
+        elif response:
+            broker_total = (response.get("final") or {}).get("total", 0) or \
+                (response.get("initial") or {}).get("total", 0)
+
+        underlyings = {l.underlying for l in span_legs}
+        now = time.monotonic()
+
+        if not broker_total:
+            # Don't retry a failing broker on every estimate
+            with self._lock:
+                for u in underlyings:
+                    self._calibration.setdefault(u, _Calibration()).updated_at = now
+            return None
+
+        raw = self._compute_raw(span_legs, 1.0)
+        scan = sum(v["scan"] for v in raw["underlyings"].values())
+        fixed = raw["premium"] + sum(v["exposure"] for v in raw["underlyings"].values())
+        observed = (broker_total - fixed) / scan if scan > 0 else 1.0
+        observed = min(max(observed, 0.25), 4.0)
+
+        with self._lock:
+            for u in underlyings:
+                cal = self._calibration.setdefault(u, _Calibration())
+                cal.factor = observed if cal.samples == 0 else 0.5 * cal.factor + 0.5 * observed
+                cal.updated_at = now
+                cal.samples += 1
+
+        logger.info(
+            f"Margin calibration {sorted(underlyings)}: broker ₹{broker_total:,.0f}, "
+            f"factor {observed:.3f}"
+        )
+        return float(broker_total)
+
+    def get_calibration(self) -> Dict[str, Dict[str, Any]]:
+        now = time.monotonic()
+        return {
+            u: {"factor": c.factor, "age_seconds": now - c.updated_at if c.updated_at else None, "samples": c.samples}
+            for u, c in self._calibration.items()
+        }
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {**self.stats, "cache": self._cache.stats()}
+
+    def clear_cache(self) -> None:
+        self._cache.clear()
+
+    # =========================================================================
+    # Internals
+    # =========================================================================
+
+    def _maybe_calibrate(self, legs: List[MarginLeg]) -> None:
+        if self.kite is None or getattr(self.kite, "mock_mode", False):
+            return
+        now = time.monotonic()
+        stale = {
+            l.underlying for l in legs
+            if l.is_span and (
+                l.underlying not in self._calibration or
+                now - self._calibration[l.underlying].updated_at >= self.calibration_interval
+            )
+        }
+        with self._lock:
+            stale -= self._calibrating
+            if not stale:
+                return
+            self._calibrating |= stale
+
+        thread = threading.Thread(
+            target=self._calibrate_in_background,
+            args=([l for l in legs if l.underlying in stale], stale),
+            name="margin-calibration",
+            daemon=True,
+        )
+        self._calibration_thread = thread
+        thread.start()
+
+    def _calibrate_in_background(self, legs: List[MarginLeg], underlyings: set) -> None:
+        try:
+            self.calibrate(legs)
+        except Exception as e:
+            logger.warning(f"Margin calibration failed: {e}")
+        finally:
+            with self._lock:
+                self._calibrating -= underlyings
+
+    def _normalize(self, legs: List[MarginLeg]) -> Tuple[Tuple, int]:
+        """Cache key for the basket scaled down to one lot multiple."""
+        # Price and vol are part of the leg identity: they change premium and revaluation
+        net: Dict[Tuple, int] = {}
+        for l in legs:
+            k = (l.exchange, l.tradingsymbol, round(l.price, 2), l.volatility and round(l.volatility, 4))
+            net[k] = net.get(k, 0) + int(l.quantity)
+        net = {k: q for k, q in net.items() if q}
+
+        multiple = reduce(math.gcd, (abs(q) for q in net.values()), 0) or 1
+
+        buckets = []
+        for u in sorted({l.underlying for l in legs}):
+            spot = self._spot_for(u, [l for l in legs if l.underlying == u])
+            bucket = round(math.log(spot) / self.spot_bucket_pct) if spot else 0
+            buckets.append((u, bucket, self._vols.get(u)))
+
+        key = (tuple(sorted((k, q // multiple) for k, q in net.items())), tuple(buckets))
+        return key, multiple
+
+    def _compute_raw(self, legs: List[MarginLeg], scale: float) -> Dict[str, Any]:
+        """Uncalibrated margin components for legs scaled by `scale`."""
+        by_underlying: Dict[str, List[MarginLeg]] = {}
+        other = 0.0
+        premium = 0.0
+
+        for l in legs:
+            if l.is_option and l.quantity > 0:
+                premium += l.quantity * scale * l.price
+            if l.is_span:
+                by_underlying.setdefault(l.underlying, []).append(l)
+            elif l.quantity < 0 or not l.is_option:
+                other += self._flat_margin(l) * scale
+
+        underlyings = {}
+        for u, group in by_underlying.items():
+            spot = self._spot_for(u, group)
+            scan, exposure = self._scan_risk(u, group, spot, scale)
+            underlyings[u] = {"scan": scan, "exposure": exposure}
+
+        return {"underlyings": underlyings, "premium": premium, "other": other}
+
+    def _scan_risk(
+        self,
+        underlying: str,
+        legs: List[MarginLeg],
+        spot: float,
+        scale: float
+    ) -> Tuple[float, float]:
+        """Worst-case scenario loss and exposure margin for one underlying."""
+        from ..utilities import BlackScholesCalculator  # scipy.special on first use, not at API startup
+
+        is_index = underlying in INDEX_UNDERLYINGS
+        psr = (INDEX_PRICE_SCAN if is_index else STOCK_PRICE_SCAN) * spot
+        base_vol = self._vols.get(underlying, DEFAULT_VOL)
+        today = date.today()
+
+        qty = np.array([l.quantity * scale for l in legs], dtype=float)
+        is_opt = np.array([l.is_option for l in legs])
+        is_call = np.array([l.instrument_type == "CE" for l in legs])
+        strike = np.array([l.strike or spot for l in legs], dtype=float)
+        ttm = np.array([
+            max((l.expiry - today).days, 0) / 365.0 if l.expiry else 30 / 365.0
+            for l in legs
+        ])
+        vol = np.array([l.volatility or base_vol for l in legs], dtype=float)
+
+        moves = SPAN_SCENARIOS[:, 0:1]
+        vol_dir = SPAN_SCENARIOS[:, 1:2]
+        weight = SPAN_SCENARIOS[:, 2]
+
+        # (scenarios, legs) revaluation
+        scen_spot = spot + moves * psr
+        scen_vol = np.maximum(vol + vol_dir * VOL_SCAN, 0.01)
+        base_price = BlackScholesCalculator.price_array(is_call, spot, strike, ttm, vol)
+        scen_price = BlackScholesCalculator.price_array(is_call, scen_spot, strike, ttm, scen_vol)
+
+        value_change = np.where(is_opt, scen_price - base_price, scen_spot - spot)
+        pnl = (value_change * qty).sum(axis=1) * weight
+        scan = float(max(0.0, -pnl.min()))
+
+        short_notional = float(np.abs(qty[(qty < 0) | ~is_opt]).sum()) * spot
+        exposure = short_notional * (INDEX_EXPOSURE if is_index else STOCK_EXPOSURE)
+        return scan, exposure
+
+    def _spot_for(self, underlying: str, legs: List[MarginLeg]) -> float:
+        """Known spot, else futures price, else put-call parity, else mean strike."""
+        spot = self._spots.get(underlying)
+        if spot:
+            return spot
+
+        for l in legs:
+            if l.instrument_type == "FUT" and l.price:
+                return l.price
+
+        calls = {l.strike: l.price for l in legs if l.instrument_type == "CE" and l.price}
+        puts = {l.strike: l.price for l in legs if l.instrument_type == "PE" and l.price}
+        common = set(calls) & set(puts)
+        if common:
+            k = min(common, key=lambda s: abs(calls[s] - puts[s]))
+            return max(k + calls[k] - puts[k], 1.0)
+
+        strikes = [l.strike for l in legs if l.strike]
+        return float(sum(strikes) / len(strikes)) if strikes else max((l.price for l in legs), default=0.0)
+
+    def _flat_margin(self, leg: MarginLeg) -> float:
+        """Percentage-of-notional fallback for legs outside the scenario engine."""
+        notional = abs(leg.quantity) * leg.price
+        if leg.exchange == "MCX":
+            return notional * PnLCalculator._get_mcx_multiplier(leg.tradingsymbol) * 0.05
+        if leg.exchange in ("NFO", "BFO"):
+            return notional * (0.15 if leg.is_option else 0.12)
+        return notional * (0.20 if leg.product == "MIS" else 1.0)
+
+    def _apply(self, raw: Dict[str, Any], multiple: int, cached: bool) -> MarginEstimate:
+        span = exposure = 0.0
+        by_underlying = {}
+        calibration = {}
+
+        for u, parts in raw["underlyings"].items():
+            cal = self._calibration.get(u)
+            factor = cal.factor if cal else 1.0
+            u_span = parts["scan"] * factor * multiple
+            u_exposure = parts["exposure"] * multiple
+            span += u_span
+            exposure += u_exposure
+            by_underlying[u] = u_span + u_exposure
+            calibration[u] = factor
+
+        premium = raw["premium"] * multiple
+        other = raw["other"] * multiple
+
+        return MarginEstimate(
+            total=span + exposure + premium + other,
+            span=span,
+            exposure=exposure,
+            premium=premium,
+            other=other,
+            by_underlying=by_underlying,
+            calibration=calibration,
+            cached=cached,
+        )
+
+
+# Singleton instance
+_margin_service: Optional[MarginService] = None
+
+
+def get_margin_service(kite=None) -> MarginService:
+    """Get the singleton MarginService (the first kite passed is used for calibration)."""
+    global _margin_service
+    if _margin_service is None:
+        _margin_service = MarginService(kite=kite)
+    elif _margin_service.kite is None and kite is not None:
+        _margin_service.kite = kite
+    return _margin_service
@@ -0,0 +1,201 @@
+"""Event-driven order state tracking for Trading System v2.0
+
+Order fills are pushed to the tracker by the broker's order-update stream
+(Kite postbacks over the ticker websocket) or, in paper/mock mode, by
+KiteClient's local order listeners. Each watched order gets a future that
+resolves as soon as a terminal update (COMPLETE/CANCELLED/REJECTED)
+arrives. A single batched get_orders() reconcile is used as a fallback
+when updates stop arriving.
+"""
+
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future, FIRST_COMPLETED, wait
+from typing import Any, Dict, List, Optional
+
+from loguru import logger
+
+from ...core.kite_client import KiteClient
+
+
+TERMINAL_STATUSES = ("COMPLETE", "CANCELLED", "REJECTED")
+
+
+class OrderTracker:
+    """
+    Tracks broker order state from pushed updates.
+
+    on_order_update() is safe to call from any thread (ticker thread,
+    paper order placement). Updates for orders that are not yet watched are
+    kept, so a fill that arrives before watch() is called is not lost.
+    """
+
+    def __init__(
+        self,
+        kite: KiteClient,
+        ticker=None,
+        reconcile_interval: float = 2.0,
+        max_cached_orders: int = 2000
+    ):
+        """
+        Args:
+            kite: Broker client (used for the reconcile fallback)
+            ticker: Order update source with add_order_callback (KiteTickerManager)
+            reconcile_interval: Seconds without a terminal update before
+                falling back to a batched get_orders() call
+            max_cached_orders: Latest-state entries kept for unwatched orders
+        """
+        self.kite = kite
+        self._ticker = ticker
+        self.reconcile_interval = reconcile_interval
+        self.max_cached_orders = max_cached_orders
+
+        self._lock = threading.Lock()
+        self._futures: Dict[str, Future] = {}
+        self._latest: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._started = False
+
+        self.stats = {"updates": 0, "resolved": 0, "reconciles": 0}
+
+    def start(self) -> None:
+        """Subscribe to order updates from the broker stream and paper orders."""
+        if self._started:
+            return
+        self._started = True
+
+        if hasattr(self.kite, "add_order_listener"):
+            self.kite.add_order_listener(self.on_order_update)
+
+        ticker = self._ticker
+        if ticker is None and not (self.kite.paper_mode or self.kite.mock_mode):
+            try:
+                from ...api.websocket import ticker_manager
+                ticker = ticker_manager
+            except Exception as e:
+                logger.warning(f"Order update stream unavailable, using reconcile only: {e}")
+        if ticker is not None:
+            ticker.add_order_callback(self.on_order_update)
+            self._ticker = ticker
+
+    def stop(self) -> None:
+        if not self._started:
+            return
+        self._started = False
+        if hasattr(self.kite, "remove_order_listener"):
+            self.kite.remove_order_listener(self.on_order_update)
+        if self._ticker is not None:
+            self._ticker.remove_order_callback(self.on_order_update)
+
+    # =========================================================================
+    # Updates
+    # =========================================================================
+
+    def on_order_update(self, data: Dict[str, Any]) -> None:
+        """Apply an order update (postback, paper order event, or orderbook row)."""
+        order_id = data.get("order_id")
+        if not order_id:
+            return
+
+        with self._lock:
+            self.stats["updates"] += 1
+            self._latest[order_id] = data
+            self._latest.move_to_end(order_id)
+            while len(self._latest) > self.max_cached_orders:
+                self._latest.popitem(last=False)
+
+            future = None
+            if data.get("status") in TERMINAL_STATUSES:
+                future = self._futures.pop(order_id, None)
+
+        if future is not None and not future.done():
+            future.set_result(data)
+            self.stats["resolved"] += 1
+
+    def watch(self, order_id: str) -> Future:
+        """Future resolving with the order's terminal update."""
+        with self._lock:
+            future = self._futures.get(order_id)
+            if future is None:
+                future = Future()
+                latest = self._latest.get(order_id)
+                if latest is not None and latest.get("status") in TERMINAL_STATUSES:
+                    future.set_result(latest)
+                    self.stats["resolved"] += 1
+                else:
+                    self._futures[order_id] = future
+            return future
+
+    def latest(self, order_id: str) -> Optional[Dict[str, Any]]:
+        """Last known state of an order, terminal or not."""
+        with self._lock:
+            return self._latest.get(order_id)
+
+    def reconcile(self) -> int:
+        """
+        Fallback: fetch the day's orderbook once and apply it.
+
+        Returns:
+            Number of watched orders resolved
+        """
+        with self._lock:
+            watched = set(self._futures)
+        if not watched:
+            return 0
+
+        self.stats["reconciles"] += 1
+        try:
+            if self.kite.paper_mode or self.kite.mock_mode:
+                # Paper LIMIT/SL orders only fill when checked against the market
+                self.kite.poll_paper_orders()
+            orders = self.kite.get_orders()
+        except Exception as e:
+            logger.error(f"Order reconcile failed: {e}")
+            return 0
+
+        for order in orders or []:
+            if order.get("order_id") in watched:
+                self.on_order_update(order)
+
+        with self._lock:
+            return len(watched - set(self._futures))
+
+    def wait_all(self, order_ids: List[str], timeout: float = 30.0) -> Dict[str, Optional[Dict[str, Any]]]:
+        """
+        Wait for all orders to reach a terminal state, concurrently.
+
+        Returns as soon as the last order resolves. If no update arrives for
+        reconcile_interval seconds, a batched reconcile is run.
+
+        Args:
+            order_ids: Broker order IDs
+            timeout: Maximum seconds to wait
+
+        Returns:
+            Dict of order_id -> terminal update, or the latest known
+            (non-terminal) state / None for orders that timed out
+        """
+        futures = {oid: self.watch(oid) for oid in order_ids}
+        deadline = time.monotonic() + timeout
+
+        pending = [f for f in futures.values() if not f.done()]
+        while pending:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            done, _ = wait(pending, timeout=min(self.reconcile_interval, remaining), return_when=FIRST_COMPLETED)
+            if not done:
+                self.reconcile()
+            pending = [f for f in futures.values() if not f.done()]
+
+        if pending:
+            logger.warning(f"{len(pending)} of {len(futures)} orders not terminal after {timeout}s")
+            with self._lock:
+                for oid, future in futures.items():
+                    if not future.done():
+                        self._futures.pop(oid, None)
+
+        return {
+            oid: future.result() if future.done() else self.latest(oid)
+            for oid, future in futures.items()
+        }
@@ -14,6 +14,7 @@ from ...config.settings import Settings
 from ...database.repository import Repository
 from ...database.models import BrokerPosition
 from ..utilities import PnLCalculator
+from .margin_service import MarginLeg, get_margin_service
 
 
 @dataclass
@@ -445,73 +446,59 @@ class PortfolioService:
         return enriched, totals
     
     def _calculate_position_margins(self, positions: List[dict]) -> Dict[str, float]:
-        """Calculate margins for positions using Kite API."""
-        orders_for_margin = []
-        
+        """Calculate standalone margin per position with the local margin service."""
+        legs = []
         for p in positions:
             qty = p.get("quantity", 0)
             if qty == 0:
                 continue
             
-            orders_for_margin.append({
-                "exchange": p.get("exchange", ""),
-                "tradingsymbol": p.get("tradingsymbol", ""),
-                "transaction_type": "SELL" if qty < 0 else "BUY",
-                "variety": "regular",
-                "product": p.get("product", "NRML"),
-                "order_type": "MARKET",
-                "quantity": abs(qty),
-                "price": 0
-            })
+            legs.append(MarginLeg(
+                tradingsymbol=p.get("tradingsymbol", ""),
+                quantity=qty,
+                price=p.get("last_price", 0) or p.get("average_price", 0),
+                exchange=p.get("exchange", ""),
+                product=p.get("product", "NRML"),
+            ))
         
         margin_lookup = {}
         try:
-            if orders_for_margin:
-                results = self.kite.get_order_margins(orders_for_margin)
-                for i, order in enumerate(orders_for_margin):
-                    if i < len(results):
-                        margin_lookup[order["tradingsymbol"]] = results[i].get("total", 0)
+            if legs:
+                margin_lookup = get_margin_service(self.kite).estimate_each(legs)
         except Exception as e:
-            logger.warning(f"Failed to get order margins: {e}")
+            logger.warning(f"Failed to estimate position margins: {e}")
         
         return margin_lookup
     
-    def _get_position_margin_from_api(self, tradingsymbol: str, exchange: str, qty: int, product: str) -> float:
+    def _get_position_margin(self, tradingsymbol: str, exchange: str, qty: int, product: str, price: float) -> float:
         """
-        Get actual margin for a position using Kite order_margins API.
+        Get margin for a single position from the local margin service.
         
         Args:
             tradingsymbol: Trading symbol
             exchange: Exchange (NFO, MCX, etc.)
             qty: Position quantity (negative for short)
             product: Product type (NRML, MIS, etc.)
+            price: Current price of the instrument
             
         Returns:
-            Margin amount or 0 if API call fails
+            Margin amount or 0 if estimation fails
         """
         if qty == 0:
             return 0.0
         
         try:
-            order = {
-                "exchange": exchange,
-                "tradingsymbol": tradingsymbol,
-                "transaction_type": "SELL" if qty < 0 else "BUY",
-                "variety": "regular",
-                "product": product,
-                "order_type": "MARKET",
-                "quantity": abs(qty),
-                "price": 0
-            }
-            
-            margin_results = self.kite.get_order_margins([order])
-            if margin_results and len(margin_results) > 0:
-                total_margin = margin_results[0].get("total", 0)
-                if total_margin > 0:
-                    return total_margin
+            leg = MarginLeg(
+                tradingsymbol=tradingsymbol,
+                quantity=qty,
+                price=price,
+                exchange=exchange,
+                product=product,
+            )
+            return get_margin_service(self.kite).estimate_total([leg])
                     
         except Exception as e:
-            logger.debug(f"Failed to get margin from API for {tradingsymbol}: {e}")
+            logger.debug(f"Failed to estimate margin for {tradingsymbol}: {e}")
         
         return 0.0
     
@@ -641,12 +628,12 @@ class PortfolioService:
                     ltp_change = last_price - avg_price
                     ltp_change_pct = ((last_price - avg_price) / avg_price * 100) if avg_price else 0
                     
-                    # Get margin from Kite API for accurate calculation
-                    position_margin = self._get_position_margin_from_api(
-                        p.tradingsymbol, p.exchange, qty, p.product or "NRML"
+                    # Get margin from the calibrated local margin service
+                    position_margin = self._get_position_margin(
+                        p.tradingsymbol, p.exchange, qty, p.product or "NRML", last_price
                     )
                     if position_margin == 0:
-                        # Fallback to estimation if API fails
+                        # Fallback to estimation if the service fails
                         position_margin = self._estimate_margin(
                             p.tradingsymbol, p.exchange, qty, last_price, avg_price, p.product or "NRML"
                         )
@@ -0,0 +1,331 @@
+"""
+Scenario risk grid for Trading System v2.0
+
+Fully revalues every open leg across a spot x vol x time grid in one
+broadcasted Black-Scholes computation, returning P&L surfaces for the
+portfolio, each strategy and each underlying. Used by the dashboard
+(/risk/grid) and by Treasury as a pre-trade worst-case check.
+
+Spot shocks are relative and applied to every underlying at once (a
+fully correlated move), vol shocks are absolute vol points, and time
+steps are calendar days forward.
+"""
+
+import time
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from ...models.trade import TradeLeg
+from ..utilities.option_pricing import BlackScholesCalculator
+from .greeks_aggregator import DEFAULT_VOL, EXPIRY_TIME, YEAR_SECONDS
+
+PROPOSAL_ID = "__proposal__"
+
+
+@dataclass
+class RiskGridConfig:
+    """Grid axes."""
+    spot_shocks: np.ndarray = field(default_factory=lambda: np.linspace(-0.10, 0.10, 50))
+    vol_shocks: np.ndarray = field(default_factory=lambda: np.round(np.arange(-0.05, 0.15, 0.01), 4))
+    days_forward: np.ndarray = field(default_factory=lambda: np.array([0, 1, 2, 5, 10]))
+
+    @classmethod
+    def build(
+        cls,
+        spot_range: float = 0.10,
+        spot_points: int = 50,
+        vol_down: float = 0.05,
+        vol_up: float = 0.14,
+        vol_points: int = 20,
+        days: Optional[List[int]] = None
+    ) -> "RiskGridConfig":
+        return cls(
+            spot_shocks=np.linspace(-spot_range, spot_range, spot_points),
+            vol_shocks=np.linspace(-vol_down, vol_up, vol_points),
+            days_forward=np.array(days if days is not None else [0, 1, 2, 5, 10]),
+        )
+
+
+@dataclass
+class RiskGrid:
+    """P&L surfaces indexed [spot, vol, days]."""
+    spot_shocks: np.ndarray
+    vol_shocks: np.ndarray
+    days_forward: np.ndarray
+    portfolio: np.ndarray
+    by_strategy: Dict[str, np.ndarray] = field(default_factory=dict)
+    by_underlying: Dict[str, np.ndarray] = field(default_factory=dict)
+    legs: int = 0
+    elapsed_ms: float = 0.0
+
+    @property
+    def worst_loss(self) -> float:
+        """Largest loss on the grid (positive number, 0 if no scenario loses)."""
+        return float(max(0.0, -self.portfolio.min())) if self.portfolio.size else 0.0
+
+    @property
+    def worst_scenario(self) -> Dict[str, float]:
+        if not self.portfolio.size:
+            return {}
+        s, v, t = np.unravel_index(np.argmin(self.portfolio), self.portfolio.shape)
+        return {
+            "spot_shock": float(self.spot_shocks[s]),
+            "vol_shock": float(self.vol_shocks[v]),
+            "days_forward": int(self.days_forward[t]),
+            "pnl": float(self.portfolio[s, v, t]),
+        }
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "spot_shocks": self.spot_shocks.tolist(),
+            "vol_shocks": self.vol_shocks.tolist(),
+            "days_forward": self.days_forward.tolist(),
+            "portfolio": np.round(self.portfolio, 2).tolist(),
+            "by_strategy": {k: np.round(v, 2).tolist() for k, v in self.by_strategy.items()},
+            "by_underlying": {k: np.round(v, 2).tolist() for k, v in self.by_underlying.items()},
+            "worst_loss": self.worst_loss,
+            "worst_scenario": self.worst_scenario,
+            "legs": self.legs,
+            "elapsed_ms": self.elapsed_ms,
+        }
+
+
+class RiskGridEngine:
+    """
+    Revalues the open book (from LiveGreeksAggregator) over a scenario grid.
+    """
+
+    def __init__(
+        self,
+        aggregator=None,
+        config: Optional[RiskGridConfig] = None,
+        risk_free_rate: float = BlackScholesCalculator.DEFAULT_RISK_FREE_RATE
+    ):
+        """
+        Args:
+            aggregator: LiveGreeksAggregator holding the open legs
+            config: Grid axes (defaults to 50 spot x 20 vol x 5 days)
+            risk_free_rate: Risk-free rate for pricing
+        """
+        self.aggregator = aggregator
+        self.config = config or RiskGridConfig()
+        self.risk_free_rate = risk_free_rate
+
+    def compute(
+        self,
+        config: Optional[RiskGridConfig] = None,
+        extra_legs: Optional[Dict[str, Any]] = None,
+        now: Optional[float] = None
+    ) -> RiskGrid:
+        """
+        Compute P&L surfaces for the open book.
+
+        Args:
+            config: Grid axes override
+            extra_legs: Additional leg arrays (see legs_to_arrays) to include,
+                e.g. a proposal being checked pre-trade
+            now: Valuation time (epoch seconds)
+
+        Returns:
+            RiskGrid
+        """
+        config = config or self.config
+        book = self.aggregator.snapshot() if self.aggregator is not None else self._empty_book()
+        if extra_legs:
+            book = self._merge(book, extra_legs)
+
+        return self.revalue(book, config, now or time.time())
+
+    def check_proposal(
+        self,
+        legs: List[TradeLeg],
+        instrument: str,
+        spot: Optional[float],
+        max_loss: float,
+        config: Optional[RiskGridConfig] = None
+    ) -> Tuple[bool, str, RiskGrid]:
+        """
+        Pre-trade check: worst grid loss of book + proposal within max_loss.
+
+        A proposal that reduces the book's worst loss is never rejected.
+
+        Returns:
+            Tuple of (ok, reason, grid with the proposal included)
+        """
+        before = self.compute(config)
+        after = self.compute(config, extra_legs=legs_to_arrays(legs, instrument, spot))
+
+        if after.worst_loss > max_loss and after.worst_loss > before.worst_loss:
+            scenario = after.worst_scenario
+            return False, (
+                f"Scenario loss {after.worst_loss:,.0f} exceeds limit {max_loss:,.0f} "
+                f"(spot {scenario['spot_shock']:+.1%}, vol {scenario['vol_shock']:+.2f}, "
+                f"+{scenario['days_forward']}d)"
+            ), after
+        return True, "", after
+
+    def revalue(self, book: Dict[str, Any], config: RiskGridConfig, now: float) -> RiskGrid:
+        """One broadcasted revaluation: (spot, vol, days, legs)."""
+        start = time.perf_counter()
+        spot_shocks = np.asarray(config.spot_shocks, dtype=float)
+        vol_shocks = np.asarray(config.vol_shocks, dtype=float)
+        days = np.asarray(config.days_forward, dtype=float)
+        shape = (len(spot_shocks), len(vol_shocks), len(days))
+
+        n = len(book["quantity"])
+        valid = ~np.isnan(book["spot"])
+        if n == 0 or not valid.any():
+            return RiskGrid(spot_shocks, vol_shocks, days.astype(int), np.zeros(shape))
+        book = {k: (v[valid] if isinstance(v, np.ndarray) else v) for k, v in book.items()}
+
+        # Legs repeated across strategies (same contract, vol and spot) are priced once
+        contract = np.column_stack([
+            book["is_call"], book["is_future"], book["strike"], book["expiry_ts"],
+            book["volatility"], book["spot"],
+        ])
+        unique, inverse = np.unique(contract, axis=0, return_inverse=True)
+        inverse = inverse.ravel()
+        is_call = unique[:, 0].astype(bool)
+        is_fut = unique[:, 1].astype(bool)
+        vol = unique[:, 4]
+        spot = unique[:, 5]
+        strike = np.where(is_fut, spot, unique[:, 2])
+        ttm_now = np.maximum(unique[:, 3] - now, 0.0) / YEAR_SECONDS
+
+        base = BlackScholesCalculator.price_array(is_call, spot, strike, ttm_now, vol, self.risk_free_rate)
+
+        scen_spot = spot * (1.0 + spot_shocks[:, None, None, None])
+        scen_vol = np.maximum(vol + vol_shocks[None, :, None, None], 0.01)
+        scen_ttm = np.maximum(ttm_now - days[None, None, :, None] / 365.0, 0.0)
+        price = BlackScholesCalculator.price_array(
+            is_call, scen_spot, strike, scen_ttm, scen_vol, self.risk_free_rate
+        )
+
+        change = np.where(is_fut, scen_spot - spot, price - base).reshape(-1, len(unique))
+        qty = book["quantity"]
+
+        by_strategy = self._reduce(change, inverse, qty, book["strategy"], book["strategy_ids"], shape)
+        by_underlying = self._reduce(change, inverse, qty, book["underlying"], book["underlyings"], shape)
+
+        return RiskGrid(
+            spot_shocks=spot_shocks,
+            vol_shocks=vol_shocks,
+            days_forward=days.astype(int),
+            portfolio=(change @ np.bincount(inverse, weights=qty, minlength=len(unique))).reshape(shape),
+            by_strategy=by_strategy,
+            by_underlying=by_underlying,
+            legs=len(qty),
+            elapsed_ms=(time.perf_counter() - start) * 1000,
+        )
+
+    @staticmethod
+    def _reduce(
+        change: np.ndarray,
+        contract: np.ndarray,
+        qty: np.ndarray,
+        group: np.ndarray,
+        names: List[str],
+        shape
+    ) -> Dict[str, np.ndarray]:
+        """Per-group P&L: (scenarios, contracts) @ (contracts, groups) quantity matrix."""
+        weights = np.zeros((change.shape[1], len(names)))
+        np.add.at(weights, (contract, group), qty)
+        totals = change @ weights
+        present = np.bincount(group, minlength=len(names)) > 0
+        return {
+            name: totals[:, i].reshape(shape)
+            for i, name in enumerate(names)
+            if present[i]
+        }
+
+    @staticmethod
+    def _empty_book() -> Dict[str, Any]:
+        return legs_to_arrays([], "", None)
+
+    @staticmethod
+    def _merge(book: Dict[str, Any], extra: Dict[str, Any]) -> Dict[str, Any]:
+        """Append extra legs, remapping their strategy/underlying indices."""
+        strategy_ids = book["strategy_ids"] + [s for s in extra["strategy_ids"] if s not in book["strategy_ids"]]
+        underlyings = book["underlyings"] + [u for u in extra["underlyings"] if u not in book["underlyings"]]
+        strat_map = np.array([strategy_ids.index(s) for s in extra["strategy_ids"]], dtype=np.int64)
+        und_map = np.array([underlyings.index(u) for u in extra["underlyings"]], dtype=np.int64)
+
+        merged = {"strategy_ids": strategy_ids, "underlyings": underlyings}
+        for key, value in book.items():
+            if not isinstance(value, np.ndarray):
+                continue
+            addition = extra[key]
+            if key == "strategy":
+                addition = strat_map[addition] if len(addition) else addition
+            elif key == "underlying":
+                addition = und_map[addition] if len(addition) else addition
+            merged[key] = np.concatenate([value, addition])
+
+        # Proposal legs on an underlying already in the book use the book's spot
+        for u, name in enumerate(underlyings):
+            mask = merged["underlying"] == u
+            known = mask[:len(book["quantity"])]
+            if known.any():
+                merged["spot"][mask] = book["spot"][known][0]
+        return merged
+
+
+def legs_to_arrays(
+    legs: List[TradeLeg],
+    instrument: str,
+    spot: Optional[float],
+    strategy_id: str = PROPOSAL_ID,
+    volatility: Optional[float] = None
+) -> Dict[str, Any]:
+    """
+    Leg arrays (same layout as LiveGreeksAggregator.snapshot) for TradeLegs.
+
+    Args:
+        legs: Proposal legs
+        instrument: Underlying name
+        spot: Underlying spot (mean strike if None)
+        strategy_id: Strategy key in the resulting surfaces
+        volatility: Vol used to revalue the legs; None implies each
+            option's vol from its entry price (DEFAULT_VOL without a spot)
+
+    Returns:
+        Dict of leg arrays
+    """
+    n = len(legs)
+    strikes = [leg.strike for leg in legs if leg.strike]
+    is_call = np.array([leg.option_type == "CE" for leg in legs], dtype=bool)
+    is_future = np.array([leg.option_type not in ("CE", "PE") for leg in legs], dtype=bool)
+    strike = np.array([leg.strike or 0.0 for leg in legs], dtype=float)
+    expiry_ts = np.array([
+        datetime.combine(leg.expiry, EXPIRY_TIME).timestamp() if leg.expiry else time.time()
+        for leg in legs
+    ], dtype=float)
+
+    vol = np.full(n, volatility or DEFAULT_VOL)
+    if volatility is None and spot:
+        price = np.array([leg.entry_price or 0.0 for leg in legs], dtype=float)
+        ttm = np.maximum(expiry_ts - time.time(), 0.0) / YEAR_SECONDS
+        implied = ~is_future & (price > 0) & (ttm > 0)
+        if implied.any():
+            vol[implied] = BlackScholesCalculator.implied_vol_array(
+                is_call[implied], price[implied], spot, strike[implied], ttm[implied],
+                vol[implied], iterations=8,
+            )
+
+    spot = spot or (float(np.mean(strikes)) if strikes else np.nan)
+    return {
+        "strategy_ids": [strategy_id] if n else [],
+        "underlyings": [instrument] if n else [],
+        "strategy": np.zeros(n, dtype=np.int64),
+        "underlying": np.zeros(n, dtype=np.int64),
+        "is_call": is_call,
+        "is_future": is_future,
+        "strike": strike,
+        "expiry_ts": expiry_ts,
+        "quantity": np.array([leg.quantity if leg.is_long else -leg.quantity for leg in legs], dtype=float),
+        "volatility": vol,
+        "spot": np.full(n, spot, dtype=float),
+    }
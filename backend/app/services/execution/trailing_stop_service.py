@@ -6,20 +6,39 @@ This service:
 2. Activates trailing when P&L >= activation_pct of margin
 3. Trails profit by raising stop floor on each step increase
 4. Places/modifies SL orders at position level proportionally
+
+Evaluation is tick-driven: the service registers a callback on the Kite
+ticker and keeps an in-memory index of token -> strategies with
+precomputed thresholds, so each tick only touches the strategies holding
+that instrument. DB writes and SL order changes happen asynchronously on
+the service's event loop. The service starts the ticker itself, and falls
+back to polling quotes while no ticks arrive.
+
+Once trailing is active, P&L % is measured against the margin frozen at
+activation (trailing_margin_used), not the live margin estimate, so the
+floor and next raise are fixed rupee amounts and a margin drift alone
+cannot trigger or skip a step. Before activation the live margin is used.
 """
 
 import asyncio
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass, field, replace
 from datetime import datetime
 from decimal import Decimal
-from typing import Dict, List, Optional, Tuple
-from dataclasses import dataclass
+from typing import Any, Deque, Dict, List, Optional, Set
 from loguru import logger
+from sqlalchemy.orm import selectinload
 
 from ...core.kite_provider import get_kite_client
 from ...core.kite_client import KiteClient
 from ...database.models import Strategy, StrategyTrade, get_session
 from ..utilities import PnLCalculator
 
+# No tick batch for this long means the ticker is down: poll quotes instead
+TICK_STALE_SECONDS = 15.0
+
 
 @dataclass
 class TrailingStopState:
@@ -51,6 +70,83 @@ class PositionSLTarget:
     proportion: float  # This position's share of strategy margin
 
 
+@dataclass
+class TrackedLeg:
+    """In-memory copy of an open strategy trade (same attribute names as StrategyTrade)."""
+    id: str
+    tradingsymbol: str
+    instrument_token: int
+    exchange: str
+    quantity: int
+    entry_price: float
+    last_price: float
+    pnl: float = 0.0
+    margin: float = 0.0
+
+
+@dataclass
+class TrackedStrategy:
+    """
+    In-memory trailing stop state for one strategy.
+    
+    P&L and margin totals are maintained incrementally per tick; the
+    rupee thresholds for the next floor raise and the floor itself are
+    precomputed whenever the floor moves.
+    """
+    strategy_id: str
+    name: str
+    legs: Dict[str, TrackedLeg]  # trade_id -> leg
+    activation_pct: float
+    step_pct: float
+    lock_pct: float
+    floor_pct: Optional[float] = None
+    high_water_pct: Optional[float] = None
+    margin_used: Optional[float] = None  # Frozen at activation
+    sl_order_ids: List[str] = field(default_factory=list)
+    
+    total_pnl: float = 0.0
+    total_margin: float = 0.0
+    raise_at_pnl: float = float("inf")  # P&L (Rs) that moves the floor up one step
+    floor_pnl: float = float("-inf")  # P&L (Rs) below which the stop is hit
+    stop_hit: bool = False
+    pending_transition: bool = False  # Activation/raise queued but not yet persisted
+    last_updated: Optional[datetime] = None
+    
+    @property
+    def is_active(self) -> bool:
+        return self.floor_pct is not None
+    
+    @property
+    def margin_base(self) -> float:
+        return self.margin_used if self.is_active and self.margin_used else self.total_margin
+    
+    @property
+    def pnl_pct(self) -> float:
+        """P&L as % of margin (margin frozen at activation once trailing is active)."""
+        base = self.margin_base
+        return (self.total_pnl / base) * 100 if base > 0 else 0.0
+    
+    def recompute_thresholds(self) -> None:
+        if not self.is_active or not self.margin_used:
+            self.raise_at_pnl = float("inf")
+            self.floor_pnl = float("-inf")
+            return
+        self.raise_at_pnl = (self.high_water_pct + self.step_pct) * self.margin_used / 100
+        self.floor_pnl = self.floor_pct * self.margin_used / 100
+
+
+@dataclass
+class TrailingTransition:
+    """Floor change to persist and act on (SL placement/update)."""
+    kind: str  # "activate" or "raise"
+    strategy_id: str
+    floor_pct: float
+    high_water_pct: float
+    margin_used: float
+    legs: List[TrackedLeg]  # Snapshot at the triggering tick
+    at: datetime
+
+
 class TrailingStopService:
     """
     Service to manage trailing stop-loss for strategies.
@@ -62,13 +158,31 @@ class TrailingStopService:
     - Lock in 0.8% as floor
     - Every 0.1% increase in P&L: raise floor by 0.05%
     - Place SL orders at position level proportionally
+    
+    Threading:
+    - on_ticks() runs on the ticker thread and only mutates the in-memory index
+    - start() runs on the event loop and persists transitions, SL orders and
+      dirty P&L in a worker thread
     """
     
-    def __init__(self, kite: Optional[KiteClient] = None):
+    def __init__(self, kite: Optional[KiteClient] = None, ticker=None):
         self.kite = kite
+        self._ticker = ticker
         self._running = False
-        self._poll_interval = 5  # seconds
-        self._states: Dict[str, TrailingStopState] = {}
+        self._poll_interval = 5  # seconds between P&L persistence flushes
+        self._resync_interval = 300  # seconds between DB index resyncs
+        
+        self._lock = threading.RLock()
+        self._strategies: Dict[str, TrackedStrategy] = {}
+        self._token_index: Dict[int, Set[str]] = {}  # token -> strategy ids
+        self._dirty: Set[str] = set()  # strategies with unpersisted P&L
+        self._transitions: Deque[TrailingTransition] = deque()
+        
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._wakeup: Optional[asyncio.Event] = None
+        self._last_resync: Optional[datetime] = None
+        self._last_tick_at: Optional[float] = None  # monotonic time of the last ticker batch
+        self.stats = {"ticks": 0, "quote_polls": 0}
     
     def _get_kite(self) -> Optional[KiteClient]:
         """Get KiteClient instance."""
@@ -76,209 +190,425 @@ class TrailingStopService:
             return self.kite
         return get_kite_client(paper_mode=False, skip_api_check=True)
     
-    async def start(self, poll_interval: int = 5):
-        """Start the trailing stop monitoring loop."""
+    def _get_ticker(self):
+        if self._ticker is None:
+            from ...api.websocket import ticker_manager
+            self._ticker = ticker_manager
+        return self._ticker
+    
+    async def start(self, poll_interval: int = 5, resync_interval: int = 300):
+        """
+        Start tick-driven trailing stop monitoring.
+        
+        Args:
+            poll_interval: Seconds between flushes of changed P&L to the DB
+                (transitions are handled immediately)
+            resync_interval: Seconds between reloads of the strategy index
+                from the DB (picks up new trades); 0 disables
+        """
         self._running = True
         self._poll_interval = poll_interval
-        logger.info(f"TrailingStopService started with {poll_interval}s poll interval")
+        self._resync_interval = resync_interval
+        self._loop = asyncio.get_running_loop()
+        self._wakeup = asyncio.Event()
         
-        while self._running:
-            try:
-                await self._monitor_strategies()
-            except Exception as e:
-                logger.error(f"Error in trailing stop monitor: {e}")
-            
-            await asyncio.sleep(self._poll_interval)
+        await self._loop.run_in_executor(None, self.resync)
+        ticker = self._get_ticker()
+        ticker.add_callback(self.on_ticks)
+        if not ticker.ensure_started():
+            logger.warning("Kite ticker not running, trailing stops fall back to quote polling")
+        ticker.subscribe(self.tokens())  # Re-sent by the ticker on every (re)connect
+        
+        logger.info(
+            f"TrailingStopService started (tick-driven): {len(self._strategies)} strategies, "
+            f"{len(self._token_index)} tokens, flush every {poll_interval}s"
+        )
+        
+        try:
+            while self._running:
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), timeout=self._poll_interval)
+                except asyncio.TimeoutError:
+                    pass
+                self._wakeup.clear()
+                
+                try:
+                    if self._ticks_stale():
+                        await self._loop.run_in_executor(None, self.poll_quotes)
+                    await self._loop.run_in_executor(None, self._flush)
+                    
+                    if self._resync_interval and (
+                        datetime.now() - self._last_resync
+                    ).total_seconds() >= self._resync_interval:
+                        await self._loop.run_in_executor(None, self.resync)
+                        ticker.subscribe(self.tokens())
+                except Exception as e:
+                    logger.error(f"Error in trailing stop monitor: {e}")
+        finally:
+            ticker.remove_callback(self.on_ticks)
     
     def stop(self):
         """Stop the monitoring loop."""
         self._running = False
+        if self._loop and self._wakeup:
+            self._loop.call_soon_threadsafe(self._wakeup.set)
         logger.info("TrailingStopService stopped")
     
-    async def _monitor_strategies(self):
-        """Monitor all strategies with trailing stop enabled."""
+    # =========================================================================
+    # Index
+    # =========================================================================
+    
+    def tokens(self) -> List[int]:
+        """Instrument tokens the service needs ticks for."""
+        with self._lock:
+            return list(self._token_index.keys())
+    
+    def resync(self):
+        """Rebuild the in-memory index from the DB (one query)."""
         session = get_session()
         try:
-            # Get all strategies with trailing stop enabled and status OPEN
-            strategies = session.query(Strategy).filter(
+            strategies = session.query(Strategy).options(
+                selectinload(Strategy.trades)
+            ).filter(
                 Strategy.trailing_stop_enabled == True,
                 Strategy.status == "OPEN"
             ).all()
             
-            if not strategies:
-                return
-            
-            kite = self._get_kite()
-            if not kite:
-                logger.warning("No KiteClient available for trailing stop monitoring")
-                return
-            
-            # Collect all instrument tokens for batch quote fetch
-            all_tokens = set()
-            strategy_trades_map: Dict[str, List[StrategyTrade]] = {}
-            
+            tracked = {}
             for strategy in strategies:
                 trades = [t for t in strategy.trades if t.status == "OPEN"]
-                strategy_trades_map[strategy.id] = trades
-                for trade in trades:
-                    all_tokens.add(trade.instrument_token)
-            
-            if not all_tokens:
-                return
-            
-            # Fetch quotes for all positions
-            quotes = kite.get_quote(list(all_tokens))
-            
-            # Process each strategy
-            for strategy in strategies:
-                await self._process_strategy(strategy, strategy_trades_map[strategy.id], quotes, session)
+                if trades:
+                    tracked[strategy.id] = self._build_tracked(strategy, trades)
+            
+            with self._lock:
+                # Keep live prices and unflushed state for strategies we already track
+                for sid, new in tracked.items():
+                    old = self._strategies.get(sid)
+                    if old is None:
+                        continue
+                    if old.pending_transition:
+                        tracked[sid] = old
+                        continue
+                    for tid, leg in new.legs.items():
+                        if tid in old.legs:
+                            leg.last_price = old.legs[tid].last_price
+                    self._recalculate(new)
+                self._strategies = tracked
+                self._rebuild_token_index()
+            
+            self._last_resync = datetime.now()
+            logger.debug(f"Trailing stop index: {len(tracked)} strategies")
+        except Exception as e:
+            logger.error(f"Failed to load trailing stop strategies: {e}")
+            self._last_resync = datetime.now()
+        finally:
+            session.close()
+    
+    def refresh_strategy(self, strategy_id: str):
+        """Reload one strategy (after enable/config changes)."""
+        session = get_session()
+        try:
+            strategy = session.query(Strategy).filter_by(id=strategy_id).first()
+            trades = [t for t in strategy.trades if t.status == "OPEN"] if strategy else []
             
-            session.commit()
+            with self._lock:
+                self._untrack(strategy_id)
+                if strategy and strategy.trailing_stop_enabled and strategy.status == "OPEN" and trades:
+                    self._strategies[strategy_id] = self._build_tracked(strategy, trades)
+                self._rebuild_token_index()
             
+            if self._running:
+                self._get_ticker().subscribe(self.tokens())
         except Exception as e:
-            logger.error(f"Error monitoring strategies: {e}")
-            session.rollback()
+            logger.error(f"Failed to refresh trailing stop for {strategy_id}: {e}")
         finally:
             session.close()
     
-    async def _process_strategy(
-        self, 
-        strategy: Strategy, 
-        trades: List[StrategyTrade],
-        quotes: Dict,
-        session
-    ):
-        """Process a single strategy for trailing stop logic."""
-        if not trades:
-            return
-        
-        # Calculate strategy-level P&L and margin
-        total_pnl = 0.0
-        total_margin = 0.0
-        position_details = []
-        
+    def _untrack(self, strategy_id: str):
+        """Drop a strategy with its queued transitions and unflushed P&L (caller holds _lock)."""
+        self._strategies.pop(strategy_id, None)
+        self._transitions = deque(t for t in self._transitions if t.strategy_id != strategy_id)
+        self._dirty.discard(strategy_id)
+    
+    def track(self, strategy, trades) -> TrackedStrategy:
+        """Add a strategy to the index from Strategy/StrategyTrade-like objects."""
+        tracked = self._build_tracked(strategy, trades)
+        with self._lock:
+            self._strategies[tracked.strategy_id] = tracked
+            self._rebuild_token_index()
+        return tracked
+    
+    def _build_tracked(self, strategy, trades) -> TrackedStrategy:
+        legs = {}
         for trade in trades:
-            token = trade.instrument_token
-            quote = quotes.get(token, {})
-            last_price = quote.get("last_price", float(trade.last_price or trade.entry_price))
-            
-            # Update trade's last_price
-            trade.last_price = Decimal(str(last_price))
-            trade.last_updated = datetime.now()
-            
-            # Calculate P&L for this position
-            qty = trade.quantity
-            entry_price = float(trade.entry_price)
-            
-            if qty > 0:  # Long position
-                pnl = (last_price - entry_price) * qty
-            else:  # Short position
-                pnl = (entry_price - last_price) * abs(qty)
-            
-            trade.unrealized_pnl = Decimal(str(pnl))
-            
-            # Estimate margin for this position
-            margin = self._estimate_position_margin(
-                trade.tradingsymbol, 
-                trade.exchange, 
-                qty, 
-                last_price,
-                entry_price
+            entry = float(trade.entry_price)
+            legs[trade.id] = TrackedLeg(
+                id=trade.id,
+                tradingsymbol=trade.tradingsymbol,
+                instrument_token=trade.instrument_token,
+                exchange=trade.exchange,
+                quantity=trade.quantity,
+                entry_price=entry,
+                last_price=float(trade.last_price or entry),
             )
-            
-            total_pnl += pnl
-            total_margin += margin
-            
-            position_details.append({
-                "trade": trade,
-                "last_price": last_price,
-                "pnl": pnl,
-                "margin": margin
-            })
         
-        if total_margin <= 0:
-            return
+        tracked = TrackedStrategy(
+            strategy_id=strategy.id,
+            name=strategy.name,
+            legs=legs,
+            activation_pct=float(strategy.trailing_activation_pct or 0.8),
+            step_pct=float(strategy.trailing_step_pct or 0.1),
+            lock_pct=float(strategy.trailing_lock_pct or 0.05),
+            floor_pct=float(strategy.trailing_current_floor_pct) if strategy.trailing_current_floor_pct else None,
+            high_water_pct=float(strategy.trailing_high_water_pct) if strategy.trailing_high_water_pct else None,
+            margin_used=float(strategy.trailing_margin_used) if strategy.trailing_margin_used else None,
+            sl_order_ids=list(strategy.trailing_sl_order_ids or []),
+        )
+        self._recalculate(tracked)
+        return tracked
+    
+    def _rebuild_token_index(self):
+        index: Dict[int, Set[str]] = {}
+        for sid, tracked in self._strategies.items():
+            for leg in tracked.legs.values():
+                index.setdefault(leg.instrument_token, set()).add(sid)
+        self._token_index = index
+    
+    def _update_leg(self, leg: TrackedLeg, last_price: float):
+        leg.last_price = last_price
+        leg.pnl = (last_price - leg.entry_price) * leg.quantity
+        leg.margin = self._estimate_position_margin(
+            leg.tradingsymbol, leg.exchange, leg.quantity, last_price, leg.entry_price
+        )
+    
+    def _recalculate(self, tracked: TrackedStrategy):
+        for leg in tracked.legs.values():
+            self._update_leg(leg, leg.last_price)
+        tracked.total_pnl = sum(l.pnl for l in tracked.legs.values())
+        tracked.total_margin = sum(l.margin for l in tracked.legs.values())
+        if tracked.is_active and not tracked.margin_used:
+            tracked.margin_used = tracked.total_margin
+        tracked.recompute_thresholds()
+    
+    # =========================================================================
+    # Tick path
+    # =========================================================================
+    
+    def on_ticks(self, ticks: List[Dict[str, Any]]):
+        """Ticker callback: update affected strategies and evaluate their thresholds."""
+        self._last_tick_at = time.monotonic()
+        self.stats["ticks"] += 1
+        self._apply_prices(ticks)
+    
+    def _ticks_stale(self) -> bool:
+        if not self._token_index:
+            return False
+        return self._last_tick_at is None or time.monotonic() - self._last_tick_at > TICK_STALE_SECONDS
+    
+    def poll_quotes(self) -> int:
+        """
+        Fallback while the ticker is down: evaluate tracked legs on REST LTPs.
         
-        # Calculate P&L as percentage of margin
-        pnl_pct = (total_pnl / total_margin) * 100
+        Returns:
+            Number of prices applied
+        """
+        tokens = self.tokens()
+        kite = self._get_kite()
+        if not tokens or kite is None:
+            return 0
+        try:
+            prices = kite.get_ltp(tokens)
+        except Exception as e:
+            logger.error(f"Trailing stop quote poll failed: {e}")
+            return 0
+        ticks = [{"instrument_token": t, "last_price": p} for t, p in prices.items() if p]
+        self._apply_prices(ticks)
+        self.stats["quote_polls"] += 1
+        return len(ticks)
+    
+    def _apply_prices(self, ticks: List[Dict[str, Any]]):
+        touched: Set[str] = set()
         
-        # Get trailing config
-        activation_pct = float(strategy.trailing_activation_pct or 0.8)
-        step_pct = float(strategy.trailing_step_pct or 0.1)
-        lock_pct = float(strategy.trailing_lock_pct or 0.05)
-        current_floor = float(strategy.trailing_current_floor_pct) if strategy.trailing_current_floor_pct else None
-        high_water = float(strategy.trailing_high_water_pct) if strategy.trailing_high_water_pct else None
+        with self._lock:
+            for tick in ticks:
+                token = tick.get("instrument_token")
+                price = tick.get("last_price")
+                sids = self._token_index.get(token)
+                if not sids or price is None:
+                    continue
+                
+                for sid in sids:
+                    tracked = self._strategies[sid]
+                    for leg in tracked.legs.values():
+                        if leg.instrument_token != token or leg.last_price == price:
+                            continue
+                        old_pnl, old_margin = leg.pnl, leg.margin
+                        self._update_leg(leg, price)
+                        tracked.total_pnl += leg.pnl - old_pnl
+                        tracked.total_margin += leg.margin - old_margin
+                        touched.add(sid)
+            
+            for sid in touched:
+                self._evaluate(self._strategies[sid])
+            self._dirty |= touched
         
-        logger.debug(
-            f"Strategy {strategy.name}: P&L={total_pnl:.2f} ({pnl_pct:.3f}%), "
-            f"Margin={total_margin:.2f}, Floor={current_floor}, HW={high_water}"
-        )
+        if touched and self._transitions:
+            self._notify()
+    
+    def _evaluate(self, tracked: TrackedStrategy):
+        """Apply trailing logic to one strategy; caller holds the lock."""
+        tracked.last_updated = datetime.now()
+        if tracked.total_margin <= 0 or tracked.pending_transition:
+            return
         
-        # Check if we should activate trailing
-        if current_floor is None and pnl_pct >= activation_pct:
-            # Activate trailing stop
-            current_floor = activation_pct
-            high_water = pnl_pct
-            strategy.trailing_current_floor_pct = Decimal(str(current_floor))
-            strategy.trailing_high_water_pct = Decimal(str(high_water))
-            strategy.trailing_margin_used = Decimal(str(total_margin))
-            strategy.trailing_activated_at = datetime.now()
-            
-            logger.info(
-                f"TRAILING ACTIVATED for {strategy.name}: "
-                f"P&L={pnl_pct:.3f}% >= {activation_pct}%, Floor locked at {current_floor}%"
-            )
-            
-            # Place initial SL orders
-            await self._place_sl_orders(strategy, position_details, current_floor, total_margin, session)
+        pnl = tracked.total_pnl
         
-        elif current_floor is not None:
-            # Trailing is active - check if we need to raise the floor
-            if pnl_pct > high_water:
-                # Calculate how many steps we've moved up
-                steps_up = int((pnl_pct - high_water) / step_pct)
+        if not tracked.is_active:
+            if pnl >= tracked.activation_pct * tracked.total_margin / 100:
+                pnl_pct = tracked.pnl_pct
+                tracked.floor_pct = tracked.activation_pct
+                tracked.high_water_pct = pnl_pct
+                tracked.margin_used = tracked.total_margin
+                tracked.recompute_thresholds()
                 
-                if steps_up > 0:
-                    # Raise the floor
-                    new_floor = current_floor + (steps_up * lock_pct)
-                    new_high_water = high_water + (steps_up * step_pct)
-                    
-                    strategy.trailing_current_floor_pct = Decimal(str(new_floor))
-                    strategy.trailing_high_water_pct = Decimal(str(new_high_water))
-                    
-                    logger.info(
-                        f"TRAILING RAISED for {strategy.name}: "
-                        f"Floor {current_floor:.3f}% -> {new_floor:.3f}%, "
-                        f"HW {high_water:.3f}% -> {new_high_water:.3f}%"
-                    )
-                    
-                    # Update SL orders
-                    await self._update_sl_orders(strategy, position_details, new_floor, total_margin, session)
-                    current_floor = new_floor
-            
-            # Check if P&L dropped below floor - SL should trigger
-            if pnl_pct < current_floor:
-                logger.warning(
-                    f"TRAILING STOP HIT for {strategy.name}: "
-                    f"P&L={pnl_pct:.3f}% < Floor={current_floor:.3f}%"
+                logger.info(
+                    f"TRAILING ACTIVATED for {tracked.name}: "
+                    f"P&L={pnl_pct:.3f}% >= {tracked.activation_pct}%, Floor locked at {tracked.floor_pct}%"
                 )
-                # The SL orders should have been triggered by the broker
-                # We just log here - actual order execution is handled by Kite
+                self._queue_transition("activate", tracked)
+            return
         
-        # Update state cache
-        self._states[strategy.id] = TrailingStopState(
-            strategy_id=strategy.id,
-            strategy_name=strategy.name,
-            is_active=current_floor is not None,
-            margin_used=total_margin,
-            current_pnl=total_pnl,
-            current_pnl_pct=pnl_pct,
-            activation_pct=activation_pct,
-            floor_pct=current_floor,
-            high_water_pct=high_water,
-            sl_order_ids=strategy.trailing_sl_order_ids or [],
-            last_updated=datetime.now()
-        )
+        if pnl >= tracked.raise_at_pnl:
+            pnl_pct = tracked.pnl_pct
+            steps_up = int((pnl_pct - tracked.high_water_pct) / tracked.step_pct)
+            if steps_up > 0:
+                old_floor, old_hw = tracked.floor_pct, tracked.high_water_pct
+                tracked.floor_pct = old_floor + steps_up * tracked.lock_pct
+                tracked.high_water_pct = old_hw + steps_up * tracked.step_pct
+                tracked.recompute_thresholds()
+                tracked.stop_hit = False
+                
+                logger.info(
+                    f"TRAILING RAISED for {tracked.name}: "
+                    f"Floor {old_floor:.3f}% -> {tracked.floor_pct:.3f}%, "
+                    f"HW {old_hw:.3f}% -> {tracked.high_water_pct:.3f}%"
+                )
+                self._queue_transition("raise", tracked)
+                return
+        
+        if pnl < tracked.floor_pnl and not tracked.stop_hit:
+            tracked.stop_hit = True
+            logger.warning(
+                f"TRAILING STOP HIT for {tracked.name}: "
+                f"P&L={tracked.pnl_pct:.3f}% < Floor={tracked.floor_pct:.3f}%"
+            )
+            # The SL orders should have been triggered by the broker
+            # We just log here - actual order execution is handled by Kite
+    
+    def _queue_transition(self, kind: str, tracked: TrackedStrategy):
+        tracked.pending_transition = True
+        self._transitions.append(TrailingTransition(
+            kind=kind,
+            strategy_id=tracked.strategy_id,
+            floor_pct=tracked.floor_pct,
+            high_water_pct=tracked.high_water_pct,
+            margin_used=tracked.margin_used,
+            legs=[replace(l) for l in tracked.legs.values()],
+            at=datetime.now(),
+        ))
+    
+    def _notify(self):
+        """Wake the persistence loop from any thread."""
+        if self._loop and self._wakeup and self._running:
+            self._loop.call_soon_threadsafe(self._wakeup.set)
+    
+    # =========================================================================
+    # Persistence (runs in a worker thread)
+    # =========================================================================
+    
+    def _flush(self):
+        """Persist queued transitions (with SL orders) and dirty P&L."""
+        while True:
+            with self._lock:
+                if not self._transitions:
+                    break
+                transition = self._transitions.popleft()
+            self._apply_transition(transition)
+        
+        with self._lock:
+            dirty, self._dirty = self._dirty, set()
+            updates = []
+            now = datetime.now()
+            for sid in dirty:
+                tracked = self._strategies.get(sid)
+                if tracked is None:
+                    continue
+                for leg in tracked.legs.values():
+                    updates.append({
+                        "id": leg.id,
+                        "last_price": Decimal(str(round(leg.last_price, 2))),
+                        "unrealized_pnl": Decimal(str(round(leg.pnl, 2))),
+                        "last_updated": now,
+                    })
+        
+        if not updates:
+            return
+        
+        session = get_session()
+        try:
+            session.bulk_update_mappings(StrategyTrade, updates)
+            session.commit()
+        except Exception as e:
+            logger.error(f"Failed to persist trailing stop P&L: {e}")
+            session.rollback()
+            with self._lock:
+                self._dirty |= dirty
+        finally:
+            session.close()
+    
+    def _apply_transition(self, transition: TrailingTransition):
+        session = get_session()
+        try:
+            strategy = session.query(Strategy).filter_by(id=transition.strategy_id).first()
+            with self._lock:
+                tracked = transition.strategy_id in self._strategies
+            if strategy is None or not strategy.trailing_stop_enabled or not tracked:
+                # Disabled (or refreshed) after the transition was queued
+                logger.debug(f"Dropping trailing {transition.kind} for untracked {transition.strategy_id}")
+                return
+            
+            strategy.trailing_current_floor_pct = Decimal(str(transition.floor_pct))
+            strategy.trailing_high_water_pct = Decimal(str(transition.high_water_pct))
+            if transition.kind == "activate":
+                strategy.trailing_margin_used = Decimal(str(transition.margin_used))
+                strategy.trailing_activated_at = transition.at
+            
+            position_details = [
+                {"trade": leg, "last_price": leg.last_price, "pnl": leg.pnl, "margin": leg.margin}
+                for leg in transition.legs
+            ]
+            total_margin = sum(leg.margin for leg in transition.legs)
+            
+            if transition.kind == "activate":
+                self._place_sl_orders(strategy, position_details, transition.floor_pct, total_margin, session)
+            else:
+                self._update_sl_orders(strategy, position_details, transition.floor_pct, total_margin, session)
+            
+            session.commit()
+            
+            with self._lock:
+                tracked = self._strategies.get(transition.strategy_id)
+                if tracked:
+                    tracked.sl_order_ids = list(strategy.trailing_sl_order_ids or [])
+        except Exception as e:
+            logger.error(f"Failed to apply trailing {transition.kind} for {transition.strategy_id}: {e}")
+            session.rollback()
+        finally:
+            session.close()
+            with self._lock:
+                tracked = self._strategies.get(transition.strategy_id)
+                if tracked:
+                    tracked.pending_transition = False
     
     def _estimate_position_margin(
         self, 
@@ -306,7 +636,7 @@ class TrailingStopService:
         else:
             return notional * 0.20
     
-    async def _place_sl_orders(
+    def _place_sl_orders(
         self,
         strategy: Strategy,
         position_details: List[dict],
@@ -360,7 +690,7 @@ class TrailingStopService:
         
         strategy.trailing_sl_order_ids = sl_order_ids
     
-    async def _update_sl_orders(
+    def _update_sl_orders(
         self,
         strategy: Strategy,
         position_details: List[dict],
@@ -384,11 +714,11 @@ class TrailingStopService:
                 logger.warning(f"Failed to cancel SL order {order_id}: {e}")
         
         # Place new SL orders with updated prices
-        await self._place_sl_orders(strategy, position_details, new_floor_pct, total_margin, session)
+        self._place_sl_orders(strategy, position_details, new_floor_pct, total_margin, session)
     
     def _calculate_sl_price(
         self,
-        trade: StrategyTrade,
+        trade: TrackedLeg,
         last_price: float,
         floor_pct: float,
         proportion: float,
@@ -453,13 +783,31 @@ class TrailingStopService:
             proportion=proportion
         )
     
+    def _to_state(self, tracked: TrackedStrategy) -> TrailingStopState:
+        return TrailingStopState(
+            strategy_id=tracked.strategy_id,
+            strategy_name=tracked.name,
+            is_active=tracked.is_active,
+            margin_used=tracked.margin_base,
+            current_pnl=tracked.total_pnl,
+            current_pnl_pct=tracked.pnl_pct,
+            activation_pct=tracked.activation_pct,
+            floor_pct=tracked.floor_pct,
+            high_water_pct=tracked.high_water_pct,
+            sl_order_ids=list(tracked.sl_order_ids),
+            last_updated=tracked.last_updated or datetime.now()
+        )
+    
     def get_state(self, strategy_id: str) -> Optional[TrailingStopState]:
         """Get current trailing stop state for a strategy."""
-        return self._states.get(strategy_id)
+        with self._lock:
+            tracked = self._strategies.get(strategy_id)
+            return self._to_state(tracked) if tracked else None
     
     def get_all_states(self) -> Dict[str, TrailingStopState]:
         """Get all trailing stop states."""
-        return self._states.copy()
+        with self._lock:
+            return {sid: self._to_state(t) for sid, t in self._strategies.items()}
     
     def enable_trailing_stop(
         self,
@@ -486,6 +834,7 @@ class TrailingStopService:
             strategy.trailing_sl_order_ids = None
             
             session.commit()
+            self.refresh_strategy(strategy_id)
             logger.info(
                 f"Enabled trailing stop for {strategy.name}: "
                 f"activation={activation_pct}%, step={step_pct}%, lock={lock_pct}%"
@@ -507,6 +856,11 @@ class TrailingStopService:
                 logger.error(f"Strategy {strategy_id} not found")
                 return False
             
+            # Stop tracking first so no queued transition re-places orders
+            with self._lock:
+                self._untrack(strategy_id)
+                self._rebuild_token_index()
+            
             # Cancel existing SL orders
             if cancel_orders and strategy.trailing_sl_order_ids:
                 kite = self._get_kite()
@@ -526,10 +880,6 @@ class TrailingStopService:
             
             session.commit()
             
-            # Remove from state cache
-            if strategy_id in self._states:
-                del self._states[strategy_id]
-            
             logger.info(f"Disabled trailing stop for {strategy.name}")
             return True
         except Exception as e:
@@ -545,8 +895,17 @@ _trailing_stop_service: Optional[TrailingStopService] = None
 
 
 def get_trailing_stop_service() -> TrailingStopService:
-    """Get the singleton TrailingStopService instance."""
+    """
+    Get the singleton TrailingStopService instance.
+    
+    In an API worker this is a proxy to the broker process's service, which
+    owns the ticker subscriptions and stop orders.
+    """
     global _trailing_stop_service
     if _trailing_stop_service is None:
-        _trailing_stop_service = TrailingStopService()
+        from ...core.state_hub import get_hub_client, is_api_worker
+        if is_api_worker():
+            _trailing_stop_service = get_hub_client().proxy("trailing_stop")
+        else:
+            _trailing_stop_service = TrailingStopService()
     return _trailing_stop_service
@@ -9,9 +9,10 @@ from ...core.kite_client import KiteClient
 from ...core.state_manager import StateManager
 from ...config.settings import Settings
 from .circuit_breaker import CircuitBreaker, CircuitBreakerState
+from .risk_grid import RiskGridEngine
 from ...config.thresholds import (
     MAX_MARGIN_PCT, MAX_LOSS_PER_TRADE, MAX_DAILY_LOSS, MAX_WEEKLY_LOSS,
-    MAX_POSITIONS, MAX_DELTA, MAX_GAMMA, MAX_VEGA,
+    MAX_POSITIONS, MAX_DELTA, MAX_GAMMA, MAX_VEGA, MAX_SCENARIO_LOSS_PCT,
     DRAWDOWN_LEVEL_1, DRAWDOWN_LEVEL_2, DRAWDOWN_LEVEL_3,
     DRAWDOWN_MULTIPLIER_1, DRAWDOWN_MULTIPLIER_2, DRAWDOWN_MULTIPLIER_3,
     FLAT_DAYS_DAILY_LOSS, FLAT_DAYS_WEEKLY_LOSS,
@@ -56,7 +57,8 @@ class Treasury(BaseAgent):
         config: Settings,
         state_manager: Optional[StateManager] = None,
         paper_mode: bool = False,
-        circuit_breaker: Optional[CircuitBreaker] = None
+        circuit_breaker: Optional[CircuitBreaker] = None,
+        risk_grid: Optional[RiskGridEngine] = None
     ):
         super().__init__(kite, config, name="Treasury")
         self.state_manager = state_manager or StateManager()
@@ -65,6 +67,9 @@ class Treasury(BaseAgent):
         # Initialize CircuitBreaker with paper or live equity
         initial_equity = self.PAPER_EQUITY if paper_mode else 100000.0
         self.circuit_breaker = circuit_breaker or CircuitBreaker(initial_equity=initial_equity)
+        
+        # Scenario grid over the open book (pre-trade worst-case check)
+        self.risk_grid = risk_grid
     
     def process(
         self,
@@ -110,6 +115,11 @@ class Treasury(BaseAgent):
         if not greeks_ok:
             return False, None, greeks_reason
         
+        # 5b. Check worst-case scenario loss of book + proposal
+        scenario_ok, scenario_reason = self._check_scenario_risk(proposal, account)
+        if not scenario_ok:
+            return False, None, scenario_reason
+        
         # 6. Check correlation-based diversification (Section 5)
         diversification_multiplier = self._get_diversification_multiplier(
             proposal.instrument, correlations, account
@@ -158,9 +168,11 @@ class Treasury(BaseAgent):
             proposal_id=proposal.id,
             structure=proposal.structure,
             instrument=proposal.instrument,
+            instrument_token=proposal.instrument_token,
             legs=proposal.legs,
             approved_margin=adjusted_margin,
             approved_size_pct=adjusted_size_pct,
+            available_margin=account.available_margin,
             drawdown_multiplier=final_multiplier,
             target_pnl=proposal.target_pnl * final_multiplier,
             stop_loss=proposal.stop_loss * final_multiplier,
@@ -319,6 +331,36 @@ class Treasury(BaseAgent):
         
         return True, ""
     
+    def _check_scenario_risk(
+        self,
+        proposal: TradeProposal,
+        account: AccountState
+    ) -> Tuple[bool, str]:
+        """Check worst spot/vol/time grid loss of the book plus the proposal."""
+        if self.risk_grid is None:
+            return True, ""
+        
+        try:
+            # Legs are revalued at the real spot with vols implied from their entry prices
+            ok, reason, grid = self.risk_grid.check_proposal(
+                proposal.legs, proposal.instrument, self._underlying_spot(proposal),
+                max_loss=account.equity * MAX_SCENARIO_LOSS_PCT
+            )
+            self.logger.debug(f"Scenario grid: worst loss {grid.worst_loss:,.0f} ({grid.elapsed_ms:.0f}ms)")
+            return ok, reason
+        except Exception as e:
+            self.logger.warning(f"Scenario risk check failed: {e}")
+            return True, ""
+    
+    def _underlying_spot(self, proposal: TradeProposal) -> Optional[float]:
+        """Underlying LTP for the proposal, None if unavailable."""
+        try:
+            spot = self.kite.get_ltp([proposal.instrument_token]).get(proposal.instrument_token)
+            return float(spot) if spot else None
+        except Exception as e:
+            self.logger.warning(f"Failed to get spot for {proposal.instrument}: {e}")
+            return None
+    
     def _get_drawdown_multiplier(self, account: AccountState) -> float:
         """Get position size multiplier based on drawdown."""
         dd_pct = account.drawdown_pct
@@ -1,11 +1,16 @@
 """Technical indicators and market metrics module"""
 
-from .technical import calculate_adx, calculate_rsi, calculate_atr
-from .volatility import calculate_iv_percentile, calculate_realized_vol
-from .greeks import calculate_greeks, GreeksCalculator
-from .dc import DirectionalChange, DCEvent
-from .smei import SMEICalculator
-from .hmm_helper import HMMRegimeClassifier, DCAlarmTracker
+from ...core.lazy import lazy_exports
+
+# Submodules are imported on first use of one of their names (see core/lazy.py)
+__getattr__, __dir__ = lazy_exports(__name__, {
+    ".technical": ["calculate_adx", "calculate_rsi", "calculate_atr"],
+    ".volatility": ["calculate_iv_percentile", "calculate_realized_vol"],
+    ".greeks": ["calculate_greeks", "GreeksCalculator"],
+    ".dc": ["DirectionalChange", "DCEvent"],
+    ".smei": ["SMEICalculator"],
+    ".hmm_helper": ["HMMRegimeClassifier", "DCAlarmTracker"],
+})
 
 __all__ = [
     "calculate_adx",
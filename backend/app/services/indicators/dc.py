@@ -97,11 +97,15 @@ class DirectionalChange:
         
         event_start_idx = current_extremum_idx
         
+        # Scan on plain arrays - row access via iloc dominates the cost otherwise
+        highs = df['high'].to_numpy(dtype=float)
+        lows = df['low'].to_numpy(dtype=float)
+        
         # Scan for reversals
         for i in range(current_extremum_idx + 1, len(df)):
             if current_direction == 'down':
                 # Looking for low (downtrend)
-                candidate_price = df.iloc[i]['low']
+                candidate_price = lows[i]
                 reversal_threshold = current_extremum_price * (1 - self.theta)
                 
                 if candidate_price <= reversal_threshold:
@@ -119,7 +123,7 @@ class DirectionalChange:
                     self.extrema.append((i, candidate_price, 'low'))
             else:
                 # Looking for high (uptrend)
-                candidate_price = df.iloc[i]['high']
+                candidate_price = highs[i]
                 reversal_threshold = current_extremum_price * (1 + self.theta)
                 
                 if candidate_price >= reversal_threshold:
@@ -13,14 +13,14 @@ Market Hours (IST):
 import asyncio
 from datetime import datetime, time, timedelta
 from typing import Optional, Callable
-import pytz
+from zoneinfo import ZoneInfo
 from loguru import logger
 
 from .reconciliation import run_reconciliation
 from ..core.credentials import get_kite_credentials
 from ..config.settings import Settings
 
-IST = pytz.timezone('Asia/Kolkata')
+IST = ZoneInfo('Asia/Kolkata')
 
 # Market close times (IST)
 NSE_CLOSE = time(15, 30)  # 3:30 PM
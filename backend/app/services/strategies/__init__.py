@@ -1,12 +1,17 @@
 """Trading strategies module - Option structures and signal generation"""
 
-from .strategy_selector import StrategySelector
-from .strategist import Strategist
-from .iron_condor import IronCondorStrategy
-from .jade_lizard import JadeLizardStrategy
-from .butterfly import BrokenWingButterflyStrategy
-from .risk_reversal import RiskReversalStrategy
-from .strangle import StrangleStrategy
+from ...core.lazy import lazy_exports
+
+# Submodules are imported on first use of one of their names (see core/lazy.py)
+__getattr__, __dir__ = lazy_exports(__name__, {
+    ".strategy_selector": ["StrategySelector"],
+    ".strategist": ["Strategist"],
+    ".iron_condor": ["IronCondorStrategy"],
+    ".jade_lizard": ["JadeLizardStrategy"],
+    ".butterfly": ["BrokenWingButterflyStrategy"],
+    ".risk_reversal": ["RiskReversalStrategy"],
+    ".strangle": ["StrangleStrategy"],
+})
 
 __all__ = [
     "StrategySelector",
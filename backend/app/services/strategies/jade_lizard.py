@@ -8,6 +8,7 @@ from loguru import logger
 from ...models.regime import RegimePacket, RegimeType
 from ...models.trade import TradeProposal, TradeLeg, LegType, StructureType
 from ...config.constants import NFO
+from ..execution.margin_service import MarginLeg, get_margin_service
 
 
 class JadeLizardStrategy:
@@ -131,8 +132,8 @@ class JadeLizardStrategy:
         
         greeks = self._calculate_greeks(legs)
         
-        # Get actual margin from Kite API
-        required_margin = self._calculate_margin_from_api(legs, lot_size)
+        # Get margin (local SPAN-like estimate calibrated against Kite)
+        required_margin = self._estimate_margin(legs, lot_size, spot=regime.spot_price)
         if required_margin == 0:
             # Fallback estimation if API fails
             required_margin = max(max_loss, net_credit * lot_size * 3)
@@ -246,59 +247,44 @@ class JadeLizardStrategy:
             greeks["vega"] += leg.vega * multiplier * leg.quantity
         return greeks
     
-    def _calculate_margin_from_api(self, legs: List[TradeLeg], lot_size: int) -> float:
+    def _estimate_margin(
+        self,
+        legs: List[TradeLeg],
+        lot_size: int,
+        spot: Optional[float] = None
+    ) -> float:
         """
-        Calculate actual margin required using Kite order_margins API.
+        Calculate margin required using the local SPAN-like margin service.
         
         Args:
             legs: List of TradeLeg objects
             lot_size: Lot size for the instrument
+            spot: Underlying spot price (inferred from the legs if None)
             
         Returns:
-            Total margin required (float), or 0 if API call fails
+            Total margin required (float), or 0 if estimation fails
         """
-        if not self.kite or not legs:
+        if not legs:
             return 0.0
         
-        # Build orders list for Kite API
-        orders = []
-        for leg in legs:
-            order = {
-                "exchange": leg.exchange or "NFO",
-                "tradingsymbol": leg.tradingsymbol,
-                "transaction_type": "SELL" if leg.is_short else "BUY",
-                "variety": "regular",
-                "product": "NRML",
-                "order_type": "MARKET",
-                "quantity": leg.quantity or lot_size,
-                "price": 0
-            }
-            orders.append(order)
-        
         try:
-            # Use basket_margins for combined margin (accounts for hedging)
-            basket = {"orders": orders}
-            margin_result = self.kite.get_basket_margins(basket)
+            margin_legs = []
+            for leg in legs:
+                margin_leg = MarginLeg.from_trade_leg(leg)
+                if not margin_leg.quantity:
+                    margin_leg.quantity = -lot_size if leg.is_short else lot_size
+                margin_legs.append(margin_leg)
             
-            if margin_result:
-                # Basket margins returns combined margin with hedging benefit
-                total_margin = margin_result.get("final", {}).get("total", 0)
-                if total_margin == 0:
-                    total_margin = margin_result.get("initial", {}).get("total", 0)
-                
-                if total_margin > 0:
-                    logger.info(f"Kite API margin for Jade Lizard: ₹{total_margin:,.0f}")
-                    return total_margin
+            service = get_margin_service(self.kite)
+            if spot:
+                service.update_spot(margin_legs[0].underlying, spot)
             
-            # Fallback: use order_margins for individual legs
-            margin_results = self.kite.get_order_margins(orders)
-            if margin_results:
-                total_margin = sum(m.get("total", 0) for m in margin_results)
-                if total_margin > 0:
-                    logger.info(f"Kite API margin (individual): ₹{total_margin:,.0f}")
-                    return total_margin
+            total_margin = service.estimate_total(margin_legs)
+            if total_margin > 0:
+                logger.info(f"Estimated margin for Jade Lizard: ₹{total_margin:,.0f}")
+                return total_margin
                     
         except Exception as e:
-            logger.warning(f"Failed to get margin from Kite API: {e}")
+            logger.warning(f"Failed to estimate margin: {e}")
         
         return 0.0
@@ -1,6 +1,6 @@
 """Strategist Agent - Signal Generation for Trading System v2.0"""
 
-from datetime import datetime, date, time, timedelta
+from datetime import date, time, timedelta
 from typing import Dict, List, Optional, Tuple
 import pandas as pd
 import numpy as np
@@ -33,6 +33,7 @@ from ..indicators.technical import (
     calculate_bollinger_band_width, calculate_bbw_ratio, calculate_volume_ratio
 )
 from ..indicators.greeks import validate_and_calculate_greeks, GreeksCalculator
+from ..execution.margin_service import MarginLeg, get_margin_service
 
 
 class Strategist(BaseAgent):
@@ -59,9 +60,6 @@ class Strategist(BaseAgent):
         # Lot size cache (fetched from Kite API)
         self._lot_size_cache: Dict[str, int] = {}
         
-        # Margin cache to avoid repeated API calls
-        self._margin_cache: Dict[str, float] = {}
-        
         # Initialize strategy modules with kite reference for dynamic lot size
         self._jade_lizard = JadeLizardStrategy(kite=self.kite)
         self._butterfly = ButterflyStrategy(kite=self.kite)
@@ -94,7 +92,7 @@ class Strategist(BaseAgent):
         
         # Check if trading is allowed (can be bypassed for backtesting)
         if not self.bypass_entry_window and not self._is_entry_window():
-            self.logger.info(f"Outside entry window (current: {datetime.now().time()}, window: {ENTRY_START_HOUR}:{ENTRY_START_MINUTE}-{ENTRY_END_HOUR}:{ENTRY_END_MINUTE})")
+            self.logger.info(f"Outside entry window (current: {self.clock().time()}, window: {ENTRY_START_HOUR}:{ENTRY_START_MINUTE}-{ENTRY_END_HOUR}:{ENTRY_END_MINUTE})")
             return proposals
         
         self.logger.info(f"Within entry window, processing regime: {regime_packet.regime.value}")
@@ -302,7 +300,7 @@ class Strategist(BaseAgent):
     
     def _is_entry_window(self) -> bool:
         """Check if current time is within entry window."""
-        now = datetime.now().time()
+        now = self.clock().time()
         start = time(ENTRY_START_HOUR, ENTRY_START_MINUTE)
         end = time(ENTRY_END_HOUR, ENTRY_END_MINUTE)
         return start <= now <= end
@@ -401,14 +399,14 @@ class Strategist(BaseAgent):
             "vega": sum(leg.vega * (1 if leg.is_long else -1) for leg in legs)
         }
         
-        # Get actual margin from Kite API
-        required_margin = self._calculate_margin_from_api(legs, lot_size=65)
+        # Get margin (local SPAN-like estimate calibrated against Kite)
+        required_margin = self._estimate_margin(legs, lot_size=65, spot=regime.spot_price)
         if required_margin == 0:
             # Fallback estimation if API fails
             required_margin = wing_width * 65  # Lot size * wing width as rough estimate
             self.logger.warning(f"Using fallback margin estimate: ₹{required_margin:,.0f}")
         
-        days_to_expiry = (expiry - date.today()).days
+        days_to_expiry = (expiry - self.clock().date()).days
         
         proposal = TradeProposal(
             structure=StructureType.IRON_CONDOR,
@@ -492,7 +490,7 @@ class Strategist(BaseAgent):
         
         # Get unique expiries from API data
         expiries = pd.to_datetime(options['expiry'].unique()).date
-        today = date.today()
+        today = self.clock().date()
         
         # Log available expiries for debugging
         sorted_expiries = sorted(expiries)
@@ -818,67 +816,48 @@ class Strategist(BaseAgent):
             f"trailing={proposal.trailing_mode}"
         )
     
-    def _calculate_margin_from_api(self, legs: List[TradeLeg], lot_size: int = 75) -> float:
+    def _estimate_margin(
+        self,
+        legs: List[TradeLeg],
+        lot_size: int = 75,
+        spot: Optional[float] = None
+    ) -> float:
         """
-        Calculate actual margin required using Kite order_margins API.
+        Calculate margin required for the legs (hedging benefit included).
+        
+        Uses the local SPAN-like margin service, which is calibrated
+        against Kite basket margins a few times an hour instead of
+        calling the API for every proposal.
         
         Args:
             legs: List of TradeLeg objects
             lot_size: Lot size for the instrument
+            spot: Underlying spot price (inferred from the legs if None)
             
         Returns:
-            Total margin required (float), or 0 if API call fails
+            Total margin required (float), or 0 if estimation fails
         """
         if not legs:
             return 0.0
         
-        # Build orders list for Kite API
-        orders = []
-        for leg in legs:
-            order = {
-                "exchange": leg.exchange or "NFO",
-                "tradingsymbol": leg.tradingsymbol,
-                "transaction_type": "SELL" if leg.is_short else "BUY",
-                "variety": "regular",
-                "product": "NRML",
-                "order_type": "MARKET",
-                "quantity": leg.quantity or lot_size,
-                "price": 0
-            }
-            orders.append(order)
-        
-        # Create cache key
-        cache_key = "_".join(sorted([o["tradingsymbol"] for o in orders]))
-        if cache_key in self._margin_cache:
-            return self._margin_cache[cache_key]
-        
         try:
-            # Use basket_margins for combined margin (accounts for hedging)
-            basket = {"orders": orders}
-            margin_result = self.kite.get_basket_margins(basket)
+            margin_legs = []
+            for leg in legs:
+                margin_leg = MarginLeg.from_trade_leg(leg)
+                if not margin_leg.quantity:
+                    margin_leg.quantity = -lot_size if leg.is_short else lot_size
+                margin_legs.append(margin_leg)
             
-            if margin_result:
-                # Basket margins returns combined margin with hedging benefit
-                total_margin = margin_result.get("final", {}).get("total", 0)
-                if total_margin == 0:
-                    # Fallback to initial margin
-                    total_margin = margin_result.get("initial", {}).get("total", 0)
-                
-                if total_margin > 0:
-                    self._margin_cache[cache_key] = total_margin
-                    self.logger.info(f"Kite API margin for {len(legs)} legs: ₹{total_margin:,.0f}")
-                    return total_margin
+            service = get_margin_service(self.kite)
+            if spot:
+                service.update_spot(margin_legs[0].underlying, spot)
             
-            # Fallback: use order_margins for individual legs
-            margin_results = self.kite.get_order_margins(orders)
-            if margin_results:
-                total_margin = sum(m.get("total", 0) for m in margin_results)
-                if total_margin > 0:
-                    self._margin_cache[cache_key] = total_margin
-                    self.logger.info(f"Kite API margin (individual): ₹{total_margin:,.0f}")
-                    return total_margin
+            total_margin = service.estimate_total(margin_legs)
+            if total_margin > 0:
+                self.logger.info(f"Estimated margin for {len(legs)} legs: ₹{total_margin:,.0f}")
+                return total_margin
                     
         except Exception as e:
-            self.logger.warning(f"Failed to get margin from Kite API: {e}")
+            self.logger.warning(f"Failed to estimate margin: {e}")
         
         return 0.0
@@ -1,9 +1,16 @@
 """Utility services and helpers"""
 
-from .instrument_cache import InstrumentCache
-from .option_pricing import OptionPricingEngine, BlackScholesCalculator, HistoricalVolatility
-from .pnl_calculator import PnLCalculator
-from .event_calendar import EventCalendar, EventType, EventImpact, get_event_calendar
+from ...core.lazy import lazy_exports
+
+# Submodules are imported on first use of one of their names (see core/lazy.py)
+__getattr__, __dir__ = lazy_exports(__name__, {
+    ".instrument_cache": ["InstrumentCache"],
+    ".option_pricing": ["OptionPricingEngine", "BlackScholesCalculator", "HistoricalVolatility"],
+    ".pnl_calculator": ["PnLCalculator"],
+    ".event_calendar": ["EventCalendar", "EventType", "EventImpact", "get_event_calendar"],
+    ".tick_aggregator": ["TickBarAggregator", "InstrumentState"],
+    ".correlation_service": ["RollingCorrelationService", "get_correlation_service"],
+})
 
 __all__ = [
     "InstrumentCache",
@@ -15,4 +22,8 @@ __all__ = [
     "EventType",
     "EventImpact",
     "get_event_calendar",
+    "TickBarAggregator",
+    "InstrumentState",
+    "RollingCorrelationService",
+    "get_correlation_service",
 ]
@@ -0,0 +1,449 @@
+"""Streaming rolling correlation matrix for Trading System v2.0
+
+Keeps pairwise rolling sums (count, sum, sum of squares, cross-products)
+of bar returns for an N-asset universe, so each new or revised bar updates
+the full correlation matrix in O(N^2) per window - no history refetch.
+Missing bars are handled pairwise, matching pandas' pairwise-complete corr.
+"""
+
+import threading
+import time
+from collections import deque
+from datetime import date, datetime
+from typing import Any, Dict, Iterable, List, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+from loguru import logger
+
+
+# Recompute sums exactly from stored returns every N appended bars (bounds float drift)
+RESYNC_EVERY = 256
+
+
+def _to_date(value: Any) -> date:
+    """Normalize a bar timestamp (datetime/Timestamp/date/str) to a date."""
+    if isinstance(value, datetime):
+        return value.date()
+    if isinstance(value, date):
+        return value
+    return pd.Timestamp(value).date()
+
+
+class _WindowSums:
+    """Pairwise-complete rolling sums for one window length."""
+
+    __slots__ = ("window", "n", "sx", "sxx", "sxy")
+
+    def __init__(self, window: int, size: int):
+        self.window = window
+        self.reset(np.empty((0, size)))
+
+    def reset(self, returns: np.ndarray) -> None:
+        """Recompute all sums from a (bars x assets) return block (NaN = missing)."""
+        mask = ~np.isnan(returns)
+        x = np.where(mask, returns, 0.0)
+        m = mask.astype(float)
+        self.n = m.T @ m
+        self.sx = x.T @ m  # sx[i, j] = sum of x_i over bars where both i and j exist
+        self.sxx = (x * x).T @ m
+        self.sxy = x.T @ x
+
+    def add(self, returns: np.ndarray, sign: float = 1.0) -> None:
+        """Add (sign=1) or remove (sign=-1) one bar of returns."""
+        mask = ~np.isnan(returns)
+        x = np.where(mask, returns, 0.0)
+        m = mask.astype(float)
+        self.n += sign * np.outer(m, m)
+        self.sx += sign * np.outer(x, m)
+        self.sxx += sign * np.outer(x * x, m)
+        self.sxy += sign * np.outer(x, x)
+
+    def grow(self, size: int) -> None:
+        pad = size - self.n.shape[0]
+        for attr in ("n", "sx", "sxx", "sxy"):
+            setattr(self, attr, np.pad(getattr(self, attr), ((0, pad), (0, pad))))
+
+    def correlation(self, min_periods: int) -> np.ndarray:
+        """Current correlation matrix (NaN where fewer than min_periods common bars)."""
+        with np.errstate(divide="ignore", invalid="ignore"):
+            n = self.n
+            cov = self.sxy - self.sx * self.sx.T / n
+            var = self.sxx - self.sx ** 2 / n
+            corr = cov / np.sqrt(var * var.T)
+        corr[(n < min_periods) | ~np.isfinite(corr)] = np.nan
+        return np.clip(corr, -1.0, 1.0)
+
+
+class RollingCorrelationService:
+    """
+    Rolling correlation matrix over an asset universe, updated bar by bar.
+
+    Bars arrive via update_bar()/backfill() (e.g. daily closes) or, once
+    start() is called, intraday ticks that revise the current day's bar.
+    Readers (Sentinel) get the current matrix without any I/O.
+    """
+
+    def __init__(
+        self,
+        windows: Sequence[int] = (20, 60),
+        history: int = 20,
+        min_periods: int = 10,
+        stream_timeout: float = 60.0
+    ):
+        """
+        Initialize correlation service.
+
+        Args:
+            windows: Rolling window lengths in bars (first is the default)
+            history: Number of finalized per-bar matrices kept for spike checks
+            min_periods: Minimum common bars for a valid correlation
+            stream_timeout: Seconds after the last tick an asset counts as streaming
+        """
+        self.windows = tuple(int(w) for w in windows)
+        self.default_window = self.windows[0]
+        self.history_length = history
+        self.min_periods = min_periods
+        self.stream_timeout = stream_timeout
+        self._max_window = max(self.windows)
+        self._capacity = self._max_window + history + 1  # Close rows kept for rebuilds
+        self._lock = threading.RLock()
+
+        # Universe
+        self._names: List[str] = []
+        self._index: Dict[str, int] = {}
+        self._tokens: Dict[int, str] = {}
+
+        # Bar store: close rows aligned with dates, returns between consecutive rows
+        self._dates: List[date] = []
+        self._closes: List[np.ndarray] = []
+        self._returns: deque = deque(maxlen=self._max_window)
+        self._sums: Dict[int, _WindowSums] = {w: _WindowSums(w, 0) for w in self.windows}
+        self._history: Dict[int, deque] = {w: deque(maxlen=history) for w in self.windows}
+        self._appended = 0
+
+        # Per-asset freshness
+        self._last_bar: Dict[str, date] = {}
+        self._last_update: Dict[str, float] = {}
+        self._last_tick: Dict[str, float] = {}
+
+        # Latest tick prices, applied to today's bar on read
+        self._pending: Dict[str, float] = {}
+        self._ticker = None
+
+    # =========================================================================
+    # Universe
+    # =========================================================================
+
+    def add_asset(self, name: str, token: Optional[int] = None) -> int:
+        """Add an asset to the universe (no-op if present). Returns its index."""
+        with self._lock:
+            if token is not None:
+                self._tokens[token] = name
+                if self._ticker:
+                    self._ticker.subscribe([token])
+            if name in self._index:
+                return self._index[name]
+
+            idx = len(self._names)
+            self._names.append(name)
+            self._index[name] = idx
+            size = len(self._names)
+            self._closes = [np.append(row, np.nan) for row in self._closes]
+            self._returns = deque((np.append(r, np.nan) for r in self._returns), maxlen=self._max_window)
+            for sums in self._sums.values():
+                sums.grow(size)
+            return idx
+
+    @property
+    def assets(self) -> List[str]:
+        return list(self._names)
+
+    def last_bar_date(self, name: str) -> Optional[date]:
+        """Latest bar date with a close for the asset."""
+        return self._last_bar.get(name)
+
+    def last_update(self, name: str) -> float:
+        """Epoch seconds of the asset's last bar update (0 if never)."""
+        return self._last_update.get(name, 0.0)
+
+    def is_streaming(self, name: str) -> bool:
+        """True if the asset is receiving live ticks."""
+        return time.time() - self._last_tick.get(name, 0.0) < self.stream_timeout
+
+    # =========================================================================
+    # Bar updates
+    # =========================================================================
+
+    def update_bar(self, bar_date: Any, closes: Dict[str, float]) -> bool:
+        """
+        Add a new bar or revise an existing one.
+
+        A date after the latest bar appends a row; an existing date merges
+        the given closes into that row. Older unknown dates are ignored.
+
+        Args:
+            bar_date: Bar date (date/datetime/Timestamp)
+            closes: Asset name -> close for this bar (subset of the universe)
+
+        Returns:
+            True if the bar was applied
+        """
+        bar_date = _to_date(bar_date)
+        closes = {k: float(v) for k, v in closes.items() if v is not None and np.isfinite(v) and v > 0}
+        if not closes:
+            return False
+
+        with self._lock:
+            for name in closes:
+                self.add_asset(name)
+
+            if not self._dates or bar_date > self._dates[-1]:
+                self._append_row(bar_date, closes)
+            else:
+                try:
+                    row = self._dates.index(bar_date)
+                except ValueError:
+                    logger.debug(f"Ignoring bar {bar_date} older than correlation history")
+                    return False
+                self._revise_row(row, closes)
+
+            now = time.time()
+            for name in closes:
+                if bar_date >= self._last_bar.get(name, date.min):
+                    self._last_bar[name] = bar_date
+                self._last_update[name] = now
+            return True
+
+    def backfill(self, closes: Dict[str, pd.Series]) -> None:
+        """
+        Seed history for one or more assets from close series and rebuild sums.
+
+        Args:
+            closes: Asset name -> close series indexed by bar date
+        """
+        with self._lock:
+            for name in closes:
+                self.add_asset(name)
+
+            new = pd.DataFrame({
+                name: pd.Series(series.values, index=[_to_date(i) for i in series.index], dtype=float)
+                for name, series in closes.items()
+            })
+            existing = pd.DataFrame(self._closes, index=self._dates, columns=self._names, dtype=float)
+            merged = new.combine_first(existing).reindex(columns=self._names).sort_index()
+            merged = merged[~merged.index.duplicated(keep="last")].tail(self._capacity)
+
+            self._dates, self._closes = [], []
+            self._returns.clear()
+            for w in self.windows:
+                self._sums[w] = _WindowSums(w, len(self._names))
+                self._history[w].clear()
+            for bar_date, row in zip(merged.index, merged.to_numpy()):
+                self._append_row(bar_date, None, row=row)
+
+            now = time.time()
+            for name in closes:
+                valid = merged[name].dropna()
+                if not valid.empty:
+                    self._last_bar[name] = max(valid.index[-1], self._last_bar.get(name, date.min))
+                    self._last_update[name] = now
+
+    def _append_row(
+        self,
+        bar_date: date,
+        closes: Optional[Dict[str, float]],
+        row: Optional[np.ndarray] = None
+    ) -> None:
+        # The previous bar is final once a newer one starts
+        if self._returns:
+            self._snapshot(self._dates[-1])
+
+        if row is None:
+            row = np.full(len(self._names), np.nan)
+            for name, close in closes.items():
+                row[self._index[name]] = close
+
+        if self._closes:
+            self._push_return(row / self._closes[-1] - 1.0)
+        self._dates.append(bar_date)
+        self._closes.append(row)
+        if len(self._dates) > self._capacity:
+            del self._dates[0]
+            del self._closes[0]
+
+    def _push_return(self, returns: np.ndarray) -> None:
+        for w, sums in self._sums.items():
+            if len(self._returns) >= w:
+                sums.add(self._returns[-w], -1.0)  # Bar leaving this window
+            sums.add(returns)
+        self._returns.append(returns)
+
+        self._appended += 1
+        if self._appended % RESYNC_EVERY == 0:
+            self._resync()
+
+    def _revise_row(self, row_idx: int, closes: Dict[str, float]) -> None:
+        row = self._closes[row_idx].copy()
+        for name, close in closes.items():
+            row[self._index[name]] = close
+        self._closes[row_idx] = row
+
+        # Row k feeds returns k-1 (into it) and k (out of it); map to return deque slots
+        first_return_row = len(self._closes) - len(self._returns)
+        for k in (row_idx, row_idx + 1):
+            if k < 1 or k >= len(self._closes):
+                continue
+            slot = k - first_return_row
+            if slot < 0:
+                continue
+            new = self._closes[k] / self._closes[k - 1] - 1.0
+            age = len(self._returns) - 1 - slot  # 0 = newest
+            for w, sums in self._sums.items():
+                if age < w:
+                    sums.add(self._returns[slot], -1.0)
+                    sums.add(new)
+            self._returns[slot] = new
+
+    def _resync(self) -> None:
+        """Recompute window sums exactly from stored returns."""
+        returns = list(self._returns)
+        for w, sums in self._sums.items():
+            block = np.array(returns[-w:]) if returns else np.empty((0, len(self._names)))
+            sums.reset(block)
+
+    def _snapshot(self, bar_date: date) -> None:
+        for w, sums in self._sums.items():
+            self._history[w].append((bar_date, sums.correlation(self.min_periods)))
+
+    # =========================================================================
+    # Live ticks
+    # =========================================================================
+
+    def start(self, ticker=None) -> None:
+        """Revise today's bar from live ticks for assets registered with a token."""
+        if ticker is None:
+            from ...api.websocket import ticker_manager
+            ticker = ticker_manager
+        with self._lock:
+            if self._ticker is ticker:
+                return
+            self._ticker = ticker
+        ticker.add_callback(self.on_ticks)
+        if self._tokens:
+            ticker.subscribe(list(self._tokens))
+
+    def stop(self) -> None:
+        if self._ticker:
+            self._ticker.remove_callback(self.on_ticks)
+            self._ticker = None
+
+    def on_ticks(self, ticks: List[Dict[str, Any]]) -> None:
+        """Ticker callback: keep the latest price per asset (applied on read)."""
+        now = time.time()
+        with self._lock:
+            for tick in ticks:
+                name = self._tokens.get(tick.get("instrument_token"))
+                price = tick.get("last_price")
+                if name and price:
+                    self._pending[name] = price
+                    self._last_tick[name] = now
+
+    def _apply_pending(self) -> None:
+        if self._pending:
+            pending, self._pending = self._pending, {}
+            self.update_bar(date.today(), pending)
+
+    # =========================================================================
+    # Readers (no I/O)
+    # =========================================================================
+
+    def get_matrix(self, window: Optional[int] = None) -> pd.DataFrame:
+        """Current correlation matrix for a window as a DataFrame."""
+        with self._lock:
+            self._apply_pending()
+            corr = self._sums[window or self.default_window].correlation(self.min_periods)
+            return pd.DataFrame(corr, index=self._names, columns=self._names)
+
+    def get_correlations(
+        self,
+        name: str,
+        others: Optional[Iterable[str]] = None,
+        window: Optional[int] = None
+    ) -> Dict[str, float]:
+        """
+        Correlations of one asset against others.
+
+        Args:
+            name: Reference asset
+            others: Assets to include (default: whole universe)
+            window: Window length (default: first configured)
+
+        Returns:
+            Dict of asset -> correlation (assets without enough data omitted)
+        """
+        with self._lock:
+            self._apply_pending()
+            i = self._index.get(name)
+            if i is None:
+                return {}
+            n = self._sums[window or self.default_window]
+            with np.errstate(divide="ignore", invalid="ignore"):
+                result = {}
+                for other in (others if others is not None else self._names):
+                    j = self._index.get(other)
+                    if j is None or j == i or n.n[i, j] < self.min_periods:
+                        continue
+                    cov = n.sxy[i, j] - n.sx[i, j] * n.sx[j, i] / n.n[i, j]
+                    var_i = n.sxx[i, j] - n.sx[i, j] ** 2 / n.n[i, j]
+                    var_j = n.sxx[j, i] - n.sx[j, i] ** 2 / n.n[i, j]
+                    corr = cov / np.sqrt(var_i * var_j)
+                    if np.isfinite(corr):
+                        result[other] = float(np.clip(corr, -1.0, 1.0))
+            return result
+
+    def get_correlation_history(self, a: str, b: str, window: Optional[int] = None) -> pd.Series:
+        """Per-bar correlation of a pair over finalized bars plus the current one."""
+        with self._lock:
+            self._apply_pending()
+            i, j = self._index.get(a), self._index.get(b)
+            if i is None or j is None:
+                return pd.Series(dtype=float)
+            w = window or self.default_window
+            dates, values = [], []
+            for bar_date, corr in self._history[w]:
+                dates.append(bar_date)
+                values.append(corr[i, j] if max(i, j) < corr.shape[0] else np.nan)
+            if self._dates:
+                dates.append(self._dates[-1])
+                values.append(self._sums[w].correlation(self.min_periods)[i, j])
+            return pd.Series(values, index=dates, dtype=float)
+
+    def average_correlation(self, window: Optional[int] = None) -> float:
+        """Mean absolute off-diagonal correlation across the universe (breadth stress)."""
+        corr = self.get_matrix(window).to_numpy()
+        off_diag = corr[~np.eye(len(corr), dtype=bool)]
+        off_diag = off_diag[~np.isnan(off_diag)]
+        return float(np.abs(off_diag).mean()) if len(off_diag) else 0.0
+
+    def get_status(self) -> Dict:
+        with self._lock:
+            return {
+                "assets": len(self._names),
+                "bars": len(self._dates),
+                "windows": list(self.windows),
+                "last_bar": self._dates[-1].isoformat() if self._dates else None,
+                "streaming": sorted(n for n in self._names if self.is_streaming(n)),
+            }
+
+
+# Singleton instance
+_correlation_service: Optional[RollingCorrelationService] = None
+
+
+def get_correlation_service() -> RollingCorrelationService:
+    """Get or create the live correlation service singleton."""
+    global _correlation_service
+    if _correlation_service is None:
+        _correlation_service = RollingCorrelationService()
+    return _correlation_service
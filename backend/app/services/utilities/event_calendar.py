@@ -7,13 +7,20 @@ Provides:
 - Major earnings dates
 - Global macro events (Fed, US CPI, etc.)
 - Event blackout checking for Sentinel
+
+Events are compiled into a sorted blackout-interval index (bisect lookups)
+and a trading-day ordinal array (O(1) trading-day arithmetic). add_event
+updates both in place.
 """
 
+from bisect import bisect_left, bisect_right
 from datetime import datetime, date, timedelta
 from typing import List, Dict, Optional, Tuple
 from enum import Enum
 from pathlib import Path
 import json
+import threading
+import numpy as np
 from loguru import logger
 
 from ...database.models import EventRecord, get_session
@@ -77,6 +84,23 @@ class EventCalendar:
             self.data_dir = Path(__file__).parent.parent.parent.parent / "data"
         self._events: List[Dict] = []
         self._loaded = False
+        self._lock = threading.RLock()
+        
+        # Blackout interval index: (start_ordinal, end_ordinal, event_idx) sorted
+        self._windows: List[Tuple[int, int, int]] = []
+        self._window_starts: List[int] = []
+        self._max_window = 0
+        
+        # Events sorted by date: (date_ordinal, event_idx)
+        self._by_date: List[Tuple[int, int]] = []
+        self._dates: List[int] = []
+        
+        # Trading-day calendar over [_day_base, _day_base + len(_is_trading))
+        self._holidays: set = set()
+        self._day_base = 0
+        self._is_trading = np.zeros(0, dtype=bool)
+        self._trading_before = np.zeros(0, dtype=np.int64)  # Trading days strictly before each day
+        self._trading_days = np.zeros(0, dtype=np.int64)  # Ordinals of trading days
     
     def load_events(self, force_reload: bool = False) -> int:
         """
@@ -103,6 +127,7 @@ class EventCalendar:
         if len(self._events) == 0:
             self._add_default_2026_events()
         
+        self._compile()
         self._loaded = True
         logger.info(f"Loaded {len(self._events)} events (DB: {db_count}, JSON: {json_count})")
         
@@ -295,29 +320,18 @@ class EventCalendar:
         if not self._loaded:
             self.load_events()
         
-        check_date = check_date or date.today()
+        d = (check_date or date.today()).toordinal()
         
-        for event in self._events:
-            event_date = event["date"]
-            if isinstance(event_date, str):
-                event_date = datetime.strptime(event_date, "%Y-%m-%d").date()
-            
-            # Calculate blackout window
-            blackout_start = event.get("blackout_start")
-            blackout_end = event.get("blackout_end")
-            
-            if not blackout_start:
-                event_type = EventType(event.get("type", EventType.OTHER.value))
-                before, after = self.BLACKOUT_WINDOWS.get(event_type, (1, 1))
-                blackout_start = event_date - timedelta(days=before)
-                blackout_end = event_date + timedelta(days=after)
-            
-            # Check if check_date falls within blackout
-            if blackout_start <= check_date <= blackout_end:
-                days_until = (event_date - check_date).days
-                return True, event["name"], days_until
+        # Only windows starting within max_window days before d can contain it
+        lo = bisect_left(self._window_starts, d - self._max_window)
+        hi = bisect_right(self._window_starts, d)
+        matches = [idx for start, end, idx in self._windows[lo:hi] if end >= d]
+        if not matches:
+            return False, None, None
         
-        return False, None, None
+        # Same precedence as before: first event in load order
+        event = self._events[min(matches)]
+        return True, event["name"], event["_ordinal"] - d
     
     def get_upcoming_events(
         self,
@@ -337,24 +351,18 @@ class EventCalendar:
         if not self._loaded:
             self.load_events()
         
-        today = date.today()
-        cutoff = today + timedelta(days=days_ahead)
+        today = date.today().toordinal()
+        lo = bisect_left(self._dates, today)
+        hi = bisect_right(self._dates, today + days_ahead)
         
         upcoming = []
-        for event in self._events:
-            event_date = event["date"]
-            if isinstance(event_date, str):
-                event_date = datetime.strptime(event_date, "%Y-%m-%d").date()
-            
-            if today <= event_date <= cutoff:
-                if event_types is None or EventType(event.get("type")) in event_types:
-                    upcoming.append({
-                        **event,
-                        "days_until": (event_date - today).days
-                    })
-        
-        # Sort by date
-        upcoming.sort(key=lambda x: x["date"])
+        for ordinal, idx in self._by_date[lo:hi]:
+            event = self._events[idx]
+            if event_types is None or EventType(event.get("type")) in event_types:
+                upcoming.append({
+                    **self._public(event),
+                    "days_until": ordinal - today
+                })
         return upcoming
     
     def add_event(
@@ -391,7 +399,9 @@ class EventCalendar:
             "source": "manual"
         }
         
-        self._events.append(event)
+        with self._lock:
+            self._events.append(event)
+            self._index_event(len(self._events) - 1)
         
         if persist:
             self._save_to_database(event)
@@ -431,22 +441,9 @@ class EventCalendar:
         if not self._loaded:
             self.load_events()
         
-        check_date = check_date or date.today()
-        
-        # Check weekends
-        if check_date.weekday() >= 5:  # Saturday = 5, Sunday = 6
-            return False
-        
-        # Check holidays
-        for event in self._events:
-            if event.get("type") == EventType.HOLIDAY.value:
-                event_date = event["date"]
-                if isinstance(event_date, str):
-                    event_date = datetime.strptime(event_date, "%Y-%m-%d").date()
-                if event_date == check_date:
-                    return False
-        
-        return True
+        d = (check_date or date.today()).toordinal()
+        self._ensure_days(d, d)
+        return bool(self._is_trading[d - self._day_base])
     
     def get_next_trading_day(self, from_date: Optional[date] = None) -> date:
         """
@@ -458,14 +455,151 @@ class EventCalendar:
         Returns:
             Next trading day
         """
-        check_date = (from_date or date.today()) + timedelta(days=1)
+        return self.add_trading_days(from_date or date.today(), 1)
+    
+    def get_previous_trading_day(self, from_date: Optional[date] = None) -> date:
+        """Get the last trading day before the given date."""
+        return self.add_trading_days(from_date or date.today(), -1)
+    
+    def trading_days_between(self, start: date, end: date) -> int:
+        """
+        Number of trading days in (start, end] - e.g. trading days to expiry.
+        
+        Args:
+            start: Start date (excluded)
+            end: End date (included)
+            
+        Returns:
+            Trading day count (negative if end < start)
+        """
+        if not self._loaded:
+            self.load_events()
         
-        while not self.is_trading_day(check_date):
-            check_date += timedelta(days=1)
-            if check_date > date.today() + timedelta(days=30):
-                break  # Safety limit
+        a, b = start.toordinal(), end.toordinal()
+        self._ensure_days(min(a, b), max(a, b) + 1)
+        with self._lock:
+            return int(self._trading_before[b + 1 - self._day_base] - self._trading_before[a + 1 - self._day_base])
+    
+    def add_trading_days(self, from_date: date, n: int) -> date:
+        """
+        Date n trading days after (n > 0) or before (n < 0) from_date.
         
-        return check_date
+        Args:
+            from_date: Starting date (need not be a trading day)
+            n: Number of trading days to move
+            
+        Returns:
+            Resulting trading day (from_date itself if n == 0)
+        """
+        if not self._loaded:
+            self.load_events()
+        if n == 0:
+            return from_date
+        
+        d = from_date.toordinal()
+        # Weekends alone give >= 5 trading days per 7; holidays are padded for
+        span = abs(n) * 7 // 5 + 30
+        self._ensure_days(d - span, d + span)
+        with self._lock:
+            if n > 0:
+                pos = np.searchsorted(self._trading_days, d, side="right") + n - 1
+            else:
+                pos = np.searchsorted(self._trading_days, d, side="left") + n
+            return date.fromordinal(int(self._trading_days[pos]))
+    
+    # =========================================================================
+    # Index maintenance
+    # =========================================================================
+    
+    def _compile(self) -> None:
+        """Build the interval index and trading-day calendar from _events."""
+        with self._lock:
+            self._windows = []
+            self._window_starts = []
+            self._max_window = 0
+            self._by_date = []
+            self._dates = []
+            self._holidays = set()
+            
+            for idx in range(len(self._events)):
+                self._index_event(idx, rebuild_days=False)
+            
+            # Span the loaded events plus a year either side of today
+            today = date.today().toordinal()
+            ordinals = [e["_ordinal"] for e in self._events] or [today]
+            self._build_days(min(min(ordinals), today - 366), max(max(ordinals), today + 366))
+    
+    def _index_event(self, idx: int, rebuild_days: bool = True) -> None:
+        """Insert one event into the sorted indexes (O(log n) search + list insert)."""
+        event = self._events[idx]
+        event_date = event["date"]
+        if isinstance(event_date, str):
+            event_date = datetime.strptime(event_date, "%Y-%m-%d").date()
+            event["date"] = event_date
+        
+        blackout_start = event.get("blackout_start")
+        blackout_end = event.get("blackout_end")
+        if not blackout_start:
+            event_type = EventType(event.get("type", EventType.OTHER.value))
+            before, after = self.BLACKOUT_WINDOWS.get(event_type, (1, 1))
+            blackout_start = event_date - timedelta(days=before)
+            blackout_end = event_date + timedelta(days=after)
+        blackout_end = blackout_end or event_date
+        
+        ordinal = event_date.toordinal()
+        event["_ordinal"] = ordinal
+        start, end = blackout_start.toordinal(), blackout_end.toordinal()
+        
+        pos = bisect_right(self._window_starts, start)
+        self._window_starts.insert(pos, start)
+        self._windows.insert(pos, (start, end, idx))
+        self._max_window = max(self._max_window, end - start)
+        
+        pos = bisect_right(self._dates, ordinal)
+        self._dates.insert(pos, ordinal)
+        self._by_date.insert(pos, (ordinal, idx))
+        
+        if event.get("type") == EventType.HOLIDAY.value and ordinal not in self._holidays:
+            self._holidays.add(ordinal)
+            if rebuild_days:
+                self._mark_holiday(ordinal)
+    
+    def _build_days(self, first: int, last: int) -> None:
+        """(Re)build trading-day arrays for ordinals [first, last]."""
+        ordinals = np.arange(first, last + 1, dtype=np.int64)
+        is_trading = (ordinals + 6) % 7 < 5  # date.weekday() < 5
+        if self._holidays:
+            is_trading &= ~np.isin(ordinals, np.fromiter(self._holidays, dtype=np.int64))
+        
+        self._day_base = first
+        self._is_trading = is_trading
+        self._trading_before = np.concatenate([[0], np.cumsum(is_trading)])
+        self._trading_days = ordinals[is_trading]
+    
+    def _ensure_days(self, first: int, last: int) -> None:
+        """Extend the trading-day calendar (by at least a year) to cover [first, last]."""
+        with self._lock:
+            base, end = self._day_base, self._day_base + len(self._is_trading) - 1
+            if len(self._is_trading) and base <= first and last <= end:
+                return
+            if not len(self._is_trading):
+                base, end = first, last
+            self._build_days(min(base, first - 366), max(end, last + 366))
+    
+    def _mark_holiday(self, ordinal: int) -> None:
+        """Flip one day to non-trading and shift the cumulative counts after it."""
+        i = ordinal - self._day_base
+        if not (0 <= i < len(self._is_trading)) or not self._is_trading[i]:
+            return
+        self._is_trading[i] = False
+        self._trading_before[i + 1:] -= 1
+        self._trading_days = np.delete(
+            self._trading_days, np.searchsorted(self._trading_days, ordinal)
+        )
+    
+    @staticmethod
+    def _public(event: Dict) -> Dict:
+        return {k: v for k, v in event.items() if not k.startswith("_")}
 
 
 # Singleton instance
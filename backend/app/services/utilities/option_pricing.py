@@ -3,7 +3,13 @@
 import math
 from datetime import datetime, date
 from typing import Optional, Tuple
-from scipy.stats import norm
+import numpy as np
+from scipy.special import ndtr
+
+
+def _norm_pdf(x: float) -> float:
+    """Standard normal density (same as scipy.stats.norm.pdf, without importing scipy.stats)."""
+    return math.exp(-0.5 * x * x) / math.sqrt(2 * math.pi)
 
 
 class BlackScholesCalculator:
@@ -57,8 +63,8 @@ class BlackScholesCalculator:
         d2 = d1 - volatility * math.sqrt(ttm)
         
         call = (
-            underlying * math.exp(-dividend_yield * ttm) * norm.cdf(d1) -
-            strike * math.exp(-risk_free_rate * ttm) * norm.cdf(d2)
+            underlying * math.exp(-dividend_yield * ttm) * ndtr(d1) -
+            strike * math.exp(-risk_free_rate * ttm) * ndtr(d2)
         )
         
         return max(call, 0)  # Call price can't be negative
@@ -102,8 +108,8 @@ class BlackScholesCalculator:
         d2 = d1 - volatility * math.sqrt(ttm)
         
         put = (
-            strike * math.exp(-risk_free_rate * ttm) * norm.cdf(-d2) -
-            underlying * math.exp(-dividend_yield * ttm) * norm.cdf(-d1)
+            strike * math.exp(-risk_free_rate * ttm) * ndtr(-d2) -
+            underlying * math.exp(-dividend_yield * ttm) * ndtr(-d1)
         )
         
         return max(put, 0)  # Put price can't be negative
@@ -145,6 +151,163 @@ class BlackScholesCalculator:
         else:
             raise ValueError(f"Invalid option type: {option_type}")
     
+    @staticmethod
+    def price_array(
+        is_call,
+        underlying,
+        strike,
+        ttm,
+        volatility,
+        risk_free_rate: float = DEFAULT_RISK_FREE_RATE,
+        dividend_yield: float = 0.0
+    ) -> np.ndarray:
+        """
+        Vectorized Black-Scholes price.
+        
+        All array arguments broadcast against each other, so a (scenarios, 1)
+        underlying against (legs,) strikes prices a whole scenario grid in
+        one call. Expired options (ttm <= 0) are priced at intrinsic value.
+        
+        Args:
+            is_call: Boolean array, True for calls
+            underlying: Underlying prices
+            strike: Strike prices
+            ttm: Time to maturity in years
+            volatility: Annualized volatility
+            risk_free_rate: Risk-free rate
+            dividend_yield: Dividend yield
+            
+        Returns:
+            Array of option prices
+        """
+        S = np.asarray(underlying, dtype=float)
+        K = np.asarray(strike, dtype=float)
+        T = np.asarray(ttm, dtype=float)
+        vol = np.maximum(np.asarray(volatility, dtype=float), 0.001)
+        is_call = np.asarray(is_call, dtype=bool)
+        
+        T_safe = np.maximum(T, 1e-8)
+        sqrt_t = np.sqrt(T_safe)
+        d1 = (np.log(S / K) + (risk_free_rate - dividend_yield + 0.5 * vol ** 2) * T_safe) / (vol * sqrt_t)
+        d2 = d1 - vol * sqrt_t
+        
+        disc_q = np.exp(-dividend_yield * T_safe)
+        disc_r = np.exp(-risk_free_rate * T_safe)
+        call = S * disc_q * ndtr(d1) - K * disc_r * ndtr(d2)
+        # Put via put-call parity (one pair of ndtr evaluations for both)
+        price = np.where(is_call, call, call - S * disc_q + K * disc_r)
+        
+        intrinsic = np.where(is_call, np.maximum(S - K, 0.0), np.maximum(K - S, 0.0))
+        return np.maximum(np.where(T > 0, price, intrinsic), 0.0)
+    
+    @staticmethod
+    def greeks_array(
+        is_call,
+        underlying,
+        strike,
+        ttm,
+        volatility,
+        risk_free_rate: float = DEFAULT_RISK_FREE_RATE,
+        dividend_yield: float = 0.0
+    ) -> dict:
+        """
+        Vectorized Greeks, same units as calculate_greeks().
+        
+        Args:
+            is_call: Boolean array, True for calls
+            underlying: Underlying prices
+            strike: Strike prices
+            ttm: Time to maturity in years
+            volatility: Annualized volatility
+            risk_free_rate: Risk-free rate
+            dividend_yield: Dividend yield
+        
+        Returns:
+            Dictionary of arrays: delta, gamma, theta (per day), vega (per 1% vol)
+        """
+        S = np.asarray(underlying, dtype=float)
+        K = np.asarray(strike, dtype=float)
+        T = np.asarray(ttm, dtype=float)
+        vol = np.maximum(np.asarray(volatility, dtype=float), 0.001)
+        is_call = np.asarray(is_call, dtype=bool)
+        
+        live = T > 0
+        T_safe = np.maximum(T, 1e-8)
+        sqrt_t = np.sqrt(T_safe)
+        d1 = (np.log(S / K) + (risk_free_rate - dividend_yield + 0.5 * vol ** 2) * T_safe) / (vol * sqrt_t)
+        d2 = d1 - vol * sqrt_t
+        
+        disc_q = np.exp(-dividend_yield * T_safe)
+        disc_r = np.exp(-risk_free_rate * T_safe)
+        pdf_d1 = np.exp(-0.5 * d1 ** 2) / math.sqrt(2 * math.pi)
+        
+        delta = np.where(is_call, disc_q * ndtr(d1), -disc_q * ndtr(-d1))
+        gamma = disc_q * pdf_d1 / (S * vol * sqrt_t)
+        vega = S * disc_q * pdf_d1 * sqrt_t / 100
+        
+        decay = -S * disc_q * pdf_d1 * vol / (2 * sqrt_t)
+        call_theta = decay - risk_free_rate * K * disc_r * ndtr(d2) + dividend_yield * S * disc_q * ndtr(d1)
+        put_theta = decay + risk_free_rate * K * disc_r * ndtr(-d2) - dividend_yield * S * disc_q * ndtr(-d1)
+        theta = np.where(is_call, call_theta, put_theta) / 252
+        
+        # At/past expiry: step delta, no other Greeks
+        expired_delta = np.where(is_call, (S > K).astype(float), -(S < K).astype(float))
+        return {
+            "delta": np.where(live, delta, expired_delta),
+            "gamma": np.where(live, gamma, 0.0),
+            "theta": np.where(live, theta, 0.0),
+            "vega": np.where(live, vega, 0.0),
+        }
+    
+    @staticmethod
+    def implied_vol_array(
+        is_call,
+        price,
+        underlying,
+        strike,
+        ttm,
+        initial_vol,
+        iterations: int = 4,
+        risk_free_rate: float = DEFAULT_RISK_FREE_RATE
+    ) -> np.ndarray:
+        """
+        Vectorized implied volatility by Newton iteration.
+        
+        Meant for tracking: starting from the previous vol, a few
+        iterations converge for the small moves between ticks. Options
+        with no time value or negligible vega keep their initial vol.
+        
+        Args:
+            is_call: Boolean array, True for calls
+            price: Observed option prices
+            underlying: Underlying prices
+            strike: Strike prices
+            ttm: Time to maturity in years
+            initial_vol: Starting volatility (previous estimate)
+            iterations: Newton steps
+            risk_free_rate: Risk-free rate
+        
+        Returns:
+            Array of implied volatilities clamped to [0.01, 3.0]
+        """
+        price = np.asarray(price, dtype=float)
+        S = np.asarray(underlying, dtype=float)
+        K = np.asarray(strike, dtype=float)
+        T = np.asarray(ttm, dtype=float)
+        vol = np.clip(np.asarray(initial_vol, dtype=float), 0.01, 3.0).copy()
+        is_call = np.asarray(is_call, dtype=bool)
+        
+        intrinsic = np.where(is_call, np.maximum(S - K, 0.0), np.maximum(K - S, 0.0))
+        solvable = (T > 0) & (price > intrinsic + 1e-6)
+        
+        for _ in range(iterations):
+            model = BlackScholesCalculator.price_array(is_call, S, K, T, vol, risk_free_rate)
+            vega = BlackScholesCalculator.greeks_array(is_call, S, K, T, vol, risk_free_rate)["vega"] * 100
+            step = np.where(solvable & (vega > 1e-6), (model - price) / np.maximum(vega, 1e-6), 0.0)
+            vol = np.clip(vol - step, 0.01, 3.0)
+        
+        return vol
+    
     @staticmethod
     def calculate_greeks(
         option_type: str,
@@ -191,34 +354,34 @@ class BlackScholesCalculator:
         
         # Delta
         if option_type in ['CE', 'CALL']:
-            delta = math.exp(-dividend_yield * ttm) * norm.cdf(d1)
+            delta = math.exp(-dividend_yield * ttm) * ndtr(d1)
         else:  # PUT
-            delta = -math.exp(-dividend_yield * ttm) * norm.cdf(-d1)
+            delta = -math.exp(-dividend_yield * ttm) * ndtr(-d1)
         
         # Gamma (same for calls and puts)
         gamma = (
-            math.exp(-dividend_yield * ttm) * norm.pdf(d1) /
+            math.exp(-dividend_yield * ttm) * _norm_pdf(d1) /
             (underlying * volatility * math.sqrt(ttm))
         )
         
         # Vega (per 1% change in volatility, same for calls and puts)
         vega = (
             underlying * math.exp(-dividend_yield * ttm) * 
-            norm.pdf(d1) * math.sqrt(ttm) / 100
+            _norm_pdf(d1) * math.sqrt(ttm) / 100
         )
         
         # Theta (per day)
         if option_type in ['CE', 'CALL']:
             theta = (
-                -underlying * math.exp(-dividend_yield * ttm) * norm.pdf(d1) * volatility / (2 * math.sqrt(ttm)) -
-                risk_free_rate * strike * math.exp(-risk_free_rate * ttm) * norm.cdf(d2) +
-                dividend_yield * underlying * math.exp(-dividend_yield * ttm) * norm.cdf(d1)
+                -underlying * math.exp(-dividend_yield * ttm) * _norm_pdf(d1) * volatility / (2 * math.sqrt(ttm)) -
+                risk_free_rate * strike * math.exp(-risk_free_rate * ttm) * ndtr(d2) +
+                dividend_yield * underlying * math.exp(-dividend_yield * ttm) * ndtr(d1)
             ) / 252
         else:  # PUT
             theta = (
-                -underlying * math.exp(-dividend_yield * ttm) * norm.pdf(d1) * volatility / (2 * math.sqrt(ttm)) +
-                risk_free_rate * strike * math.exp(-risk_free_rate * ttm) * norm.cdf(-d2) -
-                dividend_yield * underlying * math.exp(-dividend_yield * ttm) * norm.cdf(-d1)
+                -underlying * math.exp(-dividend_yield * ttm) * _norm_pdf(d1) * volatility / (2 * math.sqrt(ttm)) +
+                risk_free_rate * strike * math.exp(-risk_free_rate * ttm) * ndtr(-d2) -
+                dividend_yield * underlying * math.exp(-dividend_yield * ttm) * ndtr(-d1)
             ) / 252
         
         return {
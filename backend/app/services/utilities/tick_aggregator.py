@@ -0,0 +1,260 @@
+"""Tick-to-bar aggregation for streaming option chain collection.
+
+Keeps a latest-state row per subscribed instrument, updated from Kite
+full-mode ticks, and turns it into fixed-interval snapshot/OHLC bars
+locally - no REST calls are needed while ticks are flowing.
+"""
+
+import threading
+from dataclasses import dataclass
+from datetime import date, datetime
+from typing import Any, Dict, List, Optional
+
+from loguru import logger
+
+
+@dataclass
+class InstrumentState:
+    """Latest known state of one subscribed option."""
+    symbol: str
+    trading_symbol: str
+    expiry: date
+    strike: int
+    option_type: str
+
+    # Latest tick values
+    ltp: Optional[float] = None
+    bid: float = 0.0
+    bid_qty: int = 0
+    ask: float = 0.0
+    ask_qty: int = 0
+    volume: int = 0
+    oi: int = 0
+    oi_day_high: int = 0
+    oi_day_low: int = 0
+    last_trade_time: Optional[datetime] = None
+    updated_at: Optional[datetime] = None
+
+    # Current bar (None until the first tick of the bar)
+    bar_open: Optional[float] = None
+    bar_high: Optional[float] = None
+    bar_low: Optional[float] = None
+    bar_close: Optional[float] = None
+    bar_ticks: int = 0
+
+
+@dataclass
+class AggregatorStats:
+    ticks: int = 0
+    ignored_ticks: int = 0
+    bars_emitted: int = 0
+    records_emitted: int = 0
+
+
+class TickBarAggregator:
+    """
+    Aggregates Kite ticks into per-instrument snapshot bars.
+
+    on_ticks() is safe to call from the ticker thread; flush() is called
+    by the collector at each bar boundary and returns records in the same
+    format as the REST quote collector.
+    """
+
+    def __init__(self):
+        self._states: Dict[int, InstrumentState] = {}
+        self._underlying_tokens: Dict[int, str] = {}
+        self._spot: Dict[str, float] = {}
+        self._lock = threading.Lock()
+        self.stats = AggregatorStats()
+
+    # ------------------------------------------------------------------
+    # Universe management
+    # ------------------------------------------------------------------
+
+    def register(self, token: int, meta: Dict[str, Any]) -> None:
+        """Track an option token. meta: symbol, trading_symbol, expiry, strike, option_type."""
+        with self._lock:
+            if token in self._states:
+                return
+            self._states[token] = InstrumentState(
+                symbol=meta["symbol"],
+                trading_symbol=meta["trading_symbol"],
+                expiry=meta["expiry"],
+                strike=int(meta["strike"]),
+                option_type=meta["option_type"],
+            )
+
+    def unregister(self, token: int) -> None:
+        with self._lock:
+            self._states.pop(token, None)
+
+    def register_underlying(self, token: int, symbol: str) -> None:
+        """Track an index token whose last price is used as the underlying."""
+        with self._lock:
+            self._underlying_tokens[token] = symbol
+
+    def tokens(self, symbol: Optional[str] = None) -> List[int]:
+        with self._lock:
+            return [
+                t for t, s in self._states.items()
+                if symbol is None or s.symbol == symbol
+            ]
+
+    def get_spot(self, symbol: str) -> Optional[float]:
+        return self._spot.get(symbol)
+
+    def missing_tokens(self) -> List[int]:
+        """Registered tokens that have not received a single tick yet."""
+        with self._lock:
+            return [t for t, s in self._states.items() if s.ltp is None]
+
+    def apply_quotes(self, quotes: Dict[int, Dict[str, Any]]) -> int:
+        """
+        Seed instruments from REST full quotes (gap-fill for tokens that never ticked).
+
+        Args:
+            quotes: instrument token -> Kite quote
+
+        Returns:
+            Number of instruments updated
+        """
+        applied = 0
+        with self._lock:
+            for token, quote in quotes.items():
+                state = self._states.get(token)
+                price = quote.get("last_price")
+                if state is None or price is None:
+                    continue
+                self._apply_tick(state, {
+                    "volume_traded": quote.get("volume", state.volume),
+                    "oi": quote.get("oi", state.oi),
+                    "oi_day_high": quote.get("oi_day_high", state.oi_day_high),
+                    "oi_day_low": quote.get("oi_day_low", state.oi_day_low),
+                    "last_trade_time": quote.get("last_trade_time", state.last_trade_time),
+                    "exchange_timestamp": quote.get("timestamp"),
+                    "depth": quote.get("depth"),
+                }, price)
+                applied += 1
+        return applied
+
+    def clear(self) -> None:
+        with self._lock:
+            self._states.clear()
+            self._underlying_tokens.clear()
+            self._spot.clear()
+
+    # ------------------------------------------------------------------
+    # Tick handling
+    # ------------------------------------------------------------------
+
+    def on_ticks(self, ticks: List[Dict[str, Any]]) -> None:
+        """Apply a batch of full-mode ticks to the state table."""
+        with self._lock:
+            for tick in ticks:
+                token = tick.get("instrument_token")
+                price = tick.get("last_price")
+                if token is None or price is None:
+                    continue
+
+                if token in self._underlying_tokens:
+                    self._spot[self._underlying_tokens[token]] = price
+                    self.stats.ticks += 1
+                    continue
+
+                state = self._states.get(token)
+                if state is None:
+                    self.stats.ignored_ticks += 1
+                    continue
+
+                self._apply_tick(state, tick, price)
+                self.stats.ticks += 1
+
+    @staticmethod
+    def _apply_tick(state: InstrumentState, tick: Dict[str, Any], price: float) -> None:
+        state.ltp = price
+        state.volume = tick.get("volume_traded", state.volume)
+        state.oi = tick.get("oi", state.oi)
+        state.oi_day_high = tick.get("oi_day_high", state.oi_day_high)
+        state.oi_day_low = tick.get("oi_day_low", state.oi_day_low)
+        state.last_trade_time = tick.get("last_trade_time", state.last_trade_time)
+        state.updated_at = tick.get("exchange_timestamp") or datetime.now()
+
+        depth = tick.get("depth")
+        if depth:
+            buy = depth.get("buy") or [{}]
+            sell = depth.get("sell") or [{}]
+            state.bid = buy[0].get("price", 0)
+            state.bid_qty = buy[0].get("quantity", 0)
+            state.ask = sell[0].get("price", 0)
+            state.ask_qty = sell[0].get("quantity", 0)
+
+        if state.bar_open is None:
+            state.bar_open = state.bar_high = state.bar_low = price
+        else:
+            state.bar_high = max(state.bar_high, price)
+            state.bar_low = min(state.bar_low, price)
+        state.bar_close = price
+        state.bar_ticks += 1
+
+    # ------------------------------------------------------------------
+    # Bar emission
+    # ------------------------------------------------------------------
+
+    def flush(self, bar_time: datetime) -> List[Dict[str, Any]]:
+        """
+        Close the current bar for every instrument and start a new one.
+
+        Instruments without ticks in this bar carry their last price forward
+        (flat bar); instruments that never ticked are skipped - the collector
+        quotes missing_tokens() over REST and seeds them with apply_quotes()
+        before each flush.
+
+        Args:
+            bar_time: Timestamp stamped on the emitted records (bar start)
+
+        Returns:
+            List of records matching the options collector format
+        """
+        records = []
+        with self._lock:
+            for state in self._states.values():
+                if state.ltp is None:
+                    continue
+
+                if state.bar_open is None:
+                    o = h = l = c = state.ltp
+                else:
+                    o, h, l, c = state.bar_open, state.bar_high, state.bar_low, state.bar_close
+
+                records.append({
+                    "timestamp": bar_time,
+                    "symbol": state.symbol,
+                    "trading_symbol": state.trading_symbol,
+                    "expiry": state.expiry,
+                    "strike": state.strike,
+                    "option_type": state.option_type,
+                    "underlying": self._spot.get(state.symbol, 0),
+                    "ltp": state.ltp,
+                    "bid": state.bid,
+                    "bid_qty": state.bid_qty,
+                    "ask": state.ask,
+                    "ask_qty": state.ask_qty,
+                    "volume": state.volume,
+                    "oi": state.oi,
+                    "oi_day_high": state.oi_day_high,
+                    "oi_day_low": state.oi_day_low,
+                    "open": o,
+                    "high": h,
+                    "low": l,
+                    "close": c,
+                    "last_trade_time": state.last_trade_time,
+                })
+
+                state.bar_open = state.bar_high = state.bar_low = state.bar_close = None
+                state.bar_ticks = 0
+
+            self.stats.bars_emitted += 1
+            self.stats.records_emitted += len(records)
+
+        logger.debug(f"Emitted {len(records)} bar records for {bar_time}")
+        return records
@@ -0,0 +1,29 @@
+"""Performance benchmarks for Trading System v2.0 (run with scripts/run_benchmarks.py)"""
+
+from .runner import (
+    REGISTRY,
+    Benchmark,
+    BenchmarkResult,
+    BenchmarkRun,
+    Comparison,
+    benchmark,
+    compare_runs,
+    load_run,
+    run_benchmarks,
+    save_run,
+    select,
+)
+
+__all__ = [
+    "REGISTRY",
+    "Benchmark",
+    "BenchmarkResult",
+    "BenchmarkRun",
+    "Comparison",
+    "benchmark",
+    "compare_runs",
+    "load_run",
+    "run_benchmarks",
+    "save_run",
+    "select",
+]
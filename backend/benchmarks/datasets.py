@@ -0,0 +1,194 @@
+"""
+Synthetic benchmark datasets for Trading System v2.0
+
+Every dataset is generated from a fixed seed, so a benchmark run on any
+machine times exactly the same inputs. Bar datasets end on the same date
+and differ only in history length.
+"""
+
+import hashlib
+from datetime import date, timedelta
+from functools import lru_cache
+from typing import Dict, List, Tuple
+
+import numpy as np
+import pandas as pd
+
+
+SEED = 20240101
+TRADING_DAYS_PER_YEAR = 250
+BARS_PER_DAY = 375  # 09:15-15:29 1-minute bars
+LAST_SESSION = "2025-12-31"
+
+BAR_SIZES: Dict[str, int] = {"1y": 1, "5y": 5, "20y": 20}  # label -> years of 1-minute bars
+BOOK_SIZES: Tuple[int, ...] = (50, 500, 5000)  # option legs
+CLIENT_COUNTS: Tuple[int, ...] = (1, 10, 100)  # websocket clients
+
+LEGS_PER_STRATEGY = 4
+STRATEGIES_PER_PORTFOLIO = 25
+BOOK_TOKEN_BASE = 10_000_000
+
+
+@lru_cache(maxsize=None)
+def minute_bars(years: float, seed: int = SEED) -> pd.DataFrame:
+    """
+    1-minute OHLCV bars in HistoricalDataClient format.
+
+    Args:
+        years: History length (250 sessions per year)
+        seed: Random seed; other seeds give correlated-asset stand-ins
+
+    Returns:
+        DataFrame with date, open, high, low, close, volume
+    """
+    sessions = pd.bdate_range(end=LAST_SESSION, periods=int(round(years * TRADING_DAYS_PER_YEAR)))
+    offsets = np.timedelta64(9 * 60 + 15, "m") + np.arange(BARS_PER_DAY) * np.timedelta64(1, "m")
+    dates = pd.DatetimeIndex((sessions.values[:, None] + offsets[None, :]).ravel())
+
+    n = len(dates)
+    rng = np.random.default_rng(seed)
+    # ~15% annualized vol, occasional volatility bursts so regimes vary
+    vol = 0.0006 * np.repeat(rng.choice([0.6, 1.0, 2.2], size=len(sessions), p=[0.3, 0.55, 0.15]), BARS_PER_DAY)
+    close = 10000.0 * np.exp(np.cumsum(rng.normal(0, 1, n) * vol))
+    open_ = np.r_[close[0], close[:-1]] * (1 + rng.normal(0, 0.0001, n))
+    spread = np.abs(rng.normal(0, 0.0003, n))
+
+    return pd.DataFrame({
+        "date": dates,
+        "open": open_,
+        "high": np.maximum(open_, close) * (1 + spread),
+        "low": np.minimum(open_, close) * (1 - spread),
+        "close": close,
+        "volume": rng.integers(1_000, 100_000, n),
+    })
+
+
+@lru_cache(maxsize=None)
+def daily_bars(years: float, seed: int = SEED) -> pd.DataFrame:
+    """Daily OHLCV aggregated from minute_bars, indexed by session date."""
+    minutes = minute_bars(years, seed)
+    return minutes.groupby(minutes["date"].dt.normalize()).agg(
+        open=("open", "first"), high=("high", "max"), low=("low", "min"),
+        close=("close", "last"), volume=("volume", "sum")
+    )
+
+
+def fingerprint(df: pd.DataFrame) -> str:
+    """Short content hash, recorded with results so runs compare like with like."""
+    digest = hashlib.sha1(np.ascontiguousarray(df["close"].to_numpy()).tobytes())
+    return f"{len(df)}:{digest.hexdigest()[:12]}"
+
+
+@lru_cache(maxsize=None)
+def _book_arrays(legs: int, seed: int):
+    rng = np.random.default_rng(seed + legs)
+    spot = 25000.0
+    strikes = (np.round(spot * (1 + rng.normal(0, 0.04, legs)) / 50) * 50).astype(int)
+    option_types = rng.choice(["CE", "PE"], size=legs)
+    expiries = rng.choice([7, 14, 28, 56], size=legs)
+    lots = rng.integers(1, 10, legs) * 75 * rng.choice([-1, 1], size=legs, p=[0.7, 0.3])
+    entry = np.round(np.abs(rng.normal(120, 60, legs)) + 5, 2)
+    last = np.round(entry * (1 + rng.normal(0, 0.15, legs)), 2)
+    return spot, strikes, option_types, expiries, lots, entry, last
+
+
+def option_book(legs: int, seed: int = SEED) -> List[Dict]:
+    """
+    Open option positions in the websocket position format.
+
+    Args:
+        legs: Number of option legs
+        seed: Random seed
+
+    Returns:
+        JSON-ready position dicts (tradingsymbol, instrument_token, quantity, prices, expiry)
+    """
+    spot, strikes, option_types, expiries, lots, entry, last = _book_arrays(legs, seed)
+    today = date.fromisoformat(LAST_SESSION)
+    book = []
+    for i in range(legs):
+        expiry = today + timedelta(days=int(expiries[i]))
+        quantity = int(lots[i])
+        pnl = (last[i] - entry[i]) * quantity
+        book.append({
+            "tradingsymbol": f"NIFTY{expiry:%y%b}{strikes[i]}{option_types[i]}".upper(),
+            "instrument_token": BOOK_TOKEN_BASE + i,
+            "exchange": "NFO",
+            "product": "NRML",
+            "strike": int(strikes[i]),
+            "expiry": expiry.isoformat(),
+            "option_type": str(option_types[i]),
+            "underlying": spot,
+            "quantity": quantity,
+            "average_price": float(entry[i]),
+            "last_price": float(last[i]),
+            "close_price": float(entry[i]),
+            "pnl": round(float(pnl), 2),
+            "pnl_pct": round(float((last[i] - entry[i]) / entry[i] * 100), 2),
+            "margin_used": abs(quantity) * spot * 0.12,
+        })
+    return book
+
+
+def book_ticks(book: List[Dict], move: float = 0.01, seed: int = SEED) -> List[Dict]:
+    """One LTP tick per leg of the book, moved by a random fraction."""
+    rng = np.random.default_rng(seed)
+    moves = 1 + rng.normal(0, move, len(book))
+    return [
+        {"tradable": True, "mode": "ltp", "instrument_token": leg["instrument_token"],
+         "last_price": round(float(leg["last_price"] * m), 2)}  # Python floats, as KiteTicker delivers
+        for leg, m in zip(book, moves)
+    ]
+
+
+def seed_book_database(book: List[Dict]) -> int:
+    """
+    Replace all strategies, trades and portfolios with the book.
+
+    Legs are grouped LEGS_PER_STRATEGY to a strategy and
+    STRATEGIES_PER_PORTFOLIO strategies to a portfolio.
+
+    Args:
+        book: option_book() legs
+
+    Returns:
+        Number of strategies written
+    """
+    from app.database.models import Portfolio, Strategy, StrategyTrade
+    from app.database.repository import Repository
+
+    repo = Repository()
+    with repo._get_session() as session:
+        session.query(StrategyTrade).delete()
+        session.query(Strategy).delete()
+        session.query(Portfolio).delete()
+
+        strategies = 0
+        for start in range(0, len(book), LEGS_PER_STRATEGY):
+            if strategies % STRATEGIES_PER_PORTFOLIO == 0:
+                portfolio_id = f"bench-portfolio-{strategies // STRATEGIES_PER_PORTFOLIO}"
+                session.add(Portfolio(id=portfolio_id, name=portfolio_id, is_active=True))
+            strategy_id = f"bench-strategy-{strategies}"
+            session.add(Strategy(
+                id=strategy_id, portfolio_id=portfolio_id, name=strategy_id,
+                label="IRON_CONDOR", status="OPEN", source="MANUAL"
+            ))
+            for leg in book[start:start + LEGS_PER_STRATEGY]:
+                session.add(StrategyTrade(
+                    id=f"bench-trade-{leg['instrument_token']}",
+                    strategy_id=strategy_id,
+                    tradingsymbol=leg["tradingsymbol"],
+                    instrument_token=leg["instrument_token"],
+                    exchange=leg["exchange"],
+                    instrument_type=leg["option_type"],
+                    strike=leg["strike"],
+                    expiry=date.fromisoformat(leg["expiry"]),
+                    option_type=leg["option_type"],
+                    quantity=leg["quantity"],
+                    entry_price=leg["average_price"],
+                    last_price=leg["last_price"],
+                    status="OPEN",
+                ))
+            strategies += 1
+        session.commit()
+    return strategies
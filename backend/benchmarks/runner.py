@@ -0,0 +1,328 @@
+"""
+Benchmark Runner for Trading System v2.0
+
+Benchmarks are registered with @benchmark and timed by run_benchmarks().
+A benchmark function takes one parameter (dataset size, book size, ...)
+and returns - or yields, when it needs cleanup - the callable to time,
+optionally as (callable, ops) so results are also reported per operation.
+"""
+
+import fnmatch
+import gc
+import inspect
+import json
+import platform
+import statistics
+import subprocess
+import time
+from dataclasses import asdict, dataclass, field, replace
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence
+
+from loguru import logger
+
+
+RESULTS_VERSION = 1
+
+
+@dataclass
+class Benchmark:
+    """A registered benchmark and the parameters it runs with."""
+    name: str
+    group: str
+    func: Callable[[Any], Any]
+    params: Sequence[Any] = (None,)
+    repeat: int = 5
+    label: str = "{}"  # Parameter label format, e.g. "{}legs"
+
+    def param_label(self, param: Any) -> Optional[str]:
+        return None if param is None else self.label.format(param)
+
+    def case_name(self, param: Any) -> str:
+        return self.name if param is None else f"{self.name}[{self.param_label(param)}]"
+
+
+@dataclass
+class BenchmarkResult:
+    """Timings for one benchmark at one parameter."""
+    name: str
+    group: str
+    param: Optional[str]
+    runs: int = 0
+    ops: int = 1
+    min_ms: float = 0.0
+    median_ms: float = 0.0
+    mean_ms: float = 0.0
+    max_ms: float = 0.0
+    per_op_us: float = 0.0
+    setup_s: float = 0.0
+    error: Optional[str] = None
+
+
+@dataclass
+class BenchmarkRun:
+    """A saved benchmark run: environment plus results."""
+    results: List[BenchmarkResult] = field(default_factory=list)
+    environment: Dict[str, Any] = field(default_factory=dict)
+    datasets: Dict[str, str] = field(default_factory=dict)
+    created_at: str = field(default_factory=lambda: datetime.now().isoformat(timespec="seconds"))
+    version: int = RESULTS_VERSION
+
+
+REGISTRY: List[Benchmark] = []
+
+
+def benchmark(group: str, params: Iterable[Any] = (None,), name: Optional[str] = None,
+              repeat: int = 5, label: str = "{}"):
+    """
+    Register a benchmark function.
+
+    Args:
+        group: Result group (indicators, sentinel, engine, ...)
+        params: Parameters to run the benchmark with, one result each
+        name: Benchmark name (default: group.function_name)
+        repeat: Maximum timed runs per parameter
+        label: Parameter label format used in result names
+    """
+    def register(func):
+        REGISTRY.append(Benchmark(
+            name=name or f"{group}.{func.__name__}",
+            group=group,
+            func=func,
+            params=tuple(params),
+            repeat=repeat,
+            label=label,
+        ))
+        return func
+    return register
+
+
+def select(benchmarks: Sequence[Benchmark], patterns: Optional[Sequence[str]] = None,
+           keep: Optional[Callable[[Any], bool]] = None) -> List[Benchmark]:
+    """
+    Filter benchmarks by name pattern and restrict their parameters.
+
+    Args:
+        benchmarks: Candidates (usually REGISTRY)
+        patterns: fnmatch patterns on benchmark or group name; None keeps all
+        keep: Predicate on parameter values; None keeps all
+
+    Returns:
+        Benchmarks with at least one parameter left
+    """
+    selected = []
+    for bench in benchmarks:
+        if patterns and not any(
+            fnmatch.fnmatch(bench.name, p) or fnmatch.fnmatch(bench.group, p) for p in patterns
+        ):
+            continue
+        kept = tuple(p for p in bench.params if p is None or keep is None or keep(p))
+        if kept:
+            selected.append(replace(bench, params=kept))
+    return selected
+
+
+def _time_once(fn: Callable[[], Any]) -> float:
+    start = time.perf_counter()
+    fn()
+    return (time.perf_counter() - start) * 1000
+
+
+def run_case(bench: Benchmark, param: Any, budget_s: float = 2.0) -> BenchmarkResult:
+    """
+    Time one benchmark at one parameter.
+
+    One warm-up call, then up to bench.repeat timed calls while the total
+    stays within budget_s. A warm-up call longer than the budget is kept
+    as the only sample, so slow cases cost a single call.
+
+    Args:
+        bench: Benchmark to run
+        param: Parameter passed to the benchmark function
+        budget_s: Time budget for the timed calls
+
+    Returns:
+        BenchmarkResult (error set if setup or a call raised)
+    """
+    result = BenchmarkResult(bench.case_name(param), bench.group, bench.param_label(param))
+    cleanup = None
+    try:
+        start = time.perf_counter()
+        target = bench.func(param)
+        if inspect.isgenerator(target):
+            cleanup, target = target, next(target)
+        fn, ops = target if isinstance(target, tuple) else (target, 1)
+        result.setup_s = round(time.perf_counter() - start, 3)
+        result.ops = ops
+
+        gc.collect()
+        samples = [_time_once(fn)]
+        if samples[0] < budget_s * 1000:
+            samples = []
+            while len(samples) < bench.repeat and sum(samples) < budget_s * 1000:
+                samples.append(_time_once(fn))
+
+        result.runs = len(samples)
+        result.min_ms = round(min(samples), 4)
+        result.median_ms = round(statistics.median(samples), 4)
+        result.mean_ms = round(statistics.fmean(samples), 4)
+        result.max_ms = round(max(samples), 4)
+        result.per_op_us = round(result.median_ms * 1000 / max(ops, 1), 3)
+    except Exception as e:
+        logger.error(f"Benchmark {result.name} failed: {e}")
+        result.error = f"{type(e).__name__}: {e}"
+    finally:
+        if cleanup is not None:
+            cleanup.close()
+    return result
+
+
+def run_benchmarks(benchmarks: Sequence[Benchmark], budget_s: float = 2.0,
+                   on_result: Optional[Callable[[BenchmarkResult], None]] = None) -> BenchmarkRun:
+    """
+    Run benchmarks at every parameter.
+
+    Args:
+        benchmarks: Benchmarks to run (see select())
+        budget_s: Per-case time budget
+        on_result: Called after each case, e.g. for progress output
+
+    Returns:
+        BenchmarkRun with results and environment
+    """
+    run = BenchmarkRun(environment=environment())
+    for bench in benchmarks:
+        for param in bench.params:
+            result = run_case(bench, param, budget_s)
+            run.results.append(result)
+            if on_result:
+                on_result(result)
+    return run
+
+
+def environment() -> Dict[str, Any]:
+    """Interpreter, library and commit details saved with each run."""
+    import numpy as np
+    import pandas as pd
+
+    env = {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "machine": platform.machine(),
+        "processor": platform.processor(),
+        "numpy": np.__version__,
+        "pandas": pd.__version__,
+    }
+    try:
+        env["commit"] = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, timeout=5,
+            cwd=Path(__file__).parent
+        ).stdout.strip() or None
+    except Exception:
+        env["commit"] = None
+    return env
+
+
+def save_run(run: BenchmarkRun, path: Path) -> Path:
+    """Write a run as JSON."""
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps(asdict(run), indent=2, default=str))
+    return path
+
+
+def load_run(path: Path) -> BenchmarkRun:
+    """Read a run written by save_run()."""
+    data = json.loads(Path(path).read_text())
+    data["results"] = [BenchmarkResult(**r) for r in data.get("results", [])]
+    return BenchmarkRun(**data)
+
+
+@dataclass
+class Comparison:
+    """One benchmark in baseline vs candidate."""
+    name: str
+    baseline_ms: Optional[float]
+    candidate_ms: Optional[float]
+    ratio: Optional[float]
+    status: str  # faster, slower, same, new, missing, error
+
+
+def compare_runs(baseline: BenchmarkRun, candidate: BenchmarkRun,
+                 threshold: float = 0.10, metric: str = "median_ms") -> List[Comparison]:
+    """
+    Compare two runs benchmark by benchmark.
+
+    Args:
+        baseline: Reference run
+        candidate: Run being checked
+        threshold: Relative change treated as noise (0.10 = 10%)
+        metric: BenchmarkResult timing field to compare
+
+    Returns:
+        Comparisons in candidate order, then benchmarks missing from candidate
+    """
+    base = {r.name: r for r in baseline.results}
+    seen = set()
+    out = []
+    for r in candidate.results:
+        seen.add(r.name)
+        b = base.get(r.name)
+        if b is None:
+            out.append(Comparison(r.name, None, getattr(r, metric), None, "new"))
+            continue
+        if r.error or b.error:
+            out.append(Comparison(r.name, getattr(b, metric), getattr(r, metric), None, "error"))
+            continue
+        before, after = getattr(b, metric), getattr(r, metric)
+        ratio = after / before if before else None
+        if ratio is None:
+            status = "same"
+        elif ratio > 1 + threshold:
+            status = "slower"
+        elif ratio < 1 / (1 + threshold):
+            status = "faster"
+        else:
+            status = "same"
+        out.append(Comparison(r.name, before, after, None if ratio is None else round(ratio, 3), status))
+    for name, b in base.items():
+        if name not in seen:
+            out.append(Comparison(name, getattr(b, metric), None, None, "missing"))
+    return out
+
+
+def dataset_mismatches(baseline: BenchmarkRun, candidate: BenchmarkRun) -> List[str]:
+    """Datasets present in both runs whose fingerprints differ."""
+    return sorted(
+        name for name, fp in candidate.datasets.items()
+        if name in baseline.datasets and baseline.datasets[name] != fp
+    )
+
+
+def format_results(results: Sequence[BenchmarkResult]) -> str:
+    """Plain-text table of results."""
+    width = max([len(r.name) for r in results] + [9])
+    lines = [f"{'benchmark':<{width}}  {'runs':>4}  {'median ms':>11}  {'min ms':>11}  {'per op us':>11}"]
+    for r in results:
+        if r.error:
+            lines.append(f"{r.name:<{width}}  ERROR {r.error}")
+        else:
+            lines.append(
+                f"{r.name:<{width}}  {r.runs:>4}  {r.median_ms:>11.3f}  {r.min_ms:>11.3f}  {r.per_op_us:>11.2f}"
+            )
+    return "\n".join(lines)
+
+
+def format_comparison(comparisons: Sequence[Comparison]) -> str:
+    """Plain-text table of a comparison."""
+    width = max([len(c.name) for c in comparisons] + [9])
+
+    def ms(value):
+        return f"{value:>11.3f}" if value is not None else f"{'-':>11}"
+
+    lines = [f"{'benchmark':<{width}}  {'baseline':>11}  {'candidate':>11}  {'ratio':>7}  status"]
+    for c in comparisons:
+        ratio = f"{c.ratio:>6.2f}x" if c.ratio is not None else f"{'-':>7}"
+        lines.append(f"{c.name:<{width}}  {ms(c.baseline_ms)}  {ms(c.candidate_ms)}  {ratio}  {c.status}")
+    return "\n".join(lines)
@@ -0,0 +1,471 @@
+"""
+Benchmark Cases for Trading System v2.0
+
+Importing this module registers every benchmark with runner.REGISTRY:
+
+- indicators: each function in indicators/technical.py and volatility.py
+- dc:         DirectionalChange.compute_dc_events
+- sentinel:   Sentinel.process against HistoricalDataClient
+- engine:     TradingEngine.run_iteration against HistoricalDataClient,
+              untraced and inside a sampled trace
+- simulator:  OptionsSimulator quotes (per option and batched) and
+              simulated chains
+- positions:  open-position P&L and exit checks, Position models vs LegBook
+- websocket:  tick updates, strategy/portfolio enrichment and fan-out
+- startup:    API cold start - importing app.main and time to first request
+
+Bar benchmarks run on 1/5/20 years of 1-minute bars, book benchmarks on
+50/500/5000 option legs. The engine and websocket strategy cases write to
+the database at DATABASE_URL - scripts/run_benchmarks.py points it at a
+scratch SQLite file.
+"""
+
+import asyncio
+import json
+import os
+import subprocess
+import sys
+import tempfile
+from datetime import date
+from functools import lru_cache
+from pathlib import Path
+from types import SimpleNamespace
+
+import pandas as pd
+
+from app.config.constants import NIFTY_TOKEN
+from app.services.indicators import technical, volatility
+
+from .datasets import (
+    BAR_SIZES, BOOK_SIZES, CLIENT_COUNTS, LAST_SESSION, LEGS_PER_STRATEGY, SEED,
+    book_ticks, daily_bars, fingerprint, minute_bars, option_book, seed_book_database
+)
+from .runner import benchmark
+
+
+# Bars stepped per Sentinel/engine timed call
+STEPS_PER_CALL = 10
+# Scalar indicator calls per timed call
+SCALAR_CALLS = 10_000
+# Book used by the broadcast/fan-out cases
+FANOUT_LEGS = 500
+# /api/v1 endpoints hit by the cold-start cases
+STARTUP_ENDPOINTS = ("health", "metrics")
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+
+# Fresh interpreter: import the API app and serve one request in-process
+FIRST_REQUEST_SCRIPT = """
+import sys
+from starlette.testclient import TestClient
+from app.main import app
+response = TestClient(app).get(sys.argv[1])
+print(response.status_code, flush=True)
+"""
+
+
+@lru_cache(maxsize=None)
+def bar_inputs(size: str) -> SimpleNamespace:
+    """Series inputs for the indicator functions, built once per size."""
+    bars = minute_bars(BAR_SIZES[size])
+    other = minute_bars(BAR_SIZES[size], seed=SEED + 1)
+    realized = volatility.calculate_realized_vol(bars["close"])
+    return SimpleNamespace(
+        open=bars["open"], high=bars["high"], low=bars["low"], close=bars["close"], volume=bars["volume"],
+        other=other["close"],
+        iv=realized.bfill() * 1.1,
+        vix=realized.bfill() * 100,
+        corr=volatility.calculate_correlation(bars["close"], other["close"]).bfill(),
+    )
+
+
+TECHNICAL = {
+    "calculate_adx": lambda d: technical.calculate_adx(d.high, d.low, d.close),
+    "calculate_rsi": lambda d: technical.calculate_rsi(d.close),
+    "calculate_atr": lambda d: technical.calculate_atr(d.high, d.low, d.close),
+    "calculate_ema": lambda d: technical.calculate_ema(d.close, 20),
+    "calculate_sma": lambda d: technical.calculate_sma(d.close, 20),
+    "calculate_bollinger_bands": lambda d: technical.calculate_bollinger_bands(d.close),
+    "calculate_macd": lambda d: technical.calculate_macd(d.close),
+    "calculate_stochastic": lambda d: technical.calculate_stochastic(d.high, d.low, d.close),
+    "detect_gaps": lambda d: technical.detect_gaps(d.open, d.close.shift(1)),
+    "calculate_day_range": lambda d: technical.calculate_day_range(d.high, d.low, d.close),
+    "calculate_bollinger_band_width": lambda d: technical.calculate_bollinger_band_width(d.close),
+    "calculate_bbw_percentile": lambda d: technical.calculate_bbw_percentile(d.close),
+    "calculate_bbw_ratio": lambda d: technical.calculate_bbw_ratio(d.close),
+    "calculate_volume_ratio": lambda d: technical.calculate_volume_ratio(d.volume),
+    "calculate_price_position_in_range": lambda d: technical.calculate_price_position_in_range(d.close, d.high, d.low),
+    "calculate_atr_percentile": lambda d: technical.calculate_atr_percentile(d.high, d.low, d.close),
+}
+
+VOLATILITY = {
+    "calculate_iv_percentile": lambda d: volatility.calculate_iv_percentile(0.18, d.iv),
+    "calculate_realized_vol": lambda d: volatility.calculate_realized_vol(d.close),
+    "calculate_rv_atr_ratio": lambda d: volatility.calculate_rv_atr_ratio(d.close, d.high, d.low),
+    "calculate_vix_percentile": lambda d: volatility.calculate_vix_percentile(16.5, d.vix),
+    "calculate_correlation": lambda d: volatility.calculate_correlation(d.close, d.other),
+    "calculate_correlation_matrix": lambda d: volatility.calculate_correlation_matrix(
+        {"NIFTY": d.close, "BANKNIFTY": d.other, "VIX": d.vix}
+    ),
+    "detect_correlation_spike": lambda d: volatility.detect_correlation_spike(d.corr),
+    "calculate_parkinson_vol": lambda d: volatility.calculate_parkinson_vol(d.high, d.low),
+    "calculate_garman_klass_vol": lambda d: volatility.calculate_garman_klass_vol(d.open, d.high, d.low, d.close),
+    "calculate_rv_iv_ratio": lambda d: volatility.calculate_rv_iv_ratio(d.close, 0.18),
+    "calculate_rv_iv_ratio_series": lambda d: volatility.calculate_rv_iv_ratio_series(d.close, d.iv),
+    "calculate_intraday_rv": lambda d: volatility.calculate_intraday_rv(d.high, d.low, d.close),
+    "detect_correlation_spike_dynamic": lambda d: volatility.detect_correlation_spike_dynamic(d.corr),
+}
+
+# Functions of a few floats - timed over SCALAR_CALLS calls
+VOLATILITY_SCALAR = {
+    "calculate_skew": lambda: volatility.calculate_skew(0.21, 0.18, 0.19),
+    "calculate_term_structure": lambda: volatility.calculate_term_structure(0.19, 0.17),
+    "calculate_vol_regime_score": lambda: volatility.calculate_vol_regime_score(45.0, 0.9, 1.1, 1.3),
+}
+
+
+def _register_series(module: str, functions: dict) -> None:
+    for name, call in functions.items():
+        def case(size, call=call):
+            inputs = bar_inputs(size)
+            return lambda: call(inputs)
+        benchmark("indicators", BAR_SIZES, name=f"indicators.{module}.{name}")(case)
+
+
+def _register_scalar(module: str, functions: dict) -> None:
+    for name, call in functions.items():
+        def case(_, call=call):
+            def run():
+                for _ in range(SCALAR_CALLS):
+                    call()
+            return run, SCALAR_CALLS
+        benchmark("indicators", name=f"indicators.{module}.{name}")(case)
+
+
+_register_series("technical", TECHNICAL)
+_register_series("volatility", VOLATILITY)
+_register_scalar("volatility", VOLATILITY_SCALAR)
+
+
+@benchmark("dc", BAR_SIZES)
+def compute_dc_events(size):
+    from app.services.indicators.dc import DirectionalChange
+
+    bars = minute_bars(BAR_SIZES[size]).rename(columns={"date": "timestamp"})
+    dc = DirectionalChange(theta=0.003, min_bar_window=5)
+    return lambda: dc.compute_dc_events(bars)
+
+
+def _last_session_steps(client, count: int):
+    """5-minute steps from the end of the data, oldest first."""
+    steps = list(client.iterate_bars("5minute"))
+    return steps[-count:]
+
+
+@benchmark("sentinel", BAR_SIZES)
+def process(size):
+    from app.config.settings import Settings
+    from app.services.agents import Sentinel
+    from app.services.backtesting import HistoricalDataClient
+
+    client = HistoricalDataClient(minute_bars(BAR_SIZES[size]))
+    sentinel = Sentinel(client, Settings(), data_cache=None)
+    steps = _last_session_steps(client, STEPS_PER_CALL + 1)
+    client.set_current_time(steps[0])
+    sentinel.process(NIFTY_TOKEN)  # First call builds DC/HMM state
+
+    def run():
+        for ts in steps[1:]:
+            client.set_current_time(ts)
+            sentinel.process(NIFTY_TOKEN)
+    return run, STEPS_PER_CALL
+
+
+def _engine_iterations(size, traced: bool):
+    from app.config.settings import Settings
+    from app.core.tracing import get_tracer
+    from app.core.state_manager import StateManager
+    from app.core.trading_engine import TradingEngine
+    from app.services.agents import Sentinel
+    from app.services.backtesting import HistoricalDataClient
+    from app.services.execution import Executor, Treasury
+    from app.services.execution.audit_logger import ExecutionAuditLogger
+    from app.services.strategies import Strategist
+
+    client = HistoricalDataClient(minute_bars(BAR_SIZES[size]))
+    config = Settings()
+    with tempfile.TemporaryDirectory() as state_dir:
+        # Same wiring as scripts/run_backtest.py
+        state_manager = StateManager(Path(state_dir))
+        sentinel = Sentinel(client, config, data_cache=None)
+        strategist = Strategist(client, config)
+        strategist.bypass_entry_window = True
+        treasury = Treasury(client, config, state_manager, paper_mode=True)
+        executor = Executor(client, config, state_manager)
+        # Keep audit events out of the working tree's logs/
+        executor._audit = ExecutionAuditLogger(log_file_path=str(Path(state_dir) / "logs" / "execution_audit.jsonl"))
+        for agent in (strategist, treasury, executor):
+            agent.clock = client.now
+        engine = TradingEngine(
+            sentinel=sentinel, strategist=strategist, treasury=treasury,
+            executor=executor, state_manager=state_manager, kite=client
+        )
+        state_manager.reset_daily()
+
+        # Each timed call advances the clock by STEPS_PER_CALL bars
+        steps = iter(_last_session_steps(client, STEPS_PER_CALL * 8))
+
+        tracer = get_tracer()
+        tracer.configure(sample_rate=1.0)
+
+        def run():
+            for _ in range(STEPS_PER_CALL):
+                client.set_current_time(next(steps))
+                if traced:
+                    with tracer.trace("orchestrator.iteration"):
+                        engine.run_iteration(NIFTY_TOKEN)
+                else:
+                    engine.run_iteration(NIFTY_TOKEN)
+        try:
+            yield run, STEPS_PER_CALL
+        finally:
+            engine.shutdown()
+            tracer.clear()
+
+
+@benchmark("engine", BAR_SIZES)
+def run_iteration(size):
+    yield from _engine_iterations(size, traced=False)
+
+
+@benchmark("engine", BAR_SIZES)
+def run_iteration_traced(size):
+    # Every iteration sampled - compare with engine.run_iteration for tracing overhead
+    yield from _engine_iterations(size, traced=True)
+
+
+@benchmark("simulator", BAR_SIZES)
+def simulate_options_data(size):
+    from app.services.backtesting.options_simulator import OptionsSimulator
+
+    # One simulated chain per bar - daily bars keep 20 years tractable
+    bars = daily_bars(BAR_SIZES[size])
+    simulator = OptionsSimulator()
+    return lambda: simulator.simulate_options_data(bars)
+
+
+@benchmark("simulator", BOOK_SIZES, label="{}legs")
+def quote_book(legs):
+    from app.services.backtesting.options_simulator import OptionsSimulator
+
+    simulator = OptionsSimulator()
+    today = date.fromisoformat(LAST_SESSION)
+    book = [
+        (leg["underlying"], leg["strike"], date.fromisoformat(leg["expiry"]), leg["option_type"])
+        for leg in option_book(legs)
+    ]
+
+    def run():
+        for spot, strike, expiry, option_type in book:
+            simulator.get_option_quote(spot, strike, expiry, today, 0.15, option_type)
+    return run, legs
+
+
+@benchmark("simulator", BOOK_SIZES, label="{}legs")
+def quote_book_arrays(legs):
+    from app.services.backtesting.options_simulator import OptionsSimulator
+
+    simulator = OptionsSimulator()
+    today = date.fromisoformat(LAST_SESSION)
+    book = option_book(legs)
+    spot = [leg["underlying"] for leg in book]
+    strikes = [leg["strike"] for leg in book]
+    expiries = [leg["expiry"] for leg in book]
+    option_types = [leg["option_type"] for leg in book]
+    return lambda: simulator.get_option_quotes(spot, strikes, expiries, today, 0.15, option_types), legs
+
+
+def _book_positions(legs: int) -> list:
+    """option_book() legs as open Positions, LEGS_PER_STRATEGY legs each."""
+    from app.models.position import Position
+    from app.models.trade import LegType, StructureType, TradeLeg
+
+    book = option_book(legs)
+    positions = []
+    for start in range(0, len(book), LEGS_PER_STRATEGY):
+        group = book[start:start + LEGS_PER_STRATEGY]
+        positions.append(Position(
+            signal_id=f"bench-{start}",
+            strategy_type=StructureType.IRON_CONDOR,
+            instrument="NIFTY",
+            instrument_token=NIFTY_TOKEN,
+            legs=[
+                TradeLeg(
+                    leg_type=(LegType.LONG_CALL if leg["option_type"] == "CE" else LegType.LONG_PUT)
+                    if leg["quantity"] > 0 else
+                    (LegType.SHORT_CALL if leg["option_type"] == "CE" else LegType.SHORT_PUT),
+                    tradingsymbol=leg["tradingsymbol"],
+                    instrument_token=leg["instrument_token"],
+                    strike=leg["strike"],
+                    expiry=date.fromisoformat(leg["expiry"]),
+                    option_type=leg["option_type"],
+                    quantity=abs(leg["quantity"]),
+                    entry_price=leg["average_price"],
+                    current_price=leg["last_price"],
+                )
+                for leg in group
+            ],
+            entry_price=sum(leg["average_price"] for leg in group),
+            entry_margin=sum(leg["margin_used"] for leg in group),
+            target_pnl=5000,
+            stop_loss=-5000,
+            max_loss=10000,
+            expiry=date.fromisoformat(group[0]["expiry"]),
+            days_to_expiry=7,
+            regime_at_entry="RANGE_BOUND",
+            exit_target_low=0.5,
+            exit_target_high=0.7,
+            current_target=5000,
+        ))
+    return positions
+
+
+def _tick_prices(legs: int) -> dict:
+    return {t["instrument_token"]: t["last_price"] for t in book_ticks(option_book(legs))}
+
+
+@benchmark("positions", BOOK_SIZES, label="{}legs")
+def update_pnl(legs):
+    positions = _book_positions(legs)
+    prices = _tick_prices(legs)
+
+    def run():
+        for position in positions:
+            position.update_pnl(prices)
+            position.should_exit_profit()
+            position.should_exit_stop()
+    return run, legs
+
+
+@benchmark("positions", BOOK_SIZES, label="{}legs")
+def leg_book(legs):
+    from app.services.execution.leg_book import LegBook
+
+    book = LegBook()
+    book.set_positions(_book_positions(legs))
+    prices = _tick_prices(legs)
+
+    def run():
+        book.update(prices)
+        book.exit_flags()
+    return run, legs
+
+
+@benchmark("websocket", BOOK_SIZES, label="{}legs")
+def update_positions_with_ticks(legs):
+    from app.api.websocket import update_positions_with_ticks
+
+    book = option_book(legs)
+    ticks = book_ticks(book)
+    return lambda: update_positions_with_ticks(book, ticks), legs
+
+
+@benchmark("websocket", BOOK_SIZES, label="{}legs")
+def fetch_strategies_and_portfolios(legs):
+    from app.api.websocket import fetch_strategies_and_portfolios, update_positions_with_ticks
+
+    book = option_book(legs)
+    seed_book_database(book)
+    positions = update_positions_with_ticks(book, book_ticks(book))
+    return lambda: fetch_strategies_and_portfolios(positions), legs
+
+
+class _BenchSocket:
+    """Stands in for a connected WebSocket; encodes like Starlette's send_json."""
+
+    def __init__(self):
+        self.sent_bytes = 0
+
+    async def send_json(self, data):
+        self.sent_bytes += len(json.dumps(data, separators=(",", ":"), ensure_ascii=False).encode("utf-8"))
+
+
+def _price_update(positions, strategies=None, portfolios=None) -> dict:
+    return {
+        "type": "price_update",
+        "data": {
+            "positions": positions,
+            "strategies": strategies or [],
+            "portfolios": portfolios or [],
+            "timestamp": pd.Timestamp(LAST_SESSION).isoformat(),
+        },
+    }
+
+
+@benchmark("websocket", CLIENT_COUNTS, label="{}clients")
+def broadcast(clients):
+    from app.api.websocket import ConnectionManager
+
+    manager = ConnectionManager()
+    manager.active_connections = {_BenchSocket() for _ in range(clients)}
+    message = _price_update(option_book(FANOUT_LEGS))
+    loop = asyncio.new_event_loop()
+    try:
+        yield lambda: loop.run_until_complete(manager.broadcast(message)), clients
+    finally:
+        loop.close()
+
+
+@benchmark("websocket", CLIENT_COUNTS, label="{}clients")
+def tick_fanout(clients):
+    """One tick batch through every client's /ws/prices process_ticks step."""
+    from app.api.websocket import fetch_strategies_and_portfolios, update_positions_with_ticks
+
+    book = option_book(FANOUT_LEGS)
+    seed_book_database(book)
+    ticks = book_ticks(book)
+    sockets = [_BenchSocket() for _ in range(clients)]
+    loop = asyncio.new_event_loop()
+
+    async def fan_out():
+        for socket in sockets:
+            positions = update_positions_with_ticks(book, ticks)
+            strategies, portfolios = fetch_strategies_and_portfolios(positions)
+            await socket.send_json(_price_update(positions, strategies, portfolios))
+    try:
+        yield lambda: loop.run_until_complete(fan_out()), clients
+    finally:
+        loop.close()
+
+
+def _cold_start(args):
+    """Spawn a fresh interpreter; the timed call ends when it reports back."""
+    env = dict(os.environ, PYTHONDONTWRITEBYTECODE="1")
+
+    def run():
+        proc = subprocess.Popen(
+            [sys.executable, *args], cwd=BACKEND_DIR, env=env,
+            stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, text=True
+        )
+        line = proc.stdout.readline().strip()
+        proc.kill()
+        proc.wait()
+        if not line.startswith("200"):
+            raise RuntimeError(f"{' '.join(args)} failed: {line or 'no output'}")
+    return run
+
+
+@benchmark("startup", repeat=3)
+def import_app(_):
+    return _cold_start(["-c", "import app.main; print(200, flush=True)"])
+
+
+@benchmark("startup", STARTUP_ENDPOINTS, repeat=3)
+def first_request(endpoint):
+    """Process start to first response (no lifespan: the scheduler only waits during market hours)."""
+    return _cold_start(["-c", FIRST_REQUEST_SCRIPT, f"/api/v1/{endpoint}"])
+
+
+def dataset_fingerprints(sizes=BAR_SIZES) -> dict:
+    """Fingerprints of the bar datasets, saved with each run."""
+    return {f"minute_bars[{size}]": fingerprint(minute_bars(BAR_SIZES[size])) for size in sizes}
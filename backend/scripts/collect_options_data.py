@@ -7,11 +7,14 @@ Run this script at 9:15 AM IST and let it run until market close.
 
 Features:
 - 1-minute interval data collection
+- Ticker mode (default): full-mode websocket ticks aggregated into bars
+  locally, re-subscribing as ATM drifts; REST is used only for gap-fill
+- Poll mode: batched REST quotes every interval
 - All strikes ±20 from ATM (covers 10-delta to 50-delta)
 - Current week, next week, and monthly expiry
 - Full depth: LTP, bid, ask, volume, OI
 - Automatic recovery on errors
-- Daily file rotation
+- Daily file rotation (append-only zstd parquet, one row group per flush)
 - Memory-efficient batch processing
 
 Usage:
@@ -20,6 +23,9 @@ Usage:
     
     # Or with specific options
     python scripts/collect_options_data.py --symbols NIFTY,BANKNIFTY --interval 60
+    
+    # Legacy REST polling
+    python scripts/collect_options_data.py --mode poll
 
 Data saved to: backend/data/options/
 """
@@ -46,6 +52,14 @@ from app.core.kite_client import KiteClient
 from app.config.settings import Settings
 from app.config.constants import NIFTY_TOKEN, BANKNIFTY_TOKEN
 from app.core.credentials import get_kite_credentials
+from app.services.utilities.tick_aggregator import TickBarAggregator
+from app.core.backfill import BackfillEngine, make_chunks
+from app.core.rate_limiter import APIEndpoint, get_rate_limiter
+from app.core.parquet_writer import (
+    DailyParquetWriter,
+    OPTIONS_CHAIN_SCHEMA,
+    OPTIONS_CHAIN_DICTIONARY_COLUMNS,
+)
 
 # Configure logging
 LOG_DIR = Path(__file__).parent.parent / "logs"
@@ -85,6 +99,10 @@ INSTRUMENTS = {
 MARKET_OPEN = (9, 15)   # 9:15 AM
 MARKET_CLOSE = (15, 30)  # 3:30 PM
 
+# Re-subscribe the strike window once spot has moved this many strikes from
+# the ATM strike the current subscription was centered on
+ATM_DRIFT_STRIKES = 2
+
 # Global flag for graceful shutdown
 shutdown_flag = threading.Event()
 
@@ -218,11 +236,13 @@ class OptionsDataCollector:
         self,
         symbols: List[str],
         interval_seconds: int = 60,
-        batch_size: int = 50
+        batch_size: int = 50,
+        mode: str = "ticker"
     ):
         self.symbols = symbols
         self.interval_seconds = interval_seconds
         self.batch_size = batch_size
+        self.mode = mode
         
         # Initialize Kite client - try database credentials first, then fall back to settings
         creds = get_kite_credentials()
@@ -246,6 +266,17 @@ class OptionsDataCollector:
         self.buffers: Dict[str, List[dict]] = {s: [] for s in symbols}
         self.buffer_lock = threading.Lock()
         
+        # One streaming writer per symbol; the day file stays open between flushes
+        self.writers: Dict[str, DailyParquetWriter] = {
+            s: DailyParquetWriter(
+                OPTIONS_DATA_DIR,
+                prefix=f"{s}_options",
+                schema=OPTIONS_CHAIN_SCHEMA,
+                dictionary_columns=OPTIONS_CHAIN_DICTIONARY_COLUMNS
+            )
+            for s in symbols
+        }
+        
         # Track if historical backfill is done
         self.historical_backfill_done = False
         
@@ -255,8 +286,20 @@ class OptionsDataCollector:
             "records": 0,
             "errors": 0,
             "historical_records": 0,
+            "gap_fills": 0,
+            "quote_fills": 0,
+            "resubscribes": 0,
             "start_time": None
         }
+        
+        # Ticker mode state
+        self.aggregator = TickBarAggregator()
+        self._kws = None
+        self._ticker_connected = False
+        self._disconnected_at: Optional[datetime] = None
+        self._pending_gaps: List[Tuple[datetime, datetime]] = []
+        self._gap_lock = threading.Lock()
+        self._atm_center: Dict[str, int] = {}  # symbol -> ATM strike of current subscription
     
     def get_spot_prices(self) -> Dict[str, float]:
         """Get current spot prices for all symbols."""
@@ -303,6 +346,9 @@ class OptionsDataCollector:
             batch = all_symbols[i:i + self.batch_size]
             batch_keys = [s[0] for s in batch]
             
+            # Shared limiter instead of a fixed sleep between batches
+            get_rate_limiter().acquire_slot(APIEndpoint.QUOTE)
+            
             try:
                 quotes = self.kite.get_quote(batch_keys)
                 if quotes:
@@ -312,21 +358,24 @@ class OptionsDataCollector:
                             if token:
                                 tokens[trading_symbol] = token
                 
-                # Rate limiting between batches
-                time.sleep(0.4)
-                
             except Exception as e:
                 logger.warning(f"Batch token fetch error: {e}")
-                time.sleep(1)
         
         logger.info(f"  Got {len(tokens)} instrument tokens for {symbol}")
         return tokens
     
-    def fetch_historical_options_data(self, symbol: str, spot_price: float) -> List[dict]:
+    def fetch_historical_options_data(
+        self,
+        symbol: str,
+        spot_price: float,
+        from_time: Optional[datetime] = None,
+        to_time: Optional[datetime] = None
+    ) -> List[dict]:
         """
-        Fetch historical 1-minute options data from market open to now.
+        Fetch historical 1-minute options data for a window (default: market open to now).
         
-        This is called on startup to backfill data from 9:15 AM.
+        This is called on startup to backfill data from 9:15 AM, and in ticker
+        mode to fill gaps left by websocket disconnects.
         """
         config = INSTRUMENTS[symbol]
         exchange = config["exchange"]
@@ -338,6 +387,10 @@ class OptionsDataCollector:
         
         # Market open time today
         market_open = now.replace(hour=MARKET_OPEN[0], minute=MARKET_OPEN[1], second=0, microsecond=0)
+        if from_time is not None:
+            market_open = max(market_open, from_time)
+        if to_time is not None:
+            now = min(now, to_time)
         
         # If before market open, nothing to backfill
         if now < market_open:
@@ -361,74 +414,76 @@ class OptionsDataCollector:
         logger.info(f"  Fetching instrument tokens for {len(options_list)} options...")
         tokens_map = self.get_option_instrument_tokens_batch(symbol, options_list)
         
-        all_records = []
-        options_processed = 0
-        options_total = len(options_list)
-        
+        chunks = []
         for expiry, strike, opt_type in options_list:
-            options_processed += 1
-            
             trading_symbol = build_option_symbol(symbol, expiry, strike, opt_type)
             token = tokens_map.get(trading_symbol)
-            
             if token is None:
                 continue
-            
-            try:
-                # Fetch 1-minute historical data
-                df = self.kite.fetch_historical_data(
-                    instrument_token=token,
-                    interval="minute",
-                    from_date=market_open,
-                    to_date=now
-                )
-                
-                if df.empty:
-                    continue
-                
-                # Convert to records
-                for idx, row in df.iterrows():
-                    all_records.append({
-                        "timestamp": idx.to_pydatetime(),
-                        "symbol": symbol,
-                        "trading_symbol": trading_symbol,
-                        "expiry": expiry,
-                        "strike": strike,
-                        "option_type": opt_type,
-                        "underlying": spot_price,
-                        "ltp": row.get("close", 0),
-                        "bid": 0,
-                        "bid_qty": 0,
-                        "ask": 0,
-                        "ask_qty": 0,
-                        "volume": row.get("volume", 0),
-                        "oi": 0,
-                        "oi_day_high": 0,
-                        "oi_day_low": 0,
-                        "open": row.get("open", 0),
-                        "high": row.get("high", 0),
-                        "low": row.get("low", 0),
-                        "close": row.get("close", 0),
-                        "last_trade_time": None,
-                    })
-                
-                # Progress logging
-                if options_processed % 50 == 0:
-                    logger.info(f"  Historical fetch progress: {options_processed}/{options_total} options, {len(all_records)} records")
-                
-                # Rate limiting - be conservative to avoid rate limits
-                time.sleep(0.5)
-                
-            except Exception as e:
-                logger.debug(f"Error fetching historical for {trading_symbol}: {e}")
-                self.stats["errors"] += 1
-            
-            # Check for shutdown
+            chunks.extend(make_chunks(
+                trading_symbol, "minute", market_open, now, chunk_days=1,
+                params={"token": token, "expiry": expiry, "strike": strike, "opt_type": opt_type},
+                align=False
+            ))
+        
+        all_records = []
+        records_lock = threading.Lock()
+        
+        def fetch(chunk):
             if shutdown_flag.is_set():
-                logger.info("Shutdown requested during historical fetch")
-                return all_records
+                engine.stop()
+                return pd.DataFrame()
+            return self.kite.fetch_historical_data(
+                instrument_token=chunk.params["token"],
+                interval=chunk.interval,
+                from_date=chunk.start,
+                to_date=chunk.end,
+                raise_errors=True,
+                retry=False
+            )
+        
+        def to_records(chunk, df):
+            if df.empty:
+                return
+            p = chunk.params
+            records = [
+                {
+                    "timestamp": ts.to_pydatetime(),
+                    "symbol": symbol,
+                    "trading_symbol": chunk.instrument,
+                    "expiry": p["expiry"],
+                    "strike": p["strike"],
+                    "option_type": p["opt_type"],
+                    "underlying": spot_price,
+                    "ltp": row["close"],
+                    "bid": 0,
+                    "bid_qty": 0,
+                    "ask": 0,
+                    "ask_qty": 0,
+                    "volume": row.get("volume", 0),
+                    "oi": 0,
+                    "oi_day_high": 0,
+                    "oi_day_low": 0,
+                    "open": row["open"],
+                    "high": row["high"],
+                    "low": row["low"],
+                    "close": row["close"],
+                    "last_trade_time": None,
+                }
+                for ts, row in zip(df.index, df.to_dict("records"))
+            ]
+            with records_lock:
+                all_records.extend(records)
+        
+        # Fetch concurrently up to the historical API rate limit
+        engine = BackfillEngine(fetch_fn=fetch, on_chunk=to_records, max_workers=3)
+        result = engine.run(chunks)
+        self.stats["errors"] += result["failed"]
+        
+        if shutdown_flag.is_set():
+            logger.info("Shutdown requested during historical fetch")
         
-        logger.info(f"Historical fetch complete for {symbol}: {len(all_records)} records from {options_processed} options")
+        logger.info(f"Historical fetch complete for {symbol}: {len(all_records)} records from {result['fetched']} options")
         return all_records
     
     def backfill_historical_data(self):
@@ -565,7 +620,7 @@ class OptionsDataCollector:
         return records
     
     def save_buffer(self, symbol: str, force: bool = False):
-        """Save buffered data to parquet file."""
+        """Append buffered data to the day's parquet file as a new row group."""
         with self.buffer_lock:
             buffer = self.buffers[symbol]
             
@@ -576,27 +631,26 @@ class OptionsDataCollector:
             if not buffer:
                 return
             
-            df = pd.DataFrame(buffer)
+            records = buffer
             self.buffers[symbol] = []
         
-        # Save to daily file
-        today = date.today()
-        filename = f"{symbol}_options_{today.strftime('%Y%m%d')}.parquet"
-        filepath = OPTIONS_DATA_DIR / filename
+        writer = self.writers[symbol]
         
         try:
-            if filepath.exists():
-                existing = pd.read_parquet(filepath)
-                df = pd.concat([existing, df], ignore_index=True)
-            
-            df.to_parquet(filepath, index=False)
-            logger.info(f"Saved {len(df)} records to {filepath}")
+            written = writer.write(records, day=date.today())
+            logger.info(f"Appended {written} records to {writer.path_for(date.today())}")
             
         except Exception as e:
             logger.error(f"Failed to save data: {e}")
-            # Put data back in buffer
+            # Put only the unsaved records back in the buffer
             with self.buffer_lock:
-                self.buffers[symbol].extend(df.to_dict('records'))
+                self.buffers[symbol] = records + self.buffers[symbol]
+    
+    def close_writers(self):
+        """Flush remaining buffers and close all parquet files."""
+        for symbol in self.symbols:
+            self.save_buffer(symbol, force=True)
+            self.writers[symbol].close()
     
     def run_collection_cycle(self):
         """Run one collection cycle for all symbols."""
@@ -634,25 +688,284 @@ class OptionsDataCollector:
         cycle_time = time.time() - cycle_start
         logger.info(f"Cycle complete: {total_records} records in {cycle_time:.1f}s")
     
-    def run(self):
-        """Main collection loop."""
-        logger.info("=" * 60)
-        logger.info("OPTIONS DATA COLLECTOR STARTED")
-        logger.info(f"Symbols: {self.symbols}")
-        logger.info(f"Interval: {self.interval_seconds} seconds")
-        logger.info(f"Output: {OPTIONS_DATA_DIR}")
-        logger.info("=" * 60)
+    # =========================================================================
+    # Ticker mode
+    # =========================================================================
+    
+    def build_universe(self, symbol: str, spot_price: float) -> Dict[int, dict]:
+        """
+        Resolve the strike window around spot to instrument tokens.
         
-        self.stats["start_time"] = datetime.now()
+        Uses the cached NFO instrument dump (one REST call per hour) instead of
+        per-batch quote lookups.
         
-        # Register signal handlers
-        signal.signal(signal.SIGINT, signal_handler)
-        signal.signal(signal.SIGTERM, signal_handler)
+        Returns:
+            Dict mapping instrument_token to option metadata
+        """
+        config = INSTRUMENTS[symbol]
+        instruments = self.kite.get_instruments(config["exchange"])
+        if instruments.empty:
+            logger.warning(f"No instruments available to build {symbol} universe")
+            return {}
+        
+        options = instruments[
+            (instruments["name"] == symbol) &
+            (instruments["instrument_type"].isin(["CE", "PE"]))
+        ]
+        
+        # Prefer the computed expiry schedule; fall back to the nearest listed
+        # expiries if the exchange calendar has moved away from it
+        wanted = get_expiries_to_collect(date.today())
+        expiries = [e for e in sorted(options["expiry"].unique()) if e in wanted]
+        if not expiries:
+            listed = sorted(e for e in options["expiry"].unique() if e >= date.today())
+            expiries = listed[:len(wanted)]
+        
+        strikes = get_strikes_around_spot(spot_price, config["strike_interval"], config["num_strikes"])
+        selected = options[options["expiry"].isin(expiries) & options["strike"].isin(strikes)]
+        
+        universe = {}
+        for row in selected.itertuples(index=False):
+            universe[int(row.instrument_token)] = {
+                "symbol": symbol,
+                "trading_symbol": row.tradingsymbol,
+                "expiry": row.expiry,
+                "strike": int(row.strike),
+                "option_type": row.instrument_type,
+            }
+        
+        self._atm_center[symbol] = round(spot_price / config["strike_interval"]) * config["strike_interval"]
+        logger.info(
+            f"  {symbol} universe: {len(universe)} options, "
+            f"{len(expiries)} expiries, ATM {self._atm_center[symbol]}"
+        )
+        return universe
+    
+    def start_ticker(self) -> bool:
+        """Connect the Kite ticker and subscribe the option universe in full mode."""
+        from kiteconnect import KiteTicker
+        
+        spot_prices = self.get_spot_prices()
+        if not spot_prices:
+            logger.warning("Could not get spot prices, ticker not started")
+            return False
+        
+        for symbol in self.symbols:
+            self.aggregator.register_underlying(INSTRUMENTS[symbol]["token"], symbol)
+            if symbol not in spot_prices:
+                continue
+            for token, meta in self.build_universe(symbol, spot_prices[symbol]).items():
+                self.aggregator.register(token, meta)
+        
+        self._kws = KiteTicker(self.kite.api_key, self.kite.access_token)
+        self._kws.on_ticks = lambda ws, ticks: self.aggregator.on_ticks(ticks)
+        self._kws.on_connect = self._on_ticker_connect
+        self._kws.on_close = self._on_ticker_disconnect
+        self._kws.on_error = self._on_ticker_disconnect
+        self._kws.connect(threaded=True)
+        
+        logger.info(f"Ticker started with {len(self._subscription_tokens())} tokens")
+        return True
+    
+    def stop_ticker(self):
+        """Close the ticker connection and reset the state table."""
+        if self._kws is not None:
+            try:
+                self._kws.close()
+            except Exception as e:
+                logger.debug(f"Ticker close error: {e}")
+        self._kws = None
+        with self._gap_lock:
+            self._ticker_connected = False
+            self._disconnected_at = None
+        self.aggregator.clear()
+    
+    def _subscription_tokens(self) -> List[int]:
+        underlying = [INSTRUMENTS[s]["token"] for s in self.symbols]
+        return underlying + self.aggregator.tokens()
+    
+    def _on_ticker_connect(self, ws, response):
+        """Subscribe on (re)connect and queue a REST gap-fill for any outage."""
+        tokens = self._subscription_tokens()
+        ws.subscribe(tokens)
+        ws.set_mode(ws.MODE_FULL, tokens)
+        
+        gap = None
+        with self._gap_lock:
+            self._ticker_connected = True
+            if self._disconnected_at is not None:
+                gap = (self._disconnected_at, datetime.now())
+                self._pending_gaps.append(gap)
+                self._disconnected_at = None
+        if gap:
+            logger.info(f"Ticker reconnected, queued gap-fill {gap[0]:%H:%M:%S}-{gap[1]:%H:%M:%S}")
+    
+    def _on_ticker_disconnect(self, ws, code, reason):
+        logger.warning(f"Ticker disconnected: {code} - {reason}")
+        with self._gap_lock:
+            if self._ticker_connected:
+                self._disconnected_at = datetime.now()
+            self._ticker_connected = False
+    
+    def check_atm_drift(self):
+        """Re-center the subscribed strike window when spot has drifted."""
+        if self._kws is None:
+            return
+        
+        for symbol in self.symbols:
+            spot = self.aggregator.get_spot(symbol)
+            center = self._atm_center.get(symbol)
+            if not spot or center is None:
+                continue
+            
+            strike_interval = INSTRUMENTS[symbol]["strike_interval"]
+            if abs(spot - center) < ATM_DRIFT_STRIKES * strike_interval:
+                continue
+            
+            current = set(self.aggregator.tokens(symbol))
+            universe = self.build_universe(symbol, spot)
+            if not universe:
+                continue
+            
+            added = [t for t in universe if t not in current]
+            removed = [t for t in current if t not in universe]
+            
+            for token in added:
+                self.aggregator.register(token, universe[token])
+            for token in removed:
+                self.aggregator.unregister(token)
+            
+            try:
+                if added:
+                    self._kws.subscribe(added)
+                    self._kws.set_mode(self._kws.MODE_FULL, added)
+                if removed:
+                    self._kws.unsubscribe(removed)
+            except Exception as e:
+                logger.warning(f"Re-subscribe failed for {symbol}: {e}")
+                self.stats["errors"] += 1
+            
+            self.stats["resubscribes"] += 1
+            logger.info(f"{symbol} ATM drift to {spot:.2f}: +{len(added)} / -{len(removed)} tokens")
+    
+    def fill_gaps(self):
+        """Backfill ticker outages from the REST historical API."""
+        with self._gap_lock:
+            gaps, self._pending_gaps = self._pending_gaps, []
+        
+        for gap_start, gap_end in gaps:
+            for symbol in self.symbols:
+                spot = self.aggregator.get_spot(symbol)
+                if not spot:
+                    continue
+                records = self.fetch_historical_options_data(
+                    symbol, spot, from_time=gap_start, to_time=gap_end
+                )
+                if records:
+                    with self.buffer_lock:
+                        self.buffers[symbol].extend(records)
+                    self.stats["historical_records"] += len(records)
+            self.stats["gap_fills"] += 1
+    
+    def fill_missing(self):
+        """Quote instruments that have not ticked yet over REST so they still get a bar."""
+        missing = self.aggregator.missing_tokens()
+        for i in range(0, len(missing), self.batch_size):
+            batch = missing[i:i + self.batch_size]
+            try:
+                quotes = self.kite.get_quote(batch) or {}
+            except Exception as e:
+                logger.warning(f"Missing-token quote error: {e}")
+                self.stats["errors"] += 1
+                continue
+            by_token = {t: quotes.get(str(t)) or quotes.get(t) for t in batch}
+            filled = self.aggregator.apply_quotes({t: q for t, q in by_token.items() if q})
+            self.stats["quote_fills"] += filled
+    
+    def emit_bar(self, bar_time: datetime):
+        """Snapshot the state table into the per-symbol buffers."""
+        self.fill_missing()
+        records = self.aggregator.flush(bar_time)
+        
+        with self.buffer_lock:
+            for record in records:
+                self.buffers[record["symbol"]].append(record)
+        
+        for symbol in self.symbols:
+            self.save_buffer(symbol)
+        
+        self.stats["collections"] += 1
+        self.stats["records"] += len(records)
+        logger.info(
+            f"Bar {bar_time:%H:%M:%S}: {len(records)} records "
+            f"({self.aggregator.stats.ticks} ticks total)"
+        )
+    
+    def _run_ticker_loop(self):
+        """Collect bars from the websocket until shutdown."""
+        next_bar: Optional[datetime] = None
+        
+        while not shutdown_flag.is_set():
+            if not is_market_hours():
+                logger.info("Outside market hours")
+                self.stop_ticker()
+                next_bar = None
+                self.close_writers()
+                if not wait_for_market_open():
+                    break
+                continue
+            
+            if not self.historical_backfill_done:
+                try:
+                    self.backfill_historical_data()
+                except Exception as e:
+                    logger.error(f"Historical backfill error: {e}")
+                    self.stats["errors"] += 1
+                    self.historical_backfill_done = True  # Don't retry on error
+            
+            if self._kws is None:
+                try:
+                    if not self.start_ticker():
+                        time.sleep(self.interval_seconds)
+                        continue
+                except Exception as e:
+                    logger.error(f"Failed to start ticker: {e}")
+                    self.stats["errors"] += 1
+                    self.stop_ticker()
+                    time.sleep(self.interval_seconds)
+                    continue
+            
+            now = datetime.now()
+            if next_bar is None:
+                # Align bars to wall-clock interval boundaries
+                epoch = now.replace(hour=0, minute=0, second=0, microsecond=0)
+                elapsed = (now - epoch).total_seconds()
+                next_bar = epoch + timedelta(
+                    seconds=(int(elapsed // self.interval_seconds) + 1) * self.interval_seconds
+                )
+            
+            if now >= next_bar:
+                try:
+                    self.emit_bar(next_bar - timedelta(seconds=self.interval_seconds))
+                    self.check_atm_drift()
+                    self.fill_gaps()
+                except Exception as e:
+                    logger.error(f"Bar emission error: {e}")
+                    self.stats["errors"] += 1
+                next_bar += timedelta(seconds=self.interval_seconds)
+            
+            time.sleep(0.2)
         
+        self.stop_ticker()
+    
+    def _run_polling_loop(self):
+        """Collect REST quote snapshots every interval until shutdown."""
         while not shutdown_flag.is_set():
             # Wait for market to open
             if not is_market_hours():
                 logger.info("Outside market hours")
+                # Close the day file so it is readable while we wait
+                self.close_writers()
                 if not wait_for_market_open():
                     break
                 continue
@@ -677,11 +990,32 @@ class OptionsDataCollector:
             next_collection = datetime.now() + timedelta(seconds=self.interval_seconds)
             while datetime.now() < next_collection and not shutdown_flag.is_set():
                 time.sleep(1)
+    
+    def run(self):
+        """Main collection loop."""
+        logger.info("=" * 60)
+        logger.info("OPTIONS DATA COLLECTOR STARTED")
+        logger.info(f"Symbols: {self.symbols}")
+        logger.info(f"Interval: {self.interval_seconds} seconds")
+        logger.info(f"Mode: {self.mode}")
+        logger.info(f"Output: {OPTIONS_DATA_DIR}")
+        logger.info("=" * 60)
         
-        # Final save
-        logger.info("Saving remaining data...")
-        for symbol in self.symbols:
-            self.save_buffer(symbol, force=True)
+        self.stats["start_time"] = datetime.now()
+        
+        # Register signal handlers
+        signal.signal(signal.SIGINT, signal_handler)
+        signal.signal(signal.SIGTERM, signal_handler)
+        
+        try:
+            if self.mode == "ticker":
+                self._run_ticker_loop()
+            else:
+                self._run_polling_loop()
+        finally:
+            # Final save; closing writes the parquet footer
+            logger.info("Saving remaining data...")
+            self.close_writers()
         
         # Print stats
         runtime = (datetime.now() - self.stats["start_time"]).total_seconds() / 60
@@ -691,6 +1025,10 @@ class OptionsDataCollector:
         logger.info(f"Historical records: {self.stats['historical_records']}")
         logger.info(f"Real-time collections: {self.stats['collections']}")
         logger.info(f"Real-time records: {self.stats['records']}")
+        if self.mode == "ticker":
+            logger.info(f"Ticks: {self.aggregator.stats.ticks}")
+            logger.info(f"Gap fills: {self.stats['gap_fills']}")
+            logger.info(f"Re-subscribes: {self.stats['resubscribes']}")
         logger.info(f"Errors: {self.stats['errors']}")
         logger.info("=" * 60)
 
@@ -709,6 +1047,9 @@ Examples:
     
     # Collect every 30 seconds
     python collect_options_data.py --interval 30
+    
+    # Poll REST quotes instead of streaming from the ticker
+    python collect_options_data.py --mode poll
         """
     )
     parser.add_argument(
@@ -722,6 +1063,12 @@ Examples:
         default=60,
         help="Collection interval in seconds (default: 60)"
     )
+    parser.add_argument(
+        "--mode", "-m",
+        choices=["ticker", "poll"],
+        default="ticker",
+        help="ticker: websocket bars with REST gap-fill; poll: REST quotes (default: ticker)"
+    )
     
     args = parser.parse_args()
     
@@ -738,7 +1085,8 @@ Examples:
     # Create and run collector
     collector = OptionsDataCollector(
         symbols=symbols,
-        interval_seconds=args.interval
+        interval_seconds=args.interval,
+        mode=args.mode
     )
     
     collector.run()
@@ -23,11 +23,14 @@ Usage:
     python download_breeze_data.py --indices       # Download only indices
     python download_breeze_data.py --options       # Download only options
     python download_breeze_data.py --symbol NIFTY  # Download specific symbol
+
+Chunks are fetched concurrently within Breeze's rate limits and tracked in
+data/breeze/store/_manifest.jsonl, so an interrupted run resumes where it
+stopped.
 """
 
 import os
 import sys
-import time
 import json
 from datetime import datetime, timedelta
 from pathlib import Path
@@ -41,6 +44,9 @@ sys.path.insert(0, str(Path(__file__).parent.parent))
 import pandas as pd
 from loguru import logger
 
+from app.core.backfill import BackfillEngine, BackfillManifest, PartitionedStore, make_chunks
+from app.core.rate_limiter import APIEndpoint, APIRateLimiter, RateLimitConfig
+
 try:
     from breeze_connect import BreezeConnect
 except ImportError:
@@ -57,8 +63,9 @@ DATA_DIR = Path(__file__).parent.parent / "data" / "breeze"
 INDICES_DIR = DATA_DIR / "indices"
 OPTIONS_DIR = DATA_DIR / "options"
 FUTURES_DIR = DATA_DIR / "futures"
+STORE_DIR = DATA_DIR / "store"
 
-for d in [DATA_DIR, INDICES_DIR, OPTIONS_DIR, FUTURES_DIR]:
+for d in [DATA_DIR, INDICES_DIR, OPTIONS_DIR, FUTURES_DIR, STORE_DIR]:
     d.mkdir(parents=True, exist_ok=True)
 
 
@@ -109,9 +116,22 @@ OPTIONS_CONFIG = {
     },
 }
 
-# Rate limiting
-RATE_LIMIT_DELAY = 0.5  # seconds between API calls
+# Rate limiting (Breeze: 100 calls/minute, 5000 calls/day)
+BREEZE_LIMITS = {
+    APIEndpoint.HISTORICAL: RateLimitConfig(requests_per_second=2.0, requests_per_minute=100),
+    APIEndpoint.QUOTE: RateLimitConfig(requests_per_second=2.0, requests_per_minute=100),
+    APIEndpoint.OTHER: RateLimitConfig(requests_per_second=2.0, requests_per_minute=100),
+}
+BREEZE_DAILY_BUDGET = 5000
 MAX_RETRIES = 3
+MAX_WORKERS = 4
+
+# Days per request chunk
+CHUNK_DAYS = {
+    "1second": 1,
+    "1minute": 7,
+    "5minute": 30,
+}
 
 
 # =============================================================================
@@ -142,6 +162,15 @@ class BreezeDataDownloader:
         self.breeze = BreezeConnect(api_key=self.api_key)
         self._connect()
         
+        self.engine = BackfillEngine(
+            fetch_fn=self._fetch_chunk,
+            manifest=BackfillManifest(STORE_DIR / "_manifest.jsonl"),
+            store=PartitionedStore(STORE_DIR),
+            limiter=APIRateLimiter(limits=BREEZE_LIMITS, daily_budget=BREEZE_DAILY_BUDGET),
+            max_workers=MAX_WORKERS,
+            max_retries=MAX_RETRIES
+        )
+        
     def _connect(self):
         """Establish connection with Breeze API."""
         try:
@@ -195,8 +224,41 @@ class BreezeDataDownloader:
             logger.error(f"Error getting expiry dates: {e}")
             return []
     
-    def download_historical_data(
+    def _fetch_chunk(self, chunk) -> pd.DataFrame:
+        """Fetch one chunk from Breeze; raises so the engine can retry."""
+        p = chunk.params
+        params = {
+            "interval": chunk.interval,
+            "from_date": chunk.start.strftime("%Y-%m-%dT07:00:00.000Z"),
+            "to_date": chunk.end.strftime("%Y-%m-%dT15:30:00.000Z"),
+            "stock_code": p["stock_code"],
+            "exchange_code": p["exchange"],
+            "product_type": p["product_type"],
+        }
+        for key in ("expiry_date", "strike_price", "right"):
+            if p.get(key):
+                params[key] = p[key]
+        
+        response = self.breeze.get_historical_data_v2(**params)
+        if not response or response.get("Error"):
+            raise RuntimeError(response.get("Error") if response else "Empty response")
+        
+        data = response.get("Success") or []
+        df = pd.DataFrame(data)
+        if df.empty:
+            return df
+        
+        # Standardize column names
+        df = df.rename(columns={"datetime": "date"})
+        if "date" in df.columns:
+            df["date"] = pd.to_datetime(df["date"])
+        
+        logger.debug(f"  {chunk.instrument} {chunk.start.date()} to {chunk.end.date()}: {len(df)} bars")
+        return df
+    
+    def build_chunks(
         self,
+        instrument_key: str,
         stock_code: str,
         exchange: str,
         interval: str,
@@ -206,6 +268,33 @@ class BreezeDataDownloader:
         expiry_date: str = None,
         strike_price: str = None,
         right: str = None
+    ) -> list:
+        """Build date chunks for one series (chunk size depends on interval)."""
+        return make_chunks(
+            instrument_key, interval, from_date, to_date,
+            chunk_days=CHUNK_DAYS.get(interval, 365),
+            params={
+                "stock_code": stock_code,
+                "exchange": exchange,
+                "product_type": product_type,
+                "expiry_date": expiry_date,
+                "strike_price": strike_price,
+                "right": right,
+            }
+        )
+    
+    def download_historical_data(
+        self,
+        stock_code: str,
+        exchange: str,
+        interval: str,
+        from_date: datetime,
+        to_date: datetime,
+        product_type: str = "cash",
+        expiry_date: str = None,
+        strike_price: str = None,
+        right: str = None,
+        instrument_key: str = None
     ) -> pd.DataFrame:
         """
         Download historical OHLCV data.
@@ -220,87 +309,32 @@ class BreezeDataDownloader:
             expiry_date: Expiry date for F&O (format: "2026-02-27")
             strike_price: Strike price for options
             right: "call" or "put" for options
+            instrument_key: Store partition name (defaults to stock_code)
             
         Returns:
             DataFrame with OHLCV data
         """
-        all_data = []
-        current_from = from_date
-        
-        # Chunk by days based on interval
-        if interval == "1second":
-            chunk_days = 1  # 1 day at a time for 1-second data
-        elif interval == "1minute":
-            chunk_days = 7
-        elif interval == "5minute":
-            chunk_days = 30
-        else:
-            chunk_days = 365
-        
-        while current_from < to_date:
-            current_to = min(current_from + timedelta(days=chunk_days), to_date)
-            
-            for retry in range(MAX_RETRIES):
-                try:
-                    params = {
-                        "interval": interval,
-                        "from_date": current_from.strftime("%Y-%m-%dT07:00:00.000Z"),
-                        "to_date": current_to.strftime("%Y-%m-%dT15:30:00.000Z"),
-                        "stock_code": stock_code,
-                        "exchange_code": exchange,
-                        "product_type": product_type,
-                    }
-                    
-                    if expiry_date:
-                        params["expiry_date"] = expiry_date
-                    if strike_price:
-                        params["strike_price"] = strike_price
-                    if right:
-                        params["right"] = right
-                    
-                    response = self.breeze.get_historical_data_v2(**params)
-                    
-                    if response and response.get("Success"):
-                        data = response["Success"]
-                        if data:
-                            df = pd.DataFrame(data)
-                            all_data.append(df)
-                            logger.debug(
-                                f"  {current_from.date()} to {current_to.date()}: "
-                                f"{len(df)} bars"
-                            )
-                    
-                    time.sleep(RATE_LIMIT_DELAY)
-                    break
-                    
-                except Exception as e:
-                    logger.warning(f"Retry {retry+1}/{MAX_RETRIES} for {stock_code}: {e}")
-                    time.sleep(RATE_LIMIT_DELAY * (retry + 1))
-            
-            current_from = current_to
-        
-        if all_data:
-            combined = pd.concat(all_data, ignore_index=True)
-            
-            # Standardize column names
-            column_mapping = {
-                "datetime": "date",
-                "open": "open",
-                "high": "high",
-                "low": "low",
-                "close": "close",
-                "volume": "volume",
-            }
-            combined = combined.rename(columns=column_mapping)
-            
-            # Convert date column
-            if "date" in combined.columns:
-                combined["date"] = pd.to_datetime(combined["date"])
-                combined = combined.sort_values("date").drop_duplicates(subset=["date"])
-            
-            return combined
-        
-        return pd.DataFrame()
+        instrument_key = instrument_key or stock_code
+        chunks = self.build_chunks(
+            instrument_key, stock_code, exchange, interval, from_date, to_date,
+            product_type, expiry_date, strike_price, right
+        )
+        self.engine.run(chunks)
+        return self.read_series(instrument_key, interval, from_date, to_date)
+    
+    def read_series(
+        self,
+        instrument_key: str,
+        interval: str,
+        from_date: datetime,
+        to_date: datetime
+    ) -> pd.DataFrame:
+        """Read a downloaded series from the store, limited to the requested range."""
+        df = self.engine.store.read(instrument_key, interval)
+        if df.empty or "date" not in df.columns:
+            return df
+        mask = (df["date"] >= pd.Timestamp(from_date.date())) & (df["date"] <= pd.Timestamp(to_date))
+        return df[mask].reset_index(drop=True)
     
     def download_index_data(
         self,
@@ -391,15 +425,15 @@ class BreezeDataDownloader:
         from_date = to_date - timedelta(days=days_back)
         expiry_str = expiry_date.strftime("%Y-%m-%d")
         
-        options_data = {}
-        
+        # Queue every strike/right and fetch them in one concurrent pass
+        series = {}
+        chunks = []
         for strike in strikes:
             for right in ["call", "put"]:
                 option_key = f"{underlying}_{expiry_date.strftime('%Y%m%d')}_{strike}_{right.upper()}"
-                
-                logger.info(f"  Downloading {option_key}...")
-                
-                df = self.download_historical_data(
+                series[option_key] = right
+                chunks.extend(self.build_chunks(
+                    option_key,
                     stock_code=config["stock_code"],
                     exchange=config["exchange"],
                     interval=interval,
@@ -409,13 +443,17 @@ class BreezeDataDownloader:
                     expiry_date=expiry_str,
                     strike_price=str(strike),
                     right=right
-                )
-                
-                if not df.empty:
-                    options_data[option_key] = df
-                    logger.debug(f"    {len(df)} bars downloaded")
-                
-                time.sleep(RATE_LIMIT_DELAY)
+                ))
+        
+        logger.info(f"  {len(series)} option series, {len(chunks)} chunks")
+        self.engine.run(chunks)
+        
+        options_data = {}
+        for option_key in series:
+            df = self.read_series(option_key, interval, from_date, to_date)
+            if not df.empty:
+                options_data[option_key] = df
+                logger.debug(f"    {option_key}: {len(df)} bars")
         
         return options_data
     
@@ -456,7 +494,8 @@ class BreezeDataDownloader:
             from_date=from_date,
             to_date=to_date,
             product_type="futures",
-            expiry_date=expiry_str
+            expiry_date=expiry_str,
+            instrument_key=f"{underlying}_FUT_{expiry_date.strftime('%Y%m%d')}"
         )
         
         return df
@@ -532,8 +571,6 @@ def download_all_indices(downloader: BreezeDataDownloader, interval: str = "1sec
             save_index_data(df, index_name, interval)
         except Exception as e:
             logger.error(f"Failed to download {index_name}: {e}")
-        
-        time.sleep(1)
 
 
 def download_all_options(
@@ -578,8 +615,6 @@ def download_all_options(
                 except Exception as e:
                     logger.error(f"Failed to download options for {underlying} {expiry}: {e}")
                 
-                time.sleep(2)
-                
         except Exception as e:
             logger.error(f"Failed to process {underlying}: {e}")
 
@@ -612,8 +647,6 @@ def download_all_futures(
                 except Exception as e:
                     logger.error(f"Failed to download futures for {underlying} {expiry}: {e}")
                 
-                time.sleep(1)
-                
         except Exception as e:
             logger.error(f"Failed to process {underlying}: {e}")
 
@@ -13,11 +13,14 @@ This script downloads MAXIMUM available data for:
 1. All major instruments (NIFTY, BANKNIFTY, INDIA VIX, Gold, Crude, Silver)
 2. All time intervals (day, 60min, 15min, 5min)
 3. Saves to both CSV (historical/) and Parquet (cache/) for backtesting
+
+Chunks are fetched concurrently through the shared rate limiter and tracked
+in a manifest (data/store/_manifest.jsonl); re-running after an interruption
+only fetches the chunks that are missing.
 """
 
 import os
 import sys
-import time
 from datetime import datetime, timedelta
 from pathlib import Path
 
@@ -28,6 +31,7 @@ import pandas as pd
 from loguru import logger
 
 from app.core.kite_client import KiteClient
+from app.core.backfill import BackfillEngine, BackfillManifest, PartitionedStore, make_chunks
 from app.config.settings import Settings
 from app.config.constants import (
     NIFTY_TOKEN, BANKNIFTY_TOKEN, INDIA_VIX_TOKEN,
@@ -38,6 +42,8 @@ from app.config.constants import (
 # Output directories
 DATA_DIR = Path(__file__).parent.parent / "data" / "historical"
 CACHE_DIR = Path(__file__).parent.parent / "data" / "cache"
+STORE_DIR = Path(__file__).parent.parent / "data" / "store"
+FEATURES_DIR = Path(__file__).parent.parent / "data" / "features"
 DATA_DIR.mkdir(parents=True, exist_ok=True)
 CACHE_DIR.mkdir(parents=True, exist_ok=True)
 
@@ -61,71 +67,70 @@ INTERVAL_MAX_DAYS = {
     "5minute": 100,    # ~3 months
 }
 
+# Days per request chunk
+CHUNK_DAYS = {
+    "day": 365,        # 1 year chunks for daily
+    "60minute": 60,    # 2 months for hourly
+    "15minute": 30,
+    "5minute": 30,
+}
+
 # All intervals to download
 INTERVALS = ["day", "60minute", "15minute", "5minute"]
 
+# Concurrent fetches (the shared limiter enforces 3 req/s regardless)
+MAX_WORKERS = 3
+
+
+def create_engine(kite: KiteClient) -> BackfillEngine:
+    """Backfill engine writing into the partitioned store under data/store."""
+    return BackfillEngine(
+        fetch_fn=lambda chunk: kite.fetch_historical_data(
+            chunk.params["token"],
+            chunk.interval,
+            chunk.start,
+            chunk.end,
+            raise_errors=True,
+            retry=False
+        ),
+        manifest=BackfillManifest(STORE_DIR / "_manifest.jsonl"),
+        store=PartitionedStore(STORE_DIR),
+        max_workers=MAX_WORKERS
+    )
+
+
+def build_chunks(token: int, symbol: str, interval: str, max_days: int) -> list:
+    """Calendar-aligned chunks covering the last max_days for one series."""
+    to_date = datetime.now()
+    from_date = to_date - timedelta(days=max_days)
+    return make_chunks(
+        symbol, interval, from_date, to_date,
+        chunk_days=CHUNK_DAYS.get(interval, 30),
+        params={"token": token}
+    )
+
 
 def download_data(
     kite: KiteClient, 
     token: int, 
     symbol: str, 
     interval: str,
-    max_days: int
+    max_days: int,
+    engine: BackfillEngine = None
 ) -> pd.DataFrame:
     """
     Download OHLCV data for specified interval and duration.
     
-    Handles chunking for large date ranges to avoid API limits.
+    Fetches any missing chunks through the backfill engine, then reads the
+    combined series back from the partitioned store.
     """
     logger.info(f"Downloading {interval} data for {symbol} (max {max_days} days)")
     
-    all_data = []
-    to_date = datetime.now()
-    
-    # Chunk size depends on interval
-    if interval == "day":
-        chunk_days = 365  # 1 year chunks for daily
-    elif interval == "60minute":
-        chunk_days = 60   # 2 months for hourly
-    else:
-        chunk_days = 30   # 1 month for smaller intervals
+    engine = engine or create_engine(kite)
+    engine.run(build_chunks(token, symbol, interval, max_days))
     
-    current_to = to_date
-    remaining_days = max_days
-    
-    while remaining_days > 0:
-        chunk = min(chunk_days, remaining_days)
-        current_from = current_to - timedelta(days=chunk)
-        
-        try:
-            df = kite.fetch_historical_data(
-                token,
-                interval,
-                current_from,
-                current_to
-            )
-            
-            if not df.empty:
-                all_data.append(df)
-                logger.debug(f"  {current_from.date()} to {current_to.date()}: {len(df)} bars")
-            
-            # Rate limiting - 3 req/sec max
-            time.sleep(0.4)
-            
-        except Exception as e:
-            logger.warning(f"Error fetching {current_from.date()} to {current_to.date()}: {e}")
-            time.sleep(1)  # Extra delay on error
-        
-        current_to = current_from
-        remaining_days -= chunk
-    
-    if all_data:
-        combined = pd.concat(all_data, ignore_index=True)
-        # Handle both 'date' column and index
-        if 'date' in combined.columns:
-            combined = combined.drop_duplicates(subset=['date']).sort_values('date')
-        else:
-            combined = combined[~combined.index.duplicated(keep='first')].sort_index()
+    combined = engine.store.read(symbol, interval)
+    if not combined.empty:
         logger.info(f"Downloaded {len(combined)} {interval} bars for {symbol}")
         return combined
     
@@ -133,88 +138,29 @@ def download_data(
     return pd.DataFrame()
 
 
-def calculate_regime_labels(df: pd.DataFrame) -> pd.DataFrame:
+def calculate_regime_labels(df: pd.DataFrame, symbol: str = "UNKNOWN") -> pd.DataFrame:
     """
     Calculate regime labels for ML training based on historical data.
     
+    Features and labels come from the feature store, which computes them
+    once per distinct set of bars (see app.services.agents.regime_features).
+    
     Labels:
     0 = RANGE_BOUND (low ADX, low vol)
     1 = MEAN_REVERSION (moderate ADX, extreme RSI)
     2 = TREND (high ADX)
     3 = CHAOS (high vol, gaps)
     """
-    from app.services.technical import calculate_adx, calculate_rsi, calculate_atr
-    from app.services.volatility import calculate_realized_vol
+    from app.services.agents.regime_features import FeatureStore, FEATURE_COLUMNS
     
     if len(df) < 30:
         return df
     
-    # Calculate indicators
-    df = df.copy()
-    
-    # ADX
-    adx = calculate_adx(df['high'], df['low'], df['close'], period=14)
-    df['adx'] = adx
-    
-    # RSI
-    rsi = calculate_rsi(df['close'], period=14)
-    df['rsi'] = rsi
-    
-    # ATR
-    atr = calculate_atr(df['high'], df['low'], df['close'], period=14)
-    df['atr'] = atr
-    df['atr_pct'] = atr / df['close']
+    features = FeatureStore(FEATURES_DIR).load_or_build(symbol, df)
     
-    # Realized vol
-    rv = calculate_realized_vol(df['close'], period=20, annualize=True)
-    df['realized_vol'] = rv
-    
-    # Gap percentage
-    df['gap_pct'] = (df['open'] - df['close'].shift(1)) / df['close'].shift(1)
-    
-    # Day range
-    df['day_range_pct'] = (df['high'] - df['low']) / df['close']
-    
-    # IV percentile proxy (using Parkinson vol)
-    import numpy as np
-    log_hl = np.log(df['high'] / df['low'])
-    parkinson_vol = np.sqrt(1 / (4 * np.log(2)) * (log_hl ** 2))
-    df['parkinson_vol'] = parkinson_vol
-    df['iv_percentile'] = parkinson_vol.rolling(252).apply(
-        lambda x: (x < x.iloc[-1]).sum() / len(x) * 100 if len(x) > 1 else 50
-    )
-    
-    # Label regimes based on rules
-    def label_regime(row):
-        if pd.isna(row['adx']) or pd.isna(row['rsi']):
-            return -1  # Unknown
-        
-        adx = row['adx']
-        rsi = row['rsi']
-        iv_pct = row.get('iv_percentile', 50)
-        gap = abs(row.get('gap_pct', 0))
-        day_range = row.get('day_range_pct', 0.01)
-        
-        # CHAOS: High vol or large gaps
-        if iv_pct > 75 or gap > 0.02 or day_range > 0.025:
-            return 3
-        
-        # RANGE_BOUND: Low ADX, neutral RSI
-        if adx < 12 and 40 <= rsi <= 60:
-            return 0
-        
-        # MEAN_REVERSION: Moderate ADX, extreme RSI
-        if 12 <= adx <= 25 and (rsi < 30 or rsi > 70):
-            return 1
-        
-        # TREND: High ADX
-        if adx > 25:
-            return 2
-        
-        # Default to MEAN_REVERSION
-        return 1
-    
-    df['regime_label'] = df.apply(label_regime, axis=1)
+    df = df.copy()
+    for column in FEATURE_COLUMNS + ["regime_label"]:
+        df[column] = features[column].to_numpy()
     
     return df
 
@@ -271,30 +217,33 @@ def main():
     # Summary tracking
     download_summary = []
     
-    # Download ALL intervals for ALL instruments
+    # Fetch every missing chunk for ALL instruments and intervals in one
+    # concurrent, rate-limited pass
+    engine = create_engine(kite)
+    chunks = []
+    for symbol, info in INSTRUMENTS.items():
+        for interval in INTERVALS:
+            chunks.extend(build_chunks(info["token"], symbol, interval, INTERVAL_MAX_DAYS[interval]))
+    
+    try:
+        engine.run(chunks)
+    except KeyboardInterrupt:
+        engine.stop()
+        logger.warning("Interrupted - completed chunks are kept, re-run to resume")
+        return
+    
     for symbol, info in INSTRUMENTS.items():
         token = info["token"]
-        exchange = info["exchange"]
-        inst_type = info["type"]
-        
-        logger.info(f"\n{'='*50}")
-        logger.info(f"Processing: {symbol} ({exchange}, {inst_type})")
-        logger.info(f"Token: {token}")
-        logger.info(f"{'='*50}")
         
         for interval in INTERVALS:
-            max_days = INTERVAL_MAX_DAYS[interval]
-            
-            logger.info(f"\n--- {symbol} / {interval} (max {max_days} days) ---")
-            
             try:
-                df = download_data(kite, token, symbol, interval, max_days)
+                df = engine.store.read(symbol, interval)
                 
                 if not df.empty:
                     # Calculate regime labels for daily data
                     if interval == "day":
                         try:
-                            df = calculate_regime_labels(df)
+                            df = calculate_regime_labels(df, symbol)
                         except Exception as e:
                             logger.warning(f"Could not calculate regime labels: {e}")
                     
@@ -318,13 +267,7 @@ def main():
                     logger.warning(f"No data for {symbol} ({interval})")
                     
             except Exception as e:
-                logger.error(f"Failed to download {symbol} ({interval}): {e}")
-            
-            # Rate limiting between requests
-            time.sleep(1)
-        
-        # Extra delay between instruments
-        time.sleep(2)
+                logger.error(f"Failed to save {symbol} ({interval}): {e}")
     
     # Print summary
     logger.info("\n" + "=" * 70)
@@ -372,13 +315,14 @@ def download_single(symbol: str, interval: str = None):
     token = info["token"]
     
     intervals = [interval] if interval else INTERVALS
+    engine = create_engine(kite)
     
     for intv in intervals:
         max_days = INTERVAL_MAX_DAYS.get(intv, 100)
-        df = download_data(kite, token, symbol.upper(), intv, max_days)
+        df = download_data(kite, token, symbol.upper(), intv, max_days, engine=engine)
         if not df.empty:
             if intv == "day":
-                df = calculate_regime_labels(df)
+                df = calculate_regime_labels(df, symbol.upper())
             save_data(df, token, symbol.upper(), intv)
 
 
@@ -0,0 +1,121 @@
+#!/usr/bin/env python3
+"""
+Startup Profile for Trading System v2.0
+
+Imports a module (default: the API app) in a fresh interpreter with
+`python -X importtime` and reports where the import time goes: the slowest
+modules, time per top-level package, and whether the heavy scientific
+libraries were pulled in at startup.
+
+Usage:
+    python profile_startup.py [--module app.main] [--top 25] [--json]
+
+Example:
+    # Which imports dominate API cold start?
+    python profile_startup.py --top 15
+"""
+
+import os
+import re
+import sys
+import json
+import argparse
+import subprocess
+from collections import defaultdict
+from pathlib import Path
+
+
+BACKEND_DIR = Path(__file__).parent.parent
+
+# Libraries that should load on first use, not at API startup
+HEAVY_MODULES = ("pandas", "scipy.stats", "scipy.special", "sklearn", "hmmlearn", "talib", "kiteconnect")
+
+LINE = re.compile(r"import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)")
+
+
+def profile_imports(module: str) -> list:
+    """
+    Import a module in a fresh interpreter under -X importtime.
+
+    Returns:
+        List of (module, self_us, cumulative_us, depth) in import order
+    """
+    env = dict(os.environ, PYTHONDONTWRITEBYTECODE="1")
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=BACKEND_DIR, env=env, capture_output=True, text=True
+    )
+    if proc.returncode != 0:
+        tail = proc.stderr.strip().splitlines()[-1:] or ["unknown error"]
+        raise RuntimeError(f"import {module} failed: {tail[0]}")
+
+    rows = []
+    for line in proc.stderr.splitlines():
+        match = LINE.match(line)
+        if match:
+            self_us, cumulative_us, indent, name = match.groups()
+            rows.append((name, int(self_us), int(cumulative_us), len(indent) // 2))
+    return rows
+
+
+def build_report(rows: list, module: str, top: int) -> dict:
+    """Summarize importtime rows: slowest modules, packages and heavy libraries."""
+    by_package = defaultdict(int)
+    for name, self_us, _, _ in rows:
+        by_package[name.split(".")[0]] += self_us
+
+    loaded = {name for name, _, _, _ in rows}
+    total_us = next((cum for name, _, cum, _ in rows if name == module), sum(r[1] for r in rows))
+    slowest = sorted(rows, key=lambda r: r[2], reverse=True)
+
+    return {
+        "module": module,
+        "total_ms": round(total_us / 1000, 1),
+        "modules_imported": len(rows),
+        "heavy_loaded": [m for m in HEAVY_MODULES if m in loaded],
+        "packages": [
+            {"package": name, "self_ms": round(us / 1000, 1)}
+            for name, us in sorted(by_package.items(), key=lambda kv: kv[1], reverse=True)[:top]
+        ],
+        "slowest": [
+            {"module": name, "cumulative_ms": round(cum / 1000, 1), "self_ms": round(us / 1000, 1)}
+            for name, us, cum, _ in slowest[:top]
+        ],
+    }
+
+
+def print_report(report: dict) -> None:
+    print(f"import {report['module']}: {report['total_ms']:.0f} ms, {report['modules_imported']} modules")
+    heavy = ", ".join(report["heavy_loaded"]) or "none"
+    print(f"Heavy libraries loaded at import: {heavy}")
+
+    print(f"\n{'package':<30} {'self ms':>10}")
+    for row in report["packages"]:
+        print(f"{row['package']:<30} {row['self_ms']:>10.1f}")
+
+    print(f"\n{'module':<60} {'cumulative ms':>14} {'self ms':>10}")
+    for row in report["slowest"]:
+        print(f"{row['module']:<60} {row['cumulative_ms']:>14.1f} {row['self_ms']:>10.1f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Profile import time of the API process")
+    parser.add_argument("--module", default="app.main", help="Module to import (default: app.main)")
+    parser.add_argument("--top", type=int, default=25, help="Rows per table")
+    parser.add_argument("--json", action="store_true", help="Print the report as JSON")
+    args = parser.parse_args()
+
+    try:
+        report = build_report(profile_imports(args.module), args.module, args.top)
+    except RuntimeError as e:
+        print(f"ERROR: {e}")
+        sys.exit(1)
+
+    if args.json:
+        print(json.dumps(report, indent=2))
+    else:
+        print_report(report)
+
+
+if __name__ == "__main__":
+    main()
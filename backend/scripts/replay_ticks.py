@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+"""
+Tick Replay for Trading System v2.0
+
+Replays ticks recorded by KiteTickerManager (RECORD_TICKS=true) through the
+same manager, price cache and callbacks as a live session - no broker
+connection needed.
+
+Usage:
+    python replay_ticks.py <tick_dir> [--start YYYY-MM-DD] [--end YYYY-MM-DD] [--speed 1|N|max] [--positions]
+
+Example:
+    # Reproduce a session at 10x
+    python replay_ticks.py ../data/ticks --start 2026-02-06 --end 2026-02-06 --speed 10
+    
+    # Peak throughput of the websocket P&L pipeline
+    python replay_ticks.py ../data/ticks --speed max --positions
+"""
+
+import sys
+import argparse
+from datetime import datetime
+from pathlib import Path
+
+# Add parent to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from loguru import logger
+
+from app.api.websocket import ticker_manager, update_positions_with_ticks
+from app.core.tick_log import TickLog, session_files
+
+
+def parse_date(value):
+    return datetime.strptime(value, "%Y-%m-%d").date() if value else None
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Replay recorded ticks through KiteTickerManager")
+    parser.add_argument("tick_dir", help="Directory of recorded .ticks files")
+    parser.add_argument("--start", help="First day (YYYY-MM-DD)", default=None)
+    parser.add_argument("--end", help="Last day (YYYY-MM-DD)", default=None)
+    parser.add_argument("--speed", default="1", help="1 = real time, N = N times faster, max = no pacing")
+    parser.add_argument("--prefix", default="ticks", help="Tick file prefix")
+    parser.add_argument(
+        "--positions", action="store_true",
+        help="Run the websocket P&L update for one position per recorded instrument"
+    )
+    args = parser.parse_args()
+    
+    logger.remove()
+    logger.add(sys.stderr, level="INFO")
+    
+    files = session_files(Path(args.tick_dir), args.prefix, parse_date(args.start), parse_date(args.end))
+    if not files:
+        logger.error(f"No tick files in {args.tick_dir}")
+        return 1
+    
+    speed = None if args.speed == "max" else float(args.speed)
+    
+    positions = []
+    if args.positions:
+        # One short lot per instrument, opened at its first recorded price
+        first_prices = {}
+        for path in files:
+            records = TickLog(path).records
+            for token, price in zip(records["instrument_token"].tolist(), records["last_price"].tolist()):
+                first_prices.setdefault(token, price)
+        positions = [
+            {"instrument_token": token, "quantity": -75, "average_price": price,
+             "last_price": price, "exchange": "NFO"}
+            for token, price in first_prices.items()
+        ]
+        
+        def on_ticks(ticks):
+            positions[:] = update_positions_with_ticks(positions, ticks)
+        
+        ticker_manager.add_callback(on_ticks)
+    
+    replay = ticker_manager.start_replay(files, speed=speed)
+    replay.wait()
+    ticker_manager.stop_replay()
+    
+    stats = replay.get_stats()
+    print("\nREPLAY")
+    for key, value in stats.items():
+        print(f"  {key:<12} {value}")
+    if positions:
+        total = sum(p.get("pnl", 0) for p in positions)
+        print(f"  {'positions':<12} {len(positions)}")
+        print(f"  {'total_pnl':<12} {total:,.2f}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -6,7 +6,8 @@ This script runs backtests using the EXACT SAME trading logic as live/paper trad
 It uses the shared TradingEngine which is also used by the Orchestrator.
 
 Usage:
-    python run_backtest.py <data_file> [--start YYYY-MM-DD] [--end YYYY-MM-DD] [--capital N]
+    python run_backtest.py <data_file> [--start YYYY-MM-DD] [--end YYYY-MM-DD] [--capital N] [--bars 5minute]
+                           [--option-chains ../data/options] [--breeze-options ../data/breeze/options]
 
 Example:
     python run_backtest.py ../data/breeze/indices/NIFTY_1minute.parquet --start 2024-01-01 --capital 500000
@@ -19,6 +20,7 @@ from datetime import datetime, date, timedelta
 from dataclasses import dataclass, field
 from typing import List, Dict, Optional
 import json
+import pickle
 
 # Add parent to path for imports
 sys.path.insert(0, str(Path(__file__).parent.parent))
@@ -27,13 +29,16 @@ import pandas as pd
 import numpy as np
 from loguru import logger
 
-from app.services.backtesting import HistoricalDataClient, load_ohlcv_data
+from app.services.backtesting import (
+    HistoricalDataClient, PrecomputedIndicators, RecordedOptionChains, load_ohlcv_data
+)
 from app.config.settings import Settings
 from app.config.constants import NIFTY_TOKEN
 from app.core.data_cache import DataCache
 from app.core.state_manager import StateManager
 from app.core.trading_engine import TradingEngine
 from app.services.agents import Sentinel
+from app.services.agents.regime_classifier import PrecomputedRegimes
 from app.services.strategies import Strategist
 from app.services.execution import Treasury, Executor
 
@@ -62,12 +67,28 @@ def run_backtest(
     vix_path: Optional[str] = None,
     start_date: Optional[str] = None,
     end_date: Optional[str] = None,
-    initial_capital: float = 1000000
+    initial_capital: float = 1000000,
+    ml_model_path: Optional[str] = None,
+    bar_interval: Optional[str] = None,
+    option_chains_dir: Optional[str] = None,
+    breeze_options_dir: Optional[str] = None
 ) -> BacktestResult:
     """
     Run a backtest using the production trading system.
     
     This uses the EXACT SAME TradingEngine as the live Orchestrator.
+    
+    With ml_model_path, ML regime probabilities for every day are scored in
+    one batch up front and Sentinel looks them up by bar date.
+    
+    bar_interval ('5minute', 'day' or 'bar' for every source bar) switches to
+    bar mode: the simulation clock advances per bar, so exits, trailing stops
+    and entry windows are evaluated intraday. Without it the engine runs once
+    per day on the day's last bar.
+    
+    option_chains_dir (collector day files) and/or breeze_options_dir
+    (Breeze option series) replay recorded chains: recorded strikes are
+    quoted and filled from the recording, other strikes are simulated.
     """
     logger.info("=" * 60)
     logger.info("TRADING SYSTEM v2.0 BACKTEST")
@@ -91,6 +112,14 @@ def run_backtest(
         kite.add_instrument_data(264969, "INDIAVIX", vix_data)
         logger.info(f"Loaded VIX data: {len(vix_data)} records")
     
+    # Recorded option chains (indexed once, memory-mapped)
+    if option_chains_dir or breeze_options_dir:
+        kite.use_recorded_chains(RecordedOptionChains.load(
+            "NIFTY",
+            Path(option_chains_dir) if option_chains_dir else Path("data/options"),
+            breeze_dir=Path(breeze_options_dir) if breeze_options_dir else None
+        ))
+    
     # Initialize config and state
     config = Settings()
     # NOTE: Pass None for data_cache to force Sentinel to use HistoricalDataClient
@@ -100,11 +129,21 @@ def run_backtest(
     # Initialize PRODUCTION agents with historical data client
     # data_cache=None forces Sentinel to fetch from kite (HistoricalDataClient)
     sentinel = Sentinel(kite, config, data_cache=None)
+    if ml_model_path:
+        with open(ml_model_path, 'rb') as f:
+            sentinel.ml_classifier = pickle.load(f)
+        sentinel.use_precomputed_ml(
+            PrecomputedRegimes.build(sentinel.ml_classifier, kite.get_features(NIFTY_TOKEN))
+        )
     strategist = Strategist(kite, config)
     strategist.bypass_entry_window = True  # Bypass time check for backtesting
     treasury = Treasury(kite, config, state_manager, paper_mode=True)
     executor = Executor(kite, config, state_manager)
     
+    # Time-based rules (entry window, EOD exits, DTE) follow the simulation clock
+    for agent in (strategist, treasury, executor):
+        agent.clock = kite.now
+    
     # Initialize TradingEngine - SAME engine used by Orchestrator
     trading_engine = TradingEngine(
         sentinel=sentinel,
@@ -132,8 +171,20 @@ def run_backtest(
     regime_history = []
     iteration_count = 0
     
+    # Bar mode: step the clock per bar, read 5-minute indicators from arrays
+    intraday_bars = bar_interval is not None and kite.is_intraday
+    if bar_interval is not None:
+        steps = kite.iterate_bars(None if bar_interval == 'bar' else bar_interval)
+        sentinel.use_precomputed_indicators(PrecomputedIndicators.from_client(kite, NIFTY_TOKEN))
+        strategist.bypass_entry_window = not intraday_bars
+        logger.info(f"Bar mode: stepping per {bar_interval} bar")
+    else:
+        steps = kite.iterate_dates()
+    last_date = None
+    
     # Main backtest loop
-    for current_date in kite.iterate_dates():
+    for step in steps:
+        current_date = step.date() if bar_interval is not None else step
         if current_date < start:
             continue
         if current_date > end:
@@ -143,17 +194,23 @@ def run_backtest(
         if current_date.weekday() >= 5:
             continue
         
-        iteration_count += 1
+        new_day = current_date != last_date
+        last_date = current_date
+        label = str(step) if intraday_bars else str(current_date)
         
         try:
-            # Reset DC alarm state each day to prevent false positives from accumulating
-            sentinel.reset_dc_state()
+            if new_day:
+                iteration_count += 1
+                # Reset DC alarm state each day to prevent false positives from accumulating
+                sentinel.reset_dc_state()
             
             # Use shared TradingEngine - SAME code as Orchestrator
             result = trading_engine.run_iteration(NIFTY_TOKEN)
             
-            # Record regime
+            # Record regime (one entry per day - the day's latest in bar mode)
             if result.regime:
+                if not new_day and regime_history and regime_history[-1]['date'] == current_date:
+                    regime_history.pop()
                 regime_history.append({
                     'date': current_date,
                     'regime': result.regime.regime.value,
@@ -167,7 +224,7 @@ def run_backtest(
             # Record exits
             for exit_info in result.exits:
                 trades.append({
-                    'date': str(current_date),
+                    'date': label,
                     'type': 'EXIT',
                     'reason': exit_info['reason'],
                     'pnl': exit_info.get('pnl', 0)
@@ -176,7 +233,7 @@ def run_backtest(
             # Record entries
             for entry_info in result.entries:
                 trades.append({
-                    'date': str(current_date),
+                    'date': label,
                     'type': 'ENTRY',
                     'structure': entry_info['structure'],
                     'instrument': entry_info['instrument'],
@@ -192,17 +249,17 @@ def run_backtest(
                 equity += (current_price - avg_price) * qty
             
             equity_curve.append({
-                'date': str(current_date),
+                'date': label,
                 'equity': equity,
                 'regime': result.regime.regime.value if result.regime else 'UNKNOWN'
             })
             
             # Progress logging
-            if iteration_count % 50 == 0:
+            if new_day and iteration_count % 50 == 0:
                 logger.info(f"Day {iteration_count}: {current_date} | Equity: ₹{equity:,.0f}")
                 
         except Exception as e:
-            logger.error(f"Error on {current_date}: {e}")
+            logger.error(f"Error on {label}: {e}")
             continue
     
     # Calculate results
@@ -324,6 +381,13 @@ def main():
     parser.add_argument("--end", help="End date (YYYY-MM-DD)", default=None)
     parser.add_argument("--capital", type=float, default=1000000, help="Initial capital")
     parser.add_argument("--output", help="Output directory", default="backtest_results")
+    parser.add_argument("--ml-model", help="Pickled regime classifier to enable ML", default=None)
+    parser.add_argument(
+        "--bars", choices=["5minute", "day", "bar"], default=None,
+        help="Bar mode: step the simulation per bar instead of once per day"
+    )
+    parser.add_argument("--option-chains", help="Directory of recorded option chain files", default=None)
+    parser.add_argument("--breeze-options", help="Breeze options directory (data/breeze/options)", default=None)
     
     args = parser.parse_args()
     
@@ -337,7 +401,11 @@ def main():
         vix_path=args.vix,
         start_date=args.start,
         end_date=args.end,
-        initial_capital=args.capital
+        initial_capital=args.capital,
+        ml_model_path=args.ml_model,
+        bar_interval=args.bars,
+        option_chains_dir=args.option_chains,
+        breeze_options_dir=args.breeze_options
     )
     
     # Print and save results
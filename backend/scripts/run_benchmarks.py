@@ -0,0 +1,158 @@
+#!/usr/bin/env python3
+"""
+Benchmark Runner for Trading System v2.0
+
+Times indicators, Sentinel, TradingEngine iterations, the options simulator
+and websocket fan-out on fixed synthetic datasets (see benchmarks/), saves
+the results as JSON and compares two saved runs.
+
+Usage:
+    python run_benchmarks.py run [--quick] [--filter PATTERN ...] [--sizes 1y,5y,20y]
+                                 [--books 50,500,5000] [--clients 1,10,100] [--output FILE]
+    python run_benchmarks.py compare <baseline.json> <candidate.json> [--threshold 0.10]
+    python run_benchmarks.py list
+
+Example:
+    # Baseline on main, then the branch; compare exits 1 on regressions
+    python run_benchmarks.py run --quick --output ../benchmarks/results/main.json
+    python run_benchmarks.py run --quick --output ../benchmarks/results/branch.json
+    python run_benchmarks.py compare ../benchmarks/results/main.json ../benchmarks/results/branch.json
+
+    # Only the indicator functions on 20 years of bars
+    python run_benchmarks.py run --filter "indicators*" --sizes 20y
+"""
+
+import os
+import sys
+import argparse
+import tempfile
+from datetime import datetime
+from pathlib import Path
+
+# Add parent to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from loguru import logger
+
+
+RESULTS_DIR = Path(__file__).parent.parent / "benchmarks" / "results"
+
+
+def parse_list(value):
+    return [v.strip() for v in value.split(",") if v.strip()] if value else None
+
+
+def cmd_list(args):
+    from benchmarks import REGISTRY, select
+    import benchmarks.suite  # noqa: F401 - registers the benchmarks
+
+    for bench in select(REGISTRY, args.filter):
+        params = ", ".join(bench.param_label(p) or "-" for p in bench.params)
+        print(f"{bench.name:<60} {params}")
+    return 0
+
+
+def cmd_run(args):
+    # Engine and websocket cases write strategies and orders - never to the real database
+    scratch = tempfile.TemporaryDirectory(prefix="bench_db_")
+    os.environ["DATABASE_URL"] = args.database_url or f"sqlite:///{scratch.name}/bench.db"
+
+    from benchmarks import REGISTRY, run_benchmarks, save_run, select
+    from benchmarks.datasets import BAR_SIZES, BOOK_SIZES, CLIENT_COUNTS
+    from benchmarks.runner import format_results
+    import benchmarks.suite as suite
+
+    sizes = parse_list(args.sizes) or (["1y"] if args.quick else list(BAR_SIZES))
+    books = parse_list(args.books) or (["50", "500"] if args.quick else [str(b) for b in BOOK_SIZES])
+    clients = parse_list(args.clients) or (["1", "10"] if args.quick else [str(c) for c in CLIENT_COUNTS])
+    dimensions = [
+        (set(BAR_SIZES), set(sizes)),
+        ({str(b) for b in BOOK_SIZES}, set(books)),
+        ({str(c) for c in CLIENT_COUNTS}, set(clients)),
+    ]
+
+    def keep(param):
+        for values, allowed in dimensions:
+            if str(param) in values:
+                return str(param) in allowed
+        return True
+
+    benchmarks = select(REGISTRY, args.filter, keep)
+    cases = sum(len(b.params) for b in benchmarks)
+    print(f"Running {cases} benchmark cases (budget {args.budget}s each)")
+
+    def progress(result):
+        status = f"ERROR {result.error}" if result.error else f"{result.median_ms:>12.3f} ms  ({result.runs} runs)"
+        print(f"  {result.name:<62} {status}", flush=True)
+
+    run = run_benchmarks(benchmarks, budget_s=args.budget, on_result=progress)
+    run.datasets = suite.dataset_fingerprints([s for s in sizes if s in BAR_SIZES])
+    scratch.cleanup()
+
+    output = Path(args.output) if args.output else RESULTS_DIR / f"bench_{datetime.now():%Y%m%d_%H%M%S}.json"
+    save_run(run, output)
+    print()
+    print(format_results(run.results))
+    print(f"\nSaved {len(run.results)} results to {output}")
+    return 1 if any(r.error for r in run.results) else 0
+
+
+def cmd_compare(args):
+    from benchmarks import compare_runs, load_run
+    from benchmarks.runner import dataset_mismatches, format_comparison
+
+    baseline, candidate = load_run(args.baseline), load_run(args.candidate)
+    mismatched = dataset_mismatches(baseline, candidate)
+    if mismatched:
+        print(f"WARNING: datasets differ between runs: {', '.join(mismatched)}")
+    for key in ("python", "numpy", "pandas", "machine"):
+        before, after = baseline.environment.get(key), candidate.environment.get(key)
+        if before != after:
+            print(f"NOTE: {key} differs: {before} -> {after}")
+
+    comparisons = compare_runs(baseline, candidate, threshold=args.threshold, metric=f"{args.metric}_ms")
+    print(format_comparison(comparisons))
+
+    counts = {}
+    for c in comparisons:
+        counts[c.status] = counts.get(c.status, 0) + 1
+    print("\n" + ", ".join(f"{n} {status}" for status, n in sorted(counts.items())))
+    return 1 if counts.get("slower") else 0
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run and compare performance benchmarks")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    run = sub.add_parser("run", help="Run benchmarks and save results as JSON")
+    run.add_argument("--filter", nargs="*", help="Benchmark or group name patterns (fnmatch)")
+    run.add_argument("--quick", action="store_true", help="1y of bars, 50/500-leg books, 1/10 clients")
+    run.add_argument("--sizes", help="Bar datasets, e.g. 1y,5y,20y")
+    run.add_argument("--books", help="Book sizes in legs, e.g. 50,500,5000")
+    run.add_argument("--clients", help="Websocket client counts, e.g. 1,10,100")
+    run.add_argument("--budget", type=float, default=2.0, help="Seconds of timed calls per case")
+    run.add_argument("--output", help="Results file (default: benchmarks/results/bench_<timestamp>.json)")
+    run.add_argument("--database-url", help="Database for engine/websocket cases (default: scratch SQLite)")
+    run.add_argument("--verbose", action="store_true", help="Show application logs")
+
+    compare = sub.add_parser("compare", help="Compare two saved runs; exits 1 on regressions")
+    compare.add_argument("baseline", help="Baseline results JSON")
+    compare.add_argument("candidate", help="Candidate results JSON")
+    compare.add_argument("--threshold", type=float, default=0.10, help="Relative change treated as noise")
+    compare.add_argument("--metric", choices=["median", "min", "mean"], default="median")
+
+    listing = sub.add_parser("list", help="List registered benchmarks")
+    listing.add_argument("--filter", nargs="*", help="Benchmark or group name patterns (fnmatch)")
+
+    args = parser.parse_args()
+
+    # Application logging inside timed calls is noise in the output
+    logger.remove()
+    logger.add(sys.stderr, level="DEBUG" if getattr(args, "verbose", False) else "WARNING")
+
+    handlers = {"run": cmd_run, "compare": cmd_compare, "list": cmd_list}
+    sys.exit(handlers[args.command](args))
+
+
+if __name__ == "__main__":
+    main()
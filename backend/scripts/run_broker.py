@@ -0,0 +1,50 @@
+#!/usr/bin/env python3
+"""
+Broker Process for Trading System v2.0
+
+Runs the single process that owns the Kite ticker, the trading engine, the
+trailing-stop service and the API rate budget, and serves them to API
+workers over the state hub socket (STATE_HUB_ADDRESS).
+
+Usage:
+    PROCESS_ROLE=broker python run_broker.py
+
+Example:
+    # One broker process, four stateless API workers (run both from backend/)
+    PROCESS_ROLE=broker python scripts/run_broker.py &
+    PROCESS_ROLE=api uvicorn app.main:app --workers 4
+"""
+
+import os
+import sys
+import signal
+import asyncio
+from pathlib import Path
+
+# Add parent to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from loguru import logger
+
+from app.config.settings import Settings
+from app.api.broker import run_broker
+
+
+async def main():
+    config = Settings()
+    if config.process_role.lower() == "api":
+        logger.error("PROCESS_ROLE=api: the broker process must run as PROCESS_ROLE=broker")
+        sys.exit(1)
+    os.environ.setdefault("PROCESS_ROLE", "broker")
+
+    stop_event = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        loop.add_signal_handler(sig, stop_event.set)
+
+    logger.info(f"Broker process {os.getpid()} serving {config.state_hub_address}")
+    await run_broker(config, stop_event)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -40,29 +40,39 @@ from sklearn.metrics import classification_report, confusion_matrix, accuracy_sc
 import warnings
 warnings.filterwarnings('ignore')
 
+from app.services.agents.regime_features import FeatureStore
+
 # Paths
 DATA_DIR = Path(__file__).parent.parent / "data" / "historical"
 MODELS_DIR = Path(__file__).parent.parent / "data" / "models"
+FEATURES_DIR = Path(__file__).parent.parent / "data" / "features"
 MODELS_DIR.mkdir(parents=True, exist_ok=True)
 
 
 def load_training_data() -> pd.DataFrame:
-    """Load and combine all historical data for training."""
-    all_data = []
+    """
+    Load features and labels for all historical daily data.
+    
+    Features are served from the feature store and only recomputed for
+    files whose bars changed since the last run.
+    """
+    sources = {}
     
     # Load daily data files
     for csv_file in DATA_DIR.glob("*_daily.csv"):
         logger.info(f"Loading {csv_file.name}")
-        df = pd.read_csv(csv_file)
-        df['symbol'] = csv_file.stem.replace('_daily', '')
-        all_data.append(df)
+        sources[csv_file.stem.replace('_daily', '')] = pd.read_csv(csv_file)
     
-    if not all_data:
+    if not sources:
         logger.error("No training data found. Run download_historical_data.py first.")
         return pd.DataFrame()
     
-    combined = pd.concat(all_data, ignore_index=True)
-    logger.info(f"Loaded {len(combined)} total rows")
+    store = FeatureStore(FEATURES_DIR)
+    combined = store.training_frame(sources)
+    logger.info(
+        f"Loaded {len(combined)} total rows "
+        f"({store.hits} from feature store, {store.builds} rebuilt)"
+    )
     
     return combined
 
@@ -230,6 +240,21 @@ class RegimeClassifierWrapper:
         confidence = proba[pred]
         
         return regime_name, confidence
+    
+    def predict_regimes(self, features: pd.DataFrame) -> tuple:
+        """
+        Predict regimes for every row of a feature frame in one pass.
+        
+        Args:
+            features: DataFrame with feature names as columns
+            
+        Returns:
+            Tuple of (label array, probability array)
+        """
+        X = features.reindex(columns=self.feature_names).fillna(0).to_numpy(dtype=float)
+        proba = self.predict_proba(X)
+        best = proba.argmax(axis=1)
+        return self.classifier.classes_[best], proba[np.arange(len(best)), best]
 
 
 def evaluate_model(model, X_test, y_test, scaler):
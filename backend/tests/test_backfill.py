@@ -0,0 +1,187 @@
+"""Tests for the resumable backfill engine"""
+
+import threading
+import pandas as pd
+from datetime import datetime, timedelta
+
+from app.core.backfill import (
+    BackfillEngine,
+    BackfillManifest,
+    ChunkStatus,
+    PartitionedStore,
+    make_chunks,
+)
+from app.core.rate_limiter import APIEndpoint, APIRateLimiter, RateLimitConfig
+
+
+def fast_limiter():
+    """Limiter generous enough not to slow tests down."""
+    config = RateLimitConfig(requests_per_second=1000, requests_per_minute=100000)
+    return APIRateLimiter(limits={ep: config for ep in APIEndpoint})
+
+
+def ohlcv_for(chunk):
+    """Synthetic daily candles for a chunk, indexed by date like KiteClient."""
+    dates = pd.date_range(chunk.start, chunk.end, freq="D", inclusive="left")
+    return pd.DataFrame(
+        {"open": 100.0, "high": 101.0, "low": 99.0, "close": 100.5, "volume": 1000},
+        index=pd.DatetimeIndex(dates, name="date"),
+    )
+
+
+class TestMakeChunks:
+    """Tests for chunk construction."""
+
+    def test_aligned_keys_are_stable(self):
+        """The same range requested later produces the same chunk keys."""
+        end = datetime(2026, 2, 6, 15, 0)
+        a = make_chunks("NIFTY", "day", end - timedelta(days=400), end, 365)
+        b = make_chunks("NIFTY", "day", end - timedelta(days=400) + timedelta(hours=3), end, 365)
+        assert [c.key for c in a] == [c.key for c in b]
+        assert a[0].start <= end - timedelta(days=400)
+        assert a[-1].end >= end
+
+    def test_unaligned_window(self):
+        """Unaligned chunks cover exactly the requested window."""
+        start, end = datetime(2026, 2, 6, 9, 15), datetime(2026, 2, 6, 11, 0)
+        chunks = make_chunks("NIFTY26FEB22000CE", "minute", start, end, 1, align=False)
+        assert len(chunks) == 1
+        assert (chunks[0].start, chunks[0].end) == (start, end)
+
+
+class TestBackfillEngine:
+    """Tests for BackfillEngine."""
+
+    def test_fetches_and_stores_chunks(self, tmp_path):
+        """All chunks are fetched and readable from the store."""
+        store = PartitionedStore(tmp_path / "store")
+        engine = BackfillEngine(ohlcv_for, store=store, limiter=fast_limiter(), max_workers=4)
+        chunks = make_chunks("NIFTY", "day", datetime(2025, 1, 1), datetime(2025, 6, 1), 30)
+
+        stats = engine.run(chunks)
+
+        assert stats["fetched"] == len(chunks)
+        df = store.read("NIFTY", "day")
+        assert df.index.is_monotonic_increasing
+        assert not df.index.duplicated().any()
+        assert df.index.min() <= pd.Timestamp("2025-01-01")
+
+    def test_resumes_from_manifest(self, tmp_path):
+        """A second run skips chunks the manifest marks done."""
+        manifest_path = tmp_path / "manifest.jsonl"
+        chunks = make_chunks("NIFTY", "day", datetime(2025, 1, 1), datetime(2025, 4, 1), 30)
+
+        BackfillEngine(
+            ohlcv_for, manifest=BackfillManifest(manifest_path), limiter=fast_limiter()
+        ).run(chunks)
+
+        calls = []
+        engine = BackfillEngine(
+            lambda c: calls.append(c) or ohlcv_for(c),
+            manifest=BackfillManifest(manifest_path),
+            limiter=fast_limiter(),
+        )
+        stats = engine.run(chunks)
+
+        assert calls == []
+        assert stats["skipped"] == len(chunks)
+
+    def test_retries_then_succeeds(self):
+        """Transient failures are retried with backoff."""
+        attempts = {"n": 0}
+
+        def flaky(chunk):
+            attempts["n"] += 1
+            if attempts["n"] < 3:
+                raise ConnectionError("timeout")
+            return ohlcv_for(chunk)
+
+        engine = BackfillEngine(flaky, limiter=fast_limiter(), backoff_base=0.01, max_retries=4)
+        chunk = make_chunks("NIFTY", "day", datetime(2025, 1, 1), datetime(2025, 1, 20), 30)[0]
+        stats = engine.run([chunk])
+
+        assert stats["fetched"] == 1
+        assert stats["retries"] == 2
+        assert engine.manifest.status(chunk.key) == ChunkStatus.DONE
+
+    def test_one_limiter_slot_per_kite_request(self):
+        """KiteClient fetches with retry=False make one raw request per engine attempt."""
+        from app.core.kite_client import KiteClient
+
+        class FailingKite:
+            calls = 0
+
+            def historical_data(self, *args, **kwargs):
+                FailingKite.calls += 1
+                raise ConnectionError("timeout")
+
+        kite = KiteClient("key", mock_mode=True, retry_delay=0)
+        kite.mock_mode, kite._kite = False, FailingKite()
+        limiter = fast_limiter()
+        engine = BackfillEngine(
+            lambda c: kite.fetch_historical_data(256265, c.interval, c.start, c.end, raise_errors=True, retry=False),
+            limiter=limiter, backoff_base=0.001, max_retries=3
+        )
+        chunk = make_chunks("NIFTY", "day", datetime(2025, 1, 1), datetime(2025, 1, 20), 30)[0]
+
+        assert engine.run([chunk])["failed"] == 1
+        assert FailingKite.calls == 3
+        assert limiter.get_daily_usage_summary()["total_calls"] == FailingKite.calls
+
+    def test_failed_chunk_is_retried_next_run(self, tmp_path):
+        """Chunks that exhaust their retries stay pending for the next run."""
+        manifest = BackfillManifest(tmp_path / "manifest.jsonl")
+        chunk = make_chunks("NIFTY", "day", datetime(2025, 1, 1), datetime(2025, 1, 20), 30)[0]
+
+        def broken(c):
+            raise RuntimeError("Too many requests")
+
+        engine = BackfillEngine(broken, manifest=manifest, limiter=fast_limiter(),
+                                backoff_base=0.001, max_retries=2)
+        assert engine.run([chunk])["failed"] == 1
+        assert BackfillManifest(tmp_path / "manifest.jsonl").status(chunk.key) == ChunkStatus.FAILED
+        assert engine.pending([chunk]) == [chunk]
+
+    def test_runs_concurrently(self):
+        """Fetches overlap up to max_workers."""
+        in_flight = {"now": 0, "max": 0}
+        lock = threading.Lock()
+        gate = threading.Event()
+
+        def slow(chunk):
+            with lock:
+                in_flight["now"] += 1
+                in_flight["max"] = max(in_flight["max"], in_flight["now"])
+                if in_flight["now"] >= 3:
+                    gate.set()
+            gate.wait(1.0)
+            with lock:
+                in_flight["now"] -= 1
+            return pd.DataFrame()
+
+        chunks = make_chunks("NIFTY", "day", datetime(2025, 1, 1), datetime(2025, 4, 1), 30)
+        BackfillEngine(slow, limiter=fast_limiter(), max_workers=3).run(chunks)
+        assert in_flight["max"] == 3
+
+
+class TestAcquireSlot:
+    """Tests for APIRateLimiter.acquire_slot."""
+
+    def test_concurrent_reservations_respect_limit(self):
+        """Concurrent workers cannot exceed the per-second limit."""
+        config = RateLimitConfig(requests_per_second=3, requests_per_minute=1000)
+        limiter = APIRateLimiter(limits={ep: config for ep in APIEndpoint})
+
+        threads = [
+            threading.Thread(target=limiter.acquire_slot, args=(APIEndpoint.HISTORICAL,))
+            for _ in range(6)
+        ]
+        start = datetime.now()
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+
+        assert limiter.get_daily_usage_summary()["by_endpoint"]["historical"] == 6
+        # 6 calls at 3/s need at least one full wait
+        assert (datetime.now() - start).total_seconds() >= 0.9
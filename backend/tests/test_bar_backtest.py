@@ -0,0 +1,148 @@
+"""Tests for bar-level backtest stepping"""
+
+import numpy as np
+import pandas as pd
+import pytest
+from datetime import datetime, time
+
+from app.config.settings import Settings
+from app.services.agents.sentinel import Sentinel
+from app.services.backtesting import HistoricalDataClient, PrecomputedIndicators
+from app.services.strategies.strategist import Strategist
+
+
+NIFTY_TOKEN = 256265
+
+
+def make_bars(dates, seed=9):
+    rng = np.random.default_rng(seed)
+    n = len(dates)
+    close = 22000 * np.exp(np.cumsum(rng.normal(0, 0.004, n)))
+    open_ = np.r_[close[0], close[:-1]] * (1 + rng.normal(0, 0.001, n))
+    return pd.DataFrame({
+        "date": dates,
+        "open": open_,
+        "high": np.maximum(open_, close) * (1 + np.abs(rng.normal(0, 0.002, n))),
+        "low": np.minimum(open_, close) * (1 - np.abs(rng.normal(0, 0.002, n))),
+        "close": close,
+        "volume": rng.integers(1e4, 1e5, n),
+    })
+
+
+def make_intraday(days=6):
+    sessions = pd.bdate_range("2025-03-03", periods=days)
+    times = [d + pd.Timedelta(hours=9, minutes=15) + pd.Timedelta(minutes=5 * i) for d in sessions for i in range(75)]
+    return make_bars(pd.DatetimeIndex(times))
+
+
+class TestBarClock:
+    """HistoricalDataClient bar mode."""
+
+    def test_windows_never_see_future_bars(self):
+        client = HistoricalDataClient(make_intraday())
+        steps = list(client.iterate_bars("5minute"))
+        assert len(steps) == 6 * 75
+
+        now = steps[75 * 3 + 9]  # Day 4, 10:00
+        client.set_current_time(now)
+        today = client._data[client._data["date"].dt.normalize() == now.normalize()]
+        seen = today[today["date"] <= now]
+
+        daily = client.fetch_historical_data(NIFTY_TOKEN, "day", datetime(2025, 2, 1), datetime(2025, 3, 10))
+        assert len(daily) == 4
+        assert daily.iloc[-1]["close"] == seen["close"].iloc[-1]
+        assert daily.iloc[-1]["high"] == seen["high"].max()
+
+        five = client.fetch_historical_data(NIFTY_TOKEN, "5minute", datetime(2025, 2, 1), datetime(2025, 3, 10))
+        assert five["date"].iloc[-1] == now and len(five) == 75 * 3 + 10
+        assert client.now() == now.to_pydatetime()
+        assert client.get_current_bar()["close"] == seen["close"].iloc[-1]
+
+    def test_one_minute_source_steps_on_bucket_close(self):
+        minutes = pd.date_range("2025-03-03 09:15", periods=30, freq="1min")
+        client = HistoricalDataClient(make_bars(minutes))
+
+        steps = list(client.iterate_bars("5minute"))
+        assert [ts.minute for ts in steps] == [19, 24, 29, 34, 39, 44]
+
+        client.set_current_time(minutes[12])  # 09:27, inside the 09:25 bucket
+        five = client.fetch_historical_data(NIFTY_TOKEN, "5minute", datetime(2025, 3, 1), datetime(2025, 3, 3))
+        assert five["date"].iloc[-1] == pd.Timestamp("2025-03-03 09:25")
+        assert five["close"].iloc[-1] == client._data["close"].iloc[12]
+
+    def test_simulated_clock_drives_entry_window(self):
+        client = HistoricalDataClient(make_intraday(days=1))
+        strategist = Strategist(client, Settings())
+        strategist.clock = client.now
+
+        client.set_current_time(pd.Timestamp("2025-03-03 09:15"))
+        assert not strategist._is_entry_window()  # Window opens at 09:30
+        client.set_current_time(pd.Timestamp("2025-03-03 11:00"))
+        assert client.now().time() == time(11, 0)
+        assert strategist._is_entry_window()
+
+
+class TestSentinelBarMode:
+    """Precomputed indicators match the windowed calculation."""
+
+    def test_precomputed_indicators_match_recompute(self):
+        client = HistoricalDataClient(make_intraday())
+        indicators = PrecomputedIndicators.from_client(client, NIFTY_TOKEN)
+        sentinel = Sentinel(client, Settings(), None)
+
+        for ts in list(client.iterate_bars("5minute"))[100::37]:
+            client.set_current_time(ts)
+            window = client.fetch_historical_data(NIFTY_TOKEN, "5minute", datetime(2025, 2, 11), datetime(2025, 3, 3))
+            expected = sentinel._intraday_indicators(window)
+            actual = indicators.at(ts, window["close"].iloc[-1], len(window))
+            for name, value in expected.items():
+                assert actual[name] == pytest.approx(value, rel=1e-9, nan_ok=True), name
+
+        assert indicators.at(ts, -1.0, len(window)) is None  # Forming bar
+        assert indicators.at(ts, window["close"].iloc[-1], 20) is None  # Window still warming up
+
+    def test_ml_lookup_never_sees_the_session_in_progress(self, monkeypatch):
+        """Intraday bar mode reads the previous day's precomputed prediction."""
+        from app.services.agents.regime_classifier import PrecomputedRegimes
+
+        client = HistoricalDataClient(make_intraday())
+        sessions = pd.bdate_range("2025-03-03", periods=6)
+        table = PrecomputedRegimes(sessions.to_numpy(), np.arange(6), np.full(6, 0.9))
+        sentinel = Sentinel(client, Settings(), None)
+        sentinel.use_precomputed_indicators(PrecomputedIndicators.from_client(client, NIFTY_TOKEN))
+        sentinel.use_precomputed_ml(table)
+
+        seen = []
+        original = sentinel._ml_classify
+        monkeypatch.setattr(sentinel, "_ml_classify", lambda m, as_of: seen.append(as_of) or original(m, as_of))
+
+        client.set_current_time(pd.Timestamp("2025-03-06 10:00"))  # Day 4 in progress
+        sentinel.process(NIFTY_TOKEN)
+
+        assert table.lookup(seen[-1])[0] == 2  # Day 3, the last completed session
+        assert pd.Timestamp(seen[-1]) < sessions[3]
+
+    def test_bar_mode_on_daily_bars_reconciles_with_daily_mode(self):
+        data = make_bars(pd.bdate_range("2024-01-01", periods=160))
+        daily_client = HistoricalDataClient(data)
+        bar_client = HistoricalDataClient(data)
+        daily_sentinel = Sentinel(daily_client, Settings(), None)
+        bar_sentinel = Sentinel(bar_client, Settings(), None)
+        bar_sentinel.use_precomputed_indicators(PrecomputedIndicators.from_client(bar_client, NIFTY_TOKEN))
+
+        days = list(daily_client.iterate_dates())[40:]
+        bars = [ts for ts in bar_client.iterate_bars("day") if ts.date() >= days[0]]
+        assert [ts.date() for ts in bars] == days
+
+        for day, ts in zip(days, bars):
+            daily_client.set_current_date(day)
+            bar_client.set_current_time(ts)
+            expected = daily_sentinel.process(NIFTY_TOKEN)
+            actual = bar_sentinel.process(NIFTY_TOKEN)
+
+            assert actual.regime == expected.regime
+            assert actual.spot_price == expected.spot_price
+            for field, value in expected.metrics.model_dump().items():
+                assert getattr(actual.metrics, field) == pytest.approx(value, rel=1e-9), field
+        # A 20-day window of daily bars is shorter than the indicators' warm-up
+        assert bar_sentinel._precomputed_indicators.misses == len(days)
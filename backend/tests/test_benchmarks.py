@@ -0,0 +1,114 @@
+"""Tests for the benchmark runner and datasets"""
+
+import time
+
+import pytest
+
+from benchmarks import Benchmark, BenchmarkResult, BenchmarkRun, compare_runs, load_run, run_benchmarks, save_run, select
+from benchmarks.datasets import BARS_PER_DAY, book_ticks, daily_bars, fingerprint, minute_bars, option_book
+from benchmarks.runner import dataset_mismatches, run_case
+
+
+def sleeper(ms):
+    return lambda: time.sleep(ms / 1000)
+
+
+def result(name, median_ms, error=None):
+    return BenchmarkResult(name=name, group="g", param=None, runs=5, median_ms=median_ms, min_ms=median_ms, error=error)
+
+
+class TestBenchmarkRunner:
+    """Timing, parameters, cleanup and errors."""
+
+    def test_cases_per_parameter_with_ops(self):
+        calls = []
+
+        def case(n):
+            calls.append(n)
+            return sleeper(1), n
+
+        run = run_benchmarks([Benchmark("g.case", "g", case, params=(10, 20), label="{}legs")], budget_s=1)
+        assert calls == [10, 20]
+        assert [r.name for r in run.results] == ["g.case[10legs]", "g.case[20legs]"]
+        first = run.results[0]
+        assert first.runs == 5 and first.ops == 10 and first.param == "10legs"
+        assert first.min_ms <= first.median_ms <= first.max_ms
+        assert 1 <= first.median_ms < 50
+        assert first.per_op_us == pytest.approx(first.median_ms * 100, rel=1e-3)
+        assert run.environment["python"]
+
+    def test_generator_cleanup_and_errors(self):
+        cleaned = []
+
+        def case(_):
+            try:
+                yield sleeper(0)
+            finally:
+                cleaned.append(True)
+
+        def broken(_):
+            yield lambda: 1 / 0
+
+        ok = run_case(Benchmark("g.ok", "g", case), None)
+        failed = run_case(Benchmark("g.broken", "g", broken), None)
+        assert ok.error is None and cleaned == [True]
+        assert failed.error.startswith("ZeroDivisionError") and failed.runs == 0
+
+    def test_slow_case_runs_once(self):
+        calls = []
+
+        def case(_):
+            return lambda: (calls.append(1), time.sleep(0.05))
+
+        slow = run_case(Benchmark("g.slow", "g", case, repeat=5), None, budget_s=0.01)
+        assert slow.runs == 1 and len(calls) == 1
+
+    def test_select_by_pattern_and_parameter(self):
+        benches = [
+            Benchmark("indicators.rsi", "indicators", sleeper(0), params=("1y", "5y")),
+            Benchmark("dc.compute_dc_events", "dc", sleeper(0), params=("1y", "5y")),
+            Benchmark("indicators.skew", "indicators", sleeper(0)),
+        ]
+        picked = select(benches, ["indicators*"], keep=lambda p: p == "1y")
+        assert [(b.name, b.params) for b in picked] == [("indicators.rsi", ("1y",)), ("indicators.skew", (None,))]
+        assert benches[0].params == ("1y", "5y")
+
+
+class TestCompare:
+    """Saved runs compare benchmark by benchmark."""
+
+    def test_compare_statuses(self, tmp_path):
+        baseline = BenchmarkRun(results=[
+            result("a", 10.0), result("b", 10.0), result("c", 10.0), result("d", 10.0), result("gone", 1.0),
+        ], datasets={"minute_bars[1y]": "93750:abc"})
+        candidate = BenchmarkRun(results=[
+            result("a", 10.5), result("b", 15.0), result("c", 5.0), result("d", 0.0, error="Boom"), result("new", 1.0),
+        ], datasets={"minute_bars[1y]": "93750:abd"})
+
+        loaded = load_run(save_run(candidate, tmp_path / "run.json"))
+        assert loaded.results == candidate.results
+
+        statuses = {c.name: c.status for c in compare_runs(baseline, loaded, threshold=0.10)}
+        assert statuses == {"a": "same", "b": "slower", "c": "faster", "d": "error", "new": "new", "gone": "missing"}
+        assert dataset_mismatches(baseline, loaded) == ["minute_bars[1y]"]
+
+
+class TestDatasets:
+    """Synthetic datasets are fixed and shaped like the real inputs."""
+
+    def test_bars_are_deterministic(self):
+        bars = minute_bars(0.02)  # 5 sessions
+        assert len(bars) == 5 * BARS_PER_DAY
+        assert fingerprint(bars) == fingerprint(minute_bars.__wrapped__(0.02))
+        assert fingerprint(bars) != fingerprint(minute_bars(0.02, seed=1))
+        assert (bars["high"] >= bars[["open", "close"]].max(axis=1)).all()
+        assert (bars["low"] <= bars[["open", "close"]].min(axis=1)).all()
+        assert bars["date"].iloc[0].strftime("%H:%M") == "09:15"
+        assert len(daily_bars(0.02)) == 5
+
+    def test_option_book(self):
+        book = option_book(50)
+        assert len(book) == 50 and book == option_book(50)
+        assert len({leg["instrument_token"] for leg in book}) == 50
+        ticks = book_ticks(book)
+        assert [t["instrument_token"] for t in ticks] == [leg["instrument_token"] for leg in book]
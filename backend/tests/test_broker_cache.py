@@ -0,0 +1,145 @@
+"""Tests for the broker read-through cache"""
+
+import threading
+import time
+import pytest
+from concurrent.futures import ThreadPoolExecutor
+
+from app.core.broker_cache import BrokerReadCache
+from app.core.kite_client import KiteClient
+
+
+class SlowFetch:
+    def __init__(self, delay=0.05, fail=False):
+        self.delay = delay
+        self.fail = fail
+        self.calls = 0
+        self.started = threading.Event()
+
+    def __call__(self):
+        self.calls += 1
+        self.started.set()
+        time.sleep(self.delay)
+        if self.fail:
+            raise ConnectionError("broker timeout")
+        return {"net": [{"tradingsymbol": "NIFTY26FEB22400CE", "quantity": -75}], "call": self.calls}
+
+
+class FakeKite:
+    """Stands in for KiteConnect on the live path."""
+
+    def __init__(self):
+        self.counts = {"positions": 0, "margins": 0, "orders": 0}
+
+    def positions(self):
+        self.counts["positions"] += 1
+        time.sleep(0.02)
+        return {"net": [], "day": []}
+
+    def margins(self):
+        self.counts["margins"] += 1
+        return {"equity": {"net": 1_000_000}}
+
+    def orders(self):
+        self.counts["orders"] += 1
+        return []
+
+    def place_order(self, **params):
+        return "order-1"
+
+
+@pytest.fixture
+def live_client():
+    client = KiteClient(api_key="k", access_token="token-a", paper_mode=False, mock_mode=True)
+    client.mock_mode = False
+    client._kite = FakeKite()
+    client._reads = BrokerReadCache()
+    return client
+
+
+class TestBrokerReadCache:
+    """Tests for BrokerReadCache."""
+
+    def test_concurrent_reads_share_one_call(self):
+        cache = BrokerReadCache()
+        fetch = SlowFetch()
+        with ThreadPoolExecutor(max_workers=10) as pool:
+            results = list(pool.map(lambda _: cache.get("positions", fetch, scope="a"), range(10)))
+
+        assert fetch.calls == 1
+        assert all(r == results[0] for r in results)
+        stats = cache.get_stats()["positions"]
+        assert stats["misses"] == 1 and stats["hits"] + stats["coalesced"] == 9
+
+    def test_ttl_bounds_staleness(self):
+        cache = BrokerReadCache(ttls={"orders": 0.05})
+        fetch = SlowFetch(delay=0)
+        cache.get("orders", fetch)
+        cache.get("orders", fetch)
+        assert fetch.calls == 1
+
+        time.sleep(0.06)
+        assert cache.get("orders", fetch)["call"] == 2
+
+    def test_results_are_private_copies(self):
+        cache = BrokerReadCache()
+        first = cache.get("positions", SlowFetch(delay=0))
+        first["net"].clear()
+        assert cache.get("positions", SlowFetch(delay=0))["net"]
+
+    def test_invalidation_during_flight_is_not_cached(self):
+        cache = BrokerReadCache()
+        fetch = SlowFetch(delay=0.05)
+        with ThreadPoolExecutor(max_workers=1) as pool:
+            pending = pool.submit(cache.get, "positions", fetch, "a")
+            fetch.started.wait(1)
+            cache.invalidate("positions", scope="a")  # e.g. an order was placed
+            assert pending.result()["call"] == 1
+
+        assert cache.get("positions", fetch, scope="a")["call"] == 2
+
+    def test_errors_reach_all_waiters_and_are_not_cached(self):
+        cache = BrokerReadCache()
+        fetch = SlowFetch(fail=True)
+        with ThreadPoolExecutor(max_workers=4) as pool:
+            futures = [pool.submit(cache.get, "margins", fetch) for _ in range(4)]
+            for future in futures:
+                with pytest.raises(ConnectionError):
+                    future.result()
+
+        assert fetch.calls == 1
+        fetch.fail = False
+        assert cache.get("margins", fetch)["call"] == 2
+
+    def test_scopes_are_isolated(self):
+        cache = BrokerReadCache()
+        fetch = SlowFetch(delay=0)
+        cache.get("positions", fetch, scope="user-a")
+        cache.get("positions", fetch, scope="user-b")
+        cache.invalidate("positions", scope="user-a")
+        cache.get("positions", fetch, scope="user-b")
+        assert fetch.calls == 2
+
+
+class TestKiteClientReads:
+    """KiteClient live reads go through the cache; writes invalidate it."""
+
+    def test_reads_coalesce_and_orders_invalidate(self, live_client):
+        kite = live_client._kite
+        with ThreadPoolExecutor(max_workers=8) as pool:
+            list(pool.map(lambda _: live_client.get_positions(), range(8)))
+        live_client.get_margins()
+        live_client.get_margins()
+        assert kite.counts["positions"] == 1 and kite.counts["margins"] == 1
+
+        live_client.place_order("NIFTY26FEB22400CE", "NFO", "SELL", 75)
+        live_client.get_positions()
+        live_client.get_margins()
+        assert kite.counts["positions"] == 2 and kite.counts["margins"] == 2
+
+    def test_order_postback_invalidates(self, live_client):
+        kite = live_client._kite
+        live_client.get_orders()
+        live_client._reads.on_order_update({"order_id": "order-1", "status": "COMPLETE"})
+        live_client.get_orders()
+        assert kite.counts["orders"] == 2
@@ -0,0 +1,145 @@
+"""Tests for the streaming rolling correlation service"""
+
+import numpy as np
+import pandas as pd
+import pytest
+from datetime import date, timedelta
+from unittest.mock import Mock
+
+from app.config.settings import Settings
+from app.services.agents.sentinel import Sentinel
+from app.services.utilities.correlation_service import RollingCorrelationService
+
+from tests.test_greeks_aggregator import FakeTicker
+
+
+def random_closes(n_bars=80, assets=("A", "B", "C", "D"), seed=7, gaps=True):
+    rng = np.random.default_rng(seed)
+    common = rng.normal(0, 0.01, n_bars)
+    data = {}
+    for k, name in enumerate(assets):
+        returns = 0.3 * k * common + rng.normal(0, 0.01, n_bars)
+        data[name] = 100 * np.exp(np.cumsum(returns))
+    dates = [date(2026, 1, 1) + timedelta(days=i) for i in range(n_bars)]
+    df = pd.DataFrame(data, index=dates)
+    if gaps:
+        df.iloc[[10, 33, 34, 61], 1] = np.nan
+    return df
+
+
+def pandas_corr(df, window):
+    returns = (df / df.shift(1) - 1).tail(window)
+    return returns.corr(min_periods=10)
+
+
+def feed(service, df):
+    for bar_date, row in df.iterrows():
+        service.update_bar(bar_date, row.dropna().to_dict())
+
+
+class TestRollingCorrelationService:
+    """Tests for RollingCorrelationService."""
+
+    def test_matches_pandas_for_each_window(self):
+        df = random_closes()
+        service = RollingCorrelationService(windows=(20, 60))
+        feed(service, df)
+
+        for window in (20, 60):
+            expected = pandas_corr(df, window)
+            np.testing.assert_allclose(service.get_matrix(window).to_numpy(), expected.to_numpy(), atol=1e-9)
+
+        assert service.get_correlations("D", ["A", "B"]) == pytest.approx(
+            pandas_corr(df, 20).loc["D", ["A", "B"]].to_dict()
+        )
+
+    def test_revising_bars_matches_recompute(self):
+        df = random_closes(gaps=False)
+        service = RollingCorrelationService(windows=(20,))
+        feed(service, df)
+
+        # Intraday revision of today's bar, then a late fix to an older bar
+        revised = df.copy()
+        revised.iloc[-1, 0] *= 1.02
+        revised.iloc[-5, 2] *= 0.99
+        service.update_bar(revised.index[-1], {"A": revised.iloc[-1, 0]})
+        service.update_bar(revised.index[-5], {"C": revised.iloc[-5, 2]})
+
+        np.testing.assert_allclose(service.get_matrix().to_numpy(), pandas_corr(revised, 20).to_numpy(), atol=1e-9)
+
+    def test_backfill_and_late_assets(self):
+        df = random_closes()
+        service = RollingCorrelationService(windows=(20,))
+        service.backfill({name: df[name] for name in ("A", "B")})
+        service.backfill({"C": df["C"], "D": df["D"]})
+
+        np.testing.assert_allclose(service.get_matrix().to_numpy(), pandas_corr(df, 20).to_numpy(), atol=1e-9)
+        assert service.last_bar_date("C") == df.index[-1]
+
+    def test_ticks_revise_todays_bar(self):
+        service = RollingCorrelationService(windows=(20,))
+        service.add_asset("A", token=1)
+        service.add_asset("B", token=2)
+        today = date.today()
+        history = random_closes(n_bars=30, assets=("A", "B"), gaps=False)
+        history.index = [today - timedelta(days=30 - i) for i in range(30)]
+        service.backfill({"A": history["A"], "B": history["B"]})
+
+        ticker = FakeTicker()
+        service.start(ticker)
+        assert ticker.subscribed == {1, 2}
+        ticker.push({1: history["A"].iloc[-1] * 1.01, 2: history["B"].iloc[-1] * 1.01})
+
+        expected = history.copy()
+        expected.loc[today] = history.iloc[-1] * 1.01
+        assert service.get_correlations("A")["B"] == pytest.approx(pandas_corr(expected, 20).loc["A", "B"])
+        assert service.is_streaming("A") and service.last_bar_date("A") == today
+        service.stop()
+        assert ticker.callbacks == []
+
+    def test_history_feeds_spike_detection(self):
+        df = random_closes(gaps=False)
+        service = RollingCorrelationService(windows=(20,), history=15)
+        feed(service, df)
+
+        history = service.get_correlation_history("A", "D")
+        rolling = (df / df.shift(1) - 1)["A"].rolling(20, min_periods=10).corr((df / df.shift(1) - 1)["D"])
+        assert len(history) == 16
+        np.testing.assert_allclose(history.to_numpy(), rolling.tail(16).to_numpy(), atol=1e-9)
+
+    def test_wide_universe_update_is_cheap(self):
+        """Fifty assets, one new bar: a full-matrix update stays sub-millisecond-scale."""
+        import time
+        names = [f"S{i}" for i in range(50)]
+        df = random_closes(n_bars=61, assets=names, gaps=False)
+        service = RollingCorrelationService(windows=(20, 60))
+        service.backfill({name: df[name].iloc[:-1] for name in names})
+
+        start = time.perf_counter()
+        service.update_bar(df.index[-1], df.iloc[-1].to_dict())
+        elapsed = time.perf_counter() - start
+
+        np.testing.assert_allclose(service.get_matrix(60).to_numpy(), pandas_corr(df, 60).to_numpy(), atol=1e-9)
+        assert elapsed < 0.01
+
+
+class TestSentinelCorrelations:
+    """Sentinel reads correlations from the service and fetches only what changed."""
+
+    def test_backfills_once_then_reads_without_fetching(self):
+        df = random_closes(n_bars=60, assets=("NIFTY", "BANKNIFTY"), gaps=False)
+        df.index = pd.to_datetime(df.index)
+        kite = Mock()
+        kite.fetch_historical_data.side_effect = lambda token, *args: pd.DataFrame(
+            {"close": df["BANKNIFTY"] if token == 260105 else df["NIFTY"]}
+        )
+        sentinel = Sentinel(kite, Settings(), None)
+        primary_daily = pd.DataFrame({"close": df["NIFTY"]})
+
+        first = sentinel._calculate_correlations(256265, primary_daily)
+        second = sentinel._calculate_correlations(256265, primary_daily)
+
+        expected = pandas_corr(df, 20).loc["NIFTY", "BANKNIFTY"]
+        assert first["BANKNIFTY"] == pytest.approx(expected)
+        assert second == first
+        assert kite.fetch_historical_data.call_count == 1  # BANKNIFTY backfill only
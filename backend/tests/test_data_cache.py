@@ -0,0 +1,40 @@
+"""Tests for the historical data cache"""
+
+import threading
+import pandas as pd
+
+from app.core.data_cache import DataCache
+
+
+def daily(start, days):
+    dates = pd.date_range(start, periods=days, freq="D")
+    return pd.DataFrame({"close": range(days)}, index=pd.DatetimeIndex(dates, name="date"))
+
+
+class TestDataCache:
+    """Tests for DataCache."""
+
+    def test_concurrent_puts_keep_every_row(self, tmp_path):
+        """Pipelines writing the same instrument at once do not lose each other's rows."""
+        cache = DataCache(tmp_path)
+        frames = [daily(pd.Timestamp("2025-01-01") + pd.Timedelta(days=10 * i), 10) for i in range(8)]
+        barrier = threading.Barrier(len(frames))
+
+        def put(df):
+            barrier.wait()
+            cache.put(264969, "day", df)
+
+        threads = [threading.Thread(target=put, args=(df,)) for df in frames]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+
+        stored = pd.read_parquet(tmp_path / "264969_day.parquet")
+        assert len(stored) == 80
+
+    def test_memory_hit_after_put(self, tmp_path):
+        cache = DataCache(tmp_path)
+        df = daily("2025-01-01", 5)
+        cache.put(256265, "day", df)
+        assert cache.get(256265, "day", df.index[0].date(), df.index[-1].date()) is df
@@ -0,0 +1,77 @@
+"""Tests for the indexed event calendar"""
+
+import pytest
+from datetime import date, timedelta
+
+from app.services.utilities.event_calendar import EventCalendar, EventType
+
+
+@pytest.fixture
+def calendar(tmp_path):
+    cal = EventCalendar(data_dir=tmp_path)
+    cal._add_default_2026_events()
+    cal._compile()
+    cal._loaded = True
+    return cal
+
+
+def naive_is_trading_day(cal, d):
+    if d.weekday() >= 5:
+        return False
+    return not any(e["type"] == EventType.HOLIDAY.value and e["date"] == d for e in cal._events)
+
+
+class TestEventCalendar:
+    """Tests for EventCalendar indexes."""
+
+    def test_blackout_windows(self, calendar):
+        """RBI T-1..T+1 window and budget explicit window are found by bisect."""
+        assert calendar.check_blackout(date(2026, 4, 7)) == (True, "RBI MPC April 2026", 1)
+        assert calendar.check_blackout(date(2026, 4, 9)) == (True, "RBI MPC April 2026", -1)
+        assert calendar.check_blackout(date(2026, 4, 10))[0]  # Good Friday
+        assert calendar.check_blackout(date(2026, 4, 20)) == (False, None, None)
+
+    def test_overlapping_windows_keep_load_order(self, calendar):
+        """Gandhi Jayanti and the October RBI meeting share a date; the first loaded wins."""
+        blocked, name, days = calendar.check_blackout(date(2026, 10, 2))
+        assert blocked and name == "Gandhi Jayanti" and days == 0
+        assert calendar.check_blackout(date(2026, 10, 3))[1] == "RBI MPC October 2026"
+
+    def test_trading_days_match_naive_scan(self, calendar):
+        d = date(2026, 1, 1)
+        while d < date(2027, 1, 1):
+            assert calendar.is_trading_day(d) == naive_is_trading_day(calendar, d)
+            d += timedelta(days=1)
+
+    def test_trading_day_arithmetic(self, calendar):
+        # Dussehra Tue/Wed 20-21 Oct 2026
+        assert calendar.get_next_trading_day(date(2026, 10, 16)) == date(2026, 10, 19)
+        assert calendar.get_next_trading_day(date(2026, 10, 19)) == date(2026, 10, 22)
+        assert calendar.get_previous_trading_day(date(2026, 10, 22)) == date(2026, 10, 19)
+        assert calendar.trading_days_between(date(2026, 10, 16), date(2026, 10, 23)) == 3
+        assert calendar.trading_days_between(date(2026, 10, 23), date(2026, 10, 16)) == -3
+        assert calendar.add_trading_days(date(2026, 10, 16), 3) == date(2026, 10, 23)
+        assert calendar.add_trading_days(date(2026, 10, 23), -3) == date(2026, 10, 16)
+
+        # Far outside the compiled range extends the calendar
+        far = date(2030, 6, 3)  # Monday
+        assert calendar.add_trading_days(far, 5) == date(2030, 6, 10)
+
+    def test_add_event_updates_indexes_incrementally(self, calendar):
+        thursday = date(2026, 10, 22)
+        before = calendar.trading_days_between(date(2026, 10, 16), date(2026, 10, 30))
+
+        calendar.add_event("Special Holiday", thursday, EventType.HOLIDAY, persist=False)
+        calendar.add_event("CPI Print", date(2026, 10, 27), EventType.MACRO, persist=False)
+
+        assert not calendar.is_trading_day(thursday)
+        assert calendar.get_next_trading_day(date(2026, 10, 19)) == date(2026, 10, 23)
+        assert calendar.trading_days_between(date(2026, 10, 16), date(2026, 10, 30)) == before - 1
+        assert calendar.check_blackout(date(2026, 10, 26)) == (True, "CPI Print", 1)
+
+        fresh = EventCalendar(data_dir=calendar.data_dir)
+        fresh._events = list(calendar._events)
+        fresh._compile()
+        fresh._loaded = True
+        assert fresh.trading_days_between(date(2026, 1, 1), date(2026, 12, 31)) == \
+            calendar.trading_days_between(date(2026, 1, 1), date(2026, 12, 31))
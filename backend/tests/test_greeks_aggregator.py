@@ -0,0 +1,214 @@
+"""Tests for tick-driven live Greeks aggregation"""
+
+import time
+import pytest
+from types import SimpleNamespace
+from datetime import date, timedelta
+
+from app.models.position import Position
+from app.models.trade import LegType, StructureType, TradeLeg
+from app.services.execution.greek_hedger import GreekHedger
+from app.services.execution.greeks_aggregator import LiveGreeksAggregator
+from app.services.utilities.option_pricing import BlackScholesCalculator
+
+
+NIFTY_TOKEN = 256265
+EXPIRY = date.today() + timedelta(days=14)
+
+
+class FakeTicker:
+    def __init__(self):
+        self.callbacks = []
+        self.subscribed = set()
+        self.started = False
+
+    def ensure_started(self):
+        self.started = True
+        return True
+
+    def add_callback(self, cb):
+        self.callbacks.append(cb)
+
+    def remove_callback(self, cb):
+        self.callbacks.remove(cb)
+
+    def subscribe(self, tokens):
+        self.subscribed.update(tokens)
+
+    def push(self, prices):
+        ticks = [{"instrument_token": t, "last_price": p} for t, p in prices.items()]
+        for cb in self.callbacks:
+            cb(ticks)
+
+
+def make_leg(leg_type, strike, price, delta):
+    opt = "CE" if "CALL" in leg_type.value else "PE"
+    return TradeLeg(
+        leg_type=leg_type,
+        tradingsymbol=f"NIFTY26FEB{strike}{opt}",
+        instrument_token=strike,
+        strike=strike,
+        expiry=EXPIRY,
+        option_type=opt,
+        quantity=75,
+        entry_price=price,
+        delta=delta,
+    )
+
+
+def make_position(short_call_delta=0.3):
+    return Position(
+        signal_id="s1",
+        strategy_type=StructureType.NAKED_STRANGLE,
+        instrument="NIFTY",
+        instrument_token=NIFTY_TOKEN,
+        legs=[
+            make_leg(LegType.SHORT_CALL, 22400, 80.0, short_call_delta),
+            make_leg(LegType.SHORT_PUT, 21800, 70.0, -0.25),
+        ],
+        entry_price=150.0,
+        entry_margin=150_000,
+        target_pnl=5000,
+        stop_loss=-5000,
+        max_loss=20000,
+        expiry=EXPIRY,
+        days_to_expiry=14,
+        regime_at_entry="RANGE_BOUND",
+        exit_target_low=0.25,
+        exit_target_high=0.5,
+        current_target=5000,
+    )
+
+
+@pytest.fixture
+def ticker():
+    return FakeTicker()
+
+
+@pytest.fixture
+def aggregator(ticker):
+    agg = LiveGreeksAggregator(ticker=ticker, coalesce_interval=0, hedger_interval=0)
+    agg.start()
+    yield agg
+    agg.stop()
+
+
+class TestLiveGreeksAggregator:
+    """Tests for LiveGreeksAggregator."""
+
+    def test_entry_greeks_until_spot_known(self, aggregator, ticker):
+        """Without an underlying tick, totals equal the static entry-Greek sum."""
+        aggregator.add_position(make_position())
+
+        assert aggregator.get_portfolio_greeks()["delta"] == pytest.approx(75 * (-0.3 + 0.25))
+        assert {NIFTY_TOKEN, 22400, 21800} <= ticker.subscribed
+
+    def test_spot_tick_reprices_and_feeds_hedger(self, ticker):
+        """A spot move reprices delta and the hedger sees the new total."""
+        hedger = GreekHedger(equity=1_000_000)
+        agg = LiveGreeksAggregator(hedger=hedger, ticker=ticker, coalesce_interval=0, hedger_interval=0)
+        agg.start()
+        agg.add_position(make_position())
+
+        ticker.push({NIFTY_TOKEN: 22100})
+        delta_flat = agg.get_portfolio_greeks()["delta"]
+        ticker.push({NIFTY_TOKEN: 22350})
+        delta_up = agg.get_portfolio_greeks()["delta"]
+
+        assert delta_up < delta_flat  # Short call gains delta as spot rallies
+        assert hedger.metrics.portfolio_delta == pytest.approx(delta_up)
+
+    def test_refresh_seeds_quotes_without_ticks(self, ticker):
+        """Before any tick arrives, refresh() prices legs from get_ltp."""
+        quotes = {NIFTY_TOKEN: 22100.0, 22400: 60.0, 21800: 55.0}
+        kite = SimpleNamespace(get_ltp=lambda tokens: {t: quotes[t] for t in tokens})
+        agg = LiveGreeksAggregator(ticker=ticker, kite=kite, coalesce_interval=0, hedger_interval=0)
+        agg.start()
+        agg.add_position(make_position())
+
+        agg.refresh()
+
+        assert ticker.started
+        assert agg.get_status()["underlyings"]["NIFTY"] == 22100.0
+        assert agg.stats["quote_seeds"] == 1
+
+        ticker.push({NIFTY_TOKEN: 22150.0})
+        agg.refresh()
+        assert agg.stats["quote_seeds"] == 1  # Live ticks: no polling
+
+    def test_executor_position_uses_index_spot(self, aggregator, ticker, monkeypatch):
+        """A position built by the executor takes spot from the index, not its legs."""
+        from tests.test_multi_leg_execution import FakeKite, iron_condor, make_executor
+
+        executor = make_executor(monkeypatch, FakeKite(delay=0))
+        signal = iron_condor()
+        assert executor.process(signal).success
+        position = next(iter(executor._positions.values()))  # From _create_position
+        assert position.instrument_token == NIFTY_TOKEN
+
+        # Positions persisted before the fix carry their first leg's token
+        legacy = position.model_copy(update={"id": "legacy", "instrument_token": signal.legs[0].instrument_token})
+        aggregator.add_position(position)
+        aggregator.add_position(legacy)
+        ticker.push({signal.legs[0].instrument_token: 60.0, signal.legs[1].instrument_token: 55.0})
+        assert aggregator.get_status()["underlyings"]["NIFTY"] is None
+
+        ticker.push({NIFTY_TOKEN: 22100.0})
+        assert aggregator.get_status()["underlyings"]["NIFTY"] == 22100.0
+
+    def test_matches_scalar_greeks(self, aggregator, ticker):
+        """Vectorized totals equal per-leg calculate_greeks at the tracked vol."""
+        position = make_position()
+        aggregator.add_position(position)
+        ticker.push({NIFTY_TOKEN: 22100, 22400: 95.0, 21800: 60.0})
+
+        vols = aggregator._vol
+        now = time.time()
+        expected = 0.0
+        for i, leg in enumerate(position.legs):
+            ttm = (aggregator._expiry_ts[i] - now) / (365 * 24 * 3600)
+            g = BlackScholesCalculator.calculate_greeks(leg.option_type, 22100, leg.strike, ttm, vols[i])
+            expected -= g["gamma"] * 75
+
+        assert aggregator.get_portfolio_greeks()["gamma"] == pytest.approx(expected, rel=1e-3)
+
+    def test_option_tick_updates_implied_vol(self, aggregator, ticker):
+        """A richer option price raises that leg's implied vol."""
+        aggregator.add_position(make_position())
+        ticker.push({NIFTY_TOKEN: 22100, 22400: 60.0})
+        vol_before = aggregator._vol[0]
+        ticker.push({22400: 90.0})
+
+        assert aggregator._vol[0] > vol_before
+
+    def test_incremental_totals_by_strategy_and_underlying(self, aggregator, ticker):
+        """Totals per strategy/underlying stay consistent and removal clears them."""
+        first, second = make_position(), make_position()
+        aggregator.add_position(first)
+        aggregator.add_position(second)
+
+        for spot in (22000, 22150, 22300):
+            ticker.push({NIFTY_TOKEN: spot})
+
+        by_strategy = aggregator.get_strategy_greeks()
+        portfolio = aggregator.get_portfolio_greeks()
+        assert sum(s["delta"] for s in by_strategy.values()) == pytest.approx(portfolio["delta"])
+        assert aggregator.get_underlying_greeks()["NIFTY"]["vega"] == pytest.approx(portfolio["vega"])
+        assert first.greeks["delta"] == pytest.approx(by_strategy[first.id]["delta"])
+
+        aggregator.remove_position(first.id)
+        assert aggregator.get_portfolio_greeks()["delta"] == pytest.approx(by_strategy[second.id]["delta"])
+
+    def test_hundreds_of_legs_at_tick_rate(self, aggregator, ticker):
+        """A full repricing pass over 400 legs is well under a millisecond budget per tick."""
+        for _ in range(200):
+            aggregator.add_position(make_position())
+        ticker.push({NIFTY_TOKEN: 22100})
+
+        start = time.perf_counter()
+        for i in range(100):
+            ticker.push({NIFTY_TOKEN: 22100 + i})
+        per_tick = (time.perf_counter() - start) / 100
+
+        assert aggregator.stats["legs_repriced"] >= 400 * 100
+        assert per_tick < 0.005
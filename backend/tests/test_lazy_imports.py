@@ -0,0 +1,59 @@
+"""Tests for lazy package exports and API cold-start imports"""
+
+import os
+import subprocess
+import sys
+import types
+from pathlib import Path
+
+import pytest
+
+from app.core.lazy import lazy_exports
+
+
+BACKEND_DIR = Path(__file__).parent.parent
+
+
+class TestLazyExports:
+    """Names resolve from their submodule on first access."""
+
+    def test_resolves_and_caches(self):
+        package = types.ModuleType("lazy_pkg")
+        sys.modules["lazy_pkg"] = package
+        try:
+            package.__getattr__, package.__dir__ = lazy_exports("lazy_pkg", {"json": ["dumps", "loads"]})
+            assert "dumps" in dir(package) and "dumps" not in vars(package)
+
+            import json
+            assert package.dumps is json.dumps
+            assert vars(package)["dumps"] is json.dumps  # Cached after first access
+            with pytest.raises(AttributeError):
+                package.missing
+        finally:
+            del sys.modules["lazy_pkg"]
+
+    def test_package_exports_unchanged(self):
+        from app.services import agents, execution, indicators, strategies, utilities
+        from app.services.agents.sentinel import Sentinel
+        from app.services.execution.margin_service import get_margin_service
+
+        assert agents.Sentinel is Sentinel
+        assert execution.get_margin_service is get_margin_service
+        for package in (agents, execution, indicators, strategies, utilities):
+            assert all(getattr(package, name) for name in package.__all__)
+
+
+class TestColdStart:
+    """Importing the API app leaves the scientific stack unloaded."""
+
+    def test_app_import_skips_heavy_libraries(self, tmp_path):
+        script = (
+            "import sys, app.main; "
+            "print('loaded:', [m for m in ('pandas', 'scipy', 'sklearn', 'hmmlearn', 'talib') if m in sys.modules])"
+        )
+        env = dict(os.environ, DATABASE_URL=f"sqlite:///{tmp_path}/startup.db")
+        proc = subprocess.run(
+            [sys.executable, "-c", script], cwd=BACKEND_DIR, env=env, capture_output=True, text=True
+        )
+        assert proc.returncode == 0, proc.stderr[-500:]
+        assert proc.stdout.strip().splitlines()[-1] == "loaded: []"
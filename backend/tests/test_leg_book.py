@@ -0,0 +1,130 @@
+"""Tests for the struct-of-arrays open-leg book"""
+
+import random
+import tracemalloc
+from datetime import date, timedelta
+
+from app.models.position import Position, PositionStatus
+from app.models.trade import LegType, StructureType, TradeLeg
+from app.services.execution.leg_book import LegBook
+from tests.test_multi_leg_execution import FakeKite, iron_condor, make_executor
+
+
+def make_position(rng, legs=4, target=2500.0, stop=-1750.0):
+    leg_models = []
+    for _ in range(legs):
+        leg_type = rng.choice(list(LegType))
+        strike = rng.randrange(21000, 23000, 50)
+        leg_models.append(TradeLeg(
+            leg_type=leg_type,
+            tradingsymbol=f"NIFTY{strike}",
+            instrument_token=strike,  # Strikes repeat across positions, like shared contracts
+            quantity=rng.choice([25, 50, 75]),
+            entry_price=round(rng.uniform(5, 200), 2),
+            current_price=rng.choice([None, round(rng.uniform(5, 200), 2)]),
+        ))
+    return Position(
+        signal_id="s",
+        strategy_type=StructureType.IRON_CONDOR,
+        instrument="NIFTY",
+        instrument_token=256265,
+        legs=leg_models,
+        entry_price=53.0,
+        entry_margin=100_000,
+        target_pnl=target,
+        stop_loss=stop,
+        max_loss=5000,
+        expiry=date.today() + timedelta(days=10),
+        days_to_expiry=10,
+        regime_at_entry="RANGE_BOUND",
+        exit_target_low=140,
+        exit_target_high=180,
+        current_target=target,
+    )
+
+
+def random_prices(rng, positions):
+    tokens = {leg.instrument_token for p in positions for leg in p.legs}
+    return {t: round(rng.uniform(0, 250), 2) for t in tokens if rng.random() < 0.7}
+
+
+class TestLegBook:
+    """Book valuation matches the Position models."""
+
+    def test_matches_position_update_pnl(self):
+        rng = random.Random(7)
+        positions = [make_position(rng, legs=rng.randint(1, 6), target=300, stop=-300) for _ in range(40)]
+        shadow = [p.model_copy(deep=True) for p in positions]
+        book = LegBook()
+        book.set_positions(positions)
+
+        for _ in range(20):
+            prices = random_prices(rng, positions)
+            book.update(prices)
+            profit_hit, stop_hit = book.exit_flags()
+            for i, (position, model) in enumerate(zip(positions, shadow)):
+                model.update_pnl(prices)
+                assert book.sync(position)
+                assert abs(position.current_pnl - model.current_pnl) < 1e-6
+                assert abs(position.current_price - model.current_price) < 1e-6
+                assert abs(position.current_pnl_pct - model.current_pnl_pct) < 1e-9
+                assert [l.current_price for l in position.legs] == [l.current_price for l in model.legs]
+                assert profit_hit[i] == model.should_exit_profit()
+                assert stop_hit[i] == model.should_exit_stop()
+
+    def test_update_allocates_nothing(self):
+        rng = random.Random(3)
+        positions = [make_position(rng) for _ in range(250)]
+        book = LegBook()
+        book.set_positions(positions)
+        prices = random_prices(rng, positions)
+        book.update(prices)
+        book.exit_flags()
+
+        tracemalloc.start()
+        try:
+            before, _ = tracemalloc.get_traced_memory()
+            tracemalloc.reset_peak()
+            for _ in range(100):
+                book.update(prices)
+                book.exit_flags()
+            after, peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+        assert after - before <= 0
+        assert peak - before < 1024  # Transient scalars only, no arrays or models
+
+    def test_closed_and_replaced_positions_are_skipped(self):
+        rng = random.Random(1)
+        open_position, closed = make_position(rng), make_position(rng)
+        closed.status = PositionStatus.CLOSED
+        book = LegBook()
+        book.set_positions([open_position, closed])
+
+        assert book.position_ids == [open_position.id]
+        assert len(book) == len(open_position.legs)
+        assert not book.sync(closed)
+        assert not book.sync(open_position.model_copy())  # Same id, not the laid-out model
+        assert book.memory_bytes() / len(book) < 200
+
+
+class TestExecutorMonitoring:
+    """Executor monitors positions through the book."""
+
+    def test_profit_exit_and_synced_models(self, monkeypatch):
+        executor = make_executor(monkeypatch, FakeKite(delay=0))
+        result = executor.process(iron_condor())
+        position = executor.get_positions()[0]
+        assert result.success and executor._leg_book.position_ids == [position.id]
+
+        # Shorts bought back near zero: the credit is kept
+        prices = {leg.instrument_token: (0.5 if leg.is_long else 1.0) for leg in position.legs}
+        exits = executor.monitor_positions(prices, check_greeks=False)
+
+        assert [e.exit_type for e in exits] == ["PROFIT_TARGET"]
+        assert position.current_pnl >= position.current_target
+        executor.get_positions()  # API boundary writes leg prices back
+        assert [leg.current_price for leg in position.legs] == [0.5, 1.0, 1.0, 0.5]
+
+        executor.execute_exit(exits[0])
+        assert executor._leg_book.position_ids == []
@@ -0,0 +1,157 @@
+"""Tests for the local SPAN-like margin service and TTL cache"""
+
+import threading
+import time
+import pytest
+from datetime import date, timedelta
+
+from app.core.ttl_cache import TTLCache
+from app.services.execution.margin_service import MarginLeg, MarginService
+
+
+EXPIRY = date.today() + timedelta(days=14)
+
+
+class FakeKite:
+    """Returns a fixed basket margin and counts broker calls."""
+
+    mock_mode = False
+
+    def __init__(self, total=150_000, release=None):
+        self.total = total
+        self.calls = 0
+        self.release = release  # Event the call waits on (a slow broker)
+
+    def get_basket_margins(self, basket):
+        self.calls += 1
+        if self.release:
+            self.release.wait(2)
+        return {"final": {"total": self.total}}
+
+
+def leg(strike, opt, qty, price):
+    return MarginLeg(
+        tradingsymbol=f"NIFTY26FEB{strike}{opt}",
+        quantity=qty,
+        price=price,
+        expiry=EXPIRY,
+    )
+
+
+def iron_condor(lots=1):
+    q = 75 * lots
+    return [
+        leg(21500, "PE", q, 20.0),
+        leg(21800, "PE", -q, 45.0),
+        leg(22400, "CE", -q, 50.0),
+        leg(22700, "CE", q, 22.0),
+    ]
+
+
+@pytest.fixture
+def service():
+    s = MarginService()
+    s.update_spot("NIFTY", 22100)
+    return s
+
+
+class TestTTLCache:
+    """Tests for TTLCache."""
+
+    def test_expiry_and_bound(self):
+        cache = TTLCache(maxsize=2, ttl=0.05)
+        cache.set("a", 1)
+        cache.set("b", 2)
+        cache.get("a")
+        cache.set("c", 3)  # Evicts least recently used "b"
+
+        assert cache.get("a") == 1
+        assert cache.get("b") is None
+        time.sleep(0.06)
+        assert cache.get("a") is None
+        assert cache.get("c") is None
+
+
+class TestMarginService:
+    """Tests for MarginService."""
+
+    def test_symbol_parsing(self):
+        """Monthly, weekly and futures symbols are parsed."""
+        monthly = MarginLeg("NIFTY26FEB22000CE", -75, 100.0)
+        assert (monthly.underlying, monthly.strike, monthly.instrument_type) == ("NIFTY", 22000, "CE")
+        assert monthly.expiry == date(2026, 2, 24)  # Last Tuesday
+
+        weekly = MarginLeg("NIFTY2621222000PE", -75, 100.0)
+        assert weekly.expiry == date(2026, 2, 12)
+        assert weekly.strike == 22000
+
+        fut = MarginLeg("BANKNIFTY26FEBFUT", 30, 48000.0)
+        assert fut.instrument_type == "FUT" and fut.is_span
+
+    def test_hedged_cheaper_than_naked(self, service):
+        """Long wings reduce the margin of the short strangle."""
+        condor = service.estimate(iron_condor())
+        strangle = service.estimate([l for l in iron_condor() if l.quantity < 0])
+
+        assert 0 < condor.total < strangle.total
+        assert condor.premium == pytest.approx(75 * (20.0 + 22.0))
+
+    def test_lot_multiples_share_cache_entry(self, service):
+        """Three lots reuse the one-lot entry and scale linearly."""
+        one = service.estimate(iron_condor(1))
+        three = service.estimate(iron_condor(3))
+
+        assert three.cached
+        assert three.total == pytest.approx(3 * one.total)
+        assert service.stats["local"] == 1
+
+    def test_price_and_vol_are_part_of_cache_key(self, service):
+        """Repriced legs or a new vol are not served the old entry."""
+        service.estimate(iron_condor())
+        repriced = iron_condor()
+        repriced[0].price = 25.0
+
+        assert not service.estimate(repriced).cached
+        service.update_vol("NIFTY", 0.2)
+        assert not service.estimate(iron_condor()).cached
+        assert service.stats["local"] == 3
+
+    def test_calibration_rate_limited(self):
+        """Broker is called once per underlying per interval and scales the estimate."""
+        local = MarginService()
+        local.update_spot("NIFTY", 22100)
+        raw = local.estimate(iron_condor())
+
+        kite = FakeKite(total=raw.total + raw.span)  # Broker scan risk is twice ours
+        service = MarginService(kite=kite, calibration_interval=3600)
+        service.update_spot("NIFTY", 22100)
+
+        for lots in range(1, 6):
+            service.estimate(iron_condor(lots))
+        service._calibration_thread.join(2)
+
+        assert kite.calls == 1
+        calibrated = service.estimate(iron_condor())
+        assert calibrated.total == pytest.approx(kite.total, rel=1e-6)
+        assert calibrated.calibration["NIFTY"] == pytest.approx(2.0)
+
+    def test_calibration_does_not_block_estimate(self):
+        """A slow broker call runs in the background; the estimate uses the old factor."""
+        release = threading.Event()
+        kite = FakeKite(release=release)
+        service = MarginService(kite=kite)
+        service.update_spot("NIFTY", 22100)
+
+        estimate = service.estimate(iron_condor())
+
+        assert estimate.calibration["NIFTY"] == 1.0
+        assert kite.calls == 1
+        release.set()
+        service._calibration_thread.join(2)
+        assert service.get_calibration()["NIFTY"]["samples"] == 1
+
+    def test_non_derivative_legs_use_flat_margin(self, service):
+        """MCX legs fall back to percentage-of-notional margin."""
+        estimate = service.estimate([MarginLeg("CRUDEOIL26FEBFUT", 1, 6000.0, exchange="MCX")])
+        assert estimate.span == 0
+        assert estimate.other > 0
@@ -0,0 +1,123 @@
+"""Tests for latency histograms and the /metrics endpoint"""
+
+import asyncio
+
+import pytest
+
+from app.core.metrics import (
+    ENGINE_CYCLE_SECONDS, ENGINE_STAGE_SECONDS, Histogram, MetricsRegistry, broker_category, get_metrics
+)
+from tests.test_trading_engine import NIFTY, make_engine
+
+
+@pytest.fixture
+def engine_metrics():
+    ENGINE_STAGE_SECONDS.reset()
+    ENGINE_CYCLE_SECONDS.reset()
+    yield
+    ENGINE_STAGE_SECONDS.reset()
+    ENGINE_CYCLE_SECONDS.reset()
+
+
+class TestHistogram:
+    """Buckets, quantiles and the text format."""
+
+    def test_buckets_are_cumulative(self):
+        hist = Histogram("op_seconds", "Op latency", ["op"], buckets=(0.01, 0.1, 1.0))
+        for seconds in (0.005, 0.01, 0.05, 2.0):
+            hist.observe(seconds, op="read")
+
+        lines = hist.render()
+        assert 'op_seconds_bucket{op="read",le="0.01"} 2' in lines
+        assert 'op_seconds_bucket{op="read",le="0.1"} 3' in lines
+        assert 'op_seconds_bucket{op="read",le="1.0"} 3' in lines
+        assert 'op_seconds_bucket{op="read",le="+Inf"} 4' in lines
+        assert 'op_seconds_count{op="read"} 4' in lines
+        assert "# TYPE op_seconds_recent summary" in lines
+
+    def test_recent_quantiles(self):
+        hist = Histogram("op_seconds", "Op latency", window=100)
+        for ms in range(1, 201):
+            hist.observe(ms / 1000)
+
+        row = hist.snapshot()[0]
+        assert row["count"] == 200  # All-time
+        assert row["p50"] == pytest.approx(0.150)  # Last 100 samples only
+        assert row["p95"] == pytest.approx(0.195)
+        assert row["p99"] == pytest.approx(0.199)
+
+    def test_labels_must_match(self):
+        hist = Histogram("op_seconds", "Op latency", ["op"])
+        with pytest.raises(ValueError):
+            hist.observe(0.1)
+        with pytest.raises(ValueError):
+            hist.observe(0.1, op="read", extra="x")
+
+    def test_time_records_on_error(self):
+        hist = Histogram("op_seconds", "Op latency", ["op"])
+        with pytest.raises(RuntimeError):
+            with hist.time(op="fail"):
+                raise RuntimeError("boom")
+        assert hist.snapshot()[0]["count"] == 1
+
+    def test_registry_returns_same_histogram(self):
+        registry = MetricsRegistry()
+        hist = registry.histogram("op_seconds", "Op latency", ["op"])
+        assert registry.histogram("op_seconds", "Op latency", ["op"]) is hist
+        with pytest.raises(ValueError):
+            registry.histogram("op_seconds", "Op latency", ["other"])
+
+        hist.observe(0.002, op="read")
+        stats = registry.get_stats()["op_seconds"][0]
+        assert stats["op"] == "read" and stats["p99_ms"] == 2.0
+        assert registry.render().endswith("\n")
+
+    def test_broker_categories(self):
+        assert broker_category("ltp") == "quote"
+        assert broker_category("place_order") == "orders"
+        assert broker_category("unknown_call") == "other"
+
+
+class TestEngineMetrics:
+    """TradingEngine records each step and the whole cycle."""
+
+    def test_cycle_records_every_stage(self, engine_metrics):
+        engine, _ = make_engine(factory=False)
+        engine.run_cycle([NIFTY])
+
+        stages = {row["stage"]: row["count"] for row in ENGINE_STAGE_SECONDS.snapshot()}
+        assert stages == {
+            "sentinel": 1, "strategist": 1, "treasury_state": 1, "exit_monitoring": 1,
+            "safety": 1, "treasury_validation": 1, "execution": 1,
+        }
+        assert ENGINE_CYCLE_SECONDS.snapshot()[0]["count"] == 1
+
+    def test_metrics_endpoint(self, engine_metrics):
+        from app.api.routes import get_latency_metrics, get_latency_summary
+
+        engine, _ = make_engine(factory=False)
+        engine.run_cycle([NIFTY])
+
+        response = asyncio.run(get_latency_metrics())
+        body = response.body.decode()
+        assert response.media_type.startswith("text/plain")
+        assert 'trading_engine_stage_seconds_count{stage="execution"} 1' in body
+        assert 'trading_engine_stage_seconds_recent{stage="sentinel",quantile="0.99"}' in body
+
+        summary = asyncio.run(get_latency_summary())
+        assert summary == get_metrics().get_stats()
+        assert {row["stage"] for row in summary["trading_engine_stage_seconds"]} >= {"sentinel", "execution"}
+
+
+class TestDatabaseMetrics:
+    """Repository sessions are timed open-to-close."""
+
+    def test_sessions_are_timed(self, tmp_path):
+        from app.core.metrics import DB_SESSION_SECONDS
+        from app.database.repository import Repository
+
+        repo = Repository(f"sqlite:///{tmp_path}/metrics.db")
+        DB_SESSION_SECONDS.reset()
+        repo.get_trade("missing")
+        repo.get_trade("missing")
+        assert DB_SESSION_SECONDS.snapshot()[0]["count"] == 2
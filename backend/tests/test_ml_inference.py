@@ -0,0 +1,123 @@
+"""Tests for batched ML regime inference and precomputed backtest lookups"""
+
+import time
+import numpy as np
+import pandas as pd
+import pytest
+from unittest.mock import Mock
+from sklearn.linear_model import LogisticRegression
+from sklearn.preprocessing import StandardScaler
+
+from app.config.settings import Settings
+from app.models.regime import RegimeMetrics, RegimeType
+from app.services.agents.regime_classifier import (
+    LIVE_FEATURE_NAMES,
+    PrecomputedRegimes,
+    RegimeClassifier,
+    predict_batch,
+)
+from app.services.agents.sentinel import Sentinel
+
+
+def make_classifier(n_rows=400, seed=5):
+    rng = np.random.default_rng(seed)
+    X = rng.normal(size=(n_rows, len(LIVE_FEATURE_NAMES)))
+    y = np.digitize(X[:, 1] + 0.5 * X[:, 0], [-0.8, 0, 0.8])  # Four classes
+    scaler = StandardScaler().fit(X)
+    model = LogisticRegression(max_iter=500).fit(scaler.transform(X), y)
+    return RegimeClassifier(model=model, scaler=scaler), X
+
+
+def make_feature_frame(X, start="2024-01-01"):
+    frame = pd.DataFrame(X, columns=LIVE_FEATURE_NAMES)
+    frame.insert(0, "date", pd.bdate_range(start, periods=len(X)))
+    return frame
+
+
+def metrics_for(row):
+    return RegimeMetrics(
+        iv_percentile=row[0], adx=row[1], rsi=row[2], realized_vol=row[3],
+        rv_atr_ratio=row[4], india_vix=14.0, atr=100
+    )
+
+
+class TestBatchInference:
+    """predict_batch matches per-row predict/predict_proba."""
+
+    def test_matches_single_row_calls(self):
+        classifier, X = make_classifier()
+        labels, probabilities = classifier.predict_batch(X[:50])
+
+        for i in range(50):
+            row = X[i:i + 1]
+            assert labels[i] == classifier.predict(row)[0]
+            assert probabilities[i] == pytest.approx(classifier.predict_proba(row)[0].max())
+
+    def test_works_with_pickled_wrappers(self):
+        classifier, X = make_classifier()
+
+        class Wrapper:  # Shape of the Monk / training-script wrappers
+            def __init__(self, clf, scaler):
+                self.classifier = clf
+                self.scaler = scaler
+
+            def predict_proba(self, X):
+                return self.classifier.predict_proba(self.scaler.transform(X))
+
+        labels, _ = predict_batch(Wrapper(classifier.model, classifier.scaler), X)
+        np.testing.assert_array_equal(labels, classifier.predict(X))
+
+    def test_batch_is_much_cheaper_than_row_calls(self):
+        classifier, X = make_classifier()
+
+        start = time.perf_counter()
+        for i in range(200):
+            classifier.predict_regime(X[i:i + 1])
+        per_row = time.perf_counter() - start
+
+        start = time.perf_counter()
+        classifier.predict_batch(X[:200])
+        batched = time.perf_counter() - start
+
+        assert batched * 10 < per_row
+
+
+class TestPrecomputedRegimes:
+    """Tests for PrecomputedRegimes."""
+
+    def test_lookup_by_timestamp(self):
+        classifier, X = make_classifier(n_rows=30)
+        frame = make_feature_frame(X)
+        frame.loc[3, "adx"] = np.nan  # Incomplete row is skipped
+        table = PrecomputedRegimes.build(classifier, frame)
+        labels, probabilities = classifier.predict_batch(X)
+
+        assert len(table) == 29
+        assert table.lookup(frame["date"].iloc[10]) == (labels[10], pytest.approx(probabilities[10]))
+        # Intraday timestamp resolves to that day's bar; missing bar uses the previous one
+        assert table.lookup(frame["date"].iloc[10] + pd.Timedelta(hours=14))[0] == labels[10]
+        assert table.lookup(frame["date"].iloc[3])[0] == labels[2]
+        assert table.lookup(pd.Timestamp("2023-12-01")) is None
+
+    def test_sentinel_uses_table_instead_of_model(self):
+        classifier, X = make_classifier(n_rows=30)
+        frame = make_feature_frame(X)
+        table = PrecomputedRegimes.build(classifier, frame)
+
+        sentinel = Sentinel(Mock(), Settings(), None)
+        sentinel.use_precomputed_ml(table)
+        regime, probability = sentinel._ml_classify(metrics_for(X[7]), frame["date"].iloc[7])
+
+        labels, probabilities = classifier.predict_batch(X)
+        assert regime == RegimeClassifier.REGIME_MAP[labels[7]] and isinstance(regime, RegimeType)
+        assert probability == pytest.approx(probabilities[7])
+        assert table.lookups == 1
+
+    def test_sentinel_falls_back_to_single_row_model(self):
+        classifier, X = make_classifier(n_rows=30)
+        sentinel = Sentinel(Mock(), Settings(), None, ml_classifier=classifier)
+        sentinel.use_precomputed_ml(PrecomputedRegimes.build(classifier, make_feature_frame(X)))
+
+        regime, probability = sentinel._ml_classify(metrics_for(X[0]), pd.Timestamp("2020-01-01"))
+        expected, confidence = classifier.predict_regime(X[:1])
+        assert regime.value == expected and probability == pytest.approx(confidence)
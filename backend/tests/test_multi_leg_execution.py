@@ -0,0 +1,271 @@
+"""Tests for concurrent multi-leg placement and parallel flatten in Executor"""
+
+import threading
+import time
+from datetime import date, timedelta
+from unittest.mock import Mock
+
+import app.services.execution.executor as executor_module
+from app.config.settings import Settings
+from app.core.rate_limiter import APIEndpoint, APIRateLimiter, RateLimitConfig
+from app.core.tracing import current_trace_id, get_tracer
+from app.models.order import OrderStatus
+from app.models.position import Position
+from app.models.trade import LegType, StructureType, TradeLeg, TradeSignal
+from app.services.execution.audit_logger import AuditEventType, ExecutionAuditLogger
+from app.services.execution.order_tracker import OrderTracker
+
+
+class FakeKite:
+    """Broker stub: slow order placement, pushed fills, configurable margin."""
+
+    paper_mode = True
+    mock_mode = True
+
+    def __init__(self, free_margin=10_000_000, delay=0.05, fill=True, reject=()):
+        self.free_margin = free_margin
+        self.delay = delay
+        self.fill = fill
+        self.reject = set(reject)
+        self.placed = []  # (tradingsymbol, transaction_type, start, end)
+        self.traces = []  # Active trace id seen by each place_order
+        self.cancelled = []
+        self._listeners = []
+        self._lock = threading.Lock()
+        self._seq = 0
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.margin_calls = 0
+
+    def add_order_listener(self, cb):
+        self._listeners.append(cb)
+
+    def remove_order_listener(self, cb):
+        self._listeners.remove(cb)
+
+    def place_order(self, tradingsymbol, transaction_type, quantity, price=None, **kwargs):
+        start = time.monotonic()
+        with self._lock:
+            self.traces.append(current_trace_id())
+            self.in_flight += 1
+            self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        time.sleep(self.delay)
+        with self._lock:
+            self.in_flight -= 1
+        if tradingsymbol in self.reject:
+            raise RuntimeError("Insufficient margin")
+        with self._lock:
+            self._seq += 1
+            order_id = f"OID{self._seq}"
+            self.placed.append((tradingsymbol, transaction_type, start, time.monotonic()))
+        status = "COMPLETE" if self.fill else "OPEN"
+        for cb in self._listeners:
+            cb({"order_id": order_id, "status": status, "filled_quantity": quantity,
+                "average_price": price or 0})
+        return order_id
+
+    def cancel_order(self, order_id):
+        if self.fill:
+            raise RuntimeError("Order cannot be cancelled as it is being processed")  # Already filled
+        self.cancelled.append(order_id)
+        for cb in self._listeners:
+            cb({"order_id": order_id, "status": "CANCELLED", "filled_quantity": 0, "average_price": 0})
+        return order_id
+
+    def get_margins(self):
+        self.margin_calls += 1
+        return {"equity": {"available": {"live_balance": self.free_margin}}}
+
+    def get_orders(self):
+        return []
+
+    def poll_paper_orders(self):
+        return 0
+
+
+def make_leg(leg_type, strike, price):
+    opt = "CE" if "CALL" in leg_type.value else "PE"
+    return TradeLeg(
+        leg_type=leg_type,
+        tradingsymbol=f"NIFTY26FEB{strike}{opt}",
+        instrument_token=strike,
+        strike=strike,
+        expiry=date.today() + timedelta(days=10),
+        option_type=opt,
+        quantity=75,
+        entry_price=price,
+    )
+
+
+def iron_condor():
+    return TradeSignal(
+        proposal_id="p1",
+        structure=StructureType.IRON_CONDOR,
+        instrument="NIFTY",
+        legs=[
+            make_leg(LegType.LONG_PUT, 21500, 20.0),
+            make_leg(LegType.SHORT_PUT, 21800, 45.0),
+            make_leg(LegType.SHORT_CALL, 22400, 50.0),
+            make_leg(LegType.LONG_CALL, 22700, 22.0),
+        ],
+        approved_margin=100_000,
+        approved_size_pct=0.02,
+        target_pnl=2500,
+        stop_loss=-1750,
+    )
+
+
+def make_executor(monkeypatch, kite):
+    monkeypatch.setattr(executor_module, "Repository", Mock)
+    monkeypatch.setattr(executor_module.Executor, "_load_positions", lambda self: None)
+    monkeypatch.setattr(executor_module.Executor, "_persist_position", lambda self, p: None)
+    monkeypatch.setattr(executor_module.Executor, "_update_paper_margin", lambda self, m, add: None)
+
+    state_manager = Mock()
+    state_manager.record_slippage.return_value = {"alert": False}
+    state_manager.record_trade_result.return_value = {}
+
+    tracker = OrderTracker(kite, reconcile_interval=0.2)
+    executor = executor_module.Executor(kite, Settings(), state_manager=state_manager, order_tracker=tracker)
+    config = RateLimitConfig(requests_per_second=1000, requests_per_minute=100000)
+    executor._rate_limiter = APIRateLimiter(limits={ep: config for ep in APIEndpoint})
+    executor._audit = ExecutionAuditLogger(log_to_file=False)
+    return executor
+
+
+class TestMultiLegExecution:
+    """Tests for concurrent leg placement."""
+
+    def test_legs_dispatched_concurrently(self, monkeypatch):
+        """All four legs are in flight at once and skew is audited."""
+        kite = FakeKite(delay=0.1)
+        executor = make_executor(monkeypatch, kite)
+
+        result = executor.process(iron_condor())
+
+        assert result.success
+        assert kite.max_in_flight == 4
+        assert max(p[2] for p in kite.placed) < min(p[3] for p in kite.placed)  # All overlap
+
+        skew = [e for e in executor._audit.get_recent_entries() if e.event_type == AuditEventType.LEG_SKEW]
+        assert len(skew) == 1
+        assert skew[0].details["legs"] == 4
+        assert skew[0].details["submit_skew_ms"] >= 0
+
+    def test_leg_threads_stay_in_the_callers_trace(self, monkeypatch):
+        """Legs sent from the order pool see the trace that dispatched them."""
+        kite = FakeKite()
+        executor = make_executor(monkeypatch, kite)
+
+        with get_tracer().trace("orchestrator.iteration") as trace_id:
+            assert executor.process(iron_condor()).success
+
+        assert kite.traces == [trace_id] * 4
+
+    def test_hedges_first_when_margin_tight(self, monkeypatch):
+        """With little free margin, long legs fill before any short leg is sent."""
+        kite = FakeKite(free_margin=150_000)
+        executor = make_executor(monkeypatch, kite)
+
+        assert executor.process(iron_condor()).success
+
+        sides = [p[1] for p in sorted(kite.placed, key=lambda p: p[2])]
+        assert sides == ["BUY", "BUY", "SELL", "SELL"]
+        last_hedge_done = max(p[3] for p in kite.placed if p[1] == "BUY")
+        first_short = min(p[2] for p in kite.placed if p[1] == "SELL")
+        assert first_short >= last_hedge_done
+
+    def test_hedge_check_uses_treasury_margin(self, monkeypatch):
+        """The free margin Treasury saw at approval avoids another get_margins call."""
+        kite = FakeKite(free_margin=10_000_000)
+        executor = make_executor(monkeypatch, kite)
+        signal = iron_condor()
+        signal.available_margin = 150_000
+
+        assert executor.process(signal).success
+
+        assert kite.margin_calls == 0
+        sides = [p[1] for p in sorted(kite.placed, key=lambda p: p[2])]
+        assert sides == ["BUY", "BUY", "SELL", "SELL"]
+
+    def test_partial_failure_rolls_back_open_orders(self, monkeypatch):
+        """A rejected leg cancels the legs that were placed and are still open."""
+        signal = iron_condor()
+        kite = FakeKite(fill=False, reject={signal.legs[2].tradingsymbol})
+        executor = make_executor(monkeypatch, kite)
+
+        result = executor.process(signal)
+
+        assert not result.success
+        assert result.failed_legs == [signal.legs[2].leg_id]
+        assert sorted(kite.cancelled) == sorted(o.broker_order_id for o in result.orders if o.broker_order_id)
+        assert all(o.status in (OrderStatus.CANCELLED, OrderStatus.REJECTED) for o in result.orders)
+
+    def test_short_rejection_unwinds_filled_legs(self, monkeypatch):
+        """Hedges filled ahead of a rejected short leg are sold back, as is the other short."""
+        signal = iron_condor()
+        kite = FakeKite(free_margin=150_000, reject={signal.legs[1].tradingsymbol})
+        executor = make_executor(monkeypatch, kite)
+
+        result = executor.process(signal)
+
+        assert not result.success
+        assert executor._positions == {}
+        sent = [(p[0], p[1]) for p in sorted(kite.placed, key=lambda p: p[2])]
+        opened = sent[:3]  # Two hedges, then the short that was not rejected
+        assert [side for _, side in opened] == ["BUY", "BUY", "SELL"]
+        closing = {"BUY": "SELL", "SELL": "BUY"}
+        assert sorted(sent[3:]) == sorted((symbol, closing[side]) for symbol, side in opened)
+
+        rollback = [e for e in executor._audit.get_recent_entries() if e.event_type == AuditEventType.ROLLBACK_INITIATED]
+        assert len(rollback) == 1 and rollback[0].success
+
+    def test_hedge_rejection_skips_short_legs(self, monkeypatch):
+        """If a hedge cannot be placed, no short leg is sent."""
+        signal = iron_condor()
+        kite = FakeKite(free_margin=0, reject={signal.legs[0].tradingsymbol})
+        executor = make_executor(monkeypatch, kite)
+
+        assert not executor.process(signal).success
+        shorts = {leg.tradingsymbol for leg in signal.legs if leg.is_short}
+        assert not any(p[0] in shorts for p in kite.placed)
+        # The hedge that did fill is sold back
+        assert [p[:2] for p in kite.placed if p[1] == "SELL"] == [(signal.legs[3].tradingsymbol, "SELL")]
+
+
+class TestParallelFlatten:
+    """Tests for flatten_all."""
+
+    def test_flatten_all_exits_positions_in_parallel(self, monkeypatch):
+        """Closing orders for every position are sent in one concurrent batch."""
+        kite = FakeKite(delay=0.1)
+        executor = make_executor(monkeypatch, kite)
+
+        for i in range(3):
+            signal = iron_condor()
+            position = Position(
+                signal_id=f"s{i}",
+                strategy_type=StructureType.IRON_CONDOR,
+                instrument="NIFTY",
+                instrument_token=256265,
+                legs=signal.legs,
+                entry_price=53.0,
+                entry_margin=100_000,
+                target_pnl=2500,
+                stop_loss=-1750,
+                max_loss=5000,
+                expiry=date.today() + timedelta(days=10),
+                days_to_expiry=10,
+                regime_at_entry="CHAOS",
+                exit_target_low=140,
+                exit_target_high=180,
+                current_target=2500,
+            )
+            executor._positions[position.id] = position
+
+        results = executor.flatten_all("CHAOS")
+
+        assert len(results) == 3
+        assert all(r.success for r in results)
+        assert len(kite.placed) == 12
+        assert kite.max_in_flight == executor_module.MAX_CONCURRENT_ORDERS  # One batch across positions
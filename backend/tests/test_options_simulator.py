@@ -0,0 +1,70 @@
+"""Tests for batched option quotes in OptionsSimulator"""
+
+import random
+from datetime import date, timedelta
+
+import pandas as pd
+import pytest
+
+from app.services.backtesting.options_simulator import OptionQuote, OptionsSimulator
+
+
+class TestOptionQuotes:
+    """get_option_quotes matches get_option_quote row for row."""
+
+    def test_arrays_match_scalar_quotes(self):
+        rng = random.Random(5)
+        simulator = OptionsSimulator()
+        today = date(2024, 6, 3)
+        book = [
+            (22000 + rng.uniform(-300, 300), rng.randrange(20000, 24000, 50),
+             today + timedelta(days=rng.randint(0, 45)), rng.choice(["CE", "PE"]))
+            for _ in range(200)
+        ]
+        quotes = simulator.get_option_quotes(
+            [b[0] for b in book], [b[1] for b in book], [b[2] for b in book], today, 0.18, [b[3] for b in book]
+        )
+
+        assert len(quotes) == len(book)
+        for i, (spot, strike, expiry, option_type) in enumerate(book):
+            expected = simulator.get_option_quote(spot, strike, expiry, today, 0.18, option_type)
+            row = quotes.quote(i)
+            for name in OptionQuote.__slots__:
+                value = getattr(expected, name)
+                if isinstance(value, float):
+                    assert getattr(row, name) == pytest.approx(value, rel=1e-9, abs=1e-12)
+                else:
+                    assert getattr(row, name) == value
+
+    def test_quotes_are_slotted(self):
+        quote = OptionsSimulator().get_option_quote(22000, 22000, date(2024, 6, 13), date(2024, 6, 3), 0.15)
+        assert not hasattr(quote, "__dict__")
+
+    def test_chain_matches_scalar_quotes(self):
+        simulator = OptionsSimulator()
+        today, expiry = date(2024, 6, 3), date(2024, 6, 13)
+        chain = simulator.get_options_chain(22000, expiry, today, 0.16)
+
+        assert len(chain["calls"]) == len(chain["puts"]) == 7
+        for quote in chain["calls"] + chain["puts"]:
+            expected = simulator.get_option_quote(22000, quote.strike, expiry, today, 0.16, quote.option_type)
+            assert quote.mid == pytest.approx(expected.mid, rel=1e-9)
+            assert quote.delta == pytest.approx(expected.delta, rel=1e-9)
+            assert quote.dte == expected.dte
+
+    def test_simulated_data_prices_each_bar_at_its_own_date(self):
+        simulator = OptionsSimulator()
+        bars = pd.DataFrame(
+            {"open": 22000.0, "high": 22100.0, "low": 21900.0, "close": [22000.0, 22150.0, 21950.0]},
+            index=pd.date_range("2024-06-03", periods=3, freq="D")
+        )
+        data = simulator.simulate_options_data(bars, delta_levels=[0.2, 0.3])
+
+        assert len(data) == 3 * 4
+        assert list(data["option_type"][:4]) == ["CE", "CE", "PE", "PE"]
+        for row in data.itertuples():
+            expected = simulator.get_option_quote(
+                row.underlying, row.strike, row.expiry, row.timestamp.date(), row.iv, row.option_type
+            )
+            assert row.price == pytest.approx(expected.mid, rel=1e-9)
+            assert row.dte == expected.dte
@@ -0,0 +1,153 @@
+"""Tests for the event-driven order tracker"""
+
+import threading
+import time
+import pytest
+
+from app.core.kite_client import KiteClient
+from app.services.execution.order_tracker import OrderTracker
+
+
+class StubOrderFeed:
+    """Local stand-in for the broker: an orderbook plus a push stream."""
+
+    paper_mode = False
+    mock_mode = False
+
+    def __init__(self):
+        self.orders = {}
+        self.callbacks = []
+        self.get_orders_calls = 0
+
+    # Ticker side
+    def add_order_callback(self, cb):
+        self.callbacks.append(cb)
+
+    def remove_order_callback(self, cb):
+        self.callbacks.remove(cb)
+
+    def push(self, order_id, status, **fields):
+        update = {"order_id": order_id, "status": status, **fields}
+        self.orders[order_id] = update
+        for cb in self.callbacks:
+            cb(update)
+
+    # REST side
+    def get_orders(self):
+        self.get_orders_calls += 1
+        return list(self.orders.values())
+
+
+@pytest.fixture
+def feed():
+    return StubOrderFeed()
+
+
+@pytest.fixture
+def tracker(feed):
+    t = OrderTracker(feed, ticker=feed, reconcile_interval=0.2)
+    t.start()
+    yield t
+    t.stop()
+
+
+class TestOrderTracker:
+    """Tests for OrderTracker."""
+
+    def test_pushed_fill_resolves_future(self, tracker, feed):
+        """A COMPLETE update resolves the watched order immediately."""
+        future = tracker.watch("A")
+        feed.push("A", "OPEN")
+        assert not future.done()
+
+        feed.push("A", "COMPLETE", filled_quantity=75, average_price=101.5)
+        assert future.result(timeout=0)["average_price"] == 101.5
+
+    def test_update_before_watch_is_kept(self, tracker, feed):
+        """A fill that arrives before watch() is not lost."""
+        feed.push("A", "COMPLETE", filled_quantity=75, average_price=100.0)
+        assert tracker.watch("A").done()
+
+    def test_wait_all_concurrent_legs(self, tracker, feed):
+        """All legs are awaited together and return as soon as the last fills."""
+        ids = ["L1", "L2", "L3", "L4"]
+
+        def fill_all():
+            time.sleep(0.02)
+            for oid in ids:
+                feed.push(oid, "COMPLETE", filled_quantity=50, average_price=10.0)
+
+        threading.Thread(target=fill_all).start()
+        start = time.monotonic()
+        results = tracker.wait_all(ids, timeout=5)
+
+        assert time.monotonic() - start < 0.2  # No reconcile interval elapsed
+        assert all(r["status"] == "COMPLETE" for r in results.values())
+        assert feed.get_orders_calls == 0
+
+    def test_reconcile_fallback(self, tracker, feed):
+        """Without pushed updates, one batched get_orders call resolves the orders."""
+        feed.orders["A"] = {"order_id": "A", "status": "COMPLETE", "average_price": 5.0}
+        feed.orders["B"] = {"order_id": "B", "status": "REJECTED"}
+
+        results = tracker.wait_all(["A", "B"], timeout=2)
+
+        assert results["A"]["status"] == "COMPLETE"
+        assert results["B"]["status"] == "REJECTED"
+        assert feed.get_orders_calls == 1
+
+    def test_timeout_returns_latest_state(self, tracker, feed):
+        """Orders still open at the deadline report their last known state."""
+        feed.push("A", "OPEN", filled_quantity=25)
+        results = tracker.wait_all(["A"], timeout=0.3)
+        assert results["A"]["status"] == "OPEN"
+        assert results["A"]["filled_quantity"] == 25
+
+    def test_stop_detaches_from_ticker(self, feed):
+        """A stopped tracker no longer receives the ticker's postbacks."""
+        tracker = OrderTracker(feed, ticker=feed)
+        tracker.start()
+        assert feed.callbacks == [tracker.on_order_update]
+        tracker.stop()
+        assert feed.callbacks == []
+
+    def test_paper_orders_push_updates(self):
+        """Paper/mock KiteClient orders resolve through the local listener."""
+        kite = KiteClient(api_key="test", mock_mode=True)
+        tracker = OrderTracker(kite, reconcile_interval=10)
+        tracker.start()
+
+        order_id = kite.place_order(
+            tradingsymbol="NIFTY26FEB22000CE", exchange="NFO", transaction_type="SELL",
+            quantity=75, order_type="LIMIT", product="NRML", price=120.0,
+        )
+
+        results = tracker.wait_all([order_id], timeout=1)
+        assert results[order_id]["status"] == "COMPLETE"
+        assert results[order_id]["average_price"] == 120.0
+        assert tracker.stats["reconciles"] == 0
+
+    def test_backtest_orders_resolve_without_waiting(self):
+        """HistoricalDataClient fills push updates, so backtests never hit the timeout."""
+        import pandas as pd
+        from app.services.backtesting import HistoricalDataClient
+
+        kite = HistoricalDataClient(pd.DataFrame({
+            "date": pd.bdate_range("2025-03-03", periods=5),
+            "open": 22000.0, "high": 22100.0, "low": 21900.0, "close": 22050.0, "volume": 1000,
+        }))
+        kite.set_current_date(pd.Timestamp("2025-03-07").date())
+        tracker = OrderTracker(kite, reconcile_interval=10)
+        tracker.start()
+
+        order_id = kite.place_order(
+            tradingsymbol="NIFTY25MAR22000CE", exchange="NFO", transaction_type="SELL",
+            quantity=75, order_type="MARKET", product="NRML",
+        )
+
+        start = time.monotonic()
+        results = tracker.wait_all([order_id], timeout=5)
+        assert time.monotonic() - start < 0.5
+        assert results[order_id]["status"] == "COMPLETE"
+        assert tracker.stats["reconciles"] == 0
+        assert kite.poll_paper_orders() == 0
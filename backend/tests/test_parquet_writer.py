@@ -0,0 +1,132 @@
+"""Tests for the append-only daily parquet writer"""
+
+import pytest
+import pandas as pd
+import pyarrow.parquet as pq
+from datetime import datetime, date
+
+from app.core.parquet_writer import (
+    DailyParquetWriter,
+    OPTIONS_CHAIN_SCHEMA,
+    OPTIONS_CHAIN_DICTIONARY_COLUMNS,
+)
+
+
+def make_records(n: int, strike: int = 22000):
+    """Create option chain records in the collector's format."""
+    return [
+        {
+            "timestamp": datetime(2026, 2, 6, 9, 15 + i % 45),
+            "symbol": "NIFTY",
+            "trading_symbol": f"NIFTY26FEB{strike}CE",
+            "expiry": date(2026, 2, 26),
+            "strike": strike,
+            "option_type": "CE",
+            "underlying": 22010.55,
+            "ltp": 120.05 + i,
+            "bid": 120.0,
+            "bid_qty": 750,
+            "ask": 120.1,
+            "ask_qty": 600,
+            "volume": 100000 + i,
+            "oi": 5000000,
+            "oi_day_high": 5100000,
+            "oi_day_low": 4900000,
+            "open": 110.0,
+            "high": 130.0,
+            "low": 105.0,
+            "close": 118.0,
+            "last_trade_time": None,
+        }
+        for i in range(n)
+    ]
+
+
+@pytest.fixture
+def writer(tmp_path):
+    w = DailyParquetWriter(
+        tmp_path,
+        prefix="NIFTY_options",
+        schema=OPTIONS_CHAIN_SCHEMA,
+        dictionary_columns=OPTIONS_CHAIN_DICTIONARY_COLUMNS
+    )
+    yield w
+    w.close()
+
+
+class TestDailyParquetWriter:
+    """Tests for DailyParquetWriter."""
+
+    def test_appends_row_group_per_write(self, writer):
+        """Each write becomes one row group in the same file."""
+        day = date(2026, 2, 6)
+        writer.write(make_records(10), day=day)
+        writer.write(make_records(5), day=day)
+        writer.close()
+
+        pf = pq.ParquetFile(writer.path_for(day))
+        assert pf.num_row_groups == 2
+        assert pf.metadata.num_rows == 15
+
+    def test_schema_types(self, writer):
+        """Prices are float32 and the file round-trips through pandas."""
+        day = date(2026, 2, 6)
+        writer.write(make_records(3), day=day)
+        writer.close()
+
+        schema = pq.read_schema(writer.path_for(day))
+        assert str(schema.field("ltp").type) == "float"
+        df = pd.read_parquet(writer.path_for(day))
+        assert list(df.columns) == OPTIONS_CHAIN_SCHEMA.names
+        assert df["symbol"].iloc[0] == "NIFTY"
+        assert df["ltp"].iloc[0] == pytest.approx(120.05, abs=1e-3)
+
+    def test_float_volumes_are_cast(self, writer):
+        """Integer columns accept float inputs (e.g. from iterrows)."""
+        day = date(2026, 2, 6)
+        records = make_records(2)
+        for r in records:
+            r["volume"] = float(r["volume"])
+        assert writer.write(records, day=day) == 2
+
+    def test_rotates_on_day_change(self, writer):
+        """A new day closes the old file and opens a new one."""
+        d1, d2 = date(2026, 2, 6), date(2026, 2, 9)
+        writer.write(make_records(4), day=d1)
+        writer.write(make_records(6), day=d2)
+
+        # Old file was finalized on rotation
+        assert pq.ParquetFile(writer.path_for(d1)).metadata.num_rows == 4
+        writer.close()
+        assert pq.ParquetFile(writer.path_for(d2)).metadata.num_rows == 6
+
+    def test_resumes_existing_day_file(self, tmp_path):
+        """Restarting on the same day keeps previously written rows."""
+        day = date(2026, 2, 6)
+        first = DailyParquetWriter(tmp_path, "NIFTY_options", OPTIONS_CHAIN_SCHEMA)
+        first.write(make_records(7), day=day)
+        first.close()
+
+        second = DailyParquetWriter(tmp_path, "NIFTY_options", OPTIONS_CHAIN_SCHEMA)
+        second.write(make_records(3), day=day)
+        second.close()
+
+        assert pq.ParquetFile(second.path_for(day)).metadata.num_rows == 10
+        assert not list(tmp_path.glob("*.prev"))
+
+    def test_unreadable_file_is_kept_aside(self, tmp_path):
+        """A file without a footer is preserved instead of overwritten."""
+        day = date(2026, 2, 6)
+        w = DailyParquetWriter(tmp_path, "NIFTY_options", OPTIONS_CHAIN_SCHEMA)
+        w.path_for(day).write_bytes(b"PAR1 truncated")
+
+        w.write(make_records(2), day=day)
+        w.close()
+
+        assert pq.ParquetFile(w.path_for(day)).metadata.num_rows == 2
+        assert len(list(tmp_path.glob("*.corrupt"))) == 1
+
+    def test_empty_write_is_noop(self, writer):
+        """Empty record lists do not open a file."""
+        assert writer.write([]) == 0
+        assert not writer.is_open
@@ -0,0 +1,205 @@
+"""Tests for recorded option chain replay in backtests"""
+
+from datetime import date, datetime
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from app.services.backtesting import HistoricalDataClient, RecordedOptionChains
+from app.services.backtesting.recorded_chains import RECORDED_TOKEN_BASE
+
+
+WEEKLY = date(2026, 2, 12)
+NEXT_WEEKLY = date(2026, 2, 19)
+STRIKES = [25400, 25450, 25500, 25550, 25600]
+
+
+def write_day(directory, day, minutes=30, start="09:15", skip=None, seed=1):
+    """Collector-format day file: every strike/type/expiry once per minute."""
+    rng = np.random.default_rng(seed)
+    rows = []
+    for i, ts in enumerate(pd.date_range(f"{day} {start}", periods=minutes, freq="1min", tz="Asia/Kolkata")):
+        for expiry in (WEEKLY, NEXT_WEEKLY):
+            for strike in STRIKES:
+                for opt_type in ("CE", "PE"):
+                    if skip and skip(i, expiry, strike, opt_type):
+                        continue
+                    ltp = round(100 + (strike - 25500) / 10 * (-1 if opt_type == "CE" else 1) + rng.normal(), 2)
+                    rows.append({
+                        "timestamp": ts,
+                        "symbol": "NIFTY",
+                        "trading_symbol": f"NIFTY26FEB{strike}{opt_type}",
+                        "expiry": expiry,
+                        "strike": strike,
+                        "option_type": opt_type,
+                        "underlying": 25500.0 + i,
+                        "ltp": ltp,
+                        "bid": ltp - 0.5,
+                        "bid_qty": 75,
+                        "ask": ltp + 0.5,
+                        "ask_qty": 150,
+                        "volume": 1000 + i,
+                        "oi": 200000,
+                    })
+    df = pd.DataFrame(rows)
+    path = directory / f"NIFTY_options_{day.replace('-', '')}.parquet"
+    df.to_parquet(path, index=False)
+    return df
+
+
+def local(df):
+    return df.assign(time=df["timestamp"].dt.tz_localize(None))
+
+
+@pytest.fixture
+def recorded(tmp_path):
+    day1 = write_day(tmp_path, "2026-02-05", seed=1)
+    # 25600 CE stops updating after 10 minutes on day 2
+    day2 = write_day(
+        tmp_path, "2026-02-06", seed=2,
+        skip=lambda i, expiry, strike, opt_type: strike == 25600 and opt_type == "CE" and i >= 10
+    )
+    chains = RecordedOptionChains.load("NIFTY", tmp_path, index_root=tmp_path / "index")
+    return chains, local(pd.concat([day1, day2], ignore_index=True))
+
+
+class TestRecordedOptionChains:
+    """Index lookups return the latest recorded quote at or before the time."""
+
+    def test_quote_matches_source_rows(self, recorded):
+        chains, raw = recorded
+        for at in [datetime(2026, 2, 5, 9, 20), datetime(2026, 2, 6, 9, 44, 30), datetime(2026, 2, 6, 9, 47)]:
+            source = raw[
+                (raw["expiry"] == WEEKLY) & (raw["strike"] == 25500) &
+                (raw["option_type"] == "PE") & (raw["time"] <= at)
+            ].iloc[-1]
+            quote = chains.quote(WEEKLY, 25500, "PE", at)
+            assert quote["ltp"] == pytest.approx(source["ltp"], abs=1e-3)
+            assert quote["bid"] == pytest.approx(source["bid"], abs=1e-3)
+            assert quote["ask"] == pytest.approx(source["ask"], abs=1e-3)
+            assert quote["timestamp"] == source["time"].to_pydatetime()
+
+    def test_stale_and_unrecorded_quotes_miss(self, recorded):
+        chains, _ = recorded
+        at = datetime(2026, 2, 6, 9, 40)
+        assert chains.quote(WEEKLY, 25600, "CE", datetime(2026, 2, 6, 9, 27)) is not None  # 3 minutes old
+        assert chains.quote(WEEKLY, 25600, "CE", at) is None  # 16 minutes old
+        assert chains.quote(WEEKLY, 25700, "CE", at) is None
+        assert chains.quote(WEEKLY, 25500, "CE", datetime(2026, 2, 5, 9, 0)) is None
+        # Day 1's close doesn't carry into day 2's pre-open
+        assert chains.quote(WEEKLY, 25500, "CE", datetime(2026, 2, 6, 9, 0)) is None
+
+    def test_chain_for_expiry(self, recorded):
+        chains, raw = recorded
+        at = datetime(2026, 2, 6, 9, 30)
+        chain = chains.chain(WEEKLY, at)
+
+        assert len(chain) == 2 * len(STRIKES) - 1  # 25600 CE is stale
+        assert set(chain["expiry"]) == {WEEKLY}
+        row = chain[(chain["strike"] == 25450) & (chain["instrument_type"] == "CE")].iloc[0]
+        assert chains.instrument(row["instrument_token"]) == (WEEKLY, 25450, "CE")
+        assert row["oi"] == 200000 and row["last_price"] == row["ltp"]
+        assert chains.chain(date(2026, 3, 26), at).empty
+
+    def test_collector_symbols_resolve_to_nearest_live_expiry(self, recorded):
+        chains, _ = recorded
+        quote = chains.quote_symbol("NIFTY26FEB25500CE", datetime(2026, 2, 6, 9, 30))
+        assert quote["expiry"] == WEEKLY
+        quote = chains.quote_symbol("NIFTY26FEB25500CE", datetime(2026, 2, 13, 9, 30))
+        assert quote is None  # Weekly expired; the next weekly has no quote that day
+
+    def test_index_is_reused_until_sources_change(self, tmp_path, recorded):
+        chains, _ = recorded
+        manifest = tmp_path / "index" / "NIFTY" / "manifest.json"
+        built = manifest.stat().st_mtime_ns
+
+        reopened = RecordedOptionChains.load("NIFTY", tmp_path, index_root=tmp_path / "index")
+        assert manifest.stat().st_mtime_ns == built
+        assert isinstance(reopened._slots, np.memmap)
+
+        write_day(tmp_path, "2026-02-09", seed=3)
+        rebuilt = RecordedOptionChains.load("NIFTY", tmp_path, index_root=tmp_path / "index")
+        assert rebuilt.fingerprint != chains.fingerprint
+        assert rebuilt.quote(WEEKLY, 25500, "CE", datetime(2026, 2, 9, 9, 30)) is not None
+
+    def test_breeze_series_files(self, tmp_path):
+        series = tmp_path / "breeze" / "NIFTY" / "1minute"
+        series.mkdir(parents=True)
+        pd.DataFrame({
+            "date": pd.date_range("2026-02-06 09:15", periods=5, freq="1min"),
+            "open": ["100", "101", "102", "103", "104"],
+            "high": 105.0, "low": 99.0,
+            "close": ["100.5", "101.5", "102.5", "103.5", "104.5"],
+            "volume": 10, "open_interest": 5000,
+        }).to_parquet(series / "NIFTY_20260212_25500_CALL.parquet", index=False)
+
+        chains = RecordedOptionChains.load("NIFTY", tmp_path / "none", breeze_dir=tmp_path / "breeze",
+                                           index_root=tmp_path / "index")
+        quote = chains.quote(WEEKLY, 25500, "CE", datetime(2026, 2, 6, 9, 17))
+        assert quote["ltp"] == pytest.approx(102.5)
+        assert np.isnan(quote["bid"]) and quote["oi"] == 5000
+        assert quote["tradingsymbol"] == "NIFTY26FEB25500CE"
+
+
+class TestHistoricalClientReplay:
+    """HistoricalDataClient serves recorded options and simulates the rest."""
+
+    @pytest.fixture
+    def client(self, recorded):
+        chains, _ = recorded
+        bars = pd.DataFrame({
+            "date": pd.date_range("2026-02-05 09:15", periods=30, freq="1min").append(
+                pd.date_range("2026-02-06 09:15", periods=30, freq="1min")
+            ),
+            "open": 25500.0, "high": 25510.0, "low": 25490.0, "close": 25500.0, "volume": 1000,
+        })
+        client = HistoricalDataClient(bars)
+        client.use_recorded_chains(chains)
+        client.set_current_time(pd.Timestamp("2026-02-06 09:30"))
+        return client
+
+    def test_option_chain_prefers_recorded_strikes(self, client, recorded):
+        chains, raw = recorded
+        chain = client.get_option_chain("NIFTY", WEEKLY)
+
+        recorded_rows = chain[chain["instrument_token"] >= RECORDED_TOKEN_BASE]
+        simulated_rows = chain[chain["instrument_token"] < RECORDED_TOKEN_BASE]
+        assert len(recorded_rows) == 2 * len(STRIKES) - 1
+        assert not simulated_rows.empty
+        keys = set(zip(recorded_rows["strike"], recorded_rows["instrument_type"]))
+        assert not any((int(k), t) in keys for k, t in zip(simulated_rows["strike"], simulated_rows["instrument_type"]))
+
+        atm_call = recorded_rows[(recorded_rows["strike"] == 25500) & (recorded_rows["instrument_type"] == "CE")].iloc[0]
+        assert atm_call["ltp"] == pytest.approx(chains.quote(WEEKLY, 25500, "CE", client.now())["ltp"])
+        assert 0.3 < atm_call["delta"] < 0.7  # Model greeks on recorded prices
+
+    def test_quotes_and_ltp_for_recorded_tokens(self, client, recorded):
+        chains, _ = recorded
+        token = chains.token_for(chains._ids[(WEEKLY, 25500, "PE")])
+        expected = chains.quote(WEEKLY, 25500, "PE", client.now())
+
+        assert client.get_ltp([token])[token] == pytest.approx(expected["ltp"])
+        depth = client.get_quote([token])[token]["depth"]
+        assert depth["buy"][0]["price"] == pytest.approx(expected["bid"])
+        assert depth["sell"][0]["price"] == pytest.approx(expected["ask"])
+
+        # Stale recorded strike is priced by the simulator, not the underlying
+        stale = chains.token_for(chains._ids[(WEEKLY, 25600, "CE")])
+        client.set_current_time(pd.Timestamp("2026-02-06 09:44"))
+        assert 0 < client.get_ltp([stale])[stale] < 1000
+
+    def test_orders_fill_at_recorded_touch(self, client, recorded):
+        chains, _ = recorded
+        quote = chains.quote(WEEKLY, 25550, "CE", client.now())
+
+        buy = client.place_order("NIFTY26FEB25550CE", "NFO", "BUY", 75)
+        sell = client.place_order("NIFTY26FEB25550CE", "NFO", "SELL", 75)
+        assert client.get_order_history(buy)[0]["average_price"] == pytest.approx(quote["ask"])
+        assert client.get_order_history(sell)[0]["average_price"] == pytest.approx(quote["bid"])
+
+    def test_instruments_include_recorded_expiries(self, client):
+        instruments = client.get_instruments("NFO")
+        recorded = instruments[instruments["instrument_token"] >= RECORDED_TOKEN_BASE]
+        assert set(recorded["expiry"]) == {WEEKLY, NEXT_WEEKLY}
+        assert len(recorded) == 2 * 2 * len(STRIKES)
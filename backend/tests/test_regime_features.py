@@ -0,0 +1,153 @@
+"""Tests for the vectorized regime feature pipeline and feature store"""
+
+import time
+import numpy as np
+import pandas as pd
+import pytest
+
+from app.services.agents.regime_features import (
+    FeatureStore,
+    FEATURE_COLUMNS,
+    build_feature_frame,
+    label_regimes,
+    rolling_percentile_rank,
+    source_hash,
+)
+from app.services.backtesting import HistoricalDataClient
+
+
+def make_daily(n_bars=600, seed=11):
+    rng = np.random.default_rng(seed)
+    close = 20000 * np.exp(np.cumsum(rng.normal(0, 0.012, n_bars)))
+    open_ = close * (1 + rng.normal(0, 0.008, n_bars))
+    high = np.maximum(open_, close) * (1 + np.abs(rng.normal(0, 0.006, n_bars)))
+    low = np.minimum(open_, close) * (1 - np.abs(rng.normal(0, 0.006, n_bars)))
+    return pd.DataFrame({
+        "date": pd.bdate_range("2023-01-02", periods=n_bars),
+        "open": open_,
+        "high": high,
+        "low": low,
+        "close": close,
+        "volume": rng.integers(1e5, 1e6, n_bars),
+    })
+
+
+def label_row(row):
+    """The original row-wise rules from download_historical_data.py."""
+    if pd.isna(row['adx']) or pd.isna(row['rsi']):
+        return -1
+    adx, rsi = row['adx'], row['rsi']
+    if row['iv_percentile'] > 75 or abs(row['gap_pct']) > 0.02 or row['day_range_pct'] > 0.025:
+        return 3
+    if adx < 12 and 40 <= rsi <= 60:
+        return 0
+    if 12 <= adx <= 25 and (rsi < 30 or rsi > 70):
+        return 1
+    if adx > 25:
+        return 2
+    return 1
+
+
+class TestRegimeFeatures:
+    """Tests for compute_regime_features / label_regimes."""
+
+    def test_iv_percentile_matches_rolling_apply(self):
+        values = np.abs(np.random.default_rng(3).normal(0.01, 0.004, 400))
+        values[[5, 300]] = np.nan
+        expected = pd.Series(values).rolling(252).apply(
+            lambda x: (x < x.iloc[-1]).sum() / len(x) * 100
+        )
+        np.testing.assert_allclose(rolling_percentile_rank(values, 252), expected.to_numpy(), equal_nan=True)
+
+    def test_labels_match_row_rules(self):
+        features = build_feature_frame(make_daily())
+        expected = features.apply(label_row, axis=1).to_numpy()
+
+        np.testing.assert_array_equal(features["regime_label"].to_numpy(), expected)
+        assert set(np.unique(expected)) >= {-1, 1, 3}
+
+    def test_label_edges_and_missing_inputs(self):
+        frame = pd.DataFrame({
+            "adx": [np.nan, 11.9, 12.0, 25.0, 25.1, 20.0, 20.0],
+            "rsi": [50, 40.0, 29.9, 70.1, 50, 50, 50],
+            "iv_percentile": [90, np.nan, 10, 10, 10, 76, np.nan],
+            "gap_pct": [0, np.nan, 0, 0, 0, 0, -0.021],
+            "day_range_pct": [0, np.nan, 0, 0, 0, 0, 0],
+        })
+        assert label_regimes(frame).tolist() == [-1, 0, 1, 1, 2, 3, 3]
+
+    def test_rv_atr_ratio_and_optional_columns(self):
+        df = make_daily(n_bars=60)
+        df["oi"] = np.linspace(1e6, 1.6e6, 60)
+        features = build_feature_frame(df)
+
+        assert list(features.columns) == ["date"] + FEATURE_COLUMNS + ["regime_label"]
+        last = features.iloc[-1]
+        assert last["rv_atr_ratio"] == pytest.approx(last["realized_vol"] / last["atr_pct"])
+        assert last["oi_change_pct"] == pytest.approx((df["oi"].iloc[-1] / df["oi"].iloc[-2] - 1) * 100)
+        assert features["skew"].isna().all()
+
+
+class TestFeatureStore:
+    """Tests for FeatureStore."""
+
+    def test_second_load_reads_store(self, tmp_path):
+        df = make_daily()
+        store = FeatureStore(tmp_path)
+        built = store.load_or_build("NIFTY", df)
+
+        again = FeatureStore(tmp_path)  # Fresh process
+        start = time.perf_counter()
+        loaded = again.load_or_build("NIFTY", df)
+        elapsed = time.perf_counter() - start
+
+        assert again.hits == 1 and again.builds == 0
+        pd.testing.assert_frame_equal(loaded, built, check_dtype=False)
+        assert elapsed < 0.5
+
+    def test_changed_bars_or_version_rebuild(self, tmp_path):
+        df = make_daily()
+        store = FeatureStore(tmp_path)
+        store.load_or_build("NIFTY", df)
+
+        revised = df.copy()
+        revised.loc[len(df) - 1, "close"] *= 1.01
+        store.load_or_build("NIFTY", revised)
+        assert store.builds == 2
+
+        FeatureStore(tmp_path, version=99).load_or_build("NIFTY", revised)
+        assert [p.name[:4] for p in (tmp_path / "NIFTY").glob("*.parquet")] == ["v99_"]  # Old version removed
+
+    def test_feature_sets_do_not_evict_each_other(self, tmp_path):
+        """Alternating sources keep their files; only the least recently used beyond keep go."""
+        store = FeatureStore(tmp_path, keep=2)
+        training, backtest, other = make_daily(seed=1), make_daily(seed=2), make_daily(seed=3)
+
+        for df in (training, backtest, training, backtest):
+            store.load_or_build("NIFTY", df)
+        assert store.builds == 2 and store.hits == 2
+
+        store.load_or_build("NIFTY", training)
+        store.load_or_build("NIFTY", other)  # Evicts backtest, the least recently used
+        files = {p.name for p in (tmp_path / "NIFTY").glob("*.parquet")}
+        assert files == {store.path_for("NIFTY", source_hash(df)).name for df in (training, other)}
+
+    def test_hash_ignores_derived_columns_and_csv_round_trip(self, tmp_path):
+        df = make_daily(n_bars=100)
+        labelled = pd.concat([df, build_feature_frame(df).drop(columns="date")], axis=1)
+        csv = tmp_path / "NIFTY_daily.csv"
+        labelled.to_csv(csv, index=False)
+
+        assert source_hash(pd.read_csv(csv)) == source_hash(df)
+
+    def test_backtest_client_slices_to_simulation_date(self, tmp_path, monkeypatch):
+        from app.services.agents import regime_features
+        monkeypatch.setattr(regime_features, "_feature_store", FeatureStore(tmp_path))
+
+        df = make_daily(n_bars=300)
+        client = HistoricalDataClient(df)
+        client.set_current_date(df["date"].iloc[199].date())
+
+        features = client.get_features()
+        assert len(features) == 200
+        assert features["date"].iloc[-1] == df["date"].iloc[199]
@@ -0,0 +1,135 @@
+"""Tests for the cached single-flight regime service"""
+
+import asyncio
+import threading
+import time
+import pytest
+from datetime import datetime
+
+from app.models.regime import RegimeMetrics, RegimePacket, RegimeType
+from app.services.agents.regime_service import RegimeService
+
+
+NIFTY_TOKEN = 256265
+
+
+def make_packet(regime=RegimeType.RANGE_BOUND):
+    return RegimePacket(
+        timestamp=datetime.now(),
+        instrument_token=NIFTY_TOKEN,
+        symbol="NIFTY",
+        regime=regime,
+        regime_confidence=0.8,
+        metrics=RegimeMetrics(
+            adx=10, rsi=50, iv_percentile=40, india_vix=13.0,
+            realized_vol=0.12, atr=100, rv_atr_ratio=1.0
+        ),
+        correlations={},
+        approved_universe=["NIFTY"],
+        is_safe=True,
+        spot_price=22100,
+        prev_close=22000,
+        day_range_pct=0.005
+    )
+
+
+class SlowSentinel:
+    def __init__(self, delay=0.1, regime=RegimeType.RANGE_BOUND):
+        self.delay = delay
+        self.regime = regime
+        self.calls = 0
+        self.release = threading.Event()
+        self.release.set()
+
+    def process(self, token):
+        self.calls += 1
+        self.release.wait(5)
+        time.sleep(self.delay)
+        return make_packet(self.regime)
+
+
+def make_service(sentinel, **kwargs):
+    created = []
+
+    def factory(token):
+        created.append(token)
+        return sentinel
+
+    return RegimeService(sentinel_factory=factory, **kwargs), created
+
+
+class TestRegimeService:
+    """Tests for RegimeService."""
+
+    def test_concurrent_misses_are_single_flighted(self):
+        sentinel = SlowSentinel(delay=0.1)
+        service, created = make_service(sentinel)
+
+        async def poll_many():
+            return await asyncio.gather(*(service.get_async(NIFTY_TOKEN) for _ in range(20)))
+
+        entries = asyncio.run(poll_many())
+
+        assert sentinel.calls == 1 and created == [NIFTY_TOKEN]
+        assert len({e.version for e in entries}) == 1
+        assert service.stats.coalesced == 19
+
+    def test_fresh_hits_do_not_recompute_and_are_fast(self):
+        sentinel = SlowSentinel(delay=0)
+        service, _ = make_service(sentinel)
+        service.get(NIFTY_TOKEN)
+
+        start = time.perf_counter()
+        for _ in range(1000):
+            entry = service.get(NIFTY_TOKEN)
+        per_call = (time.perf_counter() - start) / 1000
+
+        assert sentinel.calls == 1
+        assert entry.source == "refresh"
+        assert per_call < 1e-4
+
+    def test_stale_entry_served_while_revalidating(self):
+        sentinel = SlowSentinel(delay=0, regime=RegimeType.CHAOS)
+        service, _ = make_service(sentinel, ttl=0.05, stale_ttl=10)
+        first = service.publish(make_packet())
+        time.sleep(0.06)
+
+        sentinel.release.clear()
+        stale = service.get(NIFTY_TOKEN)
+        again = service.get(NIFTY_TOKEN)
+        assert stale is first and again is first  # Served immediately, one refresh in flight
+        assert service.stats.refreshes == 1
+
+        sentinel.release.set()
+        for _ in range(100):
+            if service.peek(NIFTY_TOKEN) is not first:
+                break
+            time.sleep(0.01)
+        assert service.get(NIFTY_TOKEN).packet.regime == RegimeType.CHAOS
+        assert sentinel.calls == 1
+
+    def test_published_packets_preempt_recomputation(self):
+        sentinel = SlowSentinel(delay=0)
+        service, created = make_service(sentinel)
+        service.publish(make_packet(RegimeType.MEAN_REVERSION))
+
+        entry = service.get(NIFTY_TOKEN)
+        assert entry.source == "orchestrator"
+        assert entry.packet.regime == RegimeType.MEAN_REVERSION
+        assert created == [] and sentinel.calls == 0
+
+    def test_failure_propagates_and_next_call_retries(self):
+        class FailingSentinel:
+            calls = 0
+
+            def process(self, token):
+                FailingSentinel.calls += 1
+                if FailingSentinel.calls == 1:
+                    raise RuntimeError("broker down")
+                return make_packet()
+
+        service, _ = make_service(FailingSentinel())
+        with pytest.raises(RuntimeError):
+            service.get(NIFTY_TOKEN)
+        assert service.get(NIFTY_TOKEN).packet.symbol == "NIFTY"
+        assert service.stats.errors == 1
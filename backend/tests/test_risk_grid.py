@@ -0,0 +1,154 @@
+"""Tests for the spot x vol x time scenario risk grid"""
+
+import time
+import numpy as np
+import pytest
+
+from app.models.trade import LegType
+from app.services.execution.greeks_aggregator import LiveGreeksAggregator
+from app.services.execution.risk_grid import RiskGridConfig, RiskGridEngine, legs_to_arrays
+from app.services.utilities.option_pricing import BlackScholesCalculator
+
+from tests.test_greeks_aggregator import FakeTicker, NIFTY_TOKEN, make_leg, make_position
+
+
+SPOT = 22100
+
+
+def iron_condor_legs():
+    return [
+        make_leg(LegType.LONG_PUT, 21500, 20.0, -0.08),
+        make_leg(LegType.SHORT_PUT, 21800, 45.0, -0.2),
+        make_leg(LegType.SHORT_CALL, 22400, 50.0, 0.2),
+        make_leg(LegType.LONG_CALL, 22700, 22.0, 0.08),
+    ]
+
+
+@pytest.fixture
+def book():
+    ticker = FakeTicker()
+    aggregator = LiveGreeksAggregator(ticker=ticker, coalesce_interval=0, hedger_interval=0)
+    aggregator.start()
+    yield aggregator, ticker
+    aggregator.stop()
+
+
+class TestRiskGrid:
+    """Tests for RiskGridEngine."""
+
+    def test_zero_shock_is_flat_and_surfaces_add_up(self, book):
+        aggregator, ticker = book
+        aggregator.add_position(make_position())
+        condor = make_position()
+        condor.legs = iron_condor_legs()
+        aggregator.add_position(condor)
+        ticker.push({NIFTY_TOKEN: SPOT})
+
+        config = RiskGridConfig(
+            spot_shocks=np.array([-0.05, 0.0, 0.05]),
+            vol_shocks=np.array([0.0, 0.05]),
+            days_forward=np.array([0, 3]),
+        )
+        grid = RiskGridEngine(aggregator).compute(config)
+
+        assert grid.portfolio.shape == (3, 2, 2)
+        assert grid.portfolio[1, 0, 0] == pytest.approx(0.0, abs=1e-6)
+        assert sum(grid.by_strategy.values()) == pytest.approx(grid.portfolio)
+        assert grid.by_underlying["NIFTY"] == pytest.approx(grid.portfolio)
+
+    def test_matches_scalar_revaluation(self, book):
+        """A grid cell equals the leg-by-leg Black-Scholes revaluation."""
+        aggregator, ticker = book
+        position = make_position()
+        aggregator.add_position(position)
+        ticker.push({NIFTY_TOKEN: SPOT})
+
+        now = time.time()
+        config = RiskGridConfig(np.array([0.03]), np.array([0.02]), np.array([2]))
+        grid = RiskGridEngine(aggregator).compute(config, now=now)
+
+        expected = 0.0
+        for i, leg in enumerate(position.legs):
+            ttm = (aggregator._expiry_ts[i] - now) / (365 * 24 * 3600)
+            vol = aggregator._vol[i]
+            before = BlackScholesCalculator.option_price(leg.option_type, SPOT, leg.strike, ttm, vol)
+            after = BlackScholesCalculator.option_price(
+                leg.option_type, SPOT * 1.03, leg.strike, ttm - 2 / 365, vol + 0.02
+            )
+            expected -= (after - before) * leg.quantity
+
+        assert grid.portfolio[0, 0, 0] == pytest.approx(expected, rel=1e-6)
+
+    def test_defined_risk_bounded_by_wings(self, book):
+        """An iron condor never loses more than its wing width on the grid."""
+        aggregator, ticker = book
+        condor = make_position()
+        condor.legs = iron_condor_legs()
+        aggregator.add_position(condor)
+        ticker.push({NIFTY_TOKEN: SPOT})
+
+        grid = RiskGridEngine(aggregator).compute()
+        assert 0 < grid.worst_loss <= 300 * 75
+
+    def test_check_proposal(self, book):
+        """Naked exposure over the limit is rejected; a hedge is not."""
+        aggregator, ticker = book
+        aggregator.add_position(make_position())
+        ticker.push({NIFTY_TOKEN: SPOT})
+        engine = RiskGridEngine(aggregator)
+        book_loss = engine.compute().worst_loss
+
+        naked = [make_leg(LegType.SHORT_CALL, 22300, 90.0, 0.35)]
+        ok, reason, _ = engine.check_proposal(naked, "NIFTY", SPOT, max_loss=book_loss)
+        assert not ok and "Scenario loss" in reason
+
+        hedge = [
+            make_leg(LegType.LONG_CALL, 22500, 40.0, 0.2),
+            make_leg(LegType.LONG_PUT, 21700, 35.0, -0.15),
+        ]
+        ok, _, grid = engine.check_proposal(hedge, "NIFTY", SPOT, max_loss=book_loss / 2)
+        assert ok and grid.worst_loss < book_loss
+
+    def test_proposal_only_without_book(self):
+        """With no aggregator the grid covers just the proposal legs."""
+        grid = RiskGridEngine().compute(extra_legs=legs_to_arrays(iron_condor_legs(), "NIFTY", SPOT))
+        assert set(grid.by_strategy) == {"__proposal__"}
+        assert grid.legs == 4
+
+    def test_proposal_vols_implied_from_entry_prices(self):
+        """Proposal legs are revalued at the vol their entry price implies, not a flat default."""
+        legs = iron_condor_legs()
+        arrays = legs_to_arrays(legs, "NIFTY", SPOT)
+        ttm = (arrays["expiry_ts"] - time.time()) / (365 * 24 * 3600)
+
+        for i, leg in enumerate(legs):
+            price = BlackScholesCalculator.option_price(
+                leg.option_type, SPOT, leg.strike, ttm[i], arrays["volatility"][i]
+            )
+            assert price == pytest.approx(leg.entry_price, rel=1e-3)
+        assert len(set(np.round(arrays["volatility"], 4))) > 1
+
+        flat = legs_to_arrays(legs, "NIFTY", None)
+        assert (flat["volatility"] == 0.15).all()  # No spot: nothing to imply from
+
+    def test_full_grid_over_200_legs(self, book):
+        """50x20x5 over 200 distinct legs stays within tens of milliseconds."""
+        aggregator, ticker = book
+        positions = []
+        for i in range(100):
+            position = make_position()
+            position.legs = [
+                make_leg(LegType.SHORT_CALL, 22400 + 50 * i, 80.0, 0.3),
+                make_leg(LegType.SHORT_PUT, 21800 - 50 * i, 70.0, -0.25),
+            ]
+            positions.append(position)
+        aggregator.set_positions(positions)
+        ticker.push({NIFTY_TOKEN: SPOT})
+
+        engine = RiskGridEngine(aggregator)
+        engine.compute()
+        grid = engine.compute()
+
+        assert grid.portfolio.shape == (50, 20, 5)
+        assert grid.legs == 200
+        assert grid.elapsed_ms < 250  # Generous for shared CI machines
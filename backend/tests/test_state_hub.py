@@ -0,0 +1,230 @@
+"""Tests for the broker-process state hub and API worker routing"""
+
+import asyncio
+import threading
+import time
+from unittest.mock import Mock
+
+import pytest
+from fastapi import HTTPException
+
+from app.api import routes
+from app.core import state_hub
+from app.core.rate_limiter import APIEndpoint, APIRateLimiter, RemoteRateLimiter
+from app.core.state_hub import HubError, HubUnavailable, RemoteTicker, StateHub, StateHubClient
+
+AUTHKEY = b"test-hub"
+
+
+def wait_for(condition, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        if time.monotonic() > deadline:
+            raise AssertionError("condition not met in time")
+        time.sleep(0.01)
+
+
+@pytest.fixture
+def hub(tmp_path):
+    hub = StateHub(str(tmp_path / "hub.sock"), AUTHKEY)
+    hub.start()
+    yield hub
+    hub.stop()
+
+
+@pytest.fixture
+def client(hub):
+    client = StateHubClient(hub.address, AUTHKEY, timeout=5.0, retry_interval=0.05)
+    yield client
+    client.close()
+
+
+@pytest.fixture
+def event_loop_thread():
+    loop = asyncio.new_event_loop()
+    thread = threading.Thread(target=loop.run_forever, daemon=True)
+    thread.start()
+    yield loop
+    loop.call_soon_threadsafe(loop.stop)
+    thread.join(timeout=5)
+    loop.close()
+
+
+class Counter:
+    def __init__(self):
+        self.value = 0
+
+    def add(self, n=1):
+        self.value += n
+        return self.value
+
+    def fail(self):
+        raise ValueError("bad request")
+
+
+class TestStateHub:
+    """Workers read state and call into the broker process."""
+
+    def test_publish_and_get(self, hub, client):
+        assert client.get("trading.status") is None
+        assert client.get("trading.status", {}) == {}
+        hub.publish("trading.status", {"running": True, "positions": 2})
+        assert client.get("trading.status") == {"running": True, "positions": 2}
+
+    def test_call_proxy_and_errors(self, hub, client):
+        counter = Counter()
+        hub.expose("counter", counter, ["add", "fail"])
+
+        assert client.call("counter.add", 2) == 2
+        assert client.proxy("counter").add(n=3) == 5
+        with pytest.raises(ValueError, match="bad request"):
+            client.call("counter.fail")
+        with pytest.raises(HubError, match="Unknown hub command"):
+            client.call("counter.missing")
+        assert counter.value == 5
+
+    def test_unreachable_and_restarted_hub(self, tmp_path):
+        address = str(tmp_path / "restart.sock")
+        client = StateHubClient(address, AUTHKEY, timeout=2.0)
+        with pytest.raises(HubUnavailable):
+            client.get("x")
+
+        for value in (1, 2):  # Broker restart: the stale connection is replaced
+            hub = StateHub(address, AUTHKEY)
+            hub.publish("x", value)
+            hub.start()
+            try:
+                assert client.get("x") == value
+            finally:
+                hub.stop()
+        client.close()
+
+    def test_loop_bound_coroutine_handler(self, hub, client, event_loop_thread):
+        async def on_loop():
+            return asyncio.get_running_loop() is event_loop_thread
+
+        hub.register("check.loop", on_loop, loop=event_loop_thread)
+        assert client.call("check.loop") is True
+
+
+class TestRemoteTicker:
+    """Ticks broadcast by the broker reach worker callbacks."""
+
+    def test_ticks_and_seeded_prices(self, hub, client):
+        hub.register("ticker.get_all_prices", lambda: {111: 10.5})
+        ticker = RemoteTicker(client)
+        received = []
+        ticker.add_callback(received.append)
+
+        wait_for(lambda: hub.get_stats()["subscribers"].get("ticks") == 1)
+        wait_for(lambda: ticker.get_price(111) == 10.5)  # Seeded after the subscription is up
+
+        hub.broadcast("ticks", [{"instrument_token": 222, "last_price": 99.0}])
+        wait_for(lambda: received)
+        assert received == [[{"instrument_token": 222, "last_price": 99.0}]]
+        assert ticker.get_all_prices() == {111: 10.5, 222: 99.0}
+
+    def test_slow_subscriber_drops_oldest(self, tmp_path):
+        hub = StateHub(str(tmp_path / "drop.sock"), AUTHKEY, queue_size=2)
+        sub = state_hub._Subscriber(None, "ticks", 2)
+        hub._subscribers["ticks"] = [sub]
+        for i in range(5):
+            hub.broadcast("ticks", i)
+        assert [sub.queue.get_nowait() for _ in range(2)] == [3, 4]
+        assert hub.stats["dropped"] == 3
+
+
+class TestSharedRateLimit:
+    """API workers draw on one broker-side budget."""
+
+    def test_workers_share_order_budget(self, hub):
+        shared = APIRateLimiter()
+        hub.register("rate_limit.reserve", shared.reserve)
+        workers = [RemoteRateLimiter(StateHubClient(hub.address, AUTHKEY)) for _ in range(2)]
+
+        per_second = int(shared.limits[APIEndpoint.ORDER].requests_per_second)
+        granted = [workers[i % 2].reserve(APIEndpoint.ORDER)[0] for i in range(per_second + 2)]
+        assert granted == [True] * per_second + [False, False]
+        assert shared.get_daily_usage_summary()["by_endpoint"]["order"] == per_second
+
+    def test_falls_back_to_local_limits(self, tmp_path):
+        limiter = RemoteRateLimiter(StateHubClient(str(tmp_path / "none.sock"), AUTHKEY))
+        assert limiter.acquire_slot(APIEndpoint.ORDER) == 0.0
+        assert limiter.get_daily_usage_summary()["by_endpoint"]["order"] == 1
+
+
+class StubController:
+    def __init__(self):
+        self.running = False
+
+    async def start(self, mode="paper", interval_seconds=30):
+        if self.running:
+            raise ValueError("Trading already running")
+        self.running = True
+        return {"message": f"Trading started in {mode.upper()} mode with {interval_seconds}s interval"}
+
+
+class TestApiWorkerRoutes:
+    """Trading endpoints in an API worker go to the broker process."""
+
+    @pytest.fixture
+    def api_worker(self, monkeypatch, client):
+        monkeypatch.setattr(state_hub, "is_api_worker", lambda: True)
+        monkeypatch.setattr(state_hub, "_client", client)
+        return client
+
+    def test_start_and_status_through_hub(self, hub, api_worker, event_loop_thread):
+        hub.expose("trading", StubController(), ["start"], event_loop_thread)
+        hub.publish("trading.status", {"mode": "paper", "running": True, "positions": 1,
+                                       "daily_pnl": 250.0, "regime": None, "open_symbols": ["X"]})
+
+        result = asyncio.run(routes.start_trading(mode="paper", interval_seconds=5))
+        assert result["message"].startswith("Trading started in PAPER mode")
+        with pytest.raises(HTTPException) as exc:
+            asyncio.run(routes.start_trading())
+        assert exc.value.status_code == 400
+
+        status = asyncio.run(routes.get_trading_status())
+        assert status.running and status.positions == 1 and status.daily_pnl == 250.0
+
+    def test_trailing_stop_monitor_through_hub(self, hub, api_worker, event_loop_thread, monkeypatch):
+        import app.api.trading_control as trading_control
+        import app.api.websocket as websocket
+        import app.services.execution as execution
+        from app.api.broker import expose_broker_state
+
+        started = []
+
+        async def start(poll_interval=5):
+            started.append(poll_interval)
+
+        service = Mock(start=start)
+        service.stop.return_value = None
+        monkeypatch.setattr(websocket, "ticker_manager", Mock())
+        monkeypatch.setattr(trading_control, "get_trading_controller", Mock)
+        monkeypatch.setattr(execution, "get_trailing_stop_service", lambda: service)
+        expose_broker_state(hub, event_loop_thread)
+        monkeypatch.setattr(execution, "get_trailing_stop_service", lambda: api_worker.proxy("trailing_stop"))
+
+        # The start handler's reply must be picklable
+        assert api_worker.call("trailing_stop.start", 7) is None
+        wait_for(lambda: started == [7])
+
+        assert "started" in asyncio.run(routes.start_trailing_stop_monitor(poll_interval=3))["message"]
+        wait_for(lambda: started == [7, 3])
+        asyncio.run(routes.stop_trailing_stop_monitor())
+        service.stop.assert_called_once()
+
+    def test_broker_down_is_503(self, monkeypatch, tmp_path):
+        import app.services.execution as execution
+
+        monkeypatch.setattr(state_hub, "is_api_worker", lambda: True)
+        monkeypatch.setattr(state_hub, "_client", StateHubClient(str(tmp_path / "down.sock"), AUTHKEY))
+        monkeypatch.setattr(execution, "get_trailing_stop_service", lambda: state_hub._client.proxy("trailing_stop"))
+        for call in (
+            routes.stop_trading(), routes.get_trading_status(), routes.get_recent_traces(),
+            routes.stop_trailing_stop_monitor(), routes.disable_trailing_stop("s1")
+        ):
+            with pytest.raises(HTTPException) as exc:
+                asyncio.run(call)
+            assert exc.value.status_code == 503
@@ -0,0 +1,112 @@
+"""Tests for tick-to-bar aggregation used by the streaming options collector"""
+
+import pytest
+from datetime import datetime, date
+
+from app.services.utilities.tick_aggregator import TickBarAggregator
+
+
+NIFTY_INDEX_TOKEN = 256265
+CE_TOKEN = 1001
+PE_TOKEN = 1002
+
+
+def option_tick(token, price, volume=1000, oi=50000, bid=None, ask=None):
+    """Create a full-mode option tick."""
+    return {
+        "instrument_token": token,
+        "last_price": price,
+        "volume_traded": volume,
+        "oi": oi,
+        "oi_day_high": oi + 100,
+        "oi_day_low": oi - 100,
+        "last_trade_time": datetime(2026, 2, 6, 10, 0, 5),
+        "exchange_timestamp": datetime(2026, 2, 6, 10, 0, 5),
+        "depth": {
+            "buy": [{"price": bid or price - 0.5, "quantity": 75, "orders": 1}],
+            "sell": [{"price": ask or price + 0.5, "quantity": 150, "orders": 2}],
+        },
+    }
+
+
+@pytest.fixture
+def aggregator():
+    agg = TickBarAggregator()
+    agg.register_underlying(NIFTY_INDEX_TOKEN, "NIFTY")
+    for token, opt_type in [(CE_TOKEN, "CE"), (PE_TOKEN, "PE")]:
+        agg.register(token, {
+            "symbol": "NIFTY",
+            "trading_symbol": f"NIFTY2621022000{opt_type}",
+            "expiry": date(2026, 2, 10),
+            "strike": 22000,
+            "option_type": opt_type,
+        })
+    return agg
+
+
+class TestTickBarAggregator:
+    """Tests for TickBarAggregator."""
+
+    def test_bar_ohlc_from_ticks(self, aggregator):
+        """Bar OHLC tracks ticks within the interval."""
+        aggregator.on_ticks([{"instrument_token": NIFTY_INDEX_TOKEN, "last_price": 22010.0}])
+        aggregator.on_ticks([option_tick(CE_TOKEN, p) for p in [100, 104, 97, 101]])
+
+        bar_time = datetime(2026, 2, 6, 10, 0)
+        records = aggregator.flush(bar_time)
+
+        assert len(records) == 1  # PE has not ticked yet
+        r = records[0]
+        assert r["timestamp"] == bar_time
+        assert (r["open"], r["high"], r["low"], r["close"]) == (100, 104, 97, 101)
+        assert r["ltp"] == 101
+        assert r["underlying"] == 22010.0
+        assert r["bid"] == 100.5 and r["ask_qty"] == 150
+        assert r["oi"] == 50000
+
+    def test_flat_bar_carries_forward(self, aggregator):
+        """An instrument without ticks in a bar emits a flat bar at its last price."""
+        aggregator.on_ticks([option_tick(CE_TOKEN, 100), option_tick(CE_TOKEN, 110)])
+        aggregator.flush(datetime(2026, 2, 6, 10, 0))
+
+        r = aggregator.flush(datetime(2026, 2, 6, 10, 1))[0]
+        assert (r["open"], r["high"], r["low"], r["close"]) == (110, 110, 110, 110)
+
+    def test_new_bar_starts_fresh(self, aggregator):
+        """High/low reset after a flush."""
+        aggregator.on_ticks([option_tick(CE_TOKEN, 100), option_tick(CE_TOKEN, 150)])
+        aggregator.flush(datetime(2026, 2, 6, 10, 0))
+        aggregator.on_ticks([option_tick(CE_TOKEN, 120)])
+
+        r = aggregator.flush(datetime(2026, 2, 6, 10, 1))[0]
+        assert r["high"] == 120
+        assert r["low"] == 120
+
+    def test_missing_tokens(self, aggregator):
+        """Registered tokens without any tick are reported for gap-fill."""
+        aggregator.on_ticks([option_tick(CE_TOKEN, 100)])
+        assert aggregator.missing_tokens() == [PE_TOKEN]
+
+    def test_quote_fill_for_untraded_tokens(self, aggregator):
+        """REST quotes seed instruments that never ticked, so they get a bar."""
+        aggregator.on_ticks([option_tick(CE_TOKEN, 100)])
+        assert aggregator.apply_quotes({PE_TOKEN: {"last_price": 42.0, "oi": 1200}, 9999: {"last_price": 1.0}}) == 1
+        assert aggregator.missing_tokens() == []
+
+        records = {r["option_type"]: r for r in aggregator.flush(datetime(2026, 2, 6, 10, 0))}
+        assert records["PE"]["close"] == 42.0 and records["PE"]["oi"] == 1200
+
+    def test_unregistered_ticks_ignored(self, aggregator):
+        """Ticks for tokens outside the universe are counted and dropped."""
+        aggregator.on_ticks([option_tick(9999, 5.0)])
+        assert aggregator.stats.ignored_ticks == 1
+        assert aggregator.flush(datetime(2026, 2, 6, 10, 0)) == []
+
+    def test_unregister_on_resubscribe(self, aggregator):
+        """Unregistered tokens stop producing records."""
+        aggregator.on_ticks([option_tick(CE_TOKEN, 100), option_tick(PE_TOKEN, 90)])
+        aggregator.unregister(PE_TOKEN)
+
+        records = aggregator.flush(datetime(2026, 2, 6, 10, 0))
+        assert [r["option_type"] for r in records] == ["CE"]
+        assert aggregator.tokens("NIFTY") == [CE_TOKEN]
@@ -0,0 +1,155 @@
+"""Tests for tick recording and replay"""
+
+import time
+from datetime import datetime
+
+import numpy as np
+import pytest
+
+from app.api.websocket import KiteTickerManager
+from app.core.tick_log import (
+    TICK_DTYPE, TickLog, TickRecorder, TickReplay, decode_ticks, encode_ticks, session_files
+)
+
+
+def full_tick(token, price, ts=datetime(2026, 2, 6, 10, 15, 3)):
+    return {
+        "tradable": True,
+        "mode": "full",
+        "instrument_token": token,
+        "last_price": price,
+        "last_traded_quantity": 75,
+        "average_traded_price": price - 0.35,
+        "volume_traded": 1234500,
+        "total_buy_quantity": 98000,
+        "total_sell_quantity": 101250,
+        "ohlc": {"open": price - 10, "high": price + 5.5, "low": price - 12.25, "close": price - 3},
+        "change": 1.0375,
+        "last_trade_time": ts,
+        "oi": 3030950,
+        "oi_day_high": 3100000,
+        "oi_day_low": 2950000,
+        "exchange_timestamp": ts,
+        "depth": {
+            "buy": [{"quantity": 75 * (i + 1), "price": price - 0.05 * (i + 1), "orders": i + 1} for i in range(5)],
+            "sell": [{"quantity": 150 * (i + 1), "price": price + 0.05 * (i + 1), "orders": i + 2} for i in range(5)],
+        },
+    }
+
+
+def session(batches=20, tokens=(12345, 67890), start_ns=1_770_350_400_000_000_000, gap_ms=10):
+    """(received_ns, ticks) batches with ticks of every mode."""
+    out = []
+    for b in range(batches):
+        price = 100.0 + b * 0.05
+        ticks = [full_tick(token, price + i) for i, token in enumerate(tokens)]
+        ticks.append({"tradable": True, "mode": "ltp", "instrument_token": 11111, "last_price": price * 3})
+        ticks.append({
+            "tradable": False, "mode": "quote", "instrument_token": 256265, "last_price": 25500.15 + b,
+            "ohlc": {"open": 25400.0, "high": 25600.0, "low": 25350.0, "close": 25450.0}, "change": 0.2,
+        })
+        out.append((start_ns + b * gap_ms * 1_000_000, ticks))
+    return out
+
+
+@pytest.fixture
+def ticker():
+    manager = KiteTickerManager()
+    yield manager
+    manager.stop_replay()
+    manager.stop_recording()
+    manager._callbacks.clear()
+    manager._price_cache.clear()
+
+
+class TestTickEncoding:
+    """Records decode back to the dicts KiteTicker delivered."""
+
+    def test_round_trip_every_mode(self):
+        _, ticks = session(batches=1)[0]
+        ticks[0]["exchange_timestamp"] = None
+        records = encode_ticks(ticks, batch=7, received_ns=42)
+
+        assert records.dtype == TICK_DTYPE and TICK_DTYPE.itemsize % 8 == 0
+        assert decode_ticks(records) == ticks
+        assert set(records["batch"]) == {7}
+
+    def test_recorder_appends_and_rotates_daily(self, tmp_path):
+        recorder = TickRecorder(tmp_path)
+        batches = session(batches=5)
+        for received_ns, ticks in batches[:3]:
+            recorder.record(ticks, received_ns)
+        recorder.close()
+
+        # Restart the same day, then cross midnight
+        recorder = TickRecorder(tmp_path)
+        recorder.record(batches[3][1], batches[3][0])
+        recorder.record(batches[4][1], batches[4][0] + 86_400 * 10**9)
+        recorder.close()
+
+        files = session_files(tmp_path)
+        assert len(files) == 2
+        day = list(TickLog(files[0]).batches())
+        assert [b[1] for b in day] == [ticks for _, ticks in batches[:4]]
+        assert list(np.unique(TickLog(files[0]).records["batch"])) == [0, 1, 2, 3]
+        assert list(TickLog(files[1]).batches())[0][1] == batches[4][1]
+
+    def test_partial_record_is_dropped_on_reopen(self, tmp_path):
+        recorder = TickRecorder(tmp_path)
+        received_ns, ticks = session(batches=1)[0]
+        recorder.record(ticks, received_ns)
+        recorder.close()
+
+        path = session_files(tmp_path)[0]
+        with open(path, "ab") as f:
+            f.write(b"\x00" * 17)  # Torn write
+        recorder = TickRecorder(tmp_path)
+        recorder.record(ticks, received_ns)
+        recorder.close()
+
+        assert [len(b) for _, b in TickLog(path).batches()] == [len(ticks), len(ticks)]
+
+
+class TestTickReplay:
+    """Replay through KiteTickerManager matches the live session."""
+
+    def record_session(self, ticker, tmp_path, batches):
+        ticker.start_recording(tmp_path)
+        for received_ns, ticks in batches:
+            ticker._on_ticks(None, ticks)
+        ticker.stop_recording()
+        return session_files(tmp_path)
+
+    def test_replay_reproduces_callbacks_and_prices(self, ticker, tmp_path):
+        batches = session()
+        live = []
+        ticker.add_callback(live.append)
+        files = self.record_session(ticker, tmp_path, batches)
+        live_prices = ticker.get_all_prices()
+
+        ticker._price_cache.clear()
+        replayed = []
+        ticker._callbacks[:] = [replayed.append]
+        replay = ticker.start_replay(files, speed=None)
+        assert replay.wait(timeout=10)
+
+        assert replayed == live == [ticks for _, ticks in batches]
+        assert ticker.get_all_prices() == live_prices
+        assert replay.get_stats()["ticks"] == sum(len(t) for _, t in batches)
+        # Replayed ticks are not recorded again
+        assert len(TickLog(files[0])) == sum(len(t) for _, t in batches)
+
+    def test_replay_keeps_recorded_spacing(self, tmp_path):
+        recorder = TickRecorder(tmp_path)
+        for received_ns, ticks in session(batches=5, gap_ms=50):
+            recorder.record(ticks, received_ns)
+        recorder.close()
+        files = session_files(tmp_path)
+
+        timestamps = []
+        TickReplay(files, speed=1.0).run(lambda ws, ticks: timestamps.append(time.perf_counter()))
+        assert timestamps[-1] - timestamps[0] == pytest.approx(0.2, abs=0.05)
+
+        timestamps.clear()
+        TickReplay(files, speed=10.0).run(lambda ws, ticks: timestamps.append(time.perf_counter()))
+        assert timestamps[-1] - timestamps[0] < 0.1
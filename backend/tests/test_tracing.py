@@ -0,0 +1,141 @@
+"""Tests for span tracing and the trace waterfall"""
+
+import time
+
+import pytest
+
+from app.core.tracing import Tracer, current_trace_id, get_tracer, span
+from app.services.execution.audit_logger import AuditEventType, ExecutionAuditLogger
+from tests.test_trading_engine import BANKNIFTY, NIFTY, make_engine
+
+
+@pytest.fixture
+def tracer():
+    tracer = get_tracer()
+    tracer.clear()
+    tracer.configure(sample_rate=1.0)
+    yield tracer
+    tracer.clear()
+    tracer.configure(sample_rate=1.0)
+
+
+class TestTracer:
+    """Span nesting, sampling and the waterfall."""
+
+    def test_waterfall_nesting(self):
+        tracer = Tracer()
+        with tracer.trace("iteration") as trace_id:
+            with tracer.span("engine.sentinel", kind="engine"):
+                with tracer.span("kite.ltp", kind="broker", category="quote"):
+                    time.sleep(0.002)
+            with tracer.span("engine.execution", kind="engine"):
+                pass
+
+        waterfall = tracer.waterfall(trace_id)
+        rows = [(s["name"], s["depth"]) for s in waterfall["spans"]]
+        assert rows == [("iteration", 0), ("engine.sentinel", 1), ("kite.ltp", 2), ("engine.execution", 1)]
+        assert waterfall["name"] == "iteration" and waterfall["span_count"] == 4
+        assert waterfall["spans"][2]["attributes"] == {"category": "quote"}
+        assert waterfall["spans"][2]["duration_ms"] >= 2
+        assert waterfall["spans"][3]["offset_ms"] >= waterfall["spans"][2]["offset_ms"]
+        assert tracer.waterfall("trace_unknown") == {}
+
+    def test_unsampled_trace_keeps_id_but_records_nothing(self):
+        tracer = Tracer(sample_rate=0.0)
+        with tracer.trace("iteration") as trace_id:
+            assert current_trace_id() == trace_id
+            with tracer.span("engine.sentinel") as inner:
+                assert inner is None
+        assert current_trace_id() is None
+        assert tracer.get_spans(trace_id) == []
+        assert tracer.get_stats()["traces_sampled"] == 0
+
+    def test_span_cap_and_errors(self):
+        tracer = Tracer(max_spans=3)
+        with pytest.raises(ValueError):
+            with tracer.trace("iteration") as trace_id:
+                for _ in range(5):
+                    with tracer.span("db.query", kind="db"):
+                        pass
+                with tracer.span("late"):
+                    raise ValueError("boom")
+
+        spans = tracer.get_spans(trace_id)
+        assert len(spans) == 3
+        assert tracer.get_stats()["spans_dropped"] == 4
+        assert next(s for s in spans if s.name == "iteration").error == "ValueError: boom"
+
+    def test_ring_buffer_is_bounded(self):
+        tracer = Tracer(capacity=10)
+        for _ in range(5):
+            with tracer.trace("iteration"):
+                with tracer.span("a"), tracer.span("b"):
+                    pass
+        assert tracer.get_stats()["spans_buffered"] == 10
+        assert len(tracer.recent_traces()) == 4  # Oldest trace partly evicted
+
+    def test_overhead_is_small(self):
+        tracer = Tracer()
+        with tracer.trace("iteration"):
+            for _ in range(10):
+                with tracer.span("work"):
+                    time.sleep(0.005)
+        assert tracer.get_stats()["overhead_pct"] < 1.0
+
+
+class TestTracedComponents:
+    """Engine, audit logger and repository spans join the active trace."""
+
+    def test_engine_pipelines_join_trace(self, tracer):
+        engine, _ = make_engine()
+        try:
+            with tracer.trace("orchestrator.iteration") as trace_id:
+                engine.run_cycle([NIFTY, BANKNIFTY])
+        finally:
+            engine.shutdown()
+
+        spans = {s.span_id: s for s in tracer.get_spans(trace_id)}
+        by_name = {}
+        for s in spans.values():
+            by_name.setdefault(s.name, []).append(s)
+
+        cycle = by_name["engine.cycle"][0]
+        pipelines = by_name["engine.pipeline"]
+        assert sorted(p.attributes["instrument_token"] for p in pipelines) == sorted([NIFTY, BANKNIFTY])
+        assert all(p.parent_id == cycle.span_id for p in pipelines)
+        assert all(spans[s.parent_id].name == "engine.pipeline" for s in by_name["engine.sentinel"])
+        assert len(by_name["engine.execution"]) == 2
+
+    def test_audit_events_join_the_trade_trace(self, tracer):
+        audit = ExecutionAuditLogger(buffer_size=1000, log_to_file=False)
+        with tracer.trace("orchestrator.iteration") as trace_id:
+            with span("engine.execution"):
+                entry = audit.log(AuditEventType.ORDER_PLACED, "Executor", trade_id="T1", order_id="O1")
+                other = audit.log(AuditEventType.ORDER_PLACED, "Executor", trade_id="T2", order_id="O2")
+
+        # A later event for the same trade, outside any trace
+        filled = audit.log(AuditEventType.ORDER_FILLED, "Executor", trade_id="T1", order_id="O1")
+
+        # Trades in one iteration keep their own correlation ids
+        assert entry.correlation_id != other.correlation_id
+        assert filled.correlation_id == entry.correlation_id
+        assert entry.trace_id == other.trace_id == filled.trace_id == trace_id
+        assert tracer.find_traces(trade_id="T1") == [trace_id]
+        names = [s["name"] for s in tracer.waterfall(trace_id)["spans"]]
+        assert names == [
+            "orchestrator.iteration", "engine.execution", "audit.order_placed", "audit.order_placed",
+            "audit.order_filled"
+        ]
+
+    def test_repository_queries_are_spans(self, tracer, tmp_path):
+        from app.database.repository import Repository
+
+        repo = Repository(f"sqlite:///{tmp_path}/trace.db")
+        repo.get_trade("untraced")
+        with tracer.trace("iteration") as trace_id:
+            repo.get_trade("missing")
+
+        queries = [s for s in tracer.get_spans(trace_id) if s.kind == "db"]
+        assert len(queries) == 1
+        assert queries[0].attributes["statement"].startswith("SELECT")
+        assert tracer.get_stats()["spans_buffered"] == 2
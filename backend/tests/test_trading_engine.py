@@ -0,0 +1,191 @@
+"""Tests for concurrent per-underlying trading cycles"""
+
+import threading
+import time
+from types import SimpleNamespace
+from unittest.mock import Mock
+
+from app.core.trading_engine import TradingEngine
+from app.models.regime import RegimeType
+
+
+NIFTY, BANKNIFTY, FINNIFTY = 256265, 260105, 257801
+SYMBOLS = {NIFTY: "NIFTY", BANKNIFTY: "BANKNIFTY", FINNIFTY: "FINNIFTY"}
+
+
+class FakeSentinel:
+    def __init__(self, delay=0.0, regimes=None):
+        self.delay = delay
+        self.regimes = regimes or {}
+        self.calls = []
+
+    def process(self, token):
+        self.calls.append(token)
+        time.sleep(self.delay)
+        regime = self.regimes.get(token, RegimeType.RANGE_BOUND)
+        return SimpleNamespace(
+            symbol=SYMBOLS[token], regime=regime, is_safe=regime != RegimeType.CHAOS
+        )
+
+
+class FakeStrategist:
+    def __init__(self, delay=0.0, structure=None):
+        self.delay = delay
+        self.structure = structure
+
+    def process(self, regime):
+        time.sleep(self.delay)
+        structure = SimpleNamespace(value=self.structure or f"STRANGLE_{regime.symbol}")
+        return [SimpleNamespace(structure=structure, instrument=regime.symbol)]
+
+
+class SerialExecutor:
+    """Executor fake that fails if two orders are ever placed at once."""
+
+    def __init__(self):
+        self.busy = threading.Lock()
+        self.placed = []
+        self.monitor_kwargs = None
+        self.shut_down = False
+
+    def shutdown(self):
+        self.shut_down = True
+
+    def get_open_positions(self):
+        return [SimpleNamespace(legs=[SimpleNamespace(instrument_token=1)])]
+
+    def monitor_positions(self, prices, regime, **kwargs):
+        self.monitor_kwargs = kwargs
+        return []
+
+    def has_open_position_for_structure(self, structure, instrument=None):
+        return False
+
+    def process(self, signal):
+        assert self.busy.acquire(blocking=False), "orders placed concurrently"
+        try:
+            time.sleep(0.01)
+            self.placed.append(signal)
+            return SimpleNamespace(success=True)
+        finally:
+            self.busy.release()
+
+
+def make_engine(delay=0.0, factory=True, regimes=None, structure=None):
+    treasury = Mock()
+    treasury.process.side_effect = lambda proposal, account: (True, proposal.instrument, "ok")
+    state_manager = Mock()
+    state_manager.is_circuit_breaker_active.return_value = False
+    kite = Mock()
+    kite.get_ltp.return_value = {}
+
+    created = []
+
+    def pipeline_factory(token):
+        created.append(token)
+        return FakeSentinel(delay, regimes), FakeStrategist(delay, structure)
+
+    engine = TradingEngine(
+        sentinel=FakeSentinel(delay, regimes),
+        strategist=FakeStrategist(delay, structure),
+        treasury=treasury,
+        executor=SerialExecutor(),
+        state_manager=state_manager,
+        kite=kite,
+        pipeline_factory=pipeline_factory if factory else None,
+    )
+    return engine, created
+
+
+class TestTradingEngineCycle:
+    """Tests for TradingEngine.run_cycle."""
+
+    def test_cycle_time_tracks_slowest_underlying(self):
+        engine, _ = make_engine(delay=0.1)
+        try:
+            start = time.perf_counter()
+            cycle = engine.run_cycle([NIFTY, BANKNIFTY, FINNIFTY])
+            elapsed = time.perf_counter() - start
+        finally:
+            engine.shutdown()
+
+        assert set(cycle.results) == {NIFTY, BANKNIFTY, FINNIFTY}
+        assert elapsed < 0.45  # Sequential would be ~0.6s
+        assert all(ms >= 200 for ms in cycle.pipeline_ms.values())
+
+    def test_pipelines_are_isolated_per_underlying(self):
+        engine, created = make_engine()
+        try:
+            engine.run_cycle([NIFTY, BANKNIFTY])
+            engine.run_cycle([NIFTY, BANKNIFTY])
+        finally:
+            engine.shutdown()
+
+        assert created == [BANKNIFTY]  # Primary agents serve the first underlying
+        assert engine.sentinel.calls == [NIFTY, NIFTY]
+        assert engine._pipelines[BANKNIFTY][0].calls == [BANKNIFTY, BANKNIFTY]
+        assert engine.executor.shut_down  # Detached from the ticker's order stream
+
+    def test_execution_is_serialized_in_token_order(self):
+        engine, _ = make_engine(delay=0.02)
+        try:
+            cycle = engine.run_cycle([NIFTY, BANKNIFTY, FINNIFTY])
+        finally:
+            engine.shutdown()
+
+        assert engine.executor.placed == ["NIFTY", "BANKNIFTY", "FINNIFTY"]
+        assert all(len(r.entries) == 1 for r in cycle.results.values())
+
+    def test_same_structure_on_each_underlying(self):
+        """The in-cycle duplicate filter is per underlying."""
+        engine, _ = make_engine(structure="NAKED_STRANGLE")
+        try:
+            engine.run_cycle([NIFTY, BANKNIFTY])
+        finally:
+            engine.shutdown()
+
+        assert engine.executor.placed == ["NIFTY", "BANKNIFTY"]
+
+    def test_open_structure_blocks_only_its_underlying(self, monkeypatch):
+        """An open NIFTY condor skips NIFTY next cycle but not a BANKNIFTY condor."""
+        from tests.test_multi_leg_execution import FakeKite, iron_condor, make_executor
+
+        engine, _ = make_engine(structure="IRON_CONDOR")
+        engine.executor = make_executor(monkeypatch, FakeKite(delay=0))
+        engine.treasury.process.side_effect = lambda proposal, account: (
+            True, iron_condor().model_copy(update={"instrument": proposal.instrument}), "ok"
+        )
+        try:
+            first = engine.run_cycle([NIFTY])
+            second = engine.run_cycle([NIFTY, BANKNIFTY])
+            third = engine.run_cycle([NIFTY, BANKNIFTY])
+        finally:
+            engine.shutdown()
+
+        assert len(first.results[NIFTY].entries) == 1
+        assert second.results[NIFTY].entries == []
+        assert [e["instrument"] for e in second.results[BANKNIFTY].entries] == ["BANKNIFTY"]
+        assert all(r.entries == [] for r in third.results.values())
+        assert sorted(p.instrument for p in engine.executor.get_open_positions()) == ["BANKNIFTY", "NIFTY"]
+
+    def test_regimes_are_per_underlying(self):
+        """CHAOS on one underlying skips only its entries and drives only its exits."""
+        engine, _ = make_engine(regimes={BANKNIFTY: RegimeType.CHAOS})
+        try:
+            cycle = engine.run_cycle([NIFTY, BANKNIFTY])
+        finally:
+            engine.shutdown()
+
+        assert cycle.results[BANKNIFTY].skipped_reason == "Regime not safe: CHAOS"
+        assert engine.executor.placed == ["NIFTY"]
+        assert engine.executor.monitor_kwargs["regimes_by_instrument"] == {
+            "NIFTY": RegimeType.RANGE_BOUND, "BANKNIFTY": RegimeType.CHAOS
+        }
+
+    def test_run_iteration_without_factory_is_sequential(self):
+        engine, created = make_engine(factory=False)
+        result = engine.run_iteration(NIFTY)
+
+        assert result.regime.symbol == "NIFTY"
+        assert result.entries[0]["instrument"] == "NIFTY"
+        assert created == [] and engine._pool is None
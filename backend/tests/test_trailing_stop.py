@@ -0,0 +1,192 @@
+"""Tests for the tick-driven trailing stop service"""
+
+import pytest
+from types import SimpleNamespace
+
+from app.services.execution.trailing_stop_service import TrailingStopService
+
+
+CE_TOKEN = 1001
+PE_TOKEN = 1002
+OTHER_TOKEN = 2001
+
+
+class FakeTicker:
+    """Records callbacks and subscriptions like KiteTickerManager."""
+
+    def __init__(self, connects=True):
+        self.callbacks = []
+        self.tokens = set()
+        self.connects = connects
+        self.started = False
+
+    def ensure_started(self):
+        self.started = self.connects
+        return self.started
+
+    def add_callback(self, cb):
+        self.callbacks.append(cb)
+
+    def remove_callback(self, cb):
+        self.callbacks.remove(cb)
+
+    def subscribe(self, tokens):
+        self.tokens |= set(tokens)
+
+
+def make_trade(trade_id, symbol, token, qty, entry):
+    return SimpleNamespace(
+        id=trade_id, tradingsymbol=symbol, instrument_token=token, exchange="NFO",
+        quantity=qty, entry_price=entry, last_price=entry,
+    )
+
+
+def make_strategy(strategy_id, **overrides):
+    fields = dict(
+        id=strategy_id, name=f"Strategy {strategy_id}",
+        trailing_activation_pct=0.8, trailing_step_pct=0.1, trailing_lock_pct=0.05,
+        trailing_current_floor_pct=None, trailing_high_water_pct=None,
+        trailing_margin_used=None, trailing_sl_order_ids=None,
+    )
+    fields.update(overrides)
+    return SimpleNamespace(**fields)
+
+
+@pytest.fixture
+def service():
+    svc = TrailingStopService(kite=SimpleNamespace(), ticker=FakeTicker())
+    # Short strangle: margin = 15% of notional = 0.15 * 2 * 75 * 100 = 2250
+    svc.track(make_strategy("s1"), [
+        make_trade("t1", "NIFTY26FEB22500CE", CE_TOKEN, -75, 100.0),
+        make_trade("t2", "NIFTY26FEB21500PE", PE_TOKEN, -75, 100.0),
+    ])
+    svc.track(make_strategy("s2"), [
+        make_trade("t3", "BANKNIFTY26FEB50000CE", OTHER_TOKEN, -30, 200.0),
+    ])
+    return svc
+
+
+def tick(token, price):
+    return {"instrument_token": token, "last_price": price}
+
+
+class TestTrailingStopService:
+    """Tests for TrailingStopService tick evaluation."""
+
+    def test_token_index(self, service):
+        """Every leg token maps to its strategy."""
+        assert sorted(service.tokens()) == [CE_TOKEN, PE_TOKEN, OTHER_TOKEN]
+
+    def test_only_touched_strategies_update(self, service):
+        """A tick only marks strategies holding that token dirty."""
+        service.on_ticks([tick(CE_TOKEN, 99.0)])
+        assert service._dirty == {"s1"}
+        assert service.get_state("s1").current_pnl == pytest.approx(75.0)
+        assert service.get_state("s2").current_pnl == 0
+
+    def test_activation_on_single_tick(self, service):
+        """Crossing the activation threshold queues an activation immediately."""
+        # 75 * 0.3 = 22.5 on ~2247 margin -> ~1%
+        service.on_ticks([tick(CE_TOKEN, 99.7)])
+        state = service.get_state("s1")
+        assert state.is_active
+        assert state.floor_pct == 0.8
+        assert [t.kind for t in service._transitions] == ["activate"]
+
+    def test_below_activation_stays_inactive(self, service):
+        """Small profits do not activate trailing."""
+        service.on_ticks([tick(CE_TOKEN, 99.9)])
+        assert not service.get_state("s1").is_active
+        assert not service._transitions
+
+    def test_floor_raises_in_steps(self):
+        """P&L above the precomputed raise threshold moves floor and high-water mark."""
+        svc = TrailingStopService(kite=SimpleNamespace(), ticker=FakeTicker())
+        tracked = svc.track(
+            make_strategy("s1", trailing_current_floor_pct=0.8, trailing_high_water_pct=0.8,
+                          trailing_margin_used=10000.0),
+            [make_trade("t1", "NIFTY26FEB22500CE", CE_TOKEN, -100, 100.0)],
+        )
+        assert tracked.raise_at_pnl == pytest.approx(90.0)  # (0.8 + 0.1)% of 10000
+
+        svc.on_ticks([tick(CE_TOKEN, 99.2)])  # +80, below threshold
+        assert not svc._transitions
+
+        svc.on_ticks([tick(CE_TOKEN, 98.95)])  # +105 -> 1.05%: two steps
+        state = svc.get_state("s1")
+        assert state.floor_pct == pytest.approx(0.9)
+        assert state.high_water_pct == pytest.approx(1.0)
+        assert [t.kind for t in svc._transitions] == ["raise"]
+
+    def test_pending_transition_blocks_duplicates(self, service):
+        """A strategy is not re-evaluated until its transition is persisted."""
+        service.on_ticks([tick(CE_TOKEN, 99.0)])
+        service.on_ticks([tick(CE_TOKEN, 95.0)])
+        assert len(service._transitions) == 1
+
+    def test_start_subscribes_and_flushes(self, service, monkeypatch):
+        """The monitor registers its tick callback and subscribes leg tokens."""
+        import asyncio
+
+        monkeypatch.setattr(service, "resync", lambda: setattr(service, "_last_resync", None))
+        monkeypatch.setattr(service, "_flush", lambda: service.stop())
+
+        asyncio.run(service.start(poll_interval=0.01, resync_interval=0))
+
+        ticker = service._ticker
+        assert ticker.started
+        assert ticker.tokens == {CE_TOKEN, PE_TOKEN, OTHER_TOKEN}
+        assert ticker.callbacks == []  # Removed on stop
+
+    def test_polls_quotes_without_ticks(self, monkeypatch):
+        """With the ticker down the monitor evaluates legs on REST LTPs."""
+        import asyncio
+
+        kite = SimpleNamespace(get_ltp=lambda tokens: {CE_TOKEN: 99.0, PE_TOKEN: 100.0})
+        svc = TrailingStopService(kite=kite, ticker=FakeTicker(connects=False))
+        svc.track(make_strategy("s1"), [
+            make_trade("t1", "NIFTY26FEB22500CE", CE_TOKEN, -75, 100.0),
+            make_trade("t2", "NIFTY26FEB21500PE", PE_TOKEN, -75, 100.0),
+        ])
+        monkeypatch.setattr(svc, "resync", lambda: setattr(svc, "_last_resync", None))
+        monkeypatch.setattr(svc, "_flush", lambda: svc.stop())
+
+        asyncio.run(svc.start(poll_interval=0.01, resync_interval=0))
+
+        assert svc.stats["quote_polls"] == 1
+        assert svc.get_state("s1").current_pnl == pytest.approx(75.0)
+
+    def test_live_ticks_suppress_polling(self, service):
+        """Quote polling only runs while ticks are stale."""
+        assert service._ticks_stale()
+        service.on_ticks([tick(CE_TOKEN, 99.0)])
+        assert not service._ticks_stale()
+
+    def test_disable_drops_queued_activation(self, service, monkeypatch):
+        """A transition queued before disable never touches the row or places orders."""
+        import app.services.execution.trailing_stop_service as module
+
+        row = make_strategy("s1", trailing_stop_enabled=True, trailing_activated_at=None)
+        session = SimpleNamespace(
+            query=lambda model: session, filter_by=lambda **kw: session, first=lambda: row,
+            commit=lambda: None, rollback=lambda: None, close=lambda: None,
+            bulk_update_mappings=lambda model, updates: None,
+        )
+        monkeypatch.setattr(module, "get_session", lambda: session)
+        placed = []
+        monkeypatch.setattr(service, "_place_sl_orders", lambda *args: placed.append(args))
+
+        service.on_ticks([tick(CE_TOKEN, 99.7)])
+        queued = list(service._transitions)
+        assert [t.kind for t in queued] == ["activate"]
+
+        assert service.disable_trailing_stop("s1")
+        assert not service._transitions
+        service._flush()
+
+        # Already dequeued by the flush worker when disable ran
+        service._apply_transition(queued[0])
+
+        assert placed == []
+        assert row.trailing_current_floor_pct is None
+        assert row.trailing_margin_used is None